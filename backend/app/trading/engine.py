@@ -6,7 +6,7 @@
 import asyncio
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 from enum import Enum
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
@@ -19,6 +19,7 @@
 
 from ..bus import EventBus, EventType
 from ..config import Settings
+from .streaming_indicators import Bar, StreamingIndicator
 
 logger = structlog.get_logger(__name__)
 
@@ -209,7 +210,14 @@ def get_metrics(self) -> Dict[str, Any]:
         }
 
 class BaseStrategy(ABC):
-    """Base class for all trading strategies"""
+    """
+    Base class for all trading strategies
+
+    Indicators named by ``indicator_specs`` are kept per symbol as streaming
+    state and advanced once per market data update (each update is one bar
+    with open = high = low = close = price), so ``analyze`` reads current
+    values instead of recomputing them over the whole price history.
+    """
     
     def __init__(self, name: str, portfolio: Portfolio, settings: Dict[str, Any] = None):
         self.name = name
@@ -217,7 +225,7 @@ def __init__(self, name: str, portfolio: Portfolio, settings: Dict[str, Any] = N
         self.settings = settings or {}
         self.enabled = True
         self.market_data = {}  # symbol -> deque of recent prices
-        self.indicators = {}   # symbol -> indicator values
+        self.indicators: Dict[str, Dict[str, StreamingIndicator]] = {}  # symbol -> streaming indicators
         
         # Strategy performance
         self.total_signals = 0
@@ -233,16 +241,33 @@ def get_risk_params(self, symbol: str, current_price: float) -> Tuple[Optional[f
         """Get stop loss and take profit levels"""
         pass
     
+    def indicator_specs(self) -> Dict[str, Callable[[], StreamingIndicator]]:
+        """Name -> factory of the streaming indicators this strategy reads"""
+        return {}
+    
     def update_market_data(self, symbol: str, price: float, volume: float, timestamp: datetime):
-        """Update market data for strategy analysis"""
+        """Update market data and advance the symbol's indicators"""
         if symbol not in self.market_data:
             self.market_data[symbol] = deque(maxlen=1000)
+            self.indicators[symbol] = {name: factory() for name, factory in self.indicator_specs().items()}
         
         self.market_data[symbol].append({
             'price': price,
             'volume': volume,
             'timestamp': timestamp
         })
+        
+        indicators = self.indicators[symbol]
+        if indicators:
+            seconds = timestamp.timestamp() if isinstance(timestamp, datetime) else 0.0
+            bar = Bar(seconds, price, price, price, price, volume)
+            for indicator in indicators.values():
+                indicator.update(bar)
+    
+    def indicator(self, symbol: str, name: str, default: Any = None) -> Any:
+        """Current value of one of the symbol's indicators (``default`` until it is ready)"""
+        indicator = self.indicators.get(symbol, {}).get(name)
+        return indicator.value if indicator is not None and indicator.value is not None else default
 
 class TradingEngine:
     """Professional trading engine with multiple strategies"""
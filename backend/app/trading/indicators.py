@@ -7,6 +7,7 @@
 import pandas as pd
 from typing import List, Tuple, Dict, Any, Optional
 from collections import deque
+from datetime import datetime
 import talib
 import math
 from scipy import stats
@@ -15,10 +16,17 @@
 
 import structlog
 
+from .streaming_indicators import Bar, IndicatorSet, default_indicators
+
 logger = structlog.get_logger(__name__)
 
 class AdvancedIndicators:
-    """Advanced technical indicators for professional trading"""
+    """
+    Advanced technical indicators for professional trading
+
+    Each call runs over the whole series; for per-tick updates use the
+    stateful equivalents in ``streaming_indicators``.
+    """
     
     @staticmethod
     def ema(prices: List[float], period: int) -> float:
@@ -402,7 +410,7 @@ def money_flow_index(highs: List[float], lows: List[float], closes: List[float],
 class MultiTimeframeAnalysis:
     """Multi-timeframe analysis for professional trading"""
     
-    def __init__(self):
+    def __init__(self, live: bool = True):
         self.timeframes = {
             '1m': deque(maxlen=1440),    # 1 day of 1-minute data
             '5m': deque(maxlen=288),     # 1 day of 5-minute data  
@@ -412,28 +420,50 @@ def __init__(self):
             '1d': deque(maxlen=365)      # 1 year of daily data
         }
         self.last_update = {}
+        
+        # Streaming indicators per timeframe, advanced bar by bar (live bar included)
+        self.indicators = {
+            tf: IndicatorSet(tf, default_indicators(), live=live, history=data.maxlen)
+            for tf, data in self.timeframes.items()
+        }
+    
+    def update(self, price: float, volume: float, timestamp):
+        """Feed one tick to every timeframe; closed bars are recorded as they complete"""
+        for tf, indicator_set in self.indicators.items():
+            finished = indicator_set.update_tick(timestamp, price, volume)
+            if finished is not None:
+                self._record(tf, finished.close, finished.volume, finished.timestamp)
+            self.last_update[tf] = timestamp
     
     def update_timeframe_data(self, timeframe: str, price: float, volume: float, timestamp):
-        """Update specific timeframe data"""
+        """Update specific timeframe data with a closed bar"""
         if timeframe in self.timeframes:
-            self.timeframes[timeframe].append({
-                'price': price,
-                'volume': volume,
-                'timestamp': timestamp
-            })
+            ts = timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp)
+            for indicator in self.indicators[timeframe].indicators.values():
+                indicator.update(Bar(ts, price, price, price, price, volume))
+            self._record(timeframe, price, volume, timestamp)
             self.last_update[timeframe] = timestamp
     
+    def _record(self, timeframe: str, price: float, volume: float, timestamp):
+        self.timeframes[timeframe].append({
+            'price': price,
+            'volume': volume,
+            'timestamp': timestamp
+        })
+    
+    def get_indicators(self, timeframe: str) -> Dict[str, Any]:
+        """Current streaming indicator values for a timeframe"""
+        return self.indicators[timeframe].values()
+    
     def get_mtf_trend_alignment(self) -> float:
         """Multi-timeframe trend alignment score"""
         trends = {}
         
-        for tf, data in self.timeframes.items():
-            if len(data) >= 20:
-                prices = [d['price'] for d in list(data)[-20:]]
-                
-                # Calculate trend direction using linear regression
-                x = np.arange(len(prices))
-                slope, _, r_value, _, _ = stats.linregress(x, prices)
+        for tf, indicator_set in self.indicators.items():
+            # Linear regression over the last 20 bars, maintained incrementally
+            trend = indicator_set['trend'].value
+            if trend is not None:
+                slope, r_value = trend
                 
                 # Trend direction (-1 to 1)
                 trend_direction = np.tanh(slope * 100)  # Normalize slope
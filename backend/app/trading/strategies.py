@@ -19,9 +19,10 @@
 import structlog
 
 from .engine import BaseStrategy, OrderSide, Portfolio
-from .indicators import (AdvancedIndicators, QuantitativeIndicators, 
+from .indicators import (QuantitativeIndicators, 
                         MachineLearningIndicators, MarketMicrostructureIndicators,
                         MultiTimeframeAnalysis)
+from .streaming_indicators import ADX, ATR, EMA, MACD, RSI, BollingerBands
 
 logger = structlog.get_logger(__name__)
 
@@ -43,6 +44,13 @@ def __init__(self, portfolio: Portfolio, settings: Dict[str, Any] = None):
         self.z_scores = defaultdict(lambda: deque(maxlen=100))
         self.volume_avg = defaultdict(lambda: deque(maxlen=50))
         
+    def indicator_specs(self):
+        return {
+            'bbands': lambda: BollingerBands(self.settings['bb_period'], self.settings['bb_std']),
+            'rsi': lambda: RSI(14),
+            'atr': lambda: ATR(14),
+        }
+        
     async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if symbol not in self.market_data or len(self.market_data[symbol]) < self.settings['bb_period']:
             return None
@@ -59,9 +67,7 @@ async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dic
             return None
         
         # Calculate Bollinger Bands
-        upper, middle, lower = AdvancedIndicators.bollinger_bands(
-            prices, self.settings['bb_period'], self.settings['bb_std']
-        )
+        upper, middle, lower = self.indicator(symbol, 'bbands', (0.0, 0.0, 0.0))
         
         if upper == 0 or middle == 0 or lower == 0:
             return None
@@ -73,7 +79,7 @@ async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dic
         self.z_scores[symbol].append(z_score)
         
         # RSI for additional confirmation
-        rsi = AdvancedIndicators.rsi(prices)
+        rsi = self.indicator(symbol, 'rsi', 50.0)
         
         # Generate signals
         signal = None
@@ -147,10 +153,8 @@ def get_risk_params(self, symbol: str, current_price: float) -> Tuple[Optional[f
         if symbol not in self.market_data or len(self.market_data[symbol]) < 20:
             return None, None
         
-        prices = [d['price'] for d in self.market_data[symbol]]
-        
         # Use ATR for stop loss
-        atr = AdvancedIndicators.atr(prices, prices, prices, 14)
+        atr = self.indicator(symbol, 'atr', 0.0)
         if atr == 0:
             return None, None
         
@@ -182,6 +186,14 @@ def __init__(self, portfolio: Portfolio, settings: Dict[str, Any] = None):
         self.support_levels = defaultdict(lambda: deque(maxlen=10))
         self.volume_sma = defaultdict(lambda: deque(maxlen=50))
         
+    def indicator_specs(self):
+        return {
+            'rsi': lambda: RSI(14),
+            'macd': lambda: MACD(12, 26, 9),
+            'adx': lambda: ADX(14),
+            'atr': lambda: ATR(self.settings['atr_period']),
+        }
+        
     async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if symbol not in self.market_data or len(self.market_data[symbol]) < self.settings['lookback_period']:
             return None
@@ -215,9 +227,9 @@ async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dic
         volume_confirmed = current_volume > avg_volume * self.settings['volume_multiplier']
         
         # Additional indicators
-        rsi = AdvancedIndicators.rsi(prices)
-        macd, macd_signal, macd_hist = AdvancedIndicators.macd(prices)
-        adx = AdvancedIndicators.adx(prices, prices, prices)  # Trend strength
+        rsi = self.indicator(symbol, 'rsi', 50.0)
+        macd, macd_signal, macd_hist = self.indicator(symbol, 'macd', (0.0, 0.0, 0.0))
+        adx = self.indicator(symbol, 'adx', 0.0)  # Trend strength
         
         # Machine learning momentum score
         momentum_score = MachineLearningIndicators.price_momentum_score(prices)
@@ -281,10 +293,8 @@ def get_risk_params(self, symbol: str, current_price: float) -> Tuple[Optional[f
         if symbol not in self.market_data or len(self.market_data[symbol]) < 20:
             return None, None
         
-        prices = [d['price'] for d in self.market_data[symbol]]
-        
         # ATR-based stops for breakouts
-        atr = AdvancedIndicators.atr(prices, prices, prices, self.settings['atr_period'])
+        atr = self.indicator(symbol, 'atr', 0.0)
         if atr == 0:
             return None, None
         
@@ -316,6 +326,13 @@ def __init__(self, portfolio: Portfolio, settings: Dict[str, Any] = None):
         self.last_signals = defaultdict(lambda: deque(maxlen=10))
         self.price_ticks = defaultdict(lambda: deque(maxlen=100))
         
+    def indicator_specs(self):
+        return {
+            'ema_fast': lambda: EMA(self.settings['ema_fast']),
+            'ema_slow': lambda: EMA(self.settings['ema_slow']),
+            'rsi': lambda: RSI(self.settings['rsi_period']),
+        }
+        
     async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if symbol not in self.market_data or len(self.market_data[symbol]) < self.settings['ema_slow']:
             return None
@@ -329,11 +346,11 @@ async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dic
         self.price_ticks[symbol].append(current_price)
         
         # EMAs for trend
-        ema_fast = AdvancedIndicators.ema(prices, self.settings['ema_fast'])
-        ema_slow = AdvancedIndicators.ema(prices, self.settings['ema_slow'])
+        ema_fast = self.indicator(symbol, 'ema_fast', np.mean(prices))
+        ema_slow = self.indicator(symbol, 'ema_slow', np.mean(prices))
         
         # RSI for momentum
-        rsi = AdvancedIndicators.rsi(prices, self.settings['rsi_period'])
+        rsi = self.indicator(symbol, 'rsi', 50.0)
         
         # Volume analysis
         avg_volume = np.mean(volumes[-20:]) if len(volumes) >= 20 else np.mean(volumes)
@@ -655,6 +672,12 @@ def __init__(self, portfolio: Portfolio, settings: Dict[str, Any] = None):
         self.feature_history = defaultdict(lambda: deque(maxlen=200))
         self.prediction_models = {}
         
+    def indicator_specs(self):
+        return {
+            'rsi': lambda: RSI(14),
+            'atr': lambda: ATR(14),
+        }
+        
     async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if symbol not in self.market_data or len(self.market_data[symbol]) < self.settings['lookback_period']:
             return None
@@ -663,7 +686,7 @@ async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dic
         volumes = [d['volume'] for d in self.market_data[symbol]]
         
         # Extract features
-        features = self._extract_features(prices, volumes)
+        features = self._extract_features(symbol, prices, volumes)
         if not features:
             return None
         
@@ -708,7 +731,7 @@ async def analyze(self, symbol: str, price_data: Dict[str, Any]) -> Optional[Dic
         
         return signal
     
-    def _extract_features(self, prices: List[float], volumes: List[float]) -> Optional[Dict[str, float]]:
+    def _extract_features(self, symbol: str, prices: List[float], volumes: List[float]) -> Optional[Dict[str, float]]:
         """Extract features for ML model"""
         try:
             if len(prices) < self.settings['feature_window']:
@@ -728,7 +751,7 @@ def _extract_features(self, prices: List[float], volumes: List[float]) -> Option
                 'volatility_20': np.std(returns[-20:]) if len(returns) >= 20 else 0,
                 
                 # Technical indicators
-                'rsi': AdvancedIndicators.rsi(prices),
+                'rsi': self.indicator(symbol, 'rsi', 50.0),
                 'rsi_divergence': 0,  # Could calculate RSI divergence
                 
                 # Volume features
@@ -810,10 +833,8 @@ def get_risk_params(self, symbol: str, current_price: float) -> Tuple[Optional[f
         if symbol not in self.market_data or len(self.market_data[symbol]) < 20:
             return None, None
         
-        prices = [d['price'] for d in self.market_data[symbol]]
-        
         # Use ATR for dynamic stops
-        atr = AdvancedIndicators.atr(prices, prices, prices, 14)
+        atr = self.indicator(symbol, 'atr', 0.0)
         if atr == 0:
             return None, None
         
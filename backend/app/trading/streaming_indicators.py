@@ -0,0 +1,579 @@
+"""
+Sofia V2 Streaming Indicators - Stateful O(1) technical analysis
+Incremental versions of the AdvancedIndicators that match TA-Lib output
+
+Each indicator keeps just the running state it needs and advances one bar
+per ``update(bar)``; ``value`` is None until the TA-Lib lookback has been
+filled, then equals the last element TA-Lib would return for the same
+series. ``update(bar, closed=False)`` evaluates a live (still forming) bar
+without committing it, so the next update - live or closed - starts again
+from the last closed bar.
+
+``BarAggregator`` builds timeframe bars from ticks or finer bars and
+``IndicatorSet`` keeps a group of indicators on one timeframe in step with
+it, including the live partial bar.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
+
+TIMEFRAME_SECONDS = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400,
+}
+
+ZERO = 1e-8  # TA-Lib's TA_IS_ZERO tolerance
+
+
+def _is_zero(x: float) -> bool:
+    return -ZERO < x < ZERO
+
+
+def _seconds(timestamp: Union[float, datetime]) -> float:
+    return timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp)
+
+
+@dataclass
+class Bar:
+    """OHLCV bar; ``timestamp`` is the bar open time in epoch seconds"""
+    timestamp: float
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+
+    @property
+    def typical_price(self) -> float:
+        return (self.high + self.low + self.close) / 3.0
+
+
+class StreamingIndicator(ABC):
+    """Base class: subclasses implement ``_step`` (pure) and ``_commit``"""
+
+    lookback = 0
+
+    def __init__(self):
+        self.value: Any = None
+        self.count = 0  # closed bars consumed
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, bar: Bar, closed: bool = True) -> Any:
+        """Advance one bar (or preview a live one) and return the new value"""
+        state, value = self._step(bar)
+        if closed:
+            self._commit(state, bar)
+            self.count += 1
+        self.value = value
+        return value
+
+    @abstractmethod
+    def _step(self, bar: Bar) -> Tuple[Any, Any]:
+        """(new state, value) after ``bar``, without changing the indicator"""
+        pass
+
+    @abstractmethod
+    def _commit(self, state: Any, bar: Bar):
+        """Adopt the state ``_step`` returned for a closed bar"""
+        pass
+
+
+class _Ema:
+    """TA-Lib EMA core on floats: seeded with the SMA of the first ``period`` values"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.n = 0
+        self.seed = 0.0
+        self.ema: Optional[float] = None
+
+    def step(self, x: float) -> Tuple[Tuple[float, Optional[float]], Optional[float]]:
+        if self.ema is not None:
+            ema = self.ema + self.k * (x - self.ema)
+            return (self.seed, ema), ema
+        seed = self.seed + x
+        ema = seed / self.period if self.n + 1 >= self.period else None
+        return (seed, ema), ema
+
+    def commit(self, state: Tuple[float, Optional[float]]):
+        self.seed, self.ema = state
+        self.n += 1
+
+
+class SMA(StreamingIndicator):
+    """Simple Moving Average of closes"""
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self.lookback = period - 1
+        self.window: Deque[float] = deque()
+        self.total = 0.0
+
+    def _step(self, bar: Bar):
+        total = self.total + bar.close
+        if len(self.window) == self.period:
+            total -= self.window[0]
+        ready = len(self.window) + 1 >= self.period
+        return total, total / self.period if ready else None
+
+    def _commit(self, total: float, bar: Bar):
+        if len(self.window) == self.period:
+            self.window.popleft()
+        self.window.append(bar.close)
+        self.total = total
+
+
+class EMA(StreamingIndicator):
+    """Exponential Moving Average of closes (talib.EMA)"""
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.lookback = period - 1
+        self.core = _Ema(period)
+
+    def _step(self, bar: Bar):
+        return self.core.step(bar.close)
+
+    def _commit(self, state, bar: Bar):
+        self.core.commit(state)
+
+
+class RSI(StreamingIndicator):
+    """Relative Strength Index with Wilder smoothing (talib.RSI)"""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.lookback = period
+        self.prev_close: Optional[float] = None
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def _step(self, bar: Bar):
+        if self.prev_close is None:
+            return (0.0, 0.0), None
+        diff = bar.close - self.prev_close
+        up, down = (diff, 0.0) if diff > 0 else (0.0, -diff)
+        n = self.count - 1  # changes seen before this one
+        p = self.period
+        if n < p:
+            gain, loss = self.gain + up, self.loss + down
+            if n + 1 < p:
+                return (gain, loss), None
+            gain, loss = gain / p, loss / p
+        else:
+            gain = (self.gain * (p - 1) + up) / p
+            loss = (self.loss * (p - 1) + down) / p
+        total = gain + loss
+        return (gain, loss), 100.0 * gain / total if not _is_zero(total) else 0.0
+
+    def _commit(self, state, bar: Bar):
+        self.gain, self.loss = state
+        self.prev_close = bar.close
+
+
+class MACD(StreamingIndicator):
+    """MACD line, signal and histogram (talib.MACD); value is the 3-tuple"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        if fast > slow:
+            fast, slow = slow, fast  # TA-Lib swaps them too
+        self.fast_period = fast
+        self.slow_period = slow
+        self.lookback = slow + signal - 2
+        # Both EMAs are seeded on bar slow-1 (the fast one from its last ``fast`` closes)
+        self.recent: Deque[float] = deque(maxlen=fast)
+        self.slow_total = 0.0
+        self.fast_ema: Optional[float] = None
+        self.slow_ema: Optional[float] = None
+        self.k_fast = 2.0 / (fast + 1)
+        self.k_slow = 2.0 / (slow + 1)
+        self.signal = _Ema(signal)
+
+    def _step(self, bar: Bar):
+        x = bar.close
+        if self.slow_ema is None:
+            slow_total = self.slow_total + x
+            if self.count + 1 < self.slow_period:
+                return (slow_total, None, None, None), None
+            recent = list(self.recent)[1:] if len(self.recent) == self.fast_period else list(self.recent)
+            fast_ema = (sum(recent) + x) / self.fast_period
+            slow_ema = slow_total / self.slow_period
+        else:
+            slow_total = self.slow_total
+            fast_ema = self.fast_ema + self.k_fast * (x - self.fast_ema)
+            slow_ema = self.slow_ema + self.k_slow * (x - self.slow_ema)
+        macd = fast_ema - slow_ema
+        signal_state, signal = self.signal.step(macd)
+        value = (macd, signal, macd - signal) if signal is not None else None
+        return (slow_total, fast_ema, slow_ema, signal_state), value
+
+    def _commit(self, state, bar: Bar):
+        self.slow_total, fast_ema, slow_ema, signal_state = state
+        if fast_ema is None:
+            self.recent.append(bar.close)
+            return
+        self.fast_ema, self.slow_ema = fast_ema, slow_ema
+        self.signal.commit(signal_state)
+
+
+class BollingerBands(StreamingIndicator):
+    """SMA +/- ``std`` population deviations (talib.BBANDS); value is (upper, middle, lower)"""
+
+    def __init__(self, period: int = 20, std: float = 2.0):
+        super().__init__()
+        self.period = period
+        self.std = std
+        self.lookback = period - 1
+        self.window: Deque[float] = deque()
+        # Sums of (x - shift) keep the variance exact at any price level
+        self.shift: Optional[float] = None
+        self.s1 = 0.0
+        self.s2 = 0.0
+
+    def _step(self, bar: Bar):
+        shift = bar.close if self.shift is None else self.shift
+        d = bar.close - shift
+        s1, s2 = self.s1 + d, self.s2 + d * d
+        if len(self.window) == self.period:
+            old = self.window[0] - shift
+            s1, s2 = s1 - old, s2 - old * old
+        if len(self.window) + 1 < self.period:
+            return (shift, s1, s2), None
+        n = self.period
+        mean = s1 / n
+        var = s2 / n - mean * mean
+        dev = math.sqrt(var) if var > 0 else 0.0
+        middle = shift + mean
+        return (shift, s1, s2), (middle + self.std * dev, middle, middle - self.std * dev)
+
+    def _commit(self, state, bar: Bar):
+        self.shift, self.s1, self.s2 = state
+        if len(self.window) == self.period:
+            self.window.popleft()
+        self.window.append(bar.close)
+
+
+class ATR(StreamingIndicator):
+    """Average True Range with Wilder smoothing (talib.ATR)"""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.lookback = period
+        self.prev_close: Optional[float] = None
+        self.atr = 0.0  # running TR sum until seeded
+
+    def _step(self, bar: Bar):
+        if self.prev_close is None:
+            return 0.0, None
+        tr = max(bar.high - bar.low, abs(bar.high - self.prev_close), abs(bar.low - self.prev_close))
+        p = self.period
+        n = self.count - 1  # true ranges seen before this one
+        if n < p:
+            total = self.atr + tr
+            return (total, None) if n + 1 < p else (total / p, total / p)
+        atr = (self.atr * (p - 1) + tr) / p
+        return atr, atr
+
+    def _commit(self, atr: float, bar: Bar):
+        self.atr = atr
+        self.prev_close = bar.close
+
+
+class ADX(StreamingIndicator):
+    """Average Directional Index (talib.ADX)"""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.lookback = 2 * period - 1
+        self.prev: Optional[Bar] = None
+        self.plus_dm = 0.0
+        self.minus_dm = 0.0
+        self.tr = 0.0
+        self.adx = 0.0  # DX sum until seeded
+
+    def _step(self, bar: Bar):
+        prev = self.prev
+        if prev is None:
+            return None, None
+        up, down = bar.high - prev.high, prev.low - bar.low
+        plus = up if up > 0 and up > down else 0.0
+        minus = down if down > 0 and down > up else 0.0
+        tr = max(bar.high - bar.low, abs(bar.high - prev.close), abs(bar.low - prev.close))
+        p = self.period
+        n = self.count  # index of this bar
+        if n < p:
+            # Accumulate the first period-1 directional moves and ranges
+            return (self.plus_dm + plus, self.minus_dm + minus, self.tr + tr, 0.0), None
+        plus_dm = self.plus_dm - self.plus_dm / p + plus
+        minus_dm = self.minus_dm - self.minus_dm / p + minus
+        smoothed_tr = self.tr - self.tr / p + tr
+        dx = None
+        if not _is_zero(smoothed_tr):
+            plus_di = 100.0 * plus_dm / smoothed_tr
+            minus_di = 100.0 * minus_dm / smoothed_tr
+            di_sum = plus_di + minus_di
+            if not _is_zero(di_sum):
+                dx = 100.0 * abs(minus_di - plus_di) / di_sum
+        if n < 2 * p - 1:
+            return (plus_dm, minus_dm, smoothed_tr, self.adx + (dx or 0.0)), None
+        if n == 2 * p - 1:
+            adx = (self.adx + (dx or 0.0)) / p
+        else:
+            adx = (self.adx * (p - 1) + dx) / p if dx is not None else self.adx
+        return (plus_dm, minus_dm, smoothed_tr, adx), adx
+
+    def _commit(self, state, bar: Bar):
+        if state is not None:
+            self.plus_dm, self.minus_dm, self.tr, self.adx = state
+        self.prev = bar
+
+
+class CCI(StreamingIndicator):
+    """
+    Commodity Channel Index (talib.CCI).
+
+    The mean absolute deviation has no running form, so each update is
+    O(period) over the typical-price window rather than O(1).
+    """
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.lookback = period - 1
+        self.window: Deque[float] = deque()
+        self.total = 0.0
+
+    def _step(self, bar: Bar):
+        tp = bar.typical_price
+        full = len(self.window) == self.period
+        total = self.total + tp - (self.window[0] if full else 0.0)
+        if len(self.window) + 1 < self.period:
+            return total, None
+        mean = total / self.period
+        deviation = abs(tp - mean)
+        skip = 1 if full else 0
+        for i, x in enumerate(self.window):
+            if i >= skip:
+                deviation += abs(x - mean)
+        deviation /= self.period
+        delta = tp - mean
+        return total, delta / (0.015 * deviation) if deviation != 0 and delta != 0 else 0.0
+
+    def _commit(self, total: float, bar: Bar):
+        if len(self.window) == self.period:
+            self.window.popleft()
+        self.window.append(bar.typical_price)
+        self.total = total
+
+
+class MFI(StreamingIndicator):
+    """Money Flow Index (talib.MFI)"""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.lookback = period
+        self.prev_tp: Optional[float] = None
+        self.flows: Deque[Tuple[float, float]] = deque()  # (positive, negative) money flow
+        self.positive = 0.0
+        self.negative = 0.0
+
+    def _step(self, bar: Bar):
+        tp = bar.typical_price
+        if self.prev_tp is None:
+            return (0.0, 0.0), None
+        flow = tp * bar.volume
+        pos, neg = (flow, 0.0) if tp > self.prev_tp else (0.0, flow) if tp < self.prev_tp else (0.0, 0.0)
+        positive, negative = self.positive + pos, self.negative + neg
+        if len(self.flows) == self.period:
+            old_pos, old_neg = self.flows[0]
+            positive, negative = positive - old_pos, negative - old_neg
+        if len(self.flows) + 1 < self.period:
+            return (pos, neg), None
+        total = positive + negative
+        return (pos, neg), 100.0 * positive / total if total >= 1.0 else 0.0
+
+    def _commit(self, state, bar: Bar):
+        self.prev_tp = bar.typical_price
+        if self.count == 0:
+            return
+        pos, neg = state
+        if len(self.flows) == self.period:
+            old_pos, old_neg = self.flows.popleft()
+            self.positive -= old_pos
+            self.negative -= old_neg
+        self.flows.append(state)
+        self.positive += pos
+        self.negative += neg
+
+
+class LinearTrend(StreamingIndicator):
+    """
+    Least-squares fit of the last ``period`` closes against bar index.
+
+    Value is (slope, r), as ``scipy.stats.linregress`` over the window
+    would give; sums are slid in O(1) per bar.
+    """
+
+    def __init__(self, period: int = 20):
+        super().__init__()
+        self.period = period
+        self.lookback = period - 1
+        self.window: Deque[float] = deque()
+        self.shift: Optional[float] = None
+        self.sy = 0.0
+        self.syy = 0.0
+        self.sxy = 0.0  # x = 0..len-1 within the window
+
+    def _step(self, bar: Bar):
+        shift = bar.close if self.shift is None else self.shift
+        y = bar.close - shift
+        n = len(self.window)
+        sy, syy, sxy = self.sy, self.syy, self.sxy
+        if n == self.period:
+            old = self.window[0] - shift
+            # Dropping x=0 shifts every remaining x down by one
+            sy -= old
+            syy -= old * old
+            sxy -= sy
+            n -= 1
+        sxy += n * y
+        sy += y
+        syy += y * y
+        n += 1
+        if n < self.period:
+            return (shift, sy, syy, sxy), None
+        sx = n * (n - 1) / 2.0
+        sxx = (n - 1) * n * (2 * n - 1) / 6.0
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        slope = cov / var_x
+        r = cov / math.sqrt(var_x * var_y) if var_y > 0 else 0.0
+        return (shift, sy, syy, sxy), (slope, max(-1.0, min(1.0, r)))
+
+    def _commit(self, state, bar: Bar):
+        self.shift, self.sy, self.syy, self.sxy = state
+        if len(self.window) == self.period:
+            self.window.popleft()
+        self.window.append(bar.close)
+
+
+class BarAggregator:
+    """
+    Builds ``timeframe`` bars from ticks or finer bars.
+
+    ``add`` returns the bar that closed when the input opened a new
+    period; the forming bar is available as ``live``.
+    """
+
+    def __init__(self, timeframe: Union[str, int], history: int = 500):
+        self.timeframe = timeframe
+        self.seconds = TIMEFRAME_SECONDS[timeframe] if isinstance(timeframe, str) else int(timeframe)
+        self.live: Optional[Bar] = None
+        self.closed: Deque[Bar] = deque(maxlen=history)
+
+    def add(self, timestamp: Union[float, datetime], open_: float, high: float, low: float,
+            close: float, volume: float = 0.0) -> Optional[Bar]:
+        ts = _seconds(timestamp)
+        start = ts - ts % self.seconds
+        live = self.live
+        if live is not None:
+            if start < live.timestamp:
+                return None  # late input for an already closed period
+            if start == live.timestamp:
+                live.high = max(live.high, high)
+                live.low = min(live.low, low)
+                live.close = close
+                live.volume += volume
+                return None
+            self.closed.append(live)
+        self.live = Bar(start, open_, high, low, close, volume)
+        return live
+
+    def add_tick(self, timestamp: Union[float, datetime], price: float, volume: float = 0.0) -> Optional[Bar]:
+        return self.add(timestamp, price, price, price, price, volume)
+
+    def add_bar(self, bar: Bar) -> Optional[Bar]:
+        return self.add(bar.timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume)
+
+    def close_live(self) -> Optional[Bar]:
+        """Close the forming bar now (e.g. at session end)"""
+        finished, self.live = self.live, None
+        if finished is not None:
+            self.closed.append(finished)
+        return finished
+
+
+IndicatorFactory = Callable[[], StreamingIndicator]
+
+
+class IndicatorSet:
+    """
+    Named indicators on one timeframe, fed through a ``BarAggregator``.
+
+    Closed bars are committed to every indicator; with ``live`` the forming
+    bar is previewed after each input so ``values()`` is always current.
+    """
+
+    def __init__(self, timeframe: Union[str, int], indicators: Dict[str, StreamingIndicator],
+                 live: bool = True, history: int = 500):
+        self.aggregator = BarAggregator(timeframe, history)
+        self.indicators = indicators
+        self.live = live
+
+    def update_tick(self, timestamp: Union[float, datetime], price: float,
+                    volume: float = 0.0) -> Optional[Bar]:
+        return self._apply(self.aggregator.add_tick(timestamp, price, volume))
+
+    def update_bar(self, bar: Bar) -> Optional[Bar]:
+        return self._apply(self.aggregator.add_bar(bar))
+
+    def _apply(self, finished: Optional[Bar]) -> Optional[Bar]:
+        if finished is not None:
+            for indicator in self.indicators.values():
+                indicator.update(finished)
+        live = self.aggregator.live
+        if self.live and live is not None:
+            for indicator in self.indicators.values():
+                indicator.update(live, closed=False)
+        return finished
+
+    def values(self) -> Dict[str, Any]:
+        return {name: indicator.value for name, indicator in self.indicators.items()}
+
+    def __getitem__(self, name: str) -> StreamingIndicator:
+        return self.indicators[name]
+
+
+def default_indicators() -> Dict[str, StreamingIndicator]:
+    """The AdvancedIndicators set with their default parameters"""
+    return {
+        'ema_12': EMA(12),
+        'ema_26': EMA(26),
+        'rsi': RSI(14),
+        'macd': MACD(12, 26, 9),
+        'bbands': BollingerBands(20, 2.0),
+        'atr': ATR(14),
+        'adx': ADX(14),
+        'cci': CCI(14),
+        'mfi': MFI(14),
+        'trend': LinearTrend(20),
+    }
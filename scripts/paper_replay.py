@@ -1,15 +1,23 @@
 """
 Paper Trading Replay - Quick Profitability Check
+
+Bars from every symbol are merged into one time-ordered stream (k-way heap
+merge) and appended to the SignalHub one at a time, so a replay is linear in
+the number of bars. Signal timestamps and session filters follow the replay
+clock and the ML mock is seeded, so two replays of the same data agree.
 """
 
 import os
 import sys
+import heapq
 import asyncio
 import logging
-from typing import Dict, Any, List
+from itertools import groupby
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from decimal import Decimal
 from datetime import datetime, timedelta
 import json
+import numpy as np
 import pandas as pd
 import ccxt
 import yfinance as yf
@@ -24,12 +32,17 @@
 logger = logging.getLogger(__name__)
 
 
+Bar = Tuple[int, int, str, List[float]]  # (timestamp_ns, symbol order, symbol, [ts_ms, o, h, l, c, v])
+
+
 class PaperReplay:
     """Accelerated paper trading simulation for quick profitability check"""
     
-    def __init__(self, hours: int = 24):
+    def __init__(self, hours: int = 24, seed: int = 42, max_bars: int = 200):
         self.hours = hours
-        self.signal_hub = SignalHub()
+        self.seed = seed
+        self.clock_time: Optional[datetime] = None
+        self.signal_hub = SignalHub(clock=self._clock, seed=seed, max_bars=max_bars)
         
         # Replay state
         self.balance = Decimal('10000')
@@ -107,105 +120,113 @@ async def _fetch_historical_data(self, start_time: datetime, end_time: datetime)
         
         return data
     
-    async def _simulate_trading(self, historical_data: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
-        """Simulate trading on historical data"""
-        all_timestamps = set()
-        for df in historical_data.values():
-            # Convert to timezone-naive for comparison
-            if hasattr(df.index, 'tz_localize'):
-                df.index = df.index.tz_localize(None)
-            all_timestamps.update(df.index.tolist())
+    def _clock(self) -> datetime:
+        """Replay clock: timestamp of the bar being processed"""
+        return self.clock_time or datetime.now()
+    
+    @staticmethod
+    def _iter_bars(order: int, symbol: str, df: pd.DataFrame) -> Iterator[Bar]:
+        """Time-ordered bars of one symbol as plain tuples"""
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            # Compare all markets on naive UTC
+            index = index.tz_convert('UTC').tz_localize(None)
         
-        all_timestamps = sorted(all_timestamps)
+        stamps = index.values.astype('datetime64[ns]').view('int64')
+        order_by = np.argsort(stamps, kind='stable')
+        stamps = stamps[order_by]
+        values = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)[order_by]
         
-        trades_executed = 0
-        winning_trades = 0
-        total_fees = Decimal('0')
+        for ts, row in zip(stamps.tolist(), values.tolist()):
+            yield ts, order, symbol, [ts // 1_000_000] + row
+    
+    def merge_bars(self, historical_data: Dict[str, pd.DataFrame]) -> Iterator[Bar]:
+        """k-way merge of every symbol's bars into one time-ordered stream"""
+        return heapq.merge(*(
+            self._iter_bars(order, symbol, df)
+            for order, (symbol, df) in enumerate(historical_data.items())
+            if not df.empty
+        ))
+    
+    async def _simulate_trading(self, historical_data: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+        """Simulate trading on historical data"""
+        stats = {'trades_executed': 0, 'winning_trades': 0, 'total_fees': Decimal('0')}
+        last_prices: Dict[str, Decimal] = {}
         
-        # Process each timestamp
-        for timestamp in all_timestamps:
-            current_prices = {}
+        # All symbols with a bar at a timestamp are updated before any of them trades
+        for ts, group in groupby(self.merge_bars(historical_data), key=lambda bar: bar[0]):
+            self.clock_time = pd.Timestamp(ts).to_pydatetime()
             
-            # Get prices at this timestamp
-            for symbol, df in historical_data.items():
-                if timestamp in df.index:
-                    current_prices[symbol] = Decimal(str(df.loc[timestamp, 'close']))
-                    
-                    # Update signal hub with data up to this point
-                    historical_slice = df[:timestamp]
-                    if len(historical_slice) > 20:  # Need enough data for indicators
-                        # Convert to OHLCV format expected by signal hub
-                        ohlcv_data = []
-                        for idx, row in historical_slice.iterrows():
-                            ohlcv_data.append([
-                                int(idx.timestamp() * 1000) if hasattr(idx, 'timestamp') else 0,
-                                row['open'],
-                                row['high'],
-                                row['low'],
-                                row['close'],
-                                row['volume']
-                            ])
-                        self.signal_hub.update_ohlcv(symbol, ohlcv_data)
+            current_prices = {}
+            for _, _, symbol, bar in group:
+                self.signal_hub.append_bar(symbol, bar)
+                current_prices[symbol] = last_prices[symbol] = Decimal(str(bar[4]))
             
             # Get signals and execute trades
             for symbol, price in current_prices.items():
                 signal = self.signal_hub.get_signal(symbol, price)
                 
                 if signal and signal['strength'] != 0:
-                    # Simple position sizing
-                    position_size = (self.balance * Decimal('0.1')) / price  # 10% per trade
-                    
-                    if signal['strength'] > 0:  # Buy signal
-                        if symbol not in self.positions:
-                            # Open position
-                            fee = position_size * price * Decimal('0.001')
-                            self.positions[symbol] = {
-                                'quantity': position_size,
-                                'entry_price': price,
-                                'entry_time': timestamp
-                            }
-                            self.balance -= (position_size * price + fee)
-                            total_fees += fee
-                            trades_executed += 1
-                            
-                    elif signal['strength'] < 0:  # Sell signal
-                        if symbol in self.positions:
-                            # Close position
-                            pos = self.positions[symbol]
-                            pnl = (price - pos['entry_price']) * pos['quantity']
-                            fee = pos['quantity'] * price * Decimal('0.001')
-                            
-                            self.pnl += pnl - fee
-                            self.balance += (pos['quantity'] * price - fee)
-                            total_fees += fee
-                            
-                            if pnl > 0:
-                                winning_trades += 1
-                            
-                            trades_executed += 1
-                            del self.positions[symbol]
+                    self._execute_signal(symbol, price, signal['strength'], self.clock_time, stats)
         
         # Close remaining positions at last price
+        winning_trades = stats['winning_trades']
         for symbol, pos in self.positions.items():
-            if symbol in historical_data:
-                last_price = Decimal(str(historical_data[symbol]['close'].iloc[-1]))
-                pnl = (last_price - pos['entry_price']) * pos['quantity']
+            if symbol in last_prices:
+                pnl = (last_prices[symbol] - pos['entry_price']) * pos['quantity']
                 self.pnl += pnl
                 
                 if pnl > 0:
                     winning_trades += 1
         
+        trades_executed = stats['trades_executed']
         return {
             'trades_executed': trades_executed,
             'winning_trades': winning_trades,
             'win_rate': (winning_trades / trades_executed * 100) if trades_executed > 0 else 0,
             'total_pnl': float(self.pnl),
-            'total_fees': float(total_fees),
+            'total_fees': float(stats['total_fees']),
             'final_balance': float(self.balance),
             'return_pct': float((self.pnl / Decimal('10000')) * 100),
             'open_positions': len(self.positions)
         }
     
+    def _execute_signal(self, symbol: str, price: Decimal, strength: float,
+                        timestamp: datetime, stats: Dict[str, Any]):
+        """Open or close a position on a fused signal"""
+        # Simple position sizing
+        position_size = (self.balance * Decimal('0.1')) / price  # 10% per trade
+        
+        if strength > 0:  # Buy signal
+            if symbol not in self.positions:
+                # Open position
+                fee = position_size * price * Decimal('0.001')
+                self.positions[symbol] = {
+                    'quantity': position_size,
+                    'entry_price': price,
+                    'entry_time': timestamp
+                }
+                self.balance -= (position_size * price + fee)
+                stats['total_fees'] += fee
+                stats['trades_executed'] += 1
+                
+        elif strength < 0:  # Sell signal
+            if symbol in self.positions:
+                # Close position
+                pos = self.positions[symbol]
+                pnl = (price - pos['entry_price']) * pos['quantity']
+                fee = pos['quantity'] * price * Decimal('0.001')
+                
+                self.pnl += pnl - fee
+                self.balance += (pos['quantity'] * price - fee)
+                stats['total_fees'] += fee
+                
+                if pnl > 0:
+                    stats['winning_trades'] += 1
+                
+                stats['trades_executed'] += 1
+                del self.positions[symbol]
+    
     def _generate_replay_report(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate replay simulation report"""
         report = {
@@ -0,0 +1,128 @@
+"""
+Compiled multi-keyword matching for news text
+"""
+
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+
+class KeywordMatcher:
+    """
+    Match many keyword groups against text with one compiled regex.
+
+    ``groups`` maps a group name (impact level, event type, symbol...) to its
+    keywords; a keyword may belong to several groups. With ``whole_words`` a
+    keyword only matches between word boundaries (like ``\\bkeyword\\b``),
+    otherwise any substring occurrence counts (like ``keyword in text``).
+    Matching is case-insensitive.
+    """
+
+    def __init__(self, groups: Dict[Hashable, Iterable[str]], whole_words: bool = True):
+        self.whole_words = whole_words
+        self._group_order = {group: i for i, group in enumerate(groups)}
+        self.keyword_groups: Dict[str, List[Hashable]] = {}
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                group_list = self.keyword_groups.setdefault(keyword.lower(), [])
+                if group not in group_list:
+                    group_list.append(group)
+
+        # Keywords are compiled as a trie so each text position costs O(keyword
+        # length) whatever the number of keywords; the zero-width lookahead
+        # visits every position, so overlapping occurrences are all seen, and
+        # each position reports its longest keyword
+        boundary = r'\b' if whole_words else ''
+        alternation = _trie_pattern(self.keyword_groups) or r'(?!)'
+        self._pattern = re.compile(rf'(?={boundary}({alternation}){boundary})', re.IGNORECASE)
+
+        # Shorter keywords that also match wherever a longer one starts
+        self._prefixes = {
+            keyword: [
+                keyword[:end] for end in range(1, len(keyword) + 1)
+                if keyword[:end] in self.keyword_groups and self._is_prefix(keyword[:end], keyword)
+            ]
+            for keyword in self.keyword_groups
+        }
+
+    def _is_prefix(self, short: str, keyword: str) -> bool:
+        if not self.whole_words or short == keyword:
+            return True
+        # ``short`` must end on a word boundary inside ``keyword``
+        return _is_word_char(short[-1]) != _is_word_char(keyword[len(short)])
+
+    def count(self, text: str) -> Counter:
+        """Occurrences of each keyword in ``text``"""
+        counts: Counter = Counter()
+        for match in self._pattern.finditer(text):
+            counts.update(self._prefixes[match.group(1).lower()])
+        return counts
+
+    def groups(self, keyword_counts: Dict[str, int]) -> Counter:
+        """Aggregate keyword counts into per-group counts"""
+        totals: Counter = Counter()
+        for keyword, count in keyword_counts.items():
+            for group in self.keyword_groups[keyword]:
+                totals[group] += count
+        return totals
+
+    def match_groups(self, text: str) -> List[Hashable]:
+        """Groups with at least one keyword in ``text``, in definition order"""
+        return sorted(self.groups(self.count(text)), key=self._group_order.__getitem__)
+
+
+class TagCache:
+    """Bounded LRU of per-item match results keyed by item identity"""
+
+    def __init__(self, max_items: int = 10000):
+        self.max_items = max_items
+        self._items: "OrderedDict[Tuple, object]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple, compute):
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+        self.misses += 1
+        value = self._items[key] = compute()
+        if len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex alternation of ``keywords`` with shared prefixes factored out, longest first"""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional: try the longer keyword first, fall back to the one ending here
+        return f'(?:{pattern})?' if '' in node else pattern
+
+    return build(trie)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def news_item_key(item) -> Tuple:
+    """Cache key for a news item: its URL plus the text that gets matched"""
+    return (item.url, item.title, item.summary)
@@ -3,13 +3,13 @@
 """
 
 import logging
-import re
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import numpy as np
 from collections import Counter, defaultdict
 import json
 
+from .keyword_matcher import KeywordMatcher, TagCache, news_item_key
 from .news_sentiment import NewsItem, SentimentScore
 
 logger = logging.getLogger(__name__)
@@ -72,6 +72,29 @@ def __init__(self):
         self.feature_history: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         self.history_window = 100  # Keep last 100 feature sets per symbol
         
+        # One compiled matcher per keyword family; each item is tagged once
+        self._build_matchers()
+    
+    def _build_matchers(self):
+        """Compile keyword matchers (call again after editing the keyword lists)"""
+        self.impact_matcher = KeywordMatcher(
+            {level: config['keywords'] for level, config in self.impact_keywords.items()}
+        )
+        self.event_matcher = KeywordMatcher(self.event_types)
+        self.urgency_matcher = KeywordMatcher({'urgency': self.urgency_keywords}, whole_words=False)
+        self.tag_cache = TagCache()
+    
+    def _tag(self, item: NewsItem) -> Dict[str, Counter]:
+        """Keyword counts for a news item, computed once per item"""
+        def compute():
+            text = item.title + " " + item.summary
+            return {
+                'impact': self.impact_matcher.count(text),
+                'events': self.event_matcher.count(text),
+                'urgency': self.urgency_matcher.count(text)
+            }
+        return self.tag_cache.get(news_item_key(item), compute)
+        
     def extract_features(self, symbol: str, news_items: List[NewsItem], 
                         sentiment_score: Optional[SentimentScore] = None) -> Dict[str, Any]:
         """Extract comprehensive features from news"""
@@ -159,32 +182,30 @@ def _extract_window_features(self, window_news: List[NewsItem], window_name: str
     def _analyze_keyword_impact(self, news_items: List[NewsItem]) -> Dict[str, Any]:
         """Analyze impact keywords in news"""
         impact_scores = defaultdict(float)
-        keyword_counts = defaultdict(int)
+        keyword_counts = Counter()
+        now = datetime.now()
         
         for item in news_items:
-            text = (item.title + " " + item.summary).lower()
+            counts = self._tag(item)['impact']
+            if not counts:
+                continue
             
-            for impact_level, config in self.impact_keywords.items():
-                for keyword in config['keywords']:
-                    count = len(re.findall(r'\b' + keyword + r'\b', text))
-                    if count > 0:
-                        weight = config['weight']
-                        
-                        # Apply sentiment modifier
-                        sentiment_modifier = 1.0
-                        if item.sentiment_score is not None:
-                            sentiment_modifier = 1.0 + abs(item.sentiment_score) * 0.5
-                        
-                        # Time decay (more recent = higher impact)
-                        hours_ago = (datetime.now() - item.timestamp).total_seconds() / 3600
-                        time_weight = np.exp(-hours_ago / 6)  # 6-hour half-life
-                        
-                        final_weight = weight * sentiment_modifier * time_weight
-                        impact_scores[impact_level] += count * final_weight
-                        keyword_counts[keyword] += count
+            # Apply sentiment modifier
+            sentiment_modifier = 1.0
+            if item.sentiment_score is not None:
+                sentiment_modifier = 1.0 + abs(item.sentiment_score) * 0.5
+            
+            # Time decay (more recent = higher impact)
+            hours_ago = (now - item.timestamp).total_seconds() / 3600
+            time_weight = np.exp(-hours_ago / 6)  # 6-hour half-life
+            
+            for impact_level, count in self.impact_matcher.groups(counts).items():
+                weight = self.impact_keywords[impact_level]['weight']
+                impact_scores[impact_level] += count * weight * sentiment_modifier * time_weight
+            keyword_counts.update(counts)
         
         # Get top keywords
-        top_keywords = sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_keywords = keyword_counts.most_common(5)
         
         return {
             'high_impact_score': impact_scores['high_impact'],
@@ -198,25 +219,21 @@ def _classify_event_types(self, news_items: List[NewsItem]) -> Dict[str, Any]:
         """Classify news by event types"""
         event_scores = defaultdict(float)
         event_counts = defaultdict(int)
+        now = datetime.now()
         
         for item in news_items:
-            text = (item.title + " " + item.summary).lower()
+            scores = self.event_matcher.groups(self._tag(item)['events'])
+            if not scores:
+                continue
             
-            for event_type, keywords in self.event_types.items():
-                score = 0
-                for keyword in keywords:
-                    count = len(re.findall(r'\b' + keyword + r'\b', text))
-                    score += count
-                
-                if score > 0:
-                    # Weight by sentiment and recency
-                    sentiment_weight = 1.0 + abs(item.sentiment_score or 0) * 0.3
-                    hours_ago = (datetime.now() - item.timestamp).total_seconds() / 3600
-                    time_weight = np.exp(-hours_ago / 12)  # 12-hour half-life
-                    
-                    weighted_score = score * sentiment_weight * time_weight
-                    event_scores[event_type] += weighted_score
-                    event_counts[event_type] += 1
+            # Weight by sentiment and recency
+            sentiment_weight = 1.0 + abs(item.sentiment_score or 0) * 0.3
+            hours_ago = (now - item.timestamp).total_seconds() / 3600
+            time_weight = np.exp(-hours_ago / 12)  # 12-hour half-life
+            
+            for event_type, score in scores.items():
+                event_scores[event_type] += score * sentiment_weight * time_weight
+                event_counts[event_type] += 1
         
         # Identify dominant event type
         dominant_event = max(event_scores.items(), key=lambda x: x[1])[0] if event_scores else 'none'
@@ -233,13 +250,9 @@ def _extract_timing_features(self, news_items: List[NewsItem]) -> Dict[str, Any]
         urgency_score = 0
         recent_burst_count = 0
         
-        # Check for urgency keywords
+        # Check for urgency keywords (each distinct keyword counts once per item)
         for item in news_items:
-            text = (item.title + " " + item.summary).lower()
-            
-            for urgency_keyword in self.urgency_keywords:
-                if urgency_keyword in text:
-                    urgency_score += 1
+            urgency_score += len(self._tag(item)['urgency'])
         
         # Detect news bursts (many articles in short time)
         now = datetime.now()
@@ -5,15 +5,22 @@
 import os
 import logging
 import asyncio
-import aiohttp
 import json
+import httpx
+import io
 import re
-from typing import Dict, List, Any, Optional
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Any, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from collections import defaultdict
 import pandas as pd
 import numpy as np
+from defusedxml import DefusedXmlException, ElementTree
+
+from .keyword_matcher import KeywordMatcher, TagCache, news_item_key
+from .sentiment_service import SentimentService
+from ..news.feed_fetcher import DedupIndex, FeedFetcher
 
 # Sentiment analysis libraries
 try:
@@ -55,6 +62,28 @@ class SentimentScore:
     last_update: datetime
 
 
+def _local_tag(tag: str) -> str:
+    """Element tag without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _entry_time(entry: Dict[str, Any]) -> datetime:
+    """Publication time of a feed entry as naive local time (now if missing or unparseable)"""
+    for field in ('pubDate', 'published', 'updated'):
+        value = entry.get(field)
+        if not value:
+            continue
+        try:
+            if field == 'pubDate':
+                parsed = parsedate_to_datetime(value)
+            else:
+                parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except (TypeError, ValueError):
+            continue
+        return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+    return datetime.now()
+
+
 class NewsSentimentAnalyzer:
     """News sentiment analysis with multiple models"""
     
@@ -74,6 +103,14 @@ def __init__(self):
                 logger.warning(f"Failed to initialize FinBERT: {e}, falling back to VADER")
                 self.use_finbert = False
         
+        # Batched inference off the event loop, each article scored once
+        self.sentiment_service = SentimentService(
+            vader=self.vader_analyzer,
+            finbert=self.finbert_analyzer if self.use_finbert else None,
+            cache_path=os.getenv('NEWS_SENTIMENT_CACHE', 'data/cache/news_sentiment.jsonl'),
+            batch_size=int(os.getenv('NEWS_SENTIMENT_BATCH', '32'))
+        )
+        
         # News sources and feeds
         self.news_feeds = [
             {
@@ -101,6 +138,13 @@ def __init__(self):
             'MSFT': ['microsoft', 'windows', 'azure', 'office', 'satya nadella']
         }
         
+        # Pooled conditional-GET fetching, and articles seen across fetch cycles
+        self.feed_fetcher = FeedFetcher(max_concurrency=int(os.getenv('NEWS_FETCH_CONCURRENCY', '8')))
+        self.news_index = DedupIndex(ttl=timedelta(hours=int(os.getenv('NEWS_DEDUP_TTL_HOURS', '48'))))
+        
+        # Symbol tagging: one compiled matcher over every symbol's keywords
+        self._build_symbol_matcher()
+        
         # Cache
         self.news_cache: Dict[str, List[NewsItem]] = {}
         self.sentiment_cache: Dict[str, SentimentScore] = {}
@@ -110,6 +154,18 @@ def __init__(self):
         self.baseline_scores: Dict[str, List[float]] = defaultdict(list)
         self.baseline_window = 100  # Keep 100 historical scores
     
+    def _build_symbol_matcher(self):
+        """Compile symbol_keywords (call again after changing them)"""
+        self.symbol_matcher = KeywordMatcher(self.symbol_keywords, whole_words=False)
+        self.symbol_tags = TagCache()
+    
+    def _symbols_for(self, item: NewsItem) -> List[str]:
+        """Symbols whose keywords appear in the item, matched once per item"""
+        return self.symbol_tags.get(
+            news_item_key(item),
+            lambda: self.symbol_matcher.match_groups(item.title + " " + item.summary)
+        )
+    
     def _initialize_finbert(self):
         """Initialize FinBERT model"""
         logger.info("Initializing FinBERT model...")
@@ -155,107 +211,116 @@ async def _fetch_news(self):
         
         all_news = []
         
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for feed in self.news_feeds:
-                task = self._fetch_feed(session, feed)
-                tasks.append(task)
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for result in results:
-                if isinstance(result, list):
-                    all_news.extend(result)
-                elif isinstance(result, Exception):
-                    logger.error(f"Feed fetch error: {result}")
+        results = await asyncio.gather(
+            *[self._fetch_feed(feed) for feed in self.news_feeds], return_exceptions=True
+        )
+        
+        for result in results:
+            if isinstance(result, list):
+                all_news.extend(result)
+            elif isinstance(result, Exception):
+                logger.error(f"Feed fetch error: {result}")
         
         # Deduplicate news
         unique_news = self._deduplicate_news(all_news)
         
-        # Analyze sentiment for each news item
-        for news_item in unique_news:
-            try:
-                sentiment = await self._analyze_text_sentiment(news_item.title + " " + news_item.summary)
-                news_item.sentiment_score = sentiment['score']
-                news_item.confidence = sentiment['confidence']
-            except Exception as e:
-                logger.error(f"Sentiment analysis failed for news item: {e}")
-                news_item.sentiment_score = 0.0
-                news_item.confidence = 0.0
+        # Analyze sentiment for all news items in batches (cached articles are not re-scored)
+        try:
+            sentiments = await self.sentiment_service.score_many(
+                [news_item.title + " " + news_item.summary for news_item in unique_news]
+            )
+        except Exception as e:
+            logger.error(f"Sentiment analysis failed for news batch: {e}")
+            sentiments = [{'score': 0.0, 'confidence': 0.0}] * len(unique_news)
         
-        # Store in cache by symbol
-        self.news_cache.clear()
-        for symbol, keywords in self.symbol_keywords.items():
-            self.news_cache[symbol] = self._filter_news_by_symbol(unique_news, keywords)
+        for news_item, sentiment in zip(unique_news, sentiments):
+            news_item.sentiment_score = sentiment['score']
+            news_item.confidence = sentiment['confidence']
+        
+        # Store in cache by symbol (each item is tagged once for all symbols)
+        self.news_cache = {symbol: [] for symbol in self.symbol_keywords}
+        for news_item in unique_news:
+            for symbol in self._symbols_for(news_item):
+                news_item.symbol = self.symbol_keywords[symbol]  # Mark with matching keywords
+                self.news_cache[symbol].append(news_item)
         
         self.last_fetch = datetime.now()
-        logger.info(f"Fetched and processed {len(unique_news)} unique news items")
+        stats = self.sentiment_service.get_stats()
+        logger.info(
+            f"Fetched and processed {len(unique_news)} unique news items "
+            f"({stats['backend']}: {stats['articles_per_second']:.1f} articles/s, "
+            f"cache hit ratio {stats['cache_hit_ratio']:.1%})"
+        )
     
-    async def _fetch_feed(self, session: aiohttp.ClientSession, feed: Dict[str, Any]) -> List[NewsItem]:
-        """Fetch news from single feed"""
+    async def _fetch_feed(self, feed: Dict[str, Any]) -> List[NewsItem]:
+        """Fetch news from single feed (304s and already-seen items are not re-parsed)"""
         try:
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with session.get(feed['url'], timeout=timeout) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    return self._parse_rss_feed(content, feed['name'])
-                else:
-                    logger.warning(f"Feed {feed['name']} returned status {response.status}")
-                    return []
+            return await self.feed_fetcher.fetch_items(
+                feed['url'],
+                entries=lambda response: self._rss_entries(response.content),
+                key=self._rss_entry_key,
+                parse=lambda entry: self._parse_rss_entry(entry, feed['name'])
+            )
+        except httpx.HTTPStatusError as e:
+            logger.warning(f"Feed {feed['name']} returned status {e.response.status_code}")
+            return []
         except Exception as e:
             logger.error(f"Failed to fetch feed {feed['name']}: {e}")
             return []
     
-    def _parse_rss_feed(self, content: str, source: str) -> List[NewsItem]:
-        """Parse RSS feed content"""
-        news_items = []
-        
+    @staticmethod
+    def _rss_entries(content: bytes) -> Iterator[Dict[str, Any]]:
+        """
+        Raw RSS <item> / Atom <entry> elements of a feed, yielded as the
+        document is read (child tag -> text, ``link`` from href for Atom);
+        entity declarations and external references are refused
+        """
         try:
-            # Simple RSS parsing (in production would use feedparser)
-            # For now, return mock news items
-            mock_news = [
-                NewsItem(
-                    title="Bitcoin ETF Sees Record Inflows",
-                    summary="Bitcoin exchange-traded funds attracted record inflows this week...",
-                    url="https://example.com/btc-etf-inflows",
-                    source=source,
-                    timestamp=datetime.now() - timedelta(hours=1),
-                    keywords=['bitcoin', 'etf', 'inflows']
-                ),
-                NewsItem(
-                    title="Apple Reports Strong Q4 Earnings",
-                    summary="Apple Inc. reported better-than-expected earnings for Q4...",
-                    url="https://example.com/aapl-earnings",
-                    source=source,
-                    timestamp=datetime.now() - timedelta(hours=2),
-                    keywords=['apple', 'earnings', 'q4']
-                ),
-                NewsItem(
-                    title="Microsoft Azure Growth Accelerates",
-                    summary="Microsoft's cloud computing division showed accelerating growth...",
-                    url="https://example.com/msft-azure",
-                    source=source,
-                    timestamp=datetime.now() - timedelta(hours=3),
-                    keywords=['microsoft', 'azure', 'cloud']
-                )
-            ]
-            news_items.extend(mock_news)
-            
-        except Exception as e:
-            logger.error(f"Failed to parse RSS feed from {source}: {e}")
-        
-        return news_items
+            for _, element in ElementTree.iterparse(io.BytesIO(content)):
+                if _local_tag(element.tag) not in ('item', 'entry'):
+                    continue
+                entry: Dict[str, Any] = {}
+                for child in element:
+                    tag = _local_tag(child.tag)
+                    if tag == 'link' and child.get('href'):
+                        entry.setdefault('link', child.get('href'))
+                    elif child.text:
+                        entry.setdefault(tag, child.text.strip())
+                element.clear()
+                yield entry
+        except (ElementTree.ParseError, DefusedXmlException) as e:
+            logger.error(f"Failed to parse RSS feed: {e}")
+    
+    @staticmethod
+    def _rss_entry_key(entry: Dict[str, Any]) -> str:
+        return entry.get('guid') or entry.get('id') or entry.get('link') or entry.get('title', '')
+    
+    @staticmethod
+    def _parse_rss_entry(entry: Dict[str, Any], source: str) -> Optional[NewsItem]:
+        """News item of one raw feed entry (None without a title)"""
+        title = entry.get('title')
+        if not title:
+            return None
+        summary = entry.get('description') or entry.get('summary') or entry.get('content') or ''
+        return NewsItem(
+            title=title,
+            summary=re.sub(r'<[^>]+>', '', summary).strip(),
+            url=entry.get('link', ''),
+            source=source,
+            timestamp=_entry_time(entry)
+        )
     
     def _deduplicate_news(self, news_items: List[NewsItem]) -> List[NewsItem]:
-        """Remove duplicate news items"""
-        seen_titles = set()
+        """Remove duplicate news items (same URL or title, also across fetch cycles)"""
+        self.news_index.evict()
+        seen = set()
         unique_items = []
         
         for item in news_items:
-            # Simple deduplication by title similarity
-            title_key = item.title.lower().replace(' ', '')[:50]
-            if title_key not in seen_titles:
-                seen_titles.add(title_key)
+            # An article seen before resolves to its first copy (already scored and tagged)
+            item, _ = self.news_index.resolve(item.url, item.title, item)
+            if id(item) not in seen:
+                seen.add(id(item))
                 unique_items.append(item)
         
         return unique_items
@@ -282,56 +347,14 @@ async def _analyze_text_sentiment(self, text: str) -> Dict[str, float]:
             return {'score': 0.0, 'confidence': 0.0}
         
         try:
-            if self.use_finbert and self.finbert_analyzer:
-                return await self._analyze_finbert(text)
-            else:
-                return self._analyze_vader(text)
+            return await self.sentiment_service.score(text)
         except Exception as e:
             logger.error(f"Sentiment analysis failed: {e}")
             return {'score': 0.0, 'confidence': 0.0}
     
-    async def _analyze_finbert(self, text: str) -> Dict[str, float]:
-        """Analyze sentiment using FinBERT"""
-        try:
-            # Truncate text if too long
-            if len(text) > 512:
-                text = text[:512]
-            
-            result = self.finbert_analyzer(text)[0]
-            
-            # Convert to score (-1 to +1)
-            label = result['label'].lower()
-            confidence = result['score']
-            
-            if label == 'positive':
-                score = confidence
-            elif label == 'negative':
-                score = -confidence
-            else:  # neutral
-                score = 0.0
-            
-            return {'score': score, 'confidence': confidence}
-            
-        except Exception as e:
-            logger.error(f"FinBERT analysis failed: {e}")
-            return self._analyze_vader(text)
-    
-    def _analyze_vader(self, text: str) -> Dict[str, float]:
-        """Analyze sentiment using VADER"""
-        try:
-            scores = self.vader_analyzer.polarity_scores(text)
-            
-            # Use compound score as main sentiment
-            sentiment_score = scores['compound']
-            
-            # Confidence based on absolute value and neu score
-            confidence = abs(sentiment_score) * (1.0 - scores['neu'])
-            
-            return {'score': sentiment_score, 'confidence': confidence}
-            
-        except Exception as e:
-            logger.error(f"VADER analysis failed: {e}")
-            return {'score': 0.0, 'confidence': 0.0}
+    def get_sentiment_service_stats(self) -> Dict[str, Any]:
+        """Sentiment throughput (articles/s) and cache hit ratio"""
+        return self.sentiment_service.get_stats()
     
     async def _calculate_symbol_sentiment(self, symbol: str) -> Optional[SentimentScore]:
         """Calculate aggregated sentiment for symbol"""
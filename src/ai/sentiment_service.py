@@ -0,0 +1,251 @@
+"""
+Batched, cached sentiment scoring for news text
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Score = Dict[str, float]
+
+
+def vader_score(analyzer, text: str) -> Score:
+    """VADER compound score with a confidence from its non-neutral share"""
+    scores = analyzer.polarity_scores(text)
+    sentiment_score = scores['compound']
+    return {'score': sentiment_score, 'confidence': abs(sentiment_score) * (1.0 - scores['neu'])}
+
+
+def finbert_score(result: Dict[str, Any]) -> Score:
+    """Map a FinBERT label/probability to a score in [-1, 1]"""
+    label = result['label'].lower()
+    confidence = result['score']
+    if label == 'positive':
+        score = confidence
+    elif label == 'negative':
+        score = -confidence
+    else:  # neutral
+        score = 0.0
+    return {'score': score, 'confidence': confidence}
+
+
+class SentimentService:
+    """
+    Score texts in batches on a worker thread, each distinct text exactly once.
+
+    Scores are keyed by a hash of the backend name and the (truncated) text and
+    kept in memory and in an append-only JSON-lines file, so re-fetched articles
+    are never re-scored, also across restarts. The cache holds the
+    ``max_entries`` most recently used scores; the file is rewritten from it
+    once it has grown to twice that. File reads and writes run on the worker
+    thread like inference; the in-memory cache is only touched from the event
+    loop once it has been loaded. FinBERT is used when a pipeline is given;
+    VADER is the fallback and goes through the same batching path, but
+    fallback scores are returned without being cached, so the texts get a
+    FinBERT score once the model recovers.
+    """
+
+    def __init__(
+        self,
+        vader=None,
+        finbert: Optional[Callable] = None,
+        cache_path: Optional[Union[str, Path]] = "data/cache/news_sentiment.jsonl",
+        batch_size: int = 32,
+        max_chars: int = 512,
+        max_entries: int = 50000
+    ):
+        """
+        Args:
+            vader: VADER SentimentIntensityAnalyzer (fallback backend)
+            finbert: transformers sentiment pipeline; texts are cut to ``max_chars``
+            cache_path: JSON-lines score cache (None keeps scores in memory only)
+            batch_size: Texts per inference call
+            max_entries: Scores kept in memory and on disk
+        """
+        self.vader = vader
+        self.finbert = finbert
+        self.backend = 'finbert' if finbert is not None else 'vader'
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.max_entries = max_entries
+
+        # Inference and cache file I/O run here so the event loop never blocks on them
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment")
+        self._cache: Optional["OrderedDict[str, Score]"] = None
+        self._disk_lines = 0
+
+        self.stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'scored': 0,
+            'batches': 0,
+            'inference_seconds': 0.0,
+            'fallbacks': 0
+        }
+
+    def key(self, text: str) -> str:
+        """Content hash for a (truncated) text under the active backend"""
+        return hashlib.sha256(f"{self.backend}\0{text}".encode()).hexdigest()
+
+    async def score_many(self, texts: List[str]) -> List[Score]:
+        """Scores for ``texts`` in order; only uncached texts reach the model"""
+        loop = asyncio.get_running_loop()
+        cache = self._cache
+        if cache is None:
+            cache = await loop.run_in_executor(self._executor, self._load_cache)
+        if self.finbert is not None:
+            texts = [text[:self.max_chars] for text in texts]
+        keys = [self.key(text) for text in texts]
+        self.stats['requests'] += len(texts)
+
+        found: Dict[str, Score] = {}
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in cache:
+                self.stats['cache_hits'] += 1
+                cache.move_to_end(key)
+                found[key] = cache[key]
+            elif text.strip():
+                pending.setdefault(key, text)
+
+        if pending:
+            items = list(pending.items())
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                scores, cacheable = await loop.run_in_executor(
+                    self._executor, self._score_batch, [text for _, text in batch]
+                )
+                fresh = {key: score for (key, _), score in zip(batch, scores)}
+                found.update(fresh)
+                if cacheable:
+                    await self._store(fresh)
+
+        empty = {'score': 0.0, 'confidence': 0.0}
+        return [dict(found.get(key, empty)) for key in keys]
+
+    async def score(self, text: str) -> Score:
+        return (await self.score_many([text]))[0]
+
+    def _score_batch(self, texts: List[str]) -> Tuple[List[Score], bool]:
+        """
+        Run one batch through the model (worker thread). Returns the scores and
+        whether they came from the active backend and may be cached.
+        """
+        started = time.perf_counter()
+        try:
+            if self.finbert is not None:
+                try:
+                    results = self.finbert(texts, batch_size=len(texts), truncation=True)
+                    return [finbert_score(result) for result in results], True
+                except Exception as e:
+                    logger.error(f"FinBERT batch failed, falling back to VADER: {e}")
+                    self.stats['fallbacks'] += 1
+                    return [self._vader_safe(text) for text in texts], False
+            try:
+                return [vader_score(self.vader, text) for text in texts], True
+            except Exception as e:
+                logger.error(f"VADER batch failed: {e}")
+                return [self._vader_safe(text) for text in texts], False
+        finally:
+            self.stats['batches'] += 1
+            self.stats['scored'] += len(texts)
+            self.stats['inference_seconds'] += time.perf_counter() - started
+
+    def _vader_safe(self, text: str) -> Score:
+        try:
+            return vader_score(self.vader, text)
+        except Exception as e:
+            logger.error(f"VADER analysis failed: {e}")
+            return {'score': 0.0, 'confidence': 0.0}
+
+    def _load_cache(self) -> "OrderedDict[str, Score]":
+        """Read the on-disk cache on first use (worker thread)"""
+        if self._cache is not None:
+            return self._cache
+
+        cache: "OrderedDict[str, Score]" = OrderedDict()
+        lines = 0
+        if self.cache_path and self.cache_path.exists():
+            with open(self.cache_path) as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                        key = entry['key']
+                        cache[key] = {'score': entry['score'], 'confidence': entry['confidence']}
+                    except (ValueError, KeyError):
+                        continue  # torn write; the text is simply scored again
+                    cache.move_to_end(key)
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+            logger.info(f"Loaded {len(cache)} cached sentiment scores from {self.cache_path}")
+            if lines > len(cache) and self._compact(list(cache.items())):
+                lines = len(cache)
+        self._disk_lines = lines
+        self._cache = cache
+        return cache
+
+    async def _store(self, scores: Dict[str, Score]):
+        """Add fresh scores to the cache and the file, compacting the file when it doubles"""
+        self._cache.update(scores)
+        self._evict()
+        if not self.cache_path or not scores:
+            return
+        loop = asyncio.get_running_loop()
+        if self._disk_lines + len(scores) > 2 * self.max_entries:
+            self._disk_lines = len(self._cache)
+            await loop.run_in_executor(self._executor, self._compact, list(self._cache.items()))
+        else:
+            self._disk_lines += len(scores)
+            await loop.run_in_executor(self._executor, self._append, list(scores.items()))
+
+    def _evict(self):
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _append(self, entries: List[Tuple[str, Score]]):
+        """Append scores to the file (worker thread)"""
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, 'a') as f:
+                for key, score in entries:
+                    f.write(json.dumps({'key': key, **score}) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not persist sentiment cache: {e}")
+
+    def _compact(self, entries: List[Tuple[str, Score]]) -> bool:
+        """Rewrite the file with exactly ``entries`` (worker thread, atomic replace)"""
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                for key, score in entries:
+                    f.write(json.dumps({'key': key, **score}) + "\n")
+            os.replace(tmp_path, self.cache_path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not compact sentiment cache: {e}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Throughput and cache effectiveness"""
+        stats = dict(self.stats)
+        seconds = stats['inference_seconds']
+        stats['backend'] = self.backend
+        stats['cached_articles'] = len(self._cache or {})
+        stats['articles_per_second'] = stats['scored'] / seconds if seconds > 0 else 0.0
+        stats['cache_hit_ratio'] = stats['cache_hits'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -8,6 +8,8 @@
 import asyncio
 import logging
 
+logger = logging.getLogger(__name__)
+
 # Import routers and services with error handling
 try:
     from src.backtester.strategies.registry import StrategyRegistry
@@ -23,11 +25,18 @@
     JobPriority = None
 
 try:
+    # sklearn/xgboost are only imported once a model is trained or loaded
     from src.ml.price_predictor import PricePredictor
 except ImportError:
     logger.warning("PricePredictor not available")
     PricePredictor = None
 
+try:
+    from src.ml.model_registry import get_registry
+except ImportError:
+    logger.warning("ModelRegistry not available, trained models will not be persisted")
+    get_registry = None
+
 try:
     from src.data_hub.providers.multi_source import MultiSourceDataProvider
 except ImportError:
@@ -57,8 +66,6 @@
 import psutil
 from fastapi import status
 
-logger = logging.getLogger(__name__)
-
 # Create FastAPI app
 app = FastAPI(
     title="Sofia Trading Platform API",
@@ -81,6 +88,15 @@
 data_provider = MultiSourceDataProvider() if MultiSourceDataProvider else None
 ml_predictor = PricePredictor() if PricePredictor else None
 
+
+def get_model_registry():
+    """Registry shared with the prediction engine, created on the first ML request (None when unavailable)."""
+    return get_registry() if get_registry is not None else None
+
+
+def _model_key(model_type: str, algorithm: str, horizon: int) -> str:
+    return f"{model_type}-{algorithm}-h{horizon}"
+
 # Include routers if available
 if live_router:
     app.include_router(live_router)
@@ -337,6 +353,9 @@ async def train_ml_model(
     training_period: str = "1y"
 ):
     """Train ML model for price prediction."""
+    if PricePredictor is None:
+        raise HTTPException(status_code=503, detail="ML prediction is not available")
+    
     try:
         # Fetch data
         ticker = yf.Ticker(symbol)
@@ -349,9 +368,17 @@ async def train_ml_model(
         predictor = PricePredictor(model_type=model_type, algorithm=algorithm)
         metrics = predictor.train(data, prediction_horizon=prediction_horizon)
         
-        # Save model (optional - implement model storage)
-        # model_path = Path(f"models/{symbol}_{model_type}_{algorithm}.pkl")
-        # predictor.save_model(model_path)
+        # Without a registry the model is still trained, just not kept
+        registry = get_model_registry()
+        model_version = None
+        if registry is not None:
+            record = registry.save(
+                predictor, symbol, _model_key(model_type, algorithm, prediction_horizon),
+                feature_columns=predictor.feature_columns,
+                data_start=data.index[0], data_end=data.index[-1],
+                metadata={"metrics": {k: v for k, v in metrics.items() if isinstance(v, (int, float))}}
+            )
+            model_version = record.version
         
         return {
             "symbol": symbol,
@@ -359,9 +386,12 @@ async def train_ml_model(
             "algorithm": algorithm,
             "metrics": metrics,
             "training_samples": len(data),
+            "model_version": model_version,
             "status": "success"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -374,6 +404,9 @@ async def predict_price(
     periods_ahead: int = 1
 ):
     """Make price predictions for a symbol."""
+    if PricePredictor is None:
+        raise HTTPException(status_code=503, detail="ML prediction is not available")
+    
     try:
         # Fetch recent data
         ticker = yf.Ticker(symbol)
@@ -382,15 +415,29 @@ async def predict_price(
         if data.empty:
             raise HTTPException(status_code=404, detail=f"No data found for {symbol}")
         
-        # Train model (in production, load pre-trained model)
-        predictor = PricePredictor(model_type=model_type, algorithm=algorithm)
+        # Reuse a registered model trained on the same feature set; train one otherwise
+        recent_data = data.iloc[-20:]
+        registry = get_model_registry()
+        key = _model_key(model_type, algorithm, periods_ahead)
+        columns = list(PricePredictor().create_features(recent_data).columns)
+        predictor = None
+        if registry is not None:
+            predictor = registry.latest(symbol, key, feature_columns=columns, max_age_hours=24)
         
-        # Use last 2 months for training
-        train_data = data.iloc[:-20]
-        predictor.train(train_data, prediction_horizon=periods_ahead)
+        if predictor is None:
+            predictor = PricePredictor(model_type=model_type, algorithm=algorithm)
+            
+            # Use last 2 months for training
+            train_data = data.iloc[:-20]
+            predictor.train(train_data, prediction_horizon=periods_ahead)
+            if registry is not None:
+                registry.save(
+                    predictor, symbol, key,
+                    feature_columns=predictor.feature_columns,
+                    data_start=train_data.index[0], data_end=train_data.index[-1]
+                )
         
         # Predict on recent data
-        recent_data = data.iloc[-20:]
         predictions = predictor.predict(recent_data, return_confidence=True)
         
         # Get top features
@@ -405,6 +452,8 @@ async def predict_price(
             "algorithm": algorithm
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
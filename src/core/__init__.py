@@ -1,7 +1,7 @@
 """Trading Engine Core Module."""
 
 from .engine import TradingEngine
-from .order_manager import OrderManager, Order, OrderType, OrderStatus, OrderSide
+from .order_manager import OrderManager, OrderStore, Order, OrderType, OrderStatus, OrderSide
 from .position_manager import PositionManager, Position
 from .risk_manager import RiskManager, RiskParameters
 from .portfolio import Portfolio, Asset
@@ -11,6 +11,7 @@
 __all__ = [
     "TradingEngine",
     "OrderManager",
+    "OrderStore",
     "Order",
     "OrderType",
     "OrderStatus",
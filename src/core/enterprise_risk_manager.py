@@ -19,6 +19,8 @@
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from .risk_state import PositionRiskBook, ReturnCovariance, aligned_log_returns
+
 logger = logging.getLogger(__name__)
 
 class RiskLevel(Enum):
@@ -91,6 +93,7 @@ class RiskMetrics:
     correlation_matrix: Dict[str, Dict[str, float]]
     risk_level: RiskLevel
     timestamp: datetime = field(default_factory=datetime.now)
+    portfolio_var_95: Decimal = Decimal(0)  # Parametric VaR of net exposure (quote currency)
 
 @dataclass
 class Alert:
@@ -136,9 +139,14 @@ def __init__(self, config: Dict[str, Any]):
         self.daily_pnl = Decimal(0)
         self.daily_trades = []
         self.price_history: Dict[str, List[float]] = defaultdict(list)
+        self.max_price_history = config.get("max_price_history", 1000)
         self.alerts: List[Alert] = []
         self.emergency_mode = False
         
+        # Incremental risk state: aggregates follow every position change and price snapshot
+        self.returns = ReturnCovariance(lookback=config.get("correlation_lookback", 30))
+        self.book = PositionRiskBook()
+        
         # Tasks
         self.monitor_task = None
         self.report_task = None
@@ -213,6 +221,22 @@ def calculate_atr_size(
         
         return position_size
     
+    def update_prices(self, prices: Dict[str, float]):
+        """
+        Record one price snapshot (all symbols sampled at the same time).
+
+        Feeds the rolling return covariance, the price history and the
+        current price of every open position in those symbols.
+        """
+        self.returns.observe(prices)
+        for symbol, price in prices.items():
+            history = self.price_history[symbol]
+            history.append(float(price))
+            if len(history) > self.max_price_history:
+                del history[:len(history) - self.max_price_history]
+            for position_id in self.book.set_price(symbol, float(price)):
+                self.positions[position_id].current_price = Decimal(str(price))
+    
     def calculate_correlation_matrix(
         self,
         symbols: List[str],
@@ -222,41 +246,40 @@ def calculate_correlation_matrix(
         if len(symbols) < 2:
             return {}
         
-        # Get price data for all symbols
-        price_data = {}
-        for symbol in symbols:
-            if symbol in self.price_history:
-                prices = self.price_history[symbol][-lookback:]
-                if len(prices) >= 2:
-                    # Calculate returns
-                    returns = np.diff(np.log(prices))
-                    price_data[symbol] = returns
-        
-        # Calculate correlation matrix
-        correlation_matrix = {}
-        for symbol1 in price_data:
-            correlation_matrix[symbol1] = {}
-            for symbol2 in price_data:
-                if symbol1 == symbol2:
-                    correlation_matrix[symbol1][symbol2] = 1.0
-                else:
-                    corr = np.corrcoef(price_data[symbol1], price_data[symbol2])[0, 1]
-                    correlation_matrix[symbol1][symbol2] = float(corr)
-        
-        return correlation_matrix
+        symbols = list(dict.fromkeys(symbols))
+        if lookback == self.returns.lookback and all(self.returns.tracks(s) for s in symbols):
+            # Maintained incrementally by update_prices
+            matrix = self.returns.correlation_matrix(symbols)
+        else:
+            # One pass over aligned returns from the recorded price history
+            symbols, returns = aligned_log_returns(self.price_history, symbols, lookback)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                matrix = np.atleast_2d(np.corrcoef(returns)) if len(symbols) > 1 else np.ones((1, 1))
+            np.fill_diagonal(matrix, 1.0)
+        
+        return {
+            symbol1: {symbol2: float(matrix[i, j]) for j, symbol2 in enumerate(symbols)}
+            for i, symbol1 in enumerate(symbols)
+        }
+    
+    def _correlations_with(self, symbol: str, others: List[str]) -> Dict[str, float]:
+        """Correlation of ``symbol`` with each of ``others`` (pairs without data omitted)"""
+        if self.returns.tracks(symbol) and all(self.returns.tracks(s) for s in others):
+            return self.returns.correlations_with(symbol, others)
+        correlations = self.calculate_correlation_matrix(others + [symbol])
+        return {
+            other: correlations[other][symbol]
+            for other in others
+            if other in correlations and symbol in correlations[other]
+        }
     
     def calculate_portfolio_heat(self) -> Decimal:
         """Calculate total portfolio risk exposure"""
-        total_risk = Decimal(0)
-        portfolio_value = sum(p.entry_price * p.size for p in self.positions.values())
-        
-        if portfolio_value == 0:
-            return Decimal(0)
-        
-        for position in self.positions.values():
-            total_risk += position.risk_amount
-        
-        return (total_risk / portfolio_value) * 100
+        return self.book.heat
+    
+    def calculate_portfolio_var(self, confidence: float = 0.95) -> Decimal:
+        """Parametric VaR of the open positions from the rolling return covariance"""
+        return Decimal(str(self.book.value_at_risk(self.returns, confidence)))
     
     async def check_position_limits(
         self,
@@ -281,15 +304,10 @@ async def check_position_limits(
             return False, f"Portfolio heat too high ({current_heat:.1f}%)"
         
         # Check correlations
-        correlations = self.calculate_correlation_matrix(
-            [p.symbol for p in self.positions.values()] + [symbol]
-        )
-        
-        for pos in self.positions.values():
-            if pos.symbol in correlations and symbol in correlations[pos.symbol]:
-                corr = correlations[pos.symbol][symbol]
-                if abs(corr) > self.max_correlation:
-                    return False, f"High correlation with {pos.symbol} ({corr:.2f})"
+        correlations = self._correlations_with(symbol, self.book.symbols())
+        for held_symbol, corr in correlations.items():
+            if abs(corr) > self.max_correlation:
+                return False, f"High correlation with {held_symbol} ({corr:.2f})"
         
         # Check daily loss limit
         if self.daily_pnl < -portfolio_value * self.max_daily_loss:
@@ -300,8 +318,7 @@ async def check_position_limits(
     async def add_position(self, position: Position) -> bool:
         """Add new position with risk checks"""
         # Validate position
-        portfolio_value = sum(p.entry_price * p.size for p in self.positions.values())
-        portfolio_value += position.entry_price * position.size
+        portfolio_value = self.book.exposure + position.entry_price * position.size
         
         can_add, reason = await self.check_position_limits(
             position.symbol,
@@ -318,9 +335,6 @@ async def add_position(self, position: Position) -> bool:
             )
             return False
         
-        # Add position
-        self.positions[position.id] = position
-        
         # Set default stop loss if not provided
         if not position.stop_loss:
             if position.side == "long":
@@ -328,6 +342,10 @@ async def add_position(self, position: Position) -> bool:
             else:
                 position.stop_loss = position.entry_price * (1 + self.default_stop_loss)
         
+        # Add position
+        self.positions[position.id] = position
+        self.book.add(position)
+        
         # Log trade
         self.daily_trades.append({
             "id": position.id,
@@ -356,6 +374,8 @@ async def update_stop_loss(self, position_id: str, stop_type: str = "trailing"):
             await self._update_time_stop(position)
         elif stop_type == "volatility":
             await self._update_volatility_stop(position)
+        
+        self.book.refresh(position)
     
     async def _update_trailing_stop(self, position: Position):
         """Update trailing stop loss"""
@@ -419,22 +439,16 @@ async def _update_volatility_stop(self, position: Position):
                         position.stop_loss = new_stop
     
     async def check_stop_losses(self):
-        """Check and trigger stop losses"""
-        positions_to_close = []
-        
-        for position in self.positions.values():
-            if position.stop_loss:
-                if position.side == "long" and position.current_price <= position.stop_loss:
-                    positions_to_close.append(position.id)
-                elif position.side == "short" and position.current_price >= position.stop_loss:
-                    positions_to_close.append(position.id)
+        """Check and trigger stop losses (one vectorized pass over all positions)"""
+        positions_to_close = self.book.triggered_stops()
         
         for position_id in positions_to_close:
+            symbol = self.positions[position_id].symbol
             await self.close_position(position_id, "Stop loss hit")
             await self.send_alert(
                 AlertType.STOP_LOSS_HIT,
                 RiskLevel.HIGH,
-                f"Stop loss triggered for {self.positions[position_id].symbol}",
+                f"Stop loss triggered for {symbol}",
                 {"position_id": position_id}
             )
     
@@ -449,6 +463,7 @@ async def close_position(self, position_id: str, reason: str = ""):
         logger.info(f"Position closed: {position_id} ({reason}) P&L: {position.pnl:.2f}")
         
         del self.positions[position_id]
+        self.book.remove(position)
     
     async def emergency_stop_all(self, reason: str = "Emergency stop triggered"):
         """PANIC BUTTON - Close all positions immediately"""
@@ -638,7 +653,7 @@ async def _send_sms_alert(self, alert: Alert):
     async def generate_risk_report(self) -> RiskMetrics:
         """Generate comprehensive risk report"""
         # Calculate metrics
-        total_exposure = sum(p.entry_price * p.size for p in self.positions.values())
+        total_exposure = self.book.exposure
         portfolio_heat = self.calculate_portfolio_heat()
         
         # Calculate daily P&L percentage
@@ -689,7 +704,8 @@ async def generate_risk_report(self) -> RiskMetrics:
             sharpe_ratio=Decimal(str(sharpe)),
             var_95=var_95,
             correlation_matrix=correlation_matrix,
-            risk_level=risk_level
+            risk_level=risk_level,
+            portfolio_var_95=self.calculate_portfolio_var(0.95)
         )
     
     async def _monitor_positions(self):
@@ -699,7 +715,7 @@ async def _monitor_positions(self):
                 await asyncio.sleep(5)  # Check every 5 seconds
                 
                 # Update stop losses
-                for position in self.positions.values():
+                for position in list(self.positions.values()):
                     await self.update_stop_loss(position.id, "trailing")
                     await self.update_stop_loss(position.id, "breakeven")
                     await self.update_stop_loss(position.id, "time")
@@ -708,7 +724,7 @@ async def _monitor_positions(self):
                 await self.check_stop_losses()
                 
                 # Check daily loss limit
-                portfolio_value = sum(p.entry_price * p.size for p in self.positions.values())
+                portfolio_value = self.book.exposure
                 if portfolio_value > 0 and self.daily_pnl < -portfolio_value * self.max_daily_loss:
                     await self.emergency_stop_all("Daily loss limit exceeded")
                 
@@ -1,12 +1,20 @@
 """Order management module."""
 
+from collections import OrderedDict
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, List
+from pydantic import BaseModel, Field, PrivateAttr
+import json
+import logging
 import uuid
 
 
+logger = logging.getLogger(__name__)
+
+
 class OrderType(str, Enum):
     """Order types."""
     MARKET = "market"
@@ -33,6 +41,9 @@ class OrderStatus(str, Enum):
     EXPIRED = "expired"
 
 
+ACTIVE_STATUSES = frozenset({OrderStatus.PENDING, OrderStatus.OPEN, OrderStatus.PARTIALLY_FILLED})
+
+
 class TimeInForce(str, Enum):
     """Time in force."""
     GTC = "gtc"  # Good Till Cancelled
@@ -45,6 +56,8 @@ class Order(BaseModel):
     """Order model."""
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    client_order_id: Optional[str] = None
+    strategy: Optional[str] = None
     symbol: str
     side: OrderSide
     type: OrderType
@@ -59,29 +72,279 @@ class Order(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     notes: Optional[str] = None
     
+    # Store holding the order, so status changes keep its indexes current
+    _store: Optional["OrderStore"] = PrivateAttr(default=None)
+    
     def is_filled(self) -> bool:
         """Check if order is completely filled."""
         return self.status == OrderStatus.FILLED
     
     def is_active(self) -> bool:
         """Check if order is active."""
-        return self.status in [OrderStatus.PENDING, OrderStatus.OPEN, OrderStatus.PARTIALLY_FILLED]
+        return self.status in ACTIVE_STATUSES
     
     def cancel(self) -> None:
-        """Cancel the order."""
-        if self.is_active():
+        """Cancel the order (through its store, if it is in one)."""
+        if not self.is_active():
+            return
+        if self._store is not None:
+            self._store.update(self, status=OrderStatus.CANCELLED)
+        else:
             self.status = OrderStatus.CANCELLED
             self.updated_at = datetime.utcnow()
 
 
+ORDER_ROW_FIELDS = tuple(Order.model_fields)
+
+
+def order_to_row(order: Order) -> List[Any]:
+    """Compact JSON-ready row of ``order`` (values in ORDER_ROW_FIELDS order)."""
+    row = []
+    for field in ORDER_ROW_FIELDS:
+        value = getattr(order, field)
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        row.append(value)
+    return row
+
+
+def order_from_row(row: List[Any]) -> Order:
+    """Rebuild an order from ``order_to_row`` output."""
+    return Order.model_validate(dict(zip(ORDER_ROW_FIELDS, row)))
+
+
+OrderListener = Callable[[str, Order], None]
+
+
+class OrderStore:
+    """
+    Orders of record with O(1) indexes.
+
+    Active orders are indexed by id, client order id, symbol, status and
+    strategy, so status changes and lookups cost the same with ten orders
+    or ten thousand. Finished orders move to a bounded history; past
+    ``history_limit`` the oldest are evicted and, with ``spill_path``,
+    appended to a JSON-lines file as compact rows. Listeners are called as
+    ``listener(event, order)`` with event "created" or "updated".
+    """
+
+    def __init__(self, history_limit: int = 10000, spill_path: Optional[str] = None,
+                 spill_batch: int = 256):
+        """Initialize an empty store."""
+        self.history_limit = history_limit
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.spill_batch = spill_batch
+        self.orders: Dict[str, Order] = {}
+        self.active: Dict[str, Order] = {}
+        self.history: "OrderedDict[str, Order]" = OrderedDict()
+        self.by_client_id: Dict[str, Order] = {}
+        self.by_status: Dict[OrderStatus, Dict[str, Order]] = {}
+        self.active_by_symbol: Dict[str, Dict[str, Order]] = {}
+        self.active_by_strategy: Dict[str, Dict[str, Order]] = {}
+        self.history_by_symbol: Dict[str, "OrderedDict[str, Order]"] = {}
+        self.listeners: List[OrderListener] = []
+        self._spill_buffer: List[List[Any]] = []
+        self.stats = {"evicted": 0, "spilled": 0}
+
+    def add(self, order: Order) -> Order:
+        """Insert a new order."""
+        if order.id in self.orders:
+            raise ValueError(f"Duplicate order id: {order.id}")
+        if order.client_order_id is not None:
+            if order.client_order_id in self.by_client_id:
+                raise ValueError(f"Duplicate client order id: {order.client_order_id}")
+            self.by_client_id[order.client_order_id] = order
+        self.orders[order.id] = order
+        order._store = self
+        self.by_status.setdefault(order.status, {})[order.id] = order
+        if order.is_active():
+            self._index_active(order)
+        else:
+            self._archive(order)
+        self._notify("created", order)
+        return order
+
+    def update(
+        self,
+        order: Order,
+        status: Optional[OrderStatus] = None,
+        filled_quantity: Optional[float] = None,
+        average_fill_price: Optional[float] = None,
+    ) -> Order:
+        """
+        Apply a status/fill change and move the order between indexes.
+
+        An order that becomes active again (re-armed or replaced) moves from
+        the history back to the active indexes.
+        """
+        if self.orders.get(order.id) is not order:
+            raise ValueError(f"Order {order.id} is not in this store")
+        was_active = order.is_active()
+        if status is not None and status != order.status:
+            self._discard(self.by_status, order.status, order.id)
+            order.status = status
+            self.by_status.setdefault(status, {})[order.id] = order
+        if filled_quantity is not None:
+            order.filled_quantity = filled_quantity
+        if average_fill_price is not None:
+            order.average_fill_price = average_fill_price
+        order.updated_at = datetime.utcnow()
+
+        if was_active and not order.is_active():
+            self._unindex_active(order)
+            self._archive(order)
+        elif not was_active and order.is_active():
+            self._unarchive(order)
+            self._index_active(order)
+        self._notify("updated", order)
+        return order
+
+    def get(self, order_id: str) -> Optional[Order]:
+        return self.orders.get(order_id)
+
+    def get_by_client_id(self, client_order_id: str) -> Optional[Order]:
+        return self.by_client_id.get(client_order_id)
+
+    def with_status(self, status: OrderStatus) -> List[Order]:
+        return list(self.by_status.get(status, {}).values())
+
+    def active_orders(self, symbol: Optional[str] = None, strategy: Optional[str] = None) -> List[Order]:
+        """Active orders, optionally for one symbol and/or strategy."""
+        if symbol is not None and strategy is not None:
+            orders = self.active_by_symbol.get(symbol, {})
+            return [o for o in orders.values() if o.strategy == strategy]
+        if symbol is not None:
+            return list(self.active_by_symbol.get(symbol, {}).values())
+        if strategy is not None:
+            return list(self.active_by_strategy.get(strategy, {}).values())
+        return list(self.active.values())
+
+    def recent_history(self, symbol: Optional[str] = None, limit: int = 100) -> List[Order]:
+        """The last ``limit`` finished orders still in memory, oldest first."""
+        history = self.history if symbol is None else self.history_by_symbol.get(symbol, {})
+        return list(islice(reversed(history.values()), limit))[::-1]
+
+    def spilled_history(self, symbol: Optional[str] = None, limit: int = 100) -> List[Order]:
+        """The last ``limit`` evicted orders from the spill file, oldest first."""
+        self.flush()
+        if self.spill_path is None or not self.spill_path.exists():
+            return []
+        symbol_index = ORDER_ROW_FIELDS.index("symbol")
+        rows = []
+        with self.spill_path.open() as f:
+            for line in f:
+                row = json.loads(line)
+                if symbol is None or row[symbol_index] == symbol:
+                    rows.append(row)
+        return [order_from_row(row) for row in rows[-limit:]] if limit else []
+
+    def subscribe(self, listener: OrderListener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener: OrderListener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Compact state: field names once, then one row per order."""
+        return {
+            "fields": list(ORDER_ROW_FIELDS),
+            "active": [order_to_row(o) for o in self.active.values()],
+            "history": [order_to_row(o) for o in self.history.values()],
+        }
+
+    def restore(self, state: Dict[str, Any]):
+        """Load orders from ``snapshot`` output (listeners are not notified)."""
+        fields = state["fields"]
+        listeners, self.listeners = self.listeners, []
+        try:
+            for row in state["history"] + state["active"]:
+                self.add(Order.model_validate(dict(zip(fields, row))))
+        finally:
+            self.listeners = listeners
+
+    def flush(self):
+        """Write buffered evictions to the spill file."""
+        if not self._spill_buffer or self.spill_path is None:
+            self._spill_buffer.clear()
+            return
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.spill_path.open("a") as f:
+            f.writelines(json.dumps(row) + "\n" for row in self._spill_buffer)
+        self.stats["spilled"] += len(self._spill_buffer)
+        self._spill_buffer.clear()
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def _index_active(self, order: Order):
+        self.active[order.id] = order
+        self.active_by_symbol.setdefault(order.symbol, {})[order.id] = order
+        if order.strategy is not None:
+            self.active_by_strategy.setdefault(order.strategy, {})[order.id] = order
+
+    def _unindex_active(self, order: Order):
+        self.active.pop(order.id, None)
+        self._discard(self.active_by_symbol, order.symbol, order.id)
+        if order.strategy is not None:
+            self._discard(self.active_by_strategy, order.strategy, order.id)
+
+    def _archive(self, order: Order):
+        self.history[order.id] = order
+        self.history_by_symbol.setdefault(order.symbol, OrderedDict())[order.id] = order
+        while len(self.history) > self.history_limit:
+            self._evict(self.history.popitem(last=False)[1])
+
+    def _unarchive(self, order: Order):
+        self.history.pop(order.id, None)
+        self._discard(self.history_by_symbol, order.symbol, order.id)
+
+    def _evict(self, order: Order):
+        del self.orders[order.id]
+        order._store = None
+        self._discard(self.by_status, order.status, order.id)
+        self._discard(self.history_by_symbol, order.symbol, order.id)
+        if order.client_order_id is not None:
+            self.by_client_id.pop(order.client_order_id, None)
+        self.stats["evicted"] += 1
+        if self.spill_path is not None:
+            self._spill_buffer.append(order_to_row(order))
+            if len(self._spill_buffer) >= self.spill_batch:
+                self.flush()
+
+    @staticmethod
+    def _discard(index: Dict[Any, Dict[str, Order]], key: Any, order_id: str):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(order_id, None)
+            if not bucket:
+                del index[key]
+
+    def _notify(self, event: str, order: Order):
+        for listener in self.listeners:
+            try:
+                listener(event, order)
+            except Exception as e:
+                logger.error(f"Order listener failed on {event} {order.id}: {e}")
+
+
 class OrderManager:
     """Manages orders."""
     
-    def __init__(self):
+    def __init__(self, history_limit: int = 10000, spill_path: Optional[str] = None):
         """Initialize order manager."""
-        self.orders: dict[str, Order] = {}
-        self.active_orders: List[Order] = []
-        self.order_history: List[Order] = []
+        self.store = OrderStore(history_limit=history_limit, spill_path=spill_path)
+        self.orders: Dict[str, Order] = self.store.orders
+    
+    @property
+    def active_orders(self) -> List[Order]:
+        return self.store.active_orders()
+    
+    @property
+    def order_history(self) -> List[Order]:
+        return list(self.store.history.values())
     
     def create_order(
         self,
@@ -92,6 +355,8 @@ def create_order(
         price: Optional[float] = None,
         stop_price: Optional[float] = None,
         time_in_force: TimeInForce = TimeInForce.GTC,
+        client_order_id: Optional[str] = None,
+        strategy: Optional[str] = None,
     ) -> Order:
         """Create a new order."""
         order = Order(
@@ -102,22 +367,18 @@ def create_order(
             price=price,
             stop_price=stop_price,
             time_in_force=time_in_force,
+            client_order_id=client_order_id,
+            strategy=strategy,
         )
         
-        self.orders[order.id] = order
-        self.active_orders.append(order)
-        
-        return order
+        return self.store.add(order)
     
     def cancel_order(self, order_id: str) -> bool:
         """Cancel an order."""
-        if order_id in self.orders:
-            order = self.orders[order_id]
-            if order.is_active():
-                order.cancel()
-                self.active_orders.remove(order)
-                self.order_history.append(order)
-                return True
+        order = self.store.get(order_id)
+        if order is not None and order.is_active():
+            self.store.update(order, status=OrderStatus.CANCELLED)
+            return True
         return False
     
     def update_order_status(
@@ -128,35 +389,37 @@ def update_order_status(
         average_fill_price: Optional[float] = None,
     ) -> bool:
         """Update order status."""
-        if order_id in self.orders:
-            order = self.orders[order_id]
-            order.status = status
-            
-            if filled_quantity is not None:
-                order.filled_quantity = filled_quantity
-            
-            if average_fill_price is not None:
-                order.average_fill_price = average_fill_price
-            
-            order.updated_at = datetime.utcnow()
-            
-            # Move to history if completed
-            if not order.is_active() and order in self.active_orders:
-                self.active_orders.remove(order)
-                self.order_history.append(order)
-            
-            return True
-        return False
+        order = self.store.get(order_id)
+        if order is None:
+            return False
+        self.store.update(
+            order,
+            status=status,
+            filled_quantity=filled_quantity,
+            average_fill_price=average_fill_price,
+        )
+        return True
+    
+    def get_order(self, order_id: str) -> Optional[Order]:
+        """Get an order by id."""
+        return self.store.get(order_id)
     
-    def get_active_orders(self, symbol: Optional[str] = None) -> List[Order]:
+    def get_order_by_client_id(self, client_order_id: str) -> Optional[Order]:
+        """Get an order by client order id."""
+        return self.store.get_by_client_id(client_order_id)
+    
+    def get_orders_by_status(self, status: OrderStatus) -> List[Order]:
+        """Get orders in a status (finished ones while still in memory)."""
+        return self.store.with_status(status)
+    
+    def get_active_orders(self, symbol: Optional[str] = None, strategy: Optional[str] = None) -> List[Order]:
         """Get active orders."""
-        if symbol:
-            return [o for o in self.active_orders if o.symbol == symbol]
-        return self.active_orders.copy()
+        return self.store.active_orders(symbol=symbol, strategy=strategy)
     
     def get_order_history(self, symbol: Optional[str] = None, limit: int = 100) -> List[Order]:
-        """Get order history."""
-        history = self.order_history
-        if symbol:
-            history = [o for o in history if o.symbol == symbol]
-        return history[-limit:]
+        """Get order history (in memory; see ``store.spilled_history`` for evicted orders)."""
+        return self.store.recent_history(symbol=symbol, limit=limit)
+    
+    def subscribe(self, listener: OrderListener) -> None:
+        """Call ``listener(event, order)`` on every order change."""
+        self.store.subscribe(listener)
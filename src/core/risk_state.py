@@ -0,0 +1,318 @@
+"""
+Incremental portfolio risk state for the enterprise risk manager
+
+``ReturnCovariance`` keeps a rolling window of aligned log-return rows (one
+row per price snapshot) and running pairwise sums over it, so a correlation
+or covariance lookup is O(1) per pair and a new snapshot costs O(k^2) for k
+symbols instead of recomputing every pair from history. Symbols may join or
+miss snapshots: each pair only uses the rows where both had a return.
+
+``PositionRiskBook`` holds every open position's exposure and risk
+contribution, keeps the portfolio totals current on each add, change or
+close, and checks all stop losses in one vectorized comparison.
+"""
+
+import math
+from decimal import Decimal
+from statistics import NormalDist
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+def aligned_log_returns(
+    price_history: Mapping[str, Sequence[float]],
+    symbols: Sequence[str],
+    lookback: int
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Log returns of the symbols that have at least two prices, tail-aligned
+    to their common length (at most ``lookback`` prices). Rows are symbols.
+    """
+    names = [s for s in symbols if len(price_history.get(s, ())) >= 2]
+    if not names:
+        return [], np.empty((0, 0))
+    length = min(lookback, *(len(price_history[s]) for s in names))
+    prices = np.array([price_history[s][-length:] for s in names], dtype=float)
+    return names, np.diff(np.log(prices), axis=1)
+
+
+class ReturnCovariance:
+    """Rolling pairwise covariance of log returns over the last ``lookback`` snapshots"""
+
+    def __init__(self, lookback: int = 30, capacity: int = 16):
+        self.lookback = lookback
+        self.columns: Dict[str, int] = {}
+        self.last_price: Dict[str, float] = {}
+        self.last_seen: Dict[str, int] = {}  # snapshot number of each symbol's last price
+        self.snapshots = 0
+        self.capacity = capacity
+        self.rows = 0
+        self.head = 0
+        self.version = 0
+        self._returns = np.zeros((lookback, capacity))
+        self._present = np.zeros((lookback, capacity))
+        # Running sums over the window, all restricted to rows where both columns are present:
+        # count[a, b], sum_r[a, b] = sum r_a, sum_r2[a, b] = sum r_a^2, cross[a, b] = sum r_a r_b
+        self._count = np.zeros((capacity, capacity))
+        self._sum_r = np.zeros((capacity, capacity))
+        self._sum_r2 = np.zeros((capacity, capacity))
+        self._cross = np.zeros((capacity, capacity))
+        self._pushes_since_resync = 0
+
+    def observe(self, prices: Mapping[str, float]) -> bool:
+        """
+        Add one snapshot. A symbol has a return in this row only if it was
+        also priced in the previous snapshot, so every row is aligned.
+        """
+        self.snapshots += 1
+        for symbol in prices:
+            if symbol not in self.columns:
+                self._add_column(symbol)
+        k = len(self.columns)
+        returns = np.zeros(k)
+        present = np.zeros(k)
+        for symbol, price in prices.items():
+            price = float(price)
+            if price <= 0:
+                continue
+            previous = self.last_price.get(symbol)
+            consecutive = self.last_seen.get(symbol) == self.snapshots - 1
+            self.last_price[symbol] = price
+            self.last_seen[symbol] = self.snapshots
+            if previous is not None and consecutive:
+                col = self.columns[symbol]
+                returns[col] = math.log(price / previous)
+                present[col] = 1.0
+        if not present.any():
+            return False
+        self._push(returns, present)
+        return True
+
+    def tracks(self, symbol: str) -> bool:
+        """Whether ``symbol`` has at least two returns in the window"""
+        col = self.columns.get(symbol)
+        return col is not None and self._count[col, col] >= 2
+
+    def correlation(self, a: str, b: str) -> Optional[float]:
+        """Correlation over the rows both symbols share (None if undefined)"""
+        if a not in self.columns or b not in self.columns:
+            return None
+        i, j = self.columns[a], self.columns[b]
+        value = self._correlations(np.array([i]), np.array([j]))[0, 0]
+        return None if math.isnan(value) else float(value)
+
+    def correlations_with(self, symbol: str, others: Sequence[str]) -> Dict[str, float]:
+        """Defined correlations of ``symbol`` with each of ``others``"""
+        col = self.columns.get(symbol)
+        names = [s for s in others if s in self.columns]
+        if col is None or not names:
+            return {}
+        row = self._correlations(np.array([col]), np.array([self.columns[s] for s in names]))[0]
+        return {name: float(value) for name, value in zip(names, row) if not math.isnan(value)}
+
+    def correlation_matrix(self, symbols: Sequence[str]) -> np.ndarray:
+        """Pairwise correlations (NaN where undefined, 1 on the diagonal)"""
+        idx = np.array([self.columns[s] for s in symbols])
+        matrix = self._correlations(idx, idx)
+        np.fill_diagonal(matrix, 1.0)
+        return matrix
+
+    def covariance_matrix(self, symbols: Sequence[str]) -> np.ndarray:
+        """Pairwise sample covariances (0 where fewer than two shared rows)"""
+        idx = np.array([self.columns[s] for s in symbols])
+        cov, _, _ = self._moments(idx, idx)
+        return np.nan_to_num(cov)
+
+    def _moments(self, rows: np.ndarray, cols: np.ndarray):
+        grid = np.ix_(rows, cols)
+        n = self._count[grid]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sum_a = self._sum_r[grid]
+            sum_b = self._sum_r[np.ix_(cols, rows)].T
+            var_a = self._sum_r2[grid] - sum_a * sum_a / n
+            var_b = self._sum_r2[np.ix_(cols, rows)].T - sum_b * sum_b / n
+            cov = np.where(n >= 2, (self._cross[grid] - sum_a * sum_b / n) / (n - 1), np.nan)
+            var_a = np.where(n >= 2, var_a / (n - 1), np.nan)
+            var_b = np.where(n >= 2, var_b / (n - 1), np.nan)
+        return cov, var_a, var_b
+
+    def _correlations(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        cov, var_a, var_b = self._moments(rows, cols)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denom = np.sqrt(var_a * var_b)
+            corr = np.where(denom > 1e-18, cov / denom, np.nan)
+        return np.clip(corr, -1.0, 1.0)
+
+    def _push(self, returns: np.ndarray, present: np.ndarray):
+        k = len(returns)
+        if self.rows == self.lookback:
+            old_returns = self._returns[self.head, :k].copy()
+            old_present = self._present[self.head, :k].copy()
+            self._accumulate(old_returns, old_present, -1.0)
+        else:
+            self.rows += 1
+        self._returns[self.head, :k] = returns
+        self._present[self.head, :k] = present
+        self._accumulate(returns, present, 1.0)
+        self.head = (self.head + 1) % self.lookback
+        self.version += 1
+
+        # Sliding sums drift by rounding; rebuild them from the window now and then
+        self._pushes_since_resync += 1
+        if self._pushes_since_resync >= 8 * self.lookback:
+            self._resync()
+
+    def _accumulate(self, returns: np.ndarray, present: np.ndarray, sign: float):
+        k = len(returns)
+        self._count[:k, :k] += sign * np.outer(present, present)
+        self._sum_r[:k, :k] += sign * np.outer(returns, present)
+        self._sum_r2[:k, :k] += sign * np.outer(returns * returns, present)
+        self._cross[:k, :k] += sign * np.outer(returns, returns)
+
+    def _resync(self):
+        k = len(self.columns)
+        r = self._returns[:self.rows, :k]
+        m = self._present[:self.rows, :k]
+        self._count[:k, :k] = m.T @ m
+        self._sum_r[:k, :k] = r.T @ m
+        self._sum_r2[:k, :k] = (r * r).T @ m
+        self._cross[:k, :k] = r.T @ r
+        self._pushes_since_resync = 0
+
+    def _add_column(self, symbol: str):
+        k = len(self.columns)
+        if k == self.capacity:
+            grow = self.capacity
+            self._returns = np.pad(self._returns, ((0, 0), (0, grow)))
+            self._present = np.pad(self._present, ((0, 0), (0, grow)))
+            for name in ("_count", "_sum_r", "_sum_r2", "_cross"):
+                setattr(self, name, np.pad(getattr(self, name), ((0, grow), (0, grow))))
+            self.capacity += grow
+        self.columns[symbol] = k
+
+
+class PositionRiskBook:
+    """
+    Open-position risk contributions and their running totals.
+
+    Positions are duck-typed (``id``, ``symbol``, ``side``, ``entry_price``,
+    ``current_price``, ``size``, ``stop_loss``, ``risk_amount``); call
+    ``refresh`` after changing one's stop, size or price.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.slots: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = [None] * capacity
+        self.free: List[int] = list(range(capacity - 1, -1, -1))
+        self.side = np.zeros(capacity)  # +1 long, -1 short
+        self.stop = np.full(capacity, np.nan)
+        self.price = np.full(capacity, np.nan)
+        self.symbol_slots: Dict[str, Set[int]] = {}
+        self.contributions: Dict[str, Tuple[Decimal, Decimal, float]] = {}  # exposure, risk, net notional
+        self.symbol_net: Dict[str, float] = {}
+        self.exposure = Decimal(0)
+        self.risk = Decimal(0)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __contains__(self, position_id: str) -> bool:
+        return position_id in self.slots
+
+    @property
+    def heat(self) -> Decimal:
+        """Total risk as % of total entry exposure"""
+        if self.exposure == 0:
+            return Decimal(0)
+        return (self.risk / self.exposure) * 100
+
+    def symbols(self) -> List[str]:
+        return list(self.symbol_slots)
+
+    def add(self, position):
+        if position.id in self.slots:
+            self.refresh(position)
+            return
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        self.slots[position.id] = slot
+        self.ids[slot] = position.id
+        self.symbol_slots.setdefault(position.symbol, set()).add(slot)
+        self.contributions[position.id] = (Decimal(0), Decimal(0), 0.0)
+        self.refresh(position)
+
+    def refresh(self, position):
+        """Re-read a position's stop, price and risk contribution"""
+        slot = self.slots.get(position.id)
+        if slot is None:
+            return
+        self.side[slot] = 1.0 if position.side == "long" else -1.0
+        self.stop[slot] = float(position.stop_loss) if position.stop_loss else np.nan
+        self.price[slot] = float(position.current_price)
+
+        exposure = position.entry_price * position.size
+        risk = position.risk_amount
+        net = float(exposure) * self.side[slot]
+        old_exposure, old_risk, old_net = self.contributions[position.id]
+        if (exposure, risk, net) != (old_exposure, old_risk, old_net):
+            self.exposure += exposure - old_exposure
+            self.risk += risk - old_risk
+            self.symbol_net[position.symbol] = self.symbol_net.get(position.symbol, 0.0) + net - old_net
+            self.contributions[position.id] = (exposure, risk, net)
+            self.version += 1
+
+    def remove(self, position):
+        slot = self.slots.pop(position.id, None)
+        if slot is None:
+            return
+        exposure, risk, net = self.contributions.pop(position.id)
+        self.exposure -= exposure
+        self.risk -= risk
+        slots = self.symbol_slots[position.symbol]
+        slots.discard(slot)
+        if slots:
+            self.symbol_net[position.symbol] -= net
+        else:
+            del self.symbol_slots[position.symbol]
+            self.symbol_net.pop(position.symbol, None)
+        self.ids[slot] = None
+        self.side[slot] = 0.0
+        self.stop[slot] = np.nan
+        self.price[slot] = np.nan
+        self.free.append(slot)
+        self.version += 1
+
+    def set_price(self, symbol: str, price: float) -> List[str]:
+        """Record a price for every position in ``symbol``; returns their ids"""
+        slots = self.symbol_slots.get(symbol)
+        if not slots:
+            return []
+        self.price[list(slots)] = price
+        return [self.ids[slot] for slot in slots]
+
+    def triggered_stops(self) -> List[str]:
+        """Ids of positions whose price is at or through their stop"""
+        with np.errstate(invalid="ignore"):
+            hit = self.side * (self.price - self.stop) <= 0
+        hit &= ~np.isnan(self.stop) & ~np.isnan(self.price)
+        return [self.ids[slot] for slot in np.flatnonzero(hit)]
+
+    def value_at_risk(self, returns: ReturnCovariance, confidence: float = 0.95) -> float:
+        """Parametric one-period VaR of the net entry notional per symbol"""
+        symbols = [s for s in self.symbol_net if s in returns.columns]
+        if not symbols:
+            return 0.0
+        weights = np.array([self.symbol_net[s] for s in symbols])
+        variance = float(weights @ returns.covariance_matrix(symbols) @ weights)
+        return NormalDist().inv_cdf(confidence) * math.sqrt(max(variance, 0.0))
+
+    def _grow(self):
+        capacity = len(self.ids)
+        self.ids.extend([None] * capacity)
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+        self.side = np.concatenate([self.side, np.zeros(capacity)])
+        self.stop = np.concatenate([self.stop, np.full(capacity, np.nan)])
+        self.price = np.concatenate([self.price, np.full(capacity, np.nan)])
@@ -0,0 +1,192 @@
+"""
+Paginated async OHLCV backfill for the symbol universe
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import ccxt
+import pandas as pd
+from loguru import logger
+
+from .exchanges import AsyncExchangeClient
+from .ohlcv_store import OHLCVStore
+
+
+class UniverseBackfill:
+    """
+    Backfill many symbols/timeframes into an ``OHLCVStore``.
+
+    Every series runs as its own task and pages forward with ``since``
+    cursors; each venue's rate limiter decides how fast requests go out.
+    Series resume at the last stored bar (refetched, since it may have been
+    stored while still forming), each page is written as it arrives (so an
+    interrupted run picks up where it stopped), and missing bars between
+    pages or after the stored history are reported as gaps.
+    """
+
+    def __init__(self, store: OHLCVStore, exchange_names: List[str],
+                 clients: Optional[Dict[str, AsyncExchangeClient]] = None,
+                 max_in_flight: int = 16):
+        self.store = store
+        self.max_in_flight = max_in_flight
+        self.exchange_names = list(exchange_names)
+        self._clients = clients
+        self.clients: Dict[str, AsyncExchangeClient] = {}
+
+    async def _open_clients(self):
+        if self._clients is not None:
+            self.clients = dict(self._clients)
+        else:
+            for name in self.exchange_names:
+                try:
+                    self.clients[name] = AsyncExchangeClient(name, max_in_flight=self.max_in_flight)
+                except Exception as e:
+                    logger.warning(f"Failed to initialize async {name}: {e}")
+
+        async def markets(name, client):
+            try:
+                await client.load_markets()
+            except Exception as e:
+                logger.warning(f"Failed to load {name} markets: {e}")
+                client.markets = {}
+
+        await asyncio.gather(*[markets(n, c) for n, c in self.clients.items()])
+
+    async def close(self):
+        if self._clients is None:
+            await asyncio.gather(*[c.close() for c in self.clients.values()])
+        self.clients = {}
+
+    async def run(self, symbols: List[str], timeframes: List[str], since: datetime,
+                  until: Optional[datetime] = None) -> Dict[str, Any]:
+        """Backfill every (symbol, timeframe) from ``since``; returns a report"""
+        started = time.monotonic()
+        report: Dict[str, Any] = {
+            'symbols_processed': 0,
+            'symbols_failed': 0,
+            'total_records': 0,
+            'timeframes': timeframes,
+            'changed_symbols': {tf: [] for tf in timeframes},
+            'gaps': {},
+        }
+        await self._open_clients()
+        try:
+            series = [(s, tf) for tf in timeframes for s in symbols]
+            outcomes = await asyncio.gather(
+                *[self.backfill_series(s, tf, since, until) for s, tf in series],
+                return_exceptions=True
+            )
+            for (symbol, timeframe), outcome in zip(series, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Backfill failed for {symbol} {timeframe}: {outcome}")
+                    report['symbols_failed'] += 1
+                    continue
+                records, gaps, new_bars = outcome
+                if records is None:
+                    report['symbols_failed'] += 1
+                    continue
+                report['symbols_processed'] += 1
+                report['total_records'] += records
+                if new_bars:
+                    report['changed_symbols'][timeframe].append(symbol)
+                if gaps:
+                    report['gaps'][f"{symbol} {timeframe}"] = gaps
+            report['requests'] = {name: c.stats['requests'] for name, c in self.clients.items()}
+        finally:
+            await self.close()
+
+        report['elapsed_s'] = round(time.monotonic() - started, 2)
+        logger.info(f"Backfill completed: {report['symbols_processed']} series, "
+                    f"{report['total_records']} records, {len(report['gaps'])} with gaps "
+                    f"in {report['elapsed_s']}s")
+        return report
+
+    async def backfill_series(self, symbol: str, timeframe: str, since: datetime,
+                              until: Optional[datetime] = None
+                              ) -> Tuple[Optional[int], List[Dict[str, Any]], int]:
+        """
+        Fetch and store one series (naive ``since``/``until`` are UTC).
+
+        Returns (records written, gaps, bars newer than the stored history);
+        records is None when no venue lists the symbol or the first page
+        comes back empty.
+        """
+        step = pd.Timedelta(seconds=ccxt.Exchange.parse_timeframe(timeframe))
+        last = await asyncio.to_thread(self.store.last_timestamp, symbol, timeframe)
+        start = pd.Timestamp(since)
+        if start.tzinfo is not None:
+            start = start.tz_convert('UTC').tz_localize(None)
+        if last is not None:
+            start = max(start, last)
+
+        venue, first = await self._first_page(symbol, timeframe, start, until)
+        if venue is None:
+            return (0, [], 0) if last is not None else (None, [], 0)
+
+        records = 0
+        new_bars = 0
+        gaps: List[Dict[str, Any]] = []
+        previous = last
+        page = first
+        pages = venue.iter_ohlcv(symbol, timeframe, first.index[-1] + step, until)
+        while page is not None:
+            gaps.extend(_find_gaps(page.index, previous, step))
+            new_bars += len(page) if last is None else int((page.index > last).sum())
+            previous = page.index[-1]
+            records += await self._save(symbol, timeframe, venue.exchange_name, page)
+            page = await anext(pages, None)
+        return records, gaps, new_bars
+
+    async def _first_page(self, symbol: str, timeframe: str, start: pd.Timestamp,
+                          until: Optional[datetime]):
+        """
+        First page from every venue listing the symbol; keep the one with the
+        highest average volume and page the rest of the history from it.
+        """
+        venues = [c for c in self.clients.values() if c.markets and symbol in c.markets]
+        if not venues:
+            return None, None
+
+        async def first(client):
+            pages = client.iter_ohlcv(symbol, timeframe, start, until)
+            try:
+                return await anext(pages, None)
+            finally:
+                await pages.aclose()
+
+        pages = await asyncio.gather(*[first(c) for c in venues], return_exceptions=True)
+        best, best_page, best_volume = None, None, -1.0
+        for client, page in zip(venues, pages):
+            if isinstance(page, Exception):
+                logger.warning(f"Failed to fetch {symbol} from {client.exchange_name}: {page}")
+                continue
+            if page is None or page.empty:
+                continue
+            volume = float(page['volume'].mean())
+            if volume > best_volume:
+                best, best_page, best_volume = client, page, volume
+        return best, best_page
+
+    async def _save(self, symbol: str, timeframe: str, exchange: str, frame: pd.DataFrame) -> int:
+        frame = frame.assign(symbol=symbol, exchange=exchange)
+        await asyncio.to_thread(self.store.write, symbol, timeframe, frame)
+        return len(frame)
+
+
+def _find_gaps(index: pd.DatetimeIndex, previous: Optional[pd.Timestamp],
+               step: pd.Timedelta) -> List[Dict[str, Any]]:
+    """Runs of missing bars inside ``index`` and between ``previous`` and it"""
+    stamps = index if previous is None else index.insert(0, previous)
+    if len(stamps) < 2:
+        return []
+    deltas = stamps[1:] - stamps[:-1]
+    gaps = []
+    for i in (deltas > step).nonzero()[0]:
+        gaps.append({
+            'start': (stamps[i] + step).isoformat(),
+            'end': (stamps[i + 1] - step).isoformat(),
+            'missing_bars': int(deltas[i] / step) - 1,
+        })
+    return gaps
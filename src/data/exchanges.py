@@ -2,12 +2,37 @@
 CCXT-based exchange interface for multi-exchange OHLCV data collection
 """
 import ccxt
+import ccxt.async_support as ccxt_async
 import asyncio
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, AsyncIterator
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 from loguru import logger
 
+from src.exchanges.base import RateLimiter
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Largest OHLCV page each venue serves per request
+PAGE_LIMITS = {'binance': 1000, 'bybit': 1000, 'kraken': 720}
+
+
+def to_milliseconds(when: datetime) -> int:
+    """Epoch milliseconds; naive pandas timestamps are UTC bar times"""
+    if isinstance(when, pd.Timestamp) and when.tzinfo is None:
+        when = when.tz_localize('UTC')
+    return int(when.timestamp() * 1000)
+
+
+def ohlcv_frame(rows: List[List[float]]) -> pd.DataFrame:
+    """CCXT OHLCV rows as a frame indexed by (naive UTC) bar time"""
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    return df
+
 
 class ExchangeClient:
     """Unified interface for cryptocurrency exchanges using CCXT"""
@@ -69,9 +94,7 @@ def fetch_ohlcv(self, symbol: str, timeframe: str = '1h',
             if not ohlcv:
                 return pd.DataFrame()
                 
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            df = ohlcv_frame(ohlcv)
             
             logger.debug(f"Fetched {len(df)} candles for {symbol} from {self.exchange_name}")
             return df
@@ -81,6 +104,90 @@ def fetch_ohlcv(self, symbol: str, timeframe: str = '1h',
             return pd.DataFrame()
 
 
+class AsyncExchangeClient:
+    """
+    Async CCXT client for history backfills.
+
+    Requests go through a per-venue ``RateLimiter`` sized from the venue's
+    advertised rate limit, so many symbols can page concurrently while the
+    venue, not a worker count, sets the pace. Rate-limit errors pause the
+    limiter; network errors are retried with backoff.
+    """
+
+    def __init__(self, exchange_name: str, client: Any = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 page_limit: Optional[int] = None, max_retries: int = 3,
+                 max_in_flight: int = 16):
+        self.exchange_name = exchange_name
+        self.client = client or getattr(ccxt_async, exchange_name)({
+            'enableRateLimit': False,  # paced by self.rate_limiter
+            'verbose': False,
+        })
+        if rate_limiter is None:
+            interval_ms = float(getattr(self.client, 'rateLimit', 100) or 100)
+            per_second = 1000.0 / interval_ms
+            rate_limiter = RateLimiter(requests_per_second=per_second, burst=max(1, int(per_second)))
+        self.rate_limiter = rate_limiter
+        self.page_limit = page_limit or PAGE_LIMITS.get(exchange_name, 500)
+        self.max_retries = max_retries
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self.markets: Optional[Dict[str, Any]] = None
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0}
+
+    async def _call(self, method: str, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            self.stats['requests'] += 1
+            try:
+                async with self._in_flight:
+                    return await getattr(self.client, method)(*args, **kwargs)
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
+                self.stats['rate_limited'] += 1
+                self.rate_limiter.penalize(2.0 ** attempt)
+                error = e
+            except (ccxt.NetworkError, asyncio.TimeoutError) as e:
+                self.stats['retries'] += 1
+                await asyncio.sleep(0.5 * 2 ** attempt)
+                error = e
+        raise error
+
+    async def load_markets(self) -> Dict[str, Any]:
+        if self.markets is None:
+            self.markets = await self._call('load_markets')
+        return self.markets
+
+    async def fetch_ohlcv_page(self, symbol: str, timeframe: str, since_ms: Optional[int],
+                               limit: Optional[int] = None) -> List[List[float]]:
+        """One OHLCV request starting at ``since_ms``"""
+        return await self._call('fetch_ohlcv', symbol, timeframe=timeframe, since=since_ms,
+                                limit=limit or self.page_limit) or []
+
+    async def iter_ohlcv(self, symbol: str, timeframe: str, since: datetime,
+                         until: Optional[datetime] = None) -> AsyncIterator[pd.DataFrame]:
+        """
+        Page through history from ``since`` with a cursor on the last bar.
+
+        Stops at ``until`` (default: now), on an empty page, or when the venue
+        stops advancing (e.g. it only serves a fixed recent window).
+        """
+        step_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        cursor = to_milliseconds(since)
+        until_ms = to_milliseconds(until or datetime.now(timezone.utc))
+        while cursor <= until_ms:
+            rows = await self.fetch_ohlcv_page(symbol, timeframe, cursor)
+            rows = [row for row in rows if cursor <= row[0] <= until_ms]
+            if not rows:
+                return
+            yield ohlcv_frame(rows)
+            cursor = int(rows[-1][0]) + step_ms
+
+    async def close(self):
+        try:
+            await self.client.close()
+        except Exception as e:
+            logger.debug(f"Closing {self.exchange_name} client failed: {e}")
+
+
 class MultiExchangeManager:
     """Manage multiple exchanges and aggregate data"""
     
@@ -88,6 +195,7 @@ def __init__(self, exchange_names: List[str] = None):
         if exchange_names is None:
             exchange_names = ['binance', 'bybit', 'kraken']
             
+        self.exchange_names = list(exchange_names)
         self.exchanges = {}
         for name in exchange_names:
             try:
@@ -0,0 +1,165 @@
+"""
+Time-partitioned OHLCV storage on parquet
+
+Bars live in one parquet file per symbol, timeframe and calendar month:
+
+    <root>/<SYMBOL>/<timeframe>/<YYYY-MM>.parquet
+
+Writes rewrite only the months the new rows fall in, so appending a bar
+costs the same however much history is stored; reads prune partitions by
+file name and push the remaining date filter down to pyarrow.
+"""
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+import pyarrow.parquet as pq
+from loguru import logger
+
+INDEX_NAME = 'timestamp'
+
+Timestamp = Union[datetime, pd.Timestamp, str]
+
+
+def _safe_symbol(symbol: str) -> str:
+    return symbol.replace('/', '-')
+
+
+def _month(ts: pd.Timestamp) -> str:
+    return f"{ts.year:04d}-{ts.month:02d}"
+
+
+class OHLCVStore:
+    """Month-partitioned parquet store for OHLCV frames indexed by bar time"""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[Path, threading.Lock] = defaultdict(threading.Lock)
+        self._locks_guard = threading.Lock()
+
+    def partition_dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / _safe_symbol(symbol) / timeframe
+
+    def legacy_path(self, symbol: str, timeframe: str) -> Path:
+        """Single-file layout used before partitioning"""
+        return self.root / f"{_safe_symbol(symbol)}_{timeframe}.parquet"
+
+    def partitions(self, symbol: str, timeframe: str) -> List[Path]:
+        """Month files for a series, oldest first"""
+        self._migrate_legacy(symbol, timeframe)
+        directory = self.partition_dir(symbol, timeframe)
+        if not directory.is_dir():
+            return []
+        return sorted(directory.glob('*.parquet'))
+
+    def symbols(self, timeframe: str) -> List[str]:
+        """Symbols with stored bars for ``timeframe``"""
+        found = set()
+        for directory in self.root.glob(f'*/{timeframe}'):
+            if any(directory.glob('*.parquet')):
+                found.add(directory.parent.name.replace('-', '/'))
+        for legacy in self.root.glob(f'*_{timeframe}.parquet'):
+            found.add(legacy.stem[:-len(timeframe) - 1].replace('-', '/'))
+        return sorted(found)
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Merge ``df`` into the store; later rows win on duplicate timestamps.
+
+        Only the month partitions ``df`` touches are read and rewritten.
+        Returns the number of partitions written.
+        """
+        if df.empty:
+            return 0
+        self._migrate_legacy(symbol, timeframe)
+        return self._write_months(symbol, timeframe, self._normalize(df))
+
+    def read(self, symbol: str, timeframe: str, start: Optional[Timestamp] = None,
+             end: Optional[Timestamp] = None) -> pd.DataFrame:
+        """Bars with ``start <= timestamp <= end`` (either bound optional)"""
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        files = self.partitions(symbol, timeframe)
+        if start is not None:
+            files = [f for f in files if f.stem >= _month(start)]
+        if end is not None:
+            files = [f for f in files if f.stem <= _month(end)]
+        if not files:
+            return pd.DataFrame()
+
+        filters = []
+        if start is not None:
+            filters.append((INDEX_NAME, '>=', start))
+        if end is not None:
+            filters.append((INDEX_NAME, '<=', end))
+        dataset = pq.ParquetDataset([str(f) for f in files], filters=filters or None)
+        df = dataset.read_pandas().to_pandas()
+        if INDEX_NAME in df.columns:
+            df = df.set_index(INDEX_NAME)
+        return df.sort_index()
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """Time of the newest stored bar (reads only the newest partition)"""
+        files = self.partitions(symbol, timeframe)
+        if not files:
+            return None
+        table = pq.read_table(files[-1], columns=[INDEX_NAME])
+        if table.num_rows == 0:
+            return None
+        return pd.Timestamp(table.column(INDEX_NAME).to_pandas().max())
+
+    def _normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        if not isinstance(df.index, pd.DatetimeIndex):
+            df = df.copy()
+            df.index = pd.to_datetime(df.index)
+        if df.index.name != INDEX_NAME:
+            df = df.rename_axis(INDEX_NAME)
+        return df
+
+    def _write_months(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        directory = self.partition_dir(symbol, timeframe)
+        directory.mkdir(parents=True, exist_ok=True)
+        months = pd.Index([_month(ts) for ts in df.index])
+        for month, rows in df.groupby(months, sort=True):
+            self._merge_partition(directory / f"{month}.parquet", rows)
+        return months.nunique()
+
+    def _partition_lock(self, path: Path) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks[path]
+
+    def _merge_partition(self, path: Path, rows: pd.DataFrame):
+        with self._partition_lock(path):
+            combined = pd.concat([pd.read_parquet(path), rows]) if path.exists() else rows
+            combined = combined[~combined.index.duplicated(keep='last')]
+            if not combined.index.is_monotonic_increasing:
+                combined = combined.sort_index()
+
+            # Write aside and swap so readers never see a half-written partition
+            tmp = path.with_suffix('.parquet.tmp')
+            combined.to_parquet(tmp, compression='snappy')
+            os.replace(tmp, path)
+
+    def _migrate_legacy(self, symbol: str, timeframe: str):
+        """Split a pre-partitioning single file into month partitions"""
+        legacy = self.legacy_path(symbol, timeframe)
+        if not legacy.exists():
+            return
+        with self._partition_lock(legacy):
+            if not legacy.exists():
+                return
+            try:
+                df = pd.read_parquet(legacy)
+            except Exception as e:
+                logger.warning(f"Cannot migrate {legacy}: {e}")
+                return
+            if not df.empty:
+                self._write_months(symbol, timeframe, self._normalize(df))
+            legacy.unlink()
+            logger.info(f"Migrated {legacy.name} into {len(df)} partitioned records")
@@ -5,12 +5,13 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Callable
+from typing import Deque, Dict, List, Optional, Any, Callable, Tuple
 from decimal import Decimal
-from enum import Enum
+from enum import Enum, IntEnum
 import asyncio
 import time
 import logging
+from collections import deque
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -167,30 +168,235 @@ class Trade:
     def cost(self) -> Decimal:
         return self.price * self.amount
 
+class RequestPriority(IntEnum):
+    """Dispatch lanes - lower value is served first"""
+    ORDER = 0  # place/cancel
+    ACCOUNT = 1  # balances, open orders, fills
+    MARKET_DATA = 2  # tickers, books, candles
+
+
+@dataclass
+class RateBucket:
+    """Token bucket for one venue limit (request weight, order count, raw requests...)"""
+    name: str
+    capacity: float
+    refill_per_second: float
+    header: Optional[str] = None  # response header reporting used units, e.g. X-MBX-USED-WEIGHT-1M
+    tokens: float = field(init=False)
+    last_update: float = field(init=False)
+
+    def __post_init__(self):
+        self.tokens = float(self.capacity)
+        self.last_update = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self.last_update
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.last_update = now
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until `cost` units are available (0 if available now)"""
+        needed = min(cost, self.capacity) - self.tokens
+        if needed <= 0:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return float("inf")
+        return needed / self.refill_per_second
+
+
 class RateLimiter:
-    """Rate limiter to prevent API bans"""
-    
-    def __init__(self, requests_per_second: int = 10, burst: int = 20):
+    """Rate limiter to prevent API bans
+
+    Holds one or more token buckets (e.g. request weight per minute, orders per
+    10s, raw requests per 5 min). A request costs units in one or more buckets,
+    looked up per endpoint. Waiters are queued by priority lane and released by
+    a timer callback, so no lock is held while sleeping and zero-weight calls
+    never wait.
+    """
+
+    DEFAULT_BUCKET = "requests"
+
+    def __init__(
+        self,
+        requests_per_second: float = 10,
+        burst: int = 20,
+        buckets: Optional[List[RateBucket]] = None,
+        endpoint_weights: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
         self.requests_per_second = requests_per_second
         self.burst = burst
-        self.tokens = burst
-        self.last_update = time.time()
-        self.lock = asyncio.Lock()
-    
-    async def acquire(self, weight: int = 1):
+        if not buckets:
+            buckets = [RateBucket(self.DEFAULT_BUCKET, burst, requests_per_second)]
+        self.buckets: Dict[str, RateBucket] = {b.name: b for b in buckets}
+        self.default_bucket = buckets[0].name
+        self.endpoint_weights = endpoint_weights or {}
+
+        # One FIFO per priority lane
+        self._lanes: Dict[RequestPriority, Deque[Tuple[Dict[str, float], asyncio.Future]]] = {
+            lane: deque() for lane in sorted(RequestPriority)
+        }
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._blocked_until = 0.0
+
+        self.stats = {"acquired": 0, "waited": 0, "total_wait_s": 0.0, "header_syncs": 0}
+
+    @property
+    def tokens(self) -> float:
+        """Tokens left in the default bucket"""
+        bucket = self.buckets[self.default_bucket]
+        bucket.refill(time.monotonic())
+        return bucket.tokens
+
+    def cost_for(self, endpoint: Optional[str] = None, weight: float = 1) -> Dict[str, float]:
+        """Resolve per-bucket cost for an endpoint"""
+        if endpoint is not None and endpoint in self.endpoint_weights:
+            return {k: v for k, v in self.endpoint_weights[endpoint].items() if k in self.buckets}
+        return {self.default_bucket: weight}
+
+    async def acquire(
+        self,
+        weight: float = 1,
+        endpoint: Optional[str] = None,
+        priority: RequestPriority = RequestPriority.MARKET_DATA,
+    ):
         """Acquire permission to make a request"""
-        async with self.lock:
-            now = time.time()
-            elapsed = now - self.last_update
-            self.tokens = min(self.burst, self.tokens + elapsed * self.requests_per_second)
-            self.last_update = now
-            
-            if self.tokens < weight:
-                sleep_time = (weight - self.tokens) / self.requests_per_second
-                await asyncio.sleep(sleep_time)
-                self.tokens = weight
-            
-            self.tokens -= weight
+        cost = {k: v for k, v in self.cost_for(endpoint, weight).items() if v > 0}
+        if not cost:
+            return
+
+        if not self.queued and self._try_consume(cost, time.monotonic()):
+            self.stats["acquired"] += 1
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._lanes[RequestPriority(priority)].append((cost, future))
+        started = time.monotonic()
+        self._rearm()
+        # A cancelled waiter is skipped by the dispatcher; nothing to undo here
+        await future
+        self.stats["acquired"] += 1
+        self.stats["waited"] += 1
+        self.stats["total_wait_s"] += time.monotonic() - started
+
+    def _try_consume(self, cost: Dict[str, float], now: float) -> bool:
+        if now < self._blocked_until:
+            return False
+        for name, units in cost.items():
+            bucket = self.buckets[name]
+            bucket.refill(now)
+            if bucket.wait_time(units) > 0:
+                return False
+        for name, units in cost.items():
+            self.buckets[name].tokens -= units
+        return True
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for tokens"""
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def _dispatch(self):
+        """Release queued waiters in priority order and arm a timer for the next one
+
+        A waiter that cannot be served reserves only the buckets it is short on,
+        so lower lanes may still use other buckets but can never take tokens a
+        higher-priority waiter is waiting for.
+        """
+        self._timer = None
+        now = time.monotonic()
+        if now < self._blocked_until:
+            self._timer = asyncio.get_running_loop().call_later(
+                self._blocked_until - now, self._dispatch
+            )
+            return
+        for bucket in self.buckets.values():
+            bucket.refill(now)
+
+        reserved: Dict[str, float] = {}  # bucket -> wait time of the waiter holding it
+        for lane in self._lanes.values():
+            kept: Deque[Tuple[Dict[str, float], asyncio.Future]] = deque()
+            while lane:
+                cost, future = lane.popleft()
+                if future.done():
+                    continue
+                if any(name in reserved for name in cost) or not self._try_consume(cost, now):
+                    for name, units in cost.items():
+                        wait = self.buckets[name].wait_time(units)
+                        if wait > 0 and name not in reserved:
+                            reserved[name] = wait
+                    kept.append((cost, future))
+                    continue
+                future.set_result(None)
+            lane.extend(kept)
+            if len(reserved) == len(self.buckets):
+                break
+
+        if reserved:
+            delay = min(reserved.values())
+            if delay != float("inf"):
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _rearm(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.queued:
+            self._dispatch()
+
+    def sync_from_headers(self, headers: Optional[Dict[str, Any]]):
+        """Sync bucket levels from venue response headers
+
+        Buckets with a `header` take the server's used count as authoritative.
+        A Retry-After header pauses the whole limiter.
+        """
+        if not headers:
+            return
+        lowered = {str(k).lower(): v for k, v in headers.items()}
+        now = time.monotonic()
+        for bucket in self.buckets.values():
+            if not bucket.header:
+                continue
+            raw = lowered.get(bucket.header.lower())
+            if raw is None:
+                continue
+            try:
+                used = float(raw)
+            except (TypeError, ValueError):
+                continue
+            bucket.refill(now)
+            bucket.tokens = min(bucket.capacity, bucket.capacity - used)
+            self.stats["header_syncs"] += 1
+
+        retry_after = lowered.get("retry-after")
+        if retry_after is not None:
+            try:
+                self.penalize(float(retry_after))
+            except (TypeError, ValueError):
+                pass
+        self._rearm()
+
+    def penalize(self, seconds: float):
+        """Block every bucket for `seconds` (429/418 backoff)"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        logger.warning(f"Rate limiter paused for {seconds:.1f}s")
+        self._rearm()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Current bucket levels and queue depth"""
+        now = time.monotonic()
+        for bucket in self.buckets.values():
+            bucket.refill(now)
+        return {
+            "buckets": {
+                name: {"tokens": b.tokens, "capacity": b.capacity, "refill_per_second": b.refill_per_second}
+                for name, b in self.buckets.items()
+            },
+            "queued": self.queued,
+            "paused_for_s": max(0.0, self._blocked_until - now),
+            **self.stats,
+        }
 
 class BaseExchange(ABC):
     """Base class for all exchange implementations"""
@@ -204,7 +410,9 @@ def __init__(self, config: Dict[str, Any]):
         self.status = ExchangeStatus.DISCONNECTED
         self.rate_limiter = RateLimiter(
             requests_per_second=config.get("rate_limit", 10),
-            burst=config.get("burst_limit", 20)
+            burst=config.get("burst_limit", 20),
+            buckets=[RateBucket(**b) for b in config.get("rate_buckets", [])],
+            endpoint_weights=config.get("endpoint_weights"),
         )
         self.websocket_handlers: Dict[str, List[Callable]] = {}
         self.last_ping = 0
@@ -10,15 +10,39 @@
 from typing import Dict, List, Optional, Any, Callable
 from src.exchanges.base import (
     BaseExchange, Balance, Ticker, OrderBook, Order, Trade,
-    OrderType, OrderSide, OrderStatus, ExchangeStatus
+    OrderType, OrderSide, OrderStatus, ExchangeStatus, RequestPriority
 )
 
 logger = logging.getLogger(__name__)
 
+# Spot API limits (per IP / per account), synced from X-MBX-* response headers
+BINANCE_RATE_BUCKETS = [
+    {"name": "weight", "capacity": 6000, "refill_per_second": 100, "header": "X-MBX-USED-WEIGHT-1M"},
+    {"name": "orders", "capacity": 100, "refill_per_second": 10, "header": "X-MBX-ORDER-COUNT-10S"},
+    {"name": "raw", "capacity": 61000, "refill_per_second": 61000 / 300},
+]
+
+BINANCE_ENDPOINT_WEIGHTS = {
+    "balance": {"weight": 20, "raw": 1},
+    "ticker": {"weight": 2, "raw": 1},
+    "orderbook": {"weight": 5, "raw": 1},
+    "create_order": {"weight": 1, "orders": 1, "raw": 1},
+    "cancel_order": {"weight": 1, "raw": 1},
+    "order": {"weight": 4, "raw": 1},
+    "open_orders": {"weight": 6, "raw": 1},
+    "order_history": {"weight": 20, "raw": 1},
+    "my_trades": {"weight": 20, "raw": 1},
+}
+
 class BinanceExchange(BaseExchange):
     """Binance exchange connector with WebSocket support"""
     
     def __init__(self, config: Dict[str, Any]):
+        config = {
+            "rate_buckets": BINANCE_RATE_BUCKETS,
+            "endpoint_weights": BINANCE_ENDPOINT_WEIGHTS,
+            **config,
+        }
         super().__init__(config)
         self.exchange_type = config.get("type", "spot")  # spot or future
         
@@ -66,6 +90,10 @@ async def connect(self) -> bool:
             self.error_count += 1
             return False
     
+    def _sync_rate_limits(self):
+        """Feed the last REST response headers back into the rate limiter"""
+        self.rate_limiter.sync_from_headers(getattr(self.exchange, "last_response_headers", None))
+
     async def disconnect(self):
         """Disconnect from Binance"""
         try:
@@ -78,9 +106,10 @@ async def disconnect(self):
     async def get_balance(self, currency: Optional[str] = None) -> Dict[str, Balance]:
         """Get account balance"""
         try:
-            await self.rate_limiter.acquire()
+            await self.rate_limiter.acquire(endpoint="balance", priority=RequestPriority.ACCOUNT)
             
             raw_balance = await self.exchange.fetch_balance()
+            self._sync_rate_limits()
             balances = {}
             
             for curr, info in raw_balance['total'].items():
@@ -106,9 +135,10 @@ async def get_balance(self, currency: Optional[str] = None) -> Dict[str, Balance
     async def get_ticker(self, symbol: str) -> Ticker:
         """Get ticker for symbol"""
         try:
-            await self.rate_limiter.acquire()
+            await self.rate_limiter.acquire(endpoint="ticker", priority=RequestPriority.MARKET_DATA)
             
             ticker = await self.exchange.fetch_ticker(symbol)
+            self._sync_rate_limits()
             
             result = Ticker(
                 symbol=symbol,
@@ -134,9 +164,10 @@ async def get_ticker(self, symbol: str) -> Ticker:
     async def get_orderbook(self, symbol: str, limit: int = 20) -> OrderBook:
         """Get order book for symbol"""
         try:
-            await self.rate_limiter.acquire()
+            await self.rate_limiter.acquire(endpoint="orderbook", priority=RequestPriority.MARKET_DATA)
             
             orderbook = await self.exchange.fetch_order_book(symbol, limit)
+            self._sync_rate_limits()
             
             result = OrderBook(
                 symbol=symbol,
@@ -166,7 +197,7 @@ async def place_order(
     ) -> Order:
         """Place an order on Binance"""
         try:
-            await self.rate_limiter.acquire(weight=2)
+            await self.rate_limiter.acquire(endpoint="create_order", priority=RequestPriority.ORDER)
             
             # Convert to CCXT format
             ccxt_side = side.value
@@ -187,6 +218,8 @@ async def place_order(
                     symbol, ccxt_type, ccxt_side, float(amount), float(price), params=params
                 )
             
+            self._sync_rate_limits()
+            
             # Parse response
             order = Order(
                 id=result['id'],
@@ -215,9 +248,10 @@ async def place_order(
     async def cancel_order(self, order_id: str, symbol: Optional[str] = None) -> bool:
         """Cancel an order"""
         try:
-            await self.rate_limiter.acquire()
+            await self.rate_limiter.acquire(endpoint="cancel_order", priority=RequestPriority.ORDER)
             
             result = await self.exchange.cancel_order(order_id, symbol)
+            self._sync_rate_limits()
             logger.info(f"Binance order cancelled: {order_id}")
             return True
             
@@ -229,9 +263,10 @@ async def cancel_order(self, order_id: str, symbol: Optional[str] = None) -> boo
     async def get_order(self, order_id: str, symbol: Optional[str] = None) -> Order:
         """Get order status"""
         try:
-            await self.rate_limiter.acquire()
+            await self.rate_limiter.acquire(endpoint="order", priority=RequestPriority.ACCOUNT)
             
             result = await self.exchange.fetch_order(order_id, symbol)
+            self._sync_rate_limits()
             
             return Order(
                 id=result['id'],
@@ -256,9 +291,10 @@ async def get_order(self, order_id: str, symbol: Optional[str] = None) -> Order:
     async def get_open_orders(self, symbol: Optional[str] = None) -> List[Order]:
         """Get all open orders"""
         try:
-            await self.rate_limiter.acquire()
+            await self.rate_limiter.acquire(endpoint="open_orders", priority=RequestPriority.ACCOUNT)
             
             orders = await self.exchange.fetch_open_orders(symbol)
+            self._sync_rate_limits()
             
             return [
                 Order(
@@ -288,9 +324,10 @@ async def get_order_history(
     ) -> List[Order]:
         """Get order history"""
         try:
-            await self.rate_limiter.acquire()
+            await self.rate_limiter.acquire(endpoint="order_history", priority=RequestPriority.ACCOUNT)
             
             orders = await self.exchange.fetch_closed_orders(symbol, limit=limit)
+            self._sync_rate_limits()
             
             return [
                 Order(
@@ -322,9 +359,10 @@ async def get_trades(
     ) -> List[Trade]:
         """Get trade history"""
         try:
-            await self.rate_limiter.acquire()
+            await self.rate_limiter.acquire(endpoint="my_trades", priority=RequestPriority.ACCOUNT)
             
             trades = await self.exchange.fetch_my_trades(symbol, limit=limit)
+            self._sync_rate_limits()
             
             return [
                 Trade(
@@ -0,0 +1,261 @@
+"""
+Versioned model artifact registry.
+
+Artifacts are stored under ``<root>/<symbol>/<horizon>/<version>/`` and indexed
+in ``<root>/index.json`` by symbol, horizon, feature-set hash and the date range
+of the training data. Models are loaded lazily on first use and kept in an LRU
+bounded by an approximate memory budget (size of the artifact on disk).
+
+Objects that define ``to_artifact(directory)`` / ``from_artifact(directory)``
+(e.g. ``PricePredictor``) serialize themselves; anything else is written with an
+uncompressed ``joblib.dump`` so numpy arrays can be memory-mapped on load.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FILE = "artifact.joblib"
+
+
+def feature_set_hash(columns: Iterable[str]) -> str:
+    """Stable short hash of an ordered feature column list"""
+    return hashlib.sha1("\x1f".join(map(str, columns)).encode()).hexdigest()[:12]
+
+
+@dataclass
+class ModelRecord:
+    """Index entry for one stored artifact"""
+    symbol: str
+    horizon: str
+    version: int
+    feature_hash: str
+    data_start: Optional[str]
+    data_end: Optional[str]
+    created_at: str
+    path: str
+    size_bytes: int
+    loader: str  # "joblib" or "module:Class" with a from_artifact classmethod
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.symbol}/{self.horizon}/{self.version}"
+
+    def age_hours(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now(timezone.utc)
+        return (now - datetime.fromisoformat(self.created_at)).total_seconds() / 3600
+
+
+class ModelRegistry:
+    """Versioned artifact store with lazy loading and a memory-capped LRU"""
+
+    def __init__(self, root: Union[str, Path] = "models/registry", max_memory_mb: float = 512.0,
+                 keep_versions: int = 3):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.keep_versions = keep_versions
+
+        self._index_path = self.root / "index.json"
+        self._records: Dict[str, ModelRecord] = self._read_index()
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    # ----------------------------------------------------------------- storage
+
+    def save(
+        self,
+        model: Any,
+        symbol: str,
+        horizon: Union[int, str],
+        feature_columns: Iterable[str] = (),
+        data_start: Optional[datetime] = None,
+        data_end: Optional[datetime] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> ModelRecord:
+        """Store a new version of a model and return its index record"""
+        symbol, horizon = str(symbol), str(horizon)
+        with self._lock:
+            version = max((r.version for r in self._versions(symbol, horizon)), default=0) + 1
+            directory = self.root / symbol / horizon / f"v{version}"
+            directory.mkdir(parents=True, exist_ok=True)
+
+            if hasattr(model, "to_artifact") and hasattr(type(model), "from_artifact"):
+                model.to_artifact(directory)
+                loader = f"{type(model).__module__}:{type(model).__qualname__}"
+            else:
+                import joblib
+                joblib.dump(model, directory / ARTIFACT_FILE)
+                loader = "joblib"
+
+            record = ModelRecord(
+                symbol=symbol,
+                horizon=horizon,
+                version=version,
+                feature_hash=feature_set_hash(feature_columns),
+                data_start=_iso(data_start),
+                data_end=_iso(data_end),
+                created_at=datetime.now(timezone.utc).isoformat(),
+                path=str(directory.relative_to(self.root)),
+                size_bytes=sum(f.stat().st_size for f in directory.rglob("*") if f.is_file()),
+                loader=loader,
+                metadata=metadata or {},
+            )
+            self._records[record.key] = record
+            self._prune(symbol, horizon)
+            self._write_index()
+            self._remember(record, model)
+
+        logger.info(f"Registered model {record.key} ({record.size_bytes / 1024:.0f} KB)")
+        return record
+
+    def find(
+        self,
+        symbol: str,
+        horizon: Union[int, str],
+        feature_columns: Optional[Iterable[str]] = None,
+        max_age_hours: Optional[float] = None,
+    ) -> Optional[ModelRecord]:
+        """Newest record matching the key, without loading the model"""
+        wanted = feature_set_hash(feature_columns) if feature_columns is not None else None
+        for record in sorted(self._versions(str(symbol), str(horizon)),
+                             key=lambda r: r.version, reverse=True):
+            if wanted is not None and record.feature_hash != wanted:
+                continue
+            if max_age_hours is not None and record.age_hours() > max_age_hours:
+                return None
+            return record
+        return None
+
+    def latest(
+        self,
+        symbol: str,
+        horizon: Union[int, str],
+        feature_columns: Optional[Iterable[str]] = None,
+        max_age_hours: Optional[float] = None,
+    ) -> Optional[Any]:
+        """Load (or fetch from cache) the newest matching model"""
+        record = self.find(symbol, horizon, feature_columns, max_age_hours)
+        return self.load(record) if record else None
+
+    def load(self, record: ModelRecord) -> Any:
+        """Return the model for a record, reading it from disk on first use"""
+        with self._lock:
+            if record.key in self._cache:
+                self._cache.move_to_end(record.key)
+                self.stats["hits"] += 1
+                return self._cache[record.key]
+
+        self.stats["misses"] += 1
+        model = self._read(record)
+        with self._lock:
+            self._remember(record, model)
+        return model
+
+    def records(self, symbol: Optional[str] = None) -> List[ModelRecord]:
+        return [r for r in self._records.values() if symbol is None or r.symbol == symbol]
+
+    def evict(self, key: Optional[str] = None):
+        """Drop one (or every) loaded model from memory"""
+        with self._lock:
+            keys = [key] if key else list(self._cache)
+            for k in keys:
+                if self._cache.pop(k, None) is not None:
+                    self._cache_bytes -= self._records[k].size_bytes if k in self._records else 0
+            self._cache_bytes = max(self._cache_bytes, 0)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "models": len(self._records),
+            "loaded": list(self._cache),
+            "memory_mb": round(self._cache_bytes / 1024 / 1024, 2),
+            "max_memory_mb": round(self.max_memory_bytes / 1024 / 1024, 2),
+            **self.stats,
+        }
+
+    # --------------------------------------------------------------- internals
+
+    def _versions(self, symbol: str, horizon: str) -> List[ModelRecord]:
+        return [r for r in self._records.values() if r.symbol == symbol and r.horizon == horizon]
+
+    def _read(self, record: ModelRecord) -> Any:
+        directory = self.root / record.path
+        if record.loader == "joblib":
+            import joblib
+            return joblib.load(directory / ARTIFACT_FILE, mmap_mode="r")
+
+        import importlib
+        module_name, _, class_name = record.loader.partition(":")
+        cls = importlib.import_module(module_name)
+        for part in class_name.split("."):
+            cls = getattr(cls, part)
+        return cls.from_artifact(directory)
+
+    def _remember(self, record: ModelRecord, model: Any):
+        if record.size_bytes > self.max_memory_bytes:
+            return
+        if record.key in self._cache:
+            self._cache.move_to_end(record.key)
+            return
+        self._cache[record.key] = model
+        self._cache_bytes += record.size_bytes
+        while self._cache_bytes > self.max_memory_bytes and len(self._cache) > 1:
+            key, _ = self._cache.popitem(last=False)
+            self._cache_bytes -= self._records[key].size_bytes
+            self.stats["evictions"] += 1
+
+    def _prune(self, symbol: str, horizon: str):
+        if self.keep_versions <= 0:
+            return
+        stale = sorted(self._versions(symbol, horizon), key=lambda r: r.version)[:-self.keep_versions]
+        for record in stale:
+            self.evict(record.key)
+            del self._records[record.key]
+            shutil.rmtree(self.root / record.path, ignore_errors=True)
+
+    def _read_index(self) -> Dict[str, ModelRecord]:
+        if not self._index_path.exists():
+            return {}
+        try:
+            with open(self._index_path) as f:
+                records = [ModelRecord(**r) for r in json.load(f)]
+        except Exception as e:
+            logger.error(f"Error reading model index {self._index_path}: {e}")
+            return {}
+        return {r.key: r for r in records}
+
+    def _write_index(self):
+        tmp = self._index_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump([asdict(r) for r in self._records.values()], f, indent=2)
+        tmp.replace(self._index_path)
+
+
+def _iso(value: Optional[Any]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+_default_registry: Optional[ModelRegistry] = None
+
+
+def get_registry() -> ModelRegistry:
+    """Process-wide registry under $SOFIA_MODEL_DIR (created on first use)"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry(os.getenv("SOFIA_MODEL_DIR", "models/registry"))
+    return _default_registry
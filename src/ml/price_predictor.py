@@ -1,16 +1,14 @@
-"""Machine Learning models for price prediction."""
+"""Machine Learning models for price prediction.
+
+sklearn and xgboost are imported on first use so that importing this module
+(e.g. from the API) stays cheap until a model is actually trained or loaded.
+"""
 
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional, Tuple, List
 from datetime import datetime, timedelta
 import logging
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-import xgboost as xgb
-import pickle
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -33,17 +31,20 @@ def __init__(self, model_type: str = "classification", algorithm: str = "xgboost
         self.model_type = model_type
         self.algorithm = algorithm
         self.model = None
-        self.scaler = StandardScaler()
+        self.scaler = None
         self.feature_importance = None
+        self.feature_columns: Optional[List[str]] = None
         self.is_trained = False
-        
-        # Initialize model
-        self._init_model()
     
     def _init_model(self):
         """Initialize the ML model based on configuration."""
+        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+        
+        self.scaler = StandardScaler()
         if self.model_type == "classification":
             if self.algorithm == "xgboost":
+                import xgboost as xgb
                 self.model = xgb.XGBClassifier(
                     n_estimators=100,
                     max_depth=5,
@@ -60,6 +61,7 @@ def _init_model(self):
                 )
         else:  # regression
             if self.algorithm == "xgboost":
+                import xgboost as xgb
                 self.model = xgb.XGBRegressor(
                     n_estimators=100,
                     max_depth=5,
@@ -164,7 +166,7 @@ def create_features(self, data: pd.DataFrame) -> pd.DataFrame:
             features['quarter'] = data.index.quarter
         
         # Forward fill and drop NaN
-        features = features.fillna(method='ffill').dropna()
+        features = features.ffill().dropna()
         
         return features
     
@@ -208,6 +210,12 @@ def train(
         Returns:
             Dictionary with training metrics
         """
+        from sklearn.model_selection import train_test_split, cross_val_score
+        from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+        
+        if self.model is None:
+            self._init_model()
+        
         # Create features and labels
         features = self.create_features(data)
         labels = self.create_labels(data, prediction_horizon)
@@ -216,6 +224,7 @@ def train(
         common_index = features.index.intersection(labels.dropna().index)
         X = features.loc[common_index]
         y = labels.loc[common_index]
+        self.feature_columns = list(X.columns)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -393,37 +402,74 @@ def backtest_predictions(
         return backtest_df
     
     def save_model(self, path: Path):
-        """Save trained model to disk."""
+        """
+        Save trained model to disk.
+        
+        Writes an uncompressed joblib bundle (arrays can be memory-mapped on
+        load). XGBoost boosters are stored next to it in native UBJSON.
+        """
+        import joblib
+        
         if not self.is_trained:
             raise ValueError("Model must be trained before saving")
         
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
         model_data = {
             'model': self.model,
             'scaler': self.scaler,
             'model_type': self.model_type,
             'algorithm': self.algorithm,
-            'feature_importance': self.feature_importance
+            'feature_importance': self.feature_importance,
+            'feature_columns': self.feature_columns,
+            'booster_file': None
         }
         
-        with open(path, 'wb') as f:
-            pickle.dump(model_data, f)
+        if self.algorithm == "xgboost":
+            booster_file = path.with_suffix('.ubj')
+            self.model.save_model(str(booster_file))
+            model_data['model'] = None
+            model_data['booster_file'] = booster_file.name
+        
+        joblib.dump(model_data, path)
         
         logger.info(f"Model saved to {path}")
     
-    def load_model(self, path: Path):
-        """Load trained model from disk."""
-        with open(path, 'rb') as f:
-            model_data = pickle.load(f)
+    def load_model(self, path: Path, mmap: bool = True):
+        """Load trained model from disk (also reads legacy pickle files)."""
+        import joblib
+        
+        path = Path(path)
+        model_data = joblib.load(path, mmap_mode='r' if mmap else None)
         
-        self.model = model_data['model']
-        self.scaler = model_data['scaler']
         self.model_type = model_data['model_type']
         self.algorithm = model_data['algorithm']
+        self.scaler = model_data['scaler']
         self.feature_importance = model_data['feature_importance']
+        self.feature_columns = model_data.get('feature_columns')
+        
+        if model_data.get('booster_file'):
+            import xgboost as xgb
+            model_cls = xgb.XGBClassifier if self.model_type == "classification" else xgb.XGBRegressor
+            self.model = model_cls()
+            self.model.load_model(str(path.parent / model_data['booster_file']))
+        else:
+            self.model = model_data['model']
         self.is_trained = True
         
         logger.info(f"Model loaded from {path}")
     
+    def to_artifact(self, directory: Path):
+        """Write this predictor into a registry artifact directory."""
+        self.save_model(Path(directory) / "model.joblib")
+    
+    @classmethod
+    def from_artifact(cls, directory: Path) -> "PricePredictor":
+        """Load a predictor from a registry artifact directory."""
+        predictor = cls()
+        predictor.load_model(Path(directory) / "model.joblib")
+        return predictor
+    
     def get_top_features(self, n: int = 10) -> pd.Series:
         """Get top n most important features."""
         if self.feature_importance is None:
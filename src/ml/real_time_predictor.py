@@ -1,24 +1,22 @@
 """
 Real-Time AI Prediction Engine
 Uses real crypto data to predict price movements with multiple ML models
+
+sklearn is imported when models are first built, so importing the engine is cheap.
 """
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score
-import joblib
 import asyncio
 import logging
+from collections import deque
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Deque, Dict, List, Tuple, Optional
 from dataclasses import dataclass
 import json
 
 from ..data.real_time_fetcher import fetcher
+from .model_registry import ModelRegistry, get_registry
 
 logger = logging.getLogger(__name__)
 
@@ -56,8 +54,8 @@ class FeatureEngineer:
     """Creates features for ML models from crypto data"""
     
     def __init__(self):
-        self.price_scaler = StandardScaler()
-        self.volume_scaler = StandardScaler()
+        self.price_scaler = None
+        self.volume_scaler = None
         self.fitted = False
         
     def create_features(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -135,20 +133,200 @@ def _calculate_bollinger_bands(self, prices, period=20, std_dev=2):
         lower = middle - (std * std_dev)
         return upper, middle, lower
 
+class _EWM:
+    """Incremental pandas-style ewm(span=...).mean() with adjust=True"""
+    
+    def __init__(self, span: int):
+        self.decay = 1 - 2 / (span + 1)
+        self.num = 0.0
+        self.den = 0.0
+        
+    def peek(self, x: float) -> float:
+        return (x + self.decay * self.num) / (1 + self.decay * self.den)
+        
+    def push(self, x: float) -> float:
+        self.num = x + self.decay * self.num
+        self.den = 1 + self.decay * self.den
+        return self.num / self.den
+
+
+def _sample_std(values: np.ndarray) -> float:
+    return float(np.std(values, ddof=1)) if len(values) > 1 else float('nan')
+
+
+def _safe_div(num: float, den: float) -> float:
+    if den == 0:
+        if num == 0 or np.isnan(num):
+            return float('nan')
+        return float(np.inf if num > 0 else -np.inf)
+    return num / den
+
+
+class _SymbolFeatureState:
+    """Rolling state for one symbol; the newest bar stays pending until a later bar arrives"""
+    
+    HISTORY = 25  # longest look-back: returns_24h / lag_24
+    
+    def __init__(self):
+        self.bars: Deque[Dict[str, Any]] = deque(maxlen=self.HISTORY - 1)
+        self.pending: Optional[Dict[str, Any]] = None
+        self.ema = {5: _EWM(5), 10: _EWM(10), 12: _EWM(12), 26: _EWM(26)}
+        self.macd_signal = _EWM(9)
+        
+    def update(self, bar: Dict[str, Any]) -> bool:
+        """Add or revise the latest bar. Returns False for stale bars."""
+        if self.pending is not None:
+            if bar['time'] < self.pending['time']:
+                return False
+            if bar['time'] == self.pending['time']:
+                self.pending = bar  # Live candle revised in place
+                return True
+            self._commit(self.pending)
+        self.pending = bar
+        return True
+        
+    def _commit(self, bar: Dict[str, Any]):
+        close = bar['close']
+        for ewm in self.ema.values():
+            ewm.push(close)
+        self.macd_signal.push(self.ema[12].num / self.ema[12].den - self.ema[26].num / self.ema[26].den)
+        self.bars.append(bar)
+        
+    @property
+    def ready(self) -> bool:
+        return self.pending is not None and len(self.bars) >= self.HISTORY - 1
+        
+    def row(self) -> Optional[Dict[str, float]]:
+        """Feature row for the pending bar, matching FeatureEngineer.create_features"""
+        if not self.ready:
+            return None
+            
+        bar = self.pending
+        closes = np.array([b['close'] for b in self.bars] + [bar['close']], dtype=float)
+        volumes = np.array([b['volume'] for b in self.bars] + [bar['volume']], dtype=float)
+        close, volume, open_, high, low = bar['close'], bar['volume'], bar['open'], bar['high'], bar['low']
+        
+        f: Dict[str, float] = {}
+        f['sma_5'] = closes[-5:].mean()
+        f['sma_10'] = closes[-10:].mean()
+        f['sma_20'] = closes[-20:].mean()
+        f['ema_5'] = self.ema[5].peek(close)
+        f['ema_10'] = self.ema[10].peek(close)
+        
+        delta = np.diff(closes[-15:])
+        gain = delta[delta > 0].sum() / 14
+        loss = -delta[delta < 0].sum() / 14
+        f['rsi'] = 100 - 100 / (1 + _safe_div(gain, loss))
+        
+        macd = self.ema[12].peek(close) - self.ema[26].peek(close)
+        macd_signal = self.macd_signal.peek(macd)
+        f['macd'], f['macd_signal'], f['macd_histogram'] = macd, macd_signal, macd - macd_signal
+        
+        middle = f['sma_20']
+        std = _sample_std(closes[-20:])
+        f['bb_upper'], f['bb_middle'], f['bb_lower'] = middle + 2 * std, middle, middle - 2 * std
+        f['bb_width'] = f['bb_upper'] - f['bb_lower']
+        f['bb_position'] = _safe_div(close - f['bb_lower'], f['bb_upper'] - f['bb_lower'])
+        
+        f['volume_sma'] = volumes[-10:].mean()
+        f['volume_ratio'] = _safe_div(volume, f['volume_sma'])
+        f['price_volume'] = close * volume
+        
+        f['body_size'] = abs(close - open_)
+        f['upper_shadow'] = high - max(open_, close)
+        f['lower_shadow'] = min(open_, close) - low
+        f['hl_ratio'] = (high - low) / close
+        
+        returns = closes[1:] / closes[:-1] - 1
+        f['returns_1h'] = returns[-1]
+        f['returns_4h'] = close / closes[-5] - 1
+        f['returns_24h'] = close / closes[-25] - 1
+        f['volatility_5'] = _sample_std(returns[-5:])
+        f['volatility_10'] = _sample_std(returns[-10:])
+        
+        timestamp = pd.Timestamp(bar['time'])
+        f['hour'] = timestamp.hour
+        f['day_of_week'] = timestamp.dayofweek
+        
+        for lag in [1, 2, 3, 6, 12, 24]:
+            f[f'close_lag_{lag}'] = closes[-1 - lag]
+            f[f'volume_lag_{lag}'] = volumes[-1 - lag]
+            
+        return f
+
+
+class OnlineFeatureStore:
+    """
+    Per-symbol feature state updated incrementally as bars arrive.
+    
+    Each update is O(1) in history length: EMAs are recursive and every
+    rolling window is served from a fixed 25-bar buffer. The latest bar may
+    be revised in place (live candle) without disturbing committed state.
+    """
+    
+    def __init__(self):
+        self.states: Dict[str, _SymbolFeatureState] = {}
+        
+    def update(self, symbol: str, bar: Dict[str, Any]) -> bool:
+        """Push one OHLCV bar (dict with time/open/high/low/close/volume)"""
+        state = self.states.setdefault(symbol, _SymbolFeatureState())
+        return state.update(bar)
+        
+    def seed(self, symbol: str, df: pd.DataFrame):
+        """Warm a symbol's state from an OHLCV frame indexed by time"""
+        for timestamp, row in zip(df.index, df[['open', 'high', 'low', 'close', 'volume']].itertuples(index=False)):
+            self.update(symbol, {
+                'time': pd.Timestamp(timestamp),
+                'open': row.open, 'high': row.high, 'low': row.low,
+                'close': row.close, 'volume': row.volume
+            })
+            
+    def latest_row(self, symbol: str) -> Optional[Dict[str, float]]:
+        state = self.states.get(symbol)
+        return state.row() if state else None
+        
+    def latest_price(self, symbol: str) -> Optional[float]:
+        state = self.states.get(symbol)
+        return state.pending['close'] if state and state.pending else None
+        
+    def latest_matrix(
+        self,
+        symbols: List[str],
+        feature_columns: List[str]
+    ) -> Tuple[List[str], pd.DataFrame]:
+        """Stack the latest feature row of every ready symbol into one frame"""
+        ready, rows = [], []
+        for symbol in symbols:
+            row = self.latest_row(symbol)
+            if row is not None:
+                ready.append(symbol)
+                rows.append([row.get(col, 0.0) for col in feature_columns])
+        X = pd.DataFrame(rows, columns=feature_columns, index=ready)
+        return ready, X.replace([np.inf, -np.inf], np.nan).fillna(0)
+
+
 class MultiModelPredictor:
     """Ensemble of multiple ML models for crypto price prediction"""
     
     def __init__(self):
-        self.models = {
-            'rf': RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1),
-            'gb': GradientBoostingRegressor(n_estimators=100, random_state=42),
-            'lr': LinearRegression()
-        }
+        self.models = None  # Unfitted templates, built on first train
         
         self.feature_engineer = FeatureEngineer()
         self.is_trained = False
         self.feature_columns = None
-        self.target_scaler = MinMaxScaler()
+        self.target_scaler = None
+        self.target_scalers: Dict[int, Any] = {}
+        
+    @staticmethod
+    def _build_models() -> Dict[str, Any]:
+        from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+        from sklearn.linear_model import LinearRegression
+        
+        return {
+            'rf': RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1),
+            'gb': GradientBoostingRegressor(n_estimators=100, random_state=42),
+            'lr': LinearRegression()
+        }
         
     async def prepare_data(self, symbol: str, hours: int = 168) -> Optional[pd.DataFrame]:
         """Fetch and prepare data for training"""
@@ -177,6 +355,14 @@ async def prepare_data(self, symbol: str, hours: int = 168) -> Optional[pd.DataF
             
     def train_models(self, df: pd.DataFrame, target_horizons: List[int] = [1, 24, 168]):
         """Train models for different prediction horizons"""
+        from sklearn.base import clone
+        from sklearn.metrics import mean_squared_error, r2_score
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import MinMaxScaler
+        
+        if self.models is None:
+            self.models = self._build_models()
+        
         try:
             # Create features
             features_df = self.feature_engineer.create_features(df)
@@ -205,8 +391,11 @@ def train_models(self, df: pd.DataFrame, target_horizons: List[int] = [1, 24, 16
                 if len(X_horizon) != len(y):
                     X_horizon = X_horizon.iloc[:len(y)]
                 
-                # Scale target
-                y_scaled = self.target_scaler.fit_transform(y.values.reshape(-1, 1)).ravel()
+                # Scale target (one scaler per horizon so inference inverts with the right range)
+                target_scaler = MinMaxScaler()
+                y_scaled = target_scaler.fit_transform(y.values.reshape(-1, 1)).ravel()
+                self.target_scalers[horizon] = target_scaler
+                self.target_scaler = target_scaler
                 
                 # Split data
                 X_train, X_test, y_train, y_test = train_test_split(
@@ -217,7 +406,10 @@ def train_models(self, df: pd.DataFrame, target_horizons: List[int] = [1, 24, 16
                 horizon_models = {}
                 horizon_scores = {}
                 
-                for name, model in self.models.items():
+                for name, base_model in self.models.items():
+                    # Fresh estimator per horizon; reusing one object would leave every
+                    # horizon pointing at the last fit
+                    model = clone(base_model)
                     try:
                         # Train model
                         model.fit(X_train, y_train)
@@ -266,106 +458,204 @@ async def predict(self, symbol: str, current_data: pd.DataFrame) -> Optional[Pre
             X_current = features_df[self.feature_columns].iloc[-1:].fillna(0)
             current_price = current_data['close'].iloc[-1]
             
-            # Make predictions for each horizon
-            predictions = {}
-            confidences = {}
+            results = self.predict_batch([symbol], X_current, np.array([current_price]))
+            return results[0] if results else None
             
-            for horizon in [1, 24, 168]:
-                if horizon not in self.trained_models:
-                    continue
-                    
-                horizon_predictions = []
-                horizon_weights = []
+        except Exception as e:
+            logger.error(f"Error making prediction for {symbol}: {e}")
+            return None
+            
+    def predict_batch(
+        self,
+        symbols: List[str],
+        X: pd.DataFrame,
+        current_prices: np.ndarray
+    ) -> List[PredictionResult]:
+        """
+        Predict every row of X at once, for all horizons and models.
+        
+        The input is validated and converted once: linear models of every
+        horizon are one matrix product, forests run their trees directly on
+        one float32 matrix (skipping per-call validation and thread-pool
+        dispatch), other models get one predict() each. Target scaling is
+        inverted in one vectorized call per horizon.
+        """
+        if not self.is_trained or len(X) == 0:
+            return []
+            
+        X = X[self.feature_columns]
+        raw = self._predict_raw(X)
+        predictions: Dict[int, np.ndarray] = {}
+        confidences: Dict[int, float] = {}
+        
+        for horizon in [1, 24, 168]:
+            if horizon not in self.trained_models:
+                continue
                 
-                for name, model in self.trained_models[horizon].items():
-                    try:
-                        # Make prediction
-                        pred_scaled = model.predict(X_current)[0]
-                        pred_price = self.target_scaler.inverse_transform([[pred_scaled]])[0][0]
-                        
-                        # Calculate weight based on model performance
-                        r2_score = self.model_scores[horizon][name]['r2']
-                        weight = max(0, r2_score)  # Use R² as weight
-                        
-                        horizon_predictions.append(pred_price)
-                        horizon_weights.append(weight)
-                        
-                    except Exception as e:
-                        logger.error(f"Error in prediction with {name}: {e}")
+            horizon_predictions = []
+            horizon_weights = []
+            
+            for name in self.trained_models[horizon]:
+                if (horizon, name) in raw:
+                    horizon_predictions.append(raw[(horizon, name)])
+                    # Calculate weight based on model performance (R²)
+                    horizon_weights.append(max(0, self.model_scores[horizon][name]['r2']))
+                    
+            if not horizon_predictions:
+                continue
                 
-                if horizon_predictions:
-                    # Weighted average prediction
-                    if sum(horizon_weights) > 0:
-                        weighted_pred = np.average(horizon_predictions, weights=horizon_weights)
-                        confidence = np.mean(horizon_weights) * 100  # Convert to percentage
+            # (models x rows) scaled predictions -> prices in one call
+            scaler = self.target_scalers.get(horizon, self.target_scaler)
+            stacked = np.vstack(horizon_predictions)
+            prices = scaler.inverse_transform(stacked.reshape(-1, 1)).reshape(stacked.shape)
+            
+            if sum(horizon_weights) > 0:
+                predictions[horizon] = np.average(prices, axis=0, weights=horizon_weights)
+                confidence = np.mean(horizon_weights) * 100  # Convert to percentage
+            else:
+                predictions[horizon] = prices.mean(axis=0)
+                confidence = 50.0  # Default confidence
+            confidences[horizon] = min(95, max(10, confidence))  # Clamp between 10-95%
+            
+        return [
+            self._build_result(
+                symbol,
+                float(current_prices[i]),
+                {h: float(p[i]) for h, p in predictions.items()},
+                confidences
+            )
+            for i, symbol in enumerate(symbols)
+        ]
+        
+    def _predict_raw(self, X: pd.DataFrame) -> Dict[Tuple[int, str], np.ndarray]:
+        """Scaled predictions per (horizon, model name); failing models are left out"""
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.linear_model import LinearRegression
+        
+        raw: Dict[Tuple[int, str], np.ndarray] = {}
+        X64 = X.to_numpy(dtype=np.float64)
+        X32 = None
+        linear: List[Tuple[int, str, Any]] = []
+        
+        for horizon, models in self.trained_models.items():
+            for name, model in models.items():
+                try:
+                    if type(model) is LinearRegression and np.ndim(model.coef_) == 1:
+                        linear.append((horizon, name, model))
+                    elif type(model) is RandomForestRegressor and model.n_outputs_ == 1:
+                        if X32 is None:
+                            X32 = np.ascontiguousarray(X64, dtype=np.float32)
+                        # Same as model.predict: the mean of the trees
+                        total = np.zeros(len(X64))
+                        for tree in model.estimators_:
+                            total += tree.predict(X32, check_input=False)
+                        raw[(horizon, name)] = total / len(model.estimators_)
                     else:
-                        weighted_pred = np.mean(horizon_predictions)
-                        confidence = 50.0  # Default confidence
-                        
-                    predictions[horizon] = weighted_pred
-                    confidences[horizon] = min(95, max(10, confidence))  # Clamp between 10-95%
+                        raw[(horizon, name)] = model.predict(X)
+                except Exception as e:
+                    logger.error(f"Error in prediction with {name} ({horizon}h): {e}")
+                    
+        if linear:
+            # Every linear model at once: (rows x features) @ (features x models)
+            coef = np.vstack([model.coef_ for _, _, model in linear])
+            intercept = np.array([model.intercept_ for _, _, model in linear])
+            stacked = X64 @ coef.T + intercept
+            for i, (horizon, name, _) in enumerate(linear):
+                raw[(horizon, name)] = stacked[:, i]
+        return raw
+        
+    def _build_result(
+        self,
+        symbol: str,
+        current_price: float,
+        predictions: Dict[int, float],
+        confidences: Dict[int, float]
+    ) -> PredictionResult:
+        """Derive trend, signal strength and consensus from per-horizon prices"""
+        # Calculate trend direction and signal strength
+        if 1 in predictions and 24 in predictions:
+            medium_term_change = (predictions[24] - current_price) / current_price * 100
             
-            # Calculate trend direction and signal strength
-            if 1 in predictions and 24 in predictions:
-                short_term_change = (predictions[1] - current_price) / current_price * 100
-                medium_term_change = (predictions[24] - current_price) / current_price * 100
-                
-                if medium_term_change > 2:
-                    trend_direction = "up"
-                    signal_strength = min(100, abs(medium_term_change) * 10)
-                elif medium_term_change < -2:
-                    trend_direction = "down"
-                    signal_strength = min(100, abs(medium_term_change) * 10)
-                else:
-                    trend_direction = "sideways"
-                    signal_strength = 30
+            if medium_term_change > 2:
+                trend_direction = "up"
+                signal_strength = min(100, abs(medium_term_change) * 10)
+            elif medium_term_change < -2:
+                trend_direction = "down"
+                signal_strength = min(100, abs(medium_term_change) * 10)
             else:
                 trend_direction = "sideways"
-                signal_strength = 50
-                
-            # Calculate model consensus (agreement between models)
-            if len(predictions) >= 2:
-                pred_values = list(predictions.values())
-                relative_changes = [(p - current_price) / current_price for p in pred_values]
-                consensus = 100 - (np.std(relative_changes) * 1000)  # Lower std = higher consensus
-                model_consensus = max(0, min(100, consensus))
-            else:
-                model_consensus = 50
-            
-            # Create prediction result
-            result = PredictionResult(
-                symbol=symbol,
-                current_price=current_price,
-                predicted_price_1h=predictions.get(1, current_price),
-                predicted_price_24h=predictions.get(24, current_price),
-                predicted_price_7d=predictions.get(168, current_price),
-                confidence_1h=confidences.get(1, 50),
-                confidence_24h=confidences.get(24, 50),
-                confidence_7d=confidences.get(168, 50),
-                trend_direction=trend_direction,
-                signal_strength=signal_strength,
-                model_consensus=model_consensus,
-                timestamp=datetime.now(timezone.utc)
-            )
+                signal_strength = 30
+        else:
+            trend_direction = "sideways"
+            signal_strength = 50
             
-            logger.info(f"Prediction for {symbol}: {trend_direction} trend, {signal_strength:.1f}% strength")
-            return result
+        # Calculate model consensus (agreement between models)
+        if len(predictions) >= 2:
+            relative_changes = [(p - current_price) / current_price for p in predictions.values()]
+            consensus = 100 - (np.std(relative_changes) * 1000)  # Lower std = higher consensus
+            model_consensus = max(0, min(100, consensus))
+        else:
+            model_consensus = 50
             
-        except Exception as e:
-            logger.error(f"Error making prediction for {symbol}: {e}")
-            return None
+        result = PredictionResult(
+            symbol=symbol,
+            current_price=current_price,
+            predicted_price_1h=predictions.get(1, current_price),
+            predicted_price_24h=predictions.get(24, current_price),
+            predicted_price_7d=predictions.get(168, current_price),
+            confidence_1h=confidences.get(1, 50),
+            confidence_24h=confidences.get(24, 50),
+            confidence_7d=confidences.get(168, 50),
+            trend_direction=trend_direction,
+            signal_strength=signal_strength,
+            model_consensus=model_consensus,
+            timestamp=datetime.now(timezone.utc)
+        )
+        
+        logger.debug(f"Prediction for {symbol}: {trend_direction} trend, {signal_strength:.1f}% strength")
+        return result
 
 class RealTimePredictionEngine:
-    """Main engine for real-time crypto predictions"""
+    """
+    Main engine for real-time crypto predictions.
     
-    def __init__(self):
+    Every symbol has its own ensemble, trained on that symbol's price scale
+    (features and targets are absolute prices), so models are not shared
+    across symbols and a cycle makes one predict_batch pass per symbol over
+    all of its horizons and models. Symbols only share a matrix when they
+    share a predictor.
+    """
+    
+    def __init__(
+        self,
+        update_interval: float = 15.0,
+        max_concurrent_fetches: int = 10,
+        registry: Optional[ModelRegistry] = None,
+        max_model_age_hours: float = 24.0,
+    ):
         self.predictors: Dict[str, MultiModelPredictor] = {}
         self.prediction_cache: Dict[str, PredictionResult] = {}
+        self.feature_store = OnlineFeatureStore()
         self.is_running = False
         
+        # Refresh cadence; each cycle only pulls the newest bars per symbol
+        self.update_interval = update_interval
+        self._fetch_semaphore = asyncio.Semaphore(max_concurrent_fetches)
+        
+        # Trained ensembles are reused across restarts while younger than max_model_age_hours
+        self._registry = registry
+        self.max_model_age_hours = max_model_age_hours
+        
         # Symbols to predict
         self.symbols = ["bitcoin", "ethereum", "solana", "binancecoin", "cardano"]
         
+    @property
+    def registry(self) -> ModelRegistry:
+        """The given registry, else the process-wide one (resolved on first use)"""
+        if self._registry is None:
+            self._registry = get_registry()
+        return self._registry
+        
     async def start(self):
         """Start the prediction engine"""
         if self.is_running:
@@ -377,22 +667,28 @@ async def start(self):
         # Initialize predictors for each symbol
         logger.info("Initializing AI prediction models...")
         
-        for symbol in self.symbols:
-            logger.info(f"Training models for {symbol}...")
-            predictor = MultiModelPredictor()
-            
-            # Prepare training data (last 7 days)
-            df = await predictor.prepare_data(symbol, hours=168)
-            
-            if df is not None and len(df) >= 50:
-                success = predictor.train_models(df)
-                if success:
-                    self.predictors[symbol] = predictor
-                    logger.info(f"Models trained successfully for {symbol}")
-                else:
-                    logger.error(f"Failed to train models for {symbol}")
-            else:
+        # Training data (last 7 days) for every symbol is fetched concurrently
+        frames = await asyncio.gather(
+            *(self._fetch_history(symbol, 168) for symbol in self.symbols)
+        )
+        
+        for symbol, df in zip(self.symbols, frames):
+            if df is None or len(df) < 50:
                 logger.error(f"Insufficient data for {symbol}")
+                continue
+                
+            predictor = self._load_registered(symbol)
+            if predictor is None:
+                logger.info(f"Training models for {symbol}...")
+                predictor = MultiModelPredictor()
+                if not predictor.train_models(df):
+                    logger.error(f"Failed to train models for {symbol}")
+                    continue
+                self._register(symbol, predictor, df)
+                logger.info(f"Models trained successfully for {symbol}")
+                
+            self.predictors[symbol] = predictor
+            self.feature_store.seed(symbol, df)
         
         # Start prediction loop
         asyncio.create_task(self._prediction_loop())
@@ -404,29 +700,85 @@ async def stop(self):
         await fetcher.stop()
         logger.info("AI Prediction Engine stopped")
         
+    def _load_registered(self, symbol: str) -> Optional[MultiModelPredictor]:
+        """Fresh ensemble from the registry, if one exists"""
+        try:
+            predictor = self.registry.latest(symbol, "ensemble", max_age_hours=self.max_model_age_hours)
+        except Exception as e:
+            logger.error(f"Error loading registered models for {symbol}: {e}")
+            return None
+        if predictor is not None:
+            logger.info(f"Loaded registered models for {symbol}")
+        return predictor
+        
+    def _register(self, symbol: str, predictor: MultiModelPredictor, df: pd.DataFrame):
+        try:
+            self.registry.save(
+                predictor, symbol, "ensemble",
+                feature_columns=predictor.feature_columns,
+                data_start=df.index[0], data_end=df.index[-1],
+                metadata={'horizons': list(predictor.trained_models)}
+            )
+        except Exception as e:
+            logger.error(f"Error registering models for {symbol}: {e}")
+            
+    async def _fetch_history(self, symbol: str, hours: int) -> Optional[pd.DataFrame]:
+        async with self._fetch_semaphore:
+            return await MultiModelPredictor().prepare_data(symbol, hours=hours)
+            
+    async def _fetch_latest_bars(self, symbol: str, limit: int = 2) -> List[Dict]:
+        """Last closed bar plus the live one"""
+        async with self._fetch_semaphore:
+            try:
+                return await fetcher.get_klines(symbol.lower(), "1h", limit) or []
+            except Exception as e:
+                logger.error(f"Error fetching latest bars for {symbol}: {e}")
+                return []
+                
     async def _prediction_loop(self):
         """Main prediction loop"""
         while self.is_running:
             try:
-                for symbol in self.symbols:
-                    if symbol not in self.predictors:
-                        continue
-                    
-                    # Get recent data for prediction
-                    df = await self.predictors[symbol].prepare_data(symbol, hours=48)
-                    
-                    if df is not None and len(df) >= 24:
-                        # Make prediction
-                        prediction = await self.predictors[symbol].predict(symbol, df)
-                        
-                        if prediction:
-                            self.prediction_cache[symbol] = prediction
-                            
-                await asyncio.sleep(600)  # Update every 10 minutes
+                await self.refresh_predictions()
+                await asyncio.sleep(self.update_interval)
                 
             except Exception as e:
                 logger.error(f"Error in prediction loop: {e}")
                 await asyncio.sleep(60)
+                
+    async def refresh_predictions(self) -> int:
+        """Fetch newest bars concurrently, update features, predict in batches"""
+        symbols = [s for s in self.symbols if s in self.predictors]
+        latest = await asyncio.gather(*(self._fetch_latest_bars(s) for s in symbols))
+        
+        for symbol, klines in zip(symbols, latest):
+            for kline in klines:
+                self.feature_store.update(symbol, {**kline, 'time': pd.Timestamp(kline['time'])})
+                
+        return self.predict_all(symbols)
+        
+    def predict_all(self, symbols: Optional[List[str]] = None) -> int:
+        """
+        Predict every symbol from the feature store: one batched pass per
+        predictor, i.e. per symbol unless symbols share a predictor
+        """
+        symbols = symbols if symbols is not None else list(self.predictors)
+        groups: Dict[int, Tuple[MultiModelPredictor, List[str]]] = {}
+        for symbol in symbols:
+            predictor = self.predictors.get(symbol)
+            if predictor is not None and predictor.is_trained:
+                groups.setdefault(id(predictor), (predictor, []))[1].append(symbol)
+                
+        updated = 0
+        for predictor, group in groups.values():
+            ready, X = self.feature_store.latest_matrix(group, predictor.feature_columns)
+            if not ready:
+                continue
+            prices = np.array([self.feature_store.latest_price(s) for s in ready])
+            for result in predictor.predict_batch(ready, X, prices):
+                self.prediction_cache[result.symbol] = result
+                updated += 1
+        return updated
     
     def get_prediction(self, symbol: str) -> Optional[PredictionResult]:
         """Get latest prediction for a symbol"""
@@ -451,6 +803,9 @@ async def retrain_model(self, symbol: str, hours: int = 168):
                 success = predictor.train_models(df)
                 if success:
                     self.predictors[symbol] = predictor
+                    self._register(symbol, predictor, df)
+                    self.feature_store.states.pop(symbol, None)
+                    self.feature_store.seed(symbol, df)
                     logger.info(f"Model retrained successfully for {symbol}")
                     return True
                     
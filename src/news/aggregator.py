@@ -9,23 +9,25 @@
 from loguru import logger
 
 from .cryptopanic import CryptoPanicClient
+from .feed_fetcher import FeedFetcher
 from .gdelt import GDELTClient
 
 
 class NewsAggregator:
     """Aggregate news from multiple sources"""
     
-    def __init__(self, outputs_dir: str = "./outputs"):
-        self.cryptopanic = CryptoPanicClient()
-        self.gdelt = GDELTClient()
+    def __init__(self, outputs_dir: str = "./outputs", max_concurrency: int = 8):
+        # One connection pool and one concurrency bound for every source and symbol
+        self.fetcher = FeedFetcher(max_concurrency=max_concurrency)
+        self.cryptopanic = CryptoPanicClient(fetcher=self.fetcher)
+        self.gdelt = GDELTClient(fetcher=self.fetcher)
         self.outputs_dir = Path(outputs_dir)
         self.news_dir = self.outputs_dir / "news"
         self.news_dir.mkdir(parents=True, exist_ok=True)
         
     async def close(self):
-        """Close all clients"""
-        await self.cryptopanic.close()
-        await self.gdelt.close()
+        """Close all clients (they share one HTTP session)"""
+        await self.fetcher.close()
         
     async def fetch_global_news(self, hours_back: int = 24) -> Dict[str, Any]:
         """Fetch global cryptocurrency news from all sources"""
@@ -184,29 +186,39 @@ def save_symbol_news(self, symbol: str, news_data: Dict[str, Any]):
             
         logger.info(f"News for {symbol} saved to {symbol_path}")
         
-    async def update_all_news(self, symbols: Optional[List[str]] = None, hours_back: int = 24):
+    async def update_all_news(self, symbols: Optional[List[str]] = None, hours_back: int = 24,
+                              max_symbols: int = 10):
         """Update global news and optionally symbol-specific news"""
         try:
-            # Fetch global news
-            global_news = await self.fetch_global_news(hours_back)
-            self.save_global_news(global_news)
-            
-            # Fetch symbol-specific news if provided
+            symbols = (symbols or [])[:max_symbols]  # Limit to avoid rate limiting
             if symbols:
                 logger.info(f"Fetching news for {len(symbols)} symbols")
                 
-                for symbol in symbols[:10]:  # Limit to avoid rate limiting
-                    try:
-                        symbol_news = await self.fetch_symbol_news(symbol, hours_back)
-                        self.save_symbol_news(symbol, symbol_news)
-                        
-                        # Small delay to avoid rate limiting
-                        await asyncio.sleep(1)
-                        
-                    except Exception as e:
-                        logger.error(f"Error fetching news for {symbol}: {e}")
+            # Global and per-symbol requests all go out together; the shared
+            # fetcher keeps at most ``max_concurrency`` of them in flight
+            results = await asyncio.gather(
+                self.fetch_global_news(hours_back),
+                *[self.fetch_symbol_news(symbol, hours_back) for symbol in symbols],
+                return_exceptions=True
+            )
+            
+            global_news, symbol_results = results[0], results[1:]
+            if isinstance(global_news, Exception):
+                logger.error(f"Error fetching global news: {global_news}")
+            else:
+                self.save_global_news(global_news)
+                
+            for symbol, symbol_news in zip(symbols, symbol_results):
+                if isinstance(symbol_news, Exception):
+                    logger.error(f"Error fetching news for {symbol}: {symbol_news}")
+                else:
+                    self.save_symbol_news(symbol, symbol_news)
                         
-            logger.info("News update completed")
+            stats = self.fetcher.get_stats()
+            logger.info(
+                f"News update completed (totals: {stats['requests']} requests, "
+                f"{stats['not_modified']} not modified, {stats['parsed']} entries parsed)"
+            )
             
         except Exception as e:
             logger.error(f"Error updating news: {e}")
@@ -1,42 +1,60 @@
 """
 CryptoPanic API integration for cryptocurrency news
 """
-import httpx
 import asyncio
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from loguru import logger
 import os
 
+from .feed_fetcher import FeedFetcher
+
 
 class CryptoPanicClient:
     """Client for CryptoPanic API"""
     
-    def __init__(self, api_token: Optional[str] = None):
+    def __init__(self, api_token: Optional[str] = None, fetcher: Optional[FeedFetcher] = None):
         self.api_token = api_token or os.getenv('CRYPTOPANIC_TOKEN')
         self.base_url = "https://cryptopanic.com/api/v1"
-        self.session = None
+        # Shared with the other sources when given (pooled connections, concurrency bound)
+        self.fetcher = fetcher or FeedFetcher()
         
     async def get_session(self):
         """Get or create HTTP session"""
-        if self.session is None:
-            self.session = httpx.AsyncClient(timeout=30.0)
-        return self.session
+        return await self.fetcher.get_session()
         
     async def close(self):
         """Close HTTP session"""
-        if self.session:
-            await self.session.aclose()
-            self.session = None
+        await self.fetcher.close()
+        
+    async def _fetch_recent(self, params: Dict[str, Any], parse, hours_back: int) -> List[Dict[str, Any]]:
+        """Posts newer than ``hours_back``; only posts not seen on earlier polls are parsed"""
+        posts = await self.fetcher.fetch_items(
+            f"{self.base_url}/posts/",
+            entries=lambda response: response.json().get('results', []),
+            key=lambda post: post.get('id') or post.get('url'),
+            parse=parse,
+            params=params,
+            max_items=params['limit']
+        )
+        
+        # Filter by time
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours_back)
+        recent_posts = []
+        for post in posts:
+            try:
+                if _post_time(post) >= cutoff_time:
+                    recent_posts.append(post)
+            except Exception as e:
+                logger.warning(f"Error parsing post time: {e}")
+        return recent_posts
             
     async def fetch_posts(self, symbols: Optional[List[str]] = None, 
                          hours_back: int = 24, limit: int = 20) -> List[Dict[str, Any]]:
         """Fetch news posts from CryptoPanic"""
         try:
-            session = await self.get_session()
-            
             params = {
                 'auth_token': self.api_token,
                 'kind': 'news',
@@ -56,42 +74,7 @@ async def fetch_posts(self, symbols: Optional[List[str]] = None,
                 if currencies:
                     params['currencies'] = ','.join(currencies[:10])  # API limit
                     
-            response = await session.get(f"{self.base_url}/posts/", params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            posts = data.get('results', [])
-            
-            # Filter by time
-            cutoff_time = datetime.now() - timedelta(hours=hours_back)
-            recent_posts = []
-            
-            for post in posts:
-                try:
-                    post_time = datetime.fromisoformat(post['created_at'].replace('Z', '+00:00'))
-                    
-                    if post_time >= cutoff_time:
-                        recent_posts.append({
-                            'id': post.get('id'),
-                            'title': post.get('title', ''),
-                            'url': post.get('url', ''),
-                            'created_at': post.get('created_at'),
-                            'domain': post.get('domain', ''),
-                            'votes': {
-                                'negative': post.get('votes', {}).get('negative', 0),
-                                'positive': post.get('votes', {}).get('positive', 0),
-                                'important': post.get('votes', {}).get('important', 0),
-                                'liked': post.get('votes', {}).get('liked', 0),
-                                'disliked': post.get('votes', {}).get('disliked', 0)
-                            },
-                            'currencies': [c['title'] for c in post.get('currencies', [])],
-                            'source': 'cryptopanic'
-                        })
-                        
-                except Exception as e:
-                    logger.warning(f"Error parsing post: {e}")
-                    continue
-                    
+            recent_posts = await self._fetch_recent(params, self._format_post, hours_back)
             logger.info(f"Fetched {len(recent_posts)} recent posts from CryptoPanic")
             return recent_posts
             
@@ -99,6 +82,25 @@ async def fetch_posts(self, symbols: Optional[List[str]] = None,
             logger.error(f"Error fetching CryptoPanic posts: {e}")
             return []
             
+    def _format_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        votes = post.get('votes', {})
+        return {
+            'id': post.get('id'),
+            'title': post.get('title', ''),
+            'url': post.get('url', ''),
+            'created_at': post.get('created_at'),
+            'domain': post.get('domain', ''),
+            'votes': {
+                'negative': votes.get('negative', 0),
+                'positive': votes.get('positive', 0),
+                'important': votes.get('important', 0),
+                'liked': votes.get('liked', 0),
+                'disliked': votes.get('disliked', 0)
+            },
+            'currencies': [c['title'] for c in post.get('currencies', [])],
+            'source': 'cryptopanic'
+        }
+            
     async def fetch_symbol_news(self, symbol: str, hours_back: int = 24, 
                                limit: int = 10) -> List[Dict[str, Any]]:
         """Fetch news for a specific symbol"""
@@ -108,8 +110,6 @@ async def fetch_symbol_news(self, symbol: str, hours_back: int = 24,
             else:
                 base_currency = symbol.lower()
                 
-            session = await self.get_session()
-            
             params = {
                 'auth_token': self.api_token,
                 'currencies': base_currency,
@@ -117,41 +117,23 @@ async def fetch_symbol_news(self, symbol: str, hours_back: int = 24,
                 'limit': limit
             }
             
-            response = await session.get(f"{self.base_url}/posts/", params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            posts = data.get('results', [])
-            
-            # Filter by time and format
-            cutoff_time = datetime.now() - timedelta(hours=hours_back)
-            symbol_news = []
-            
-            for post in posts:
-                try:
-                    post_time = datetime.fromisoformat(post['created_at'].replace('Z', '+00:00'))
-                    
-                    if post_time >= cutoff_time:
-                        symbol_news.append({
-                            'title': post.get('title', ''),
-                            'url': post.get('url', ''),
-                            'created_at': post.get('created_at'),
-                            'domain': post.get('domain', ''),
-                            'sentiment_score': self._calculate_sentiment_score(post.get('votes', {})),
-                            'impact_score': post.get('votes', {}).get('important', 0),
-                            'source': 'cryptopanic'
-                        })
-                        
-                except Exception as e:
-                    logger.warning(f"Error parsing symbol news: {e}")
-                    continue
-                    
-            return symbol_news
+            return await self._fetch_recent(params, self._format_symbol_post, hours_back)
             
         except Exception as e:
             logger.error(f"Error fetching {symbol} news: {e}")
             return []
             
+    def _format_symbol_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'title': post.get('title', ''),
+            'url': post.get('url', ''),
+            'created_at': post.get('created_at'),
+            'domain': post.get('domain', ''),
+            'sentiment_score': self._calculate_sentiment_score(post.get('votes', {})),
+            'impact_score': post.get('votes', {}).get('important', 0),
+            'source': 'cryptopanic'
+        }
+            
     def _calculate_sentiment_score(self, votes: Dict[str, int]) -> float:
         """Calculate sentiment score from votes"""
         positive = votes.get('positive', 0) + votes.get('liked', 0)
@@ -164,4 +146,11 @@ def _calculate_sentiment_score(self, votes: Dict[str, int]) -> float:
         
     async def fetch_global_news(self, hours_back: int = 24, limit: int = 50) -> List[Dict[str, Any]]:
         """Fetch global cryptocurrency news"""
-        return await self.fetch_posts(symbols=None, hours_back=hours_back, limit=limit)
\ No newline at end of file
+        return await self.fetch_posts(symbols=None, hours_back=hours_back, limit=limit)
+
+
+def _post_time(post: Dict[str, Any]) -> datetime:
+    post_time = datetime.fromisoformat(post['created_at'].replace('Z', '+00:00'))
+    if post_time.tzinfo is None:
+        post_time = post_time.replace(tzinfo=timezone.utc)
+    return post_time
@@ -0,0 +1,250 @@
+"""
+Shared HTTP layer for news feeds: pooled connections, bounded concurrency,
+conditional requests and incremental parsing
+"""
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+
+@dataclass
+class FeedState:
+    """Validators and parsed items from the last successful response of a feed"""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    items: List[Any] = field(default_factory=list)
+    by_key: Dict[Hashable, Any] = field(default_factory=dict)
+
+
+class FeedFetcher:
+    """
+    One pooled ``httpx.AsyncClient`` shared by every news source.
+
+    At most ``max_concurrency`` requests are in flight across all sources and
+    symbols. Each feed (URL plus params, or an explicit ``cache_key``) remembers
+    its ETag/Last-Modified and sends them back as ``If-None-Match`` /
+    ``If-Modified-Since``; a 304 returns the items parsed last time without
+    downloading or decoding the body.
+    """
+
+    def __init__(self, max_concurrency: int = 8, timeout: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.session: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._feeds: Dict[Hashable, FeedState] = {}
+
+        self.stats = {
+            'requests': 0,
+            'not_modified': 0,
+            'errors': 0,
+            'parsed': 0,
+            'reused': 0
+        }
+
+    async def get_session(self) -> httpx.AsyncClient:
+        """Get or create the shared client (one per event loop)"""
+        loop = asyncio.get_running_loop()
+        if self.session is not None and self._loop is not loop:
+            # Client and semaphore are bound to the loop that created them
+            self.session = None
+        if self.session is None:
+            self.session = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self.session
+
+    async def close(self):
+        """Close the HTTP client; feed validators are kept for the next session"""
+        if self.session:
+            await self.session.aclose()
+            self.session = None
+
+    def feed_state(self, key: Hashable) -> FeedState:
+        return self._feeds.setdefault(key, FeedState())
+
+    async def fetch(self, url: str, params: Optional[Dict[str, Any]] = None,
+                    cache_key: Optional[Hashable] = None) -> Optional[httpx.Response]:
+        """
+        Conditional GET of ``url``.
+
+        Returns the response, or None when the server answered 304 Not Modified.
+        Raises ``httpx.HTTPStatusError`` for error statuses.
+        """
+        session = await self.get_session()
+        state = self.feed_state(cache_key if cache_key is not None else _feed_key(url, params))
+
+        headers = {}
+        if state.etag:
+            headers['If-None-Match'] = state.etag
+        if state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+
+        async with self._semaphore:
+            self.stats['requests'] += 1
+            try:
+                response = await session.get(url, params=params, headers=headers)
+            except httpx.HTTPError:
+                self.stats['errors'] += 1
+                raise
+
+        if response.status_code == 304:
+            self.stats['not_modified'] += 1
+            return None
+        if response.is_error:
+            self.stats['errors'] += 1
+        response.raise_for_status()
+
+        state.etag = response.headers.get('ETag')
+        state.last_modified = response.headers.get('Last-Modified')
+        return response
+
+    async def fetch_items(self, url: str,
+                          entries: Callable[[httpx.Response], Iterable[Any]],
+                          key: Callable[[Any], Hashable],
+                          parse: Callable[[Any], Any],
+                          params: Optional[Dict[str, Any]] = None,
+                          cache_key: Optional[Hashable] = None,
+                          stop_at_seen: bool = True,
+                          max_items: Optional[int] = None) -> List[Any]:
+        """
+        Fetch a feed and return its parsed items, parsing only unseen entries.
+
+        Args:
+            entries: Raw entries of a response, in feed order (a generator is
+                read lazily, so unparsed entries cost only their key)
+            key: Identity of a raw entry (id or URL)
+            parse: Raw entry -> item; returning None or raising skips the entry
+            cache_key: Feed identity when ``params`` carry volatile values
+            stop_at_seen: Feed is newest-first; once a known entry is reached,
+                nothing after it is parsed and only the known entries that are
+                still in the response are kept. Otherwise every entry is
+                visited but known ones are not re-parsed.
+            max_items: Cap on the items kept for the feed
+        """
+        feed_key = cache_key if cache_key is not None else _feed_key(url, params)
+        response = await self.fetch(url, params=params, cache_key=feed_key)
+        state = self.feed_state(feed_key)
+        if response is None:
+            return list(state.items)
+
+        items: List[Any] = []
+        by_key: Dict[Hashable, Any] = {}
+        past_seen = False
+        for entry in entries(response):
+            entry_key = key(entry)
+            if entry_key in by_key:
+                continue
+            if entry_key in state.by_key:
+                past_seen = stop_at_seen
+                self.stats['reused'] += 1
+                item = state.by_key[entry_key]
+            elif past_seen:
+                # Older than a known entry: seen before and skipped or capped out
+                continue
+            else:
+                try:
+                    item = parse(entry)
+                except Exception as e:
+                    logger.warning(f"Error parsing entry from {url}: {e}")
+                    item = None
+                if item is None:
+                    continue
+                self.stats['parsed'] += 1
+            by_key[entry_key] = item
+            items.append(item)
+            if max_items is not None and len(items) >= max_items:
+                break
+
+        state.items = items
+        state.by_key = by_key
+        return list(items)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['feeds'] = len(self._feeds)
+        stats['not_modified_ratio'] = stats['not_modified'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+
+class DedupIndex:
+    """
+    Articles seen recently, by URL and by normalized-title hash.
+
+    An article matching either key resolves to the first one registered, so the
+    same story syndicated under another URL, or re-fetched on the next cycle,
+    is kept once. Entries expire ``ttl`` after they were first seen.
+    """
+
+    def __init__(self, ttl: timedelta = timedelta(hours=48), clock: Callable[[], float] = time.time):
+        self.ttl = ttl.total_seconds()
+        self.clock = clock
+        self._entries: "OrderedDict[int, Tuple[float, str, str, Any]]" = OrderedDict()
+        self._by_url: Dict[str, int] = {}
+        self._by_title: Dict[str, int] = {}
+        self._next_id = 0
+
+    @staticmethod
+    def title_hash(title: str) -> str:
+        """Hash of a title with case, punctuation and spacing removed"""
+        normalized = re.sub(r'[\W_]+', '', title.lower())
+        return hashlib.sha1(normalized.encode()).hexdigest()[:16] if normalized else ''
+
+    def lookup(self, url: str, title: str) -> Optional[Any]:
+        entry_id = (self._by_url.get(url) if url else None)
+        if entry_id is None:
+            title_key = self.title_hash(title)
+            entry_id = self._by_title.get(title_key) if title_key else None
+        return self._entries[entry_id][3] if entry_id is not None else None
+
+    def resolve(self, url: str, title: str, item: Any) -> Tuple[Any, bool]:
+        """The registered article matching ``item`` (and False), or ``item`` itself registered (and True)"""
+        existing = self.lookup(url, title)
+        if existing is not None:
+            return existing, False
+
+        entry_id = self._next_id
+        self._next_id += 1
+        title_key = self.title_hash(title)
+        self._entries[entry_id] = (self.clock(), url, title_key, item)
+        if url:
+            self._by_url[url] = entry_id
+        if title_key:
+            self._by_title[title_key] = entry_id
+        return item, True
+
+    def evict(self) -> int:
+        """Drop entries older than the TTL; returns how many were dropped"""
+        cutoff = self.clock() - self.ttl
+        dropped = 0
+        while self._entries:
+            entry_id, (seen_at, url, title_key, _) = next(iter(self._entries.items()))
+            if seen_at >= cutoff:
+                break
+            del self._entries[entry_id]
+            if self._by_url.get(url) == entry_id:
+                del self._by_url[url]
+            if self._by_title.get(title_key) == entry_id:
+                del self._by_title[title_key]
+            dropped += 1
+        return dropped
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _feed_key(url: str, params: Optional[Dict[str, Any]]) -> Tuple:
+    return (url, tuple(sorted((params or {}).items())))
@@ -1,7 +1,6 @@
 """
 GDELT API integration for global news analysis
 """
-import httpx
 import asyncio
 import json
 from datetime import datetime, timedelta
@@ -10,32 +9,43 @@
 from loguru import logger
 import urllib.parse
 
+from .feed_fetcher import FeedFetcher
+
 
 class GDELTClient:
     """Client for GDELT Summary API"""
     
-    def __init__(self):
+    def __init__(self, fetcher: Optional[FeedFetcher] = None):
         self.base_url = "https://api.gdeltproject.org/api/v2"
-        self.session = None
+        # Shared with the other sources when given (pooled connections, concurrency bound)
+        self.fetcher = fetcher or FeedFetcher()
         
     async def get_session(self):
         """Get or create HTTP session"""
-        if self.session is None:
-            self.session = httpx.AsyncClient(timeout=30.0)
-        return self.session
+        return await self.fetcher.get_session()
         
     async def close(self):
         """Close HTTP session"""
-        if self.session:
-            await self.session.aclose()
-            self.session = None
+        await self.fetcher.close()
+        
+    async def _fetch_articles(self, endpoint: str, params: Dict[str, Any], parse) -> List[Dict[str, Any]]:
+        """Articles of a query; ones already parsed for the same query are reused"""
+        # The date window moves on every call, so the query alone identifies the feed
+        stable = tuple((k, v) for k, v in params.items() if k not in ('startdatetime', 'enddatetime'))
+        return await self.fetcher.fetch_items(
+            f"{self.base_url}/{endpoint}",
+            entries=lambda response: response.json().get('articles', []),
+            key=lambda article: article.get('url') or article.get('title'),
+            parse=parse,
+            params=params,
+            cache_key=(endpoint, stable),
+            stop_at_seen=False
+        )
             
     async def fetch_summary_news(self, query: str, hours_back: int = 24, 
                                 limit: int = 50) -> List[Dict[str, Any]]:
         """Fetch news summary from GDELT"""
         try:
-            session = await self.get_session()
-            
             # Calculate date range
             end_time = datetime.now()
             start_time = end_time - timedelta(hours=hours_back)
@@ -50,28 +60,9 @@ async def fetch_summary_news(self, query: str, hours_back: int = 24,
                 'enddatetime': end_time.strftime('%Y%m%d%H%M%S')
             }
             
-            response = await session.get(f"{self.base_url}/summary/summary", params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            articles = data.get('articles', [])
-            
-            formatted_articles = []
-            for article in articles:
-                try:
-                    formatted_articles.append({
-                        'title': article.get('title', ''),
-                        'url': article.get('url', ''),
-                        'domain': article.get('domain', ''),
-                        'language': article.get('language', 'en'),
-                        'date': article.get('seendate', ''),
-                        'social_image': article.get('socialimage', ''),
-                        'tone': float(article.get('tone', 0)),  # GDELT tone score
-                        'source': 'gdelt'
-                    })
-                except Exception as e:
-                    logger.warning(f"Error parsing GDELT article: {e}")
-                    continue
+            formatted_articles = await self._fetch_articles(
+                "summary/summary", params, self._format_summary_article
+            )
                     
             logger.info(f"Fetched {len(formatted_articles)} articles from GDELT")
             return formatted_articles
@@ -80,6 +71,18 @@ async def fetch_summary_news(self, query: str, hours_back: int = 24,
             logger.error(f"Error fetching GDELT summary: {e}")
             return []
             
+    def _format_summary_article(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'title': article.get('title', ''),
+            'url': article.get('url', ''),
+            'domain': article.get('domain', ''),
+            'language': article.get('language', 'en'),
+            'date': article.get('seendate', ''),
+            'social_image': article.get('socialimage', ''),
+            'tone': float(article.get('tone', 0)),  # GDELT tone score
+            'source': 'gdelt'
+        }
+            
     async def fetch_crypto_news(self, hours_back: int = 24, limit: int = 50) -> List[Dict[str, Any]]:
         """Fetch cryptocurrency-related news from GDELT"""
         crypto_queries = [
@@ -91,23 +94,18 @@ async def fetch_crypto_news(self, hours_back: int = 24, limit: int = 50) -> List
             "NFT OR non-fungible token"
         ]
         
-        all_articles = []
+        # Queries run together; the shared fetcher bounds how many are in flight
+        results = await asyncio.gather(*[
+            self.fetch_summary_news(query, hours_back=hours_back, limit=limit // len(crypto_queries))
+            for query in crypto_queries
+        ], return_exceptions=True)
         
-        for query in crypto_queries:
-            try:
-                articles = await self.fetch_summary_news(
-                    query, 
-                    hours_back=hours_back, 
-                    limit=limit // len(crypto_queries)
-                )
-                all_articles.extend(articles)
-                
-                # Add small delay to avoid rate limiting
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                logger.warning(f"Error fetching GDELT news for query '{query}': {e}")
+        all_articles = []
+        for query, articles in zip(crypto_queries, results):
+            if isinstance(articles, Exception):
+                logger.warning(f"Error fetching GDELT news for query '{query}': {articles}")
                 continue
+            all_articles.extend(articles)
                 
         # Remove duplicates based on URL
         seen_urls = set()
@@ -129,8 +127,6 @@ async def fetch_doc_search(self, query: str, hours_back: int = 24,
                               limit: int = 25) -> List[Dict[str, Any]]:
         """Fetch documents using GDELT Doc 2.0 API"""
         try:
-            session = await self.get_session()
-            
             # Calculate date range
             end_time = datetime.now()
             start_time = end_time - timedelta(hours=hours_back)
@@ -146,34 +142,23 @@ async def fetch_doc_search(self, query: str, hours_back: int = 24,
                 'trans': 'googletrans'  # Auto-translate non-English
             }
             
-            response = await session.get(f"{self.base_url}/doc/doc", params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            articles = data.get('articles', [])
-            
-            formatted_articles = []
-            for article in articles:
-                try:
-                    formatted_articles.append({
-                        'title': article.get('title', ''),
-                        'url': article.get('url', ''),
-                        'domain': article.get('domain', ''),
-                        'language': article.get('language', 'en'),
-                        'date': article.get('seendate', ''),
-                        'tone': float(article.get('tone', 0)),
-                        'source': 'gdelt_doc'
-                    })
-                except Exception as e:
-                    logger.warning(f"Error parsing GDELT doc: {e}")
-                    continue
-                    
-            return formatted_articles
+            return await self._fetch_articles("doc/doc", params, self._format_doc_article)
             
         except Exception as e:
             logger.error(f"Error fetching GDELT docs: {e}")
             return []
             
+    def _format_doc_article(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'title': article.get('title', ''),
+            'url': article.get('url', ''),
+            'domain': article.get('domain', ''),
+            'language': article.get('language', 'en'),
+            'date': article.get('seendate', ''),
+            'tone': float(article.get('tone', 0)),
+            'source': 'gdelt_doc'
+        }
+            
     def calculate_sentiment_score(self, tone: float) -> float:
         """Convert GDELT tone to 0-1 sentiment score"""
         # GDELT tone ranges from -100 to +100
@@ -192,24 +177,23 @@ async def get_trending_crypto_topics(self, hours_back: int = 6) -> List[Dict[str
             "NFT marketplace"
         ]
         
-        trending_news = []
+        results = await asyncio.gather(*[
+            self.fetch_summary_news(query, hours_back=hours_back, limit=5)
+            for query in trending_queries
+        ], return_exceptions=True)
         
-        for query in trending_queries:
-            try:
-                articles = await self.fetch_summary_news(query, hours_back=hours_back, limit=5)
-                
-                if articles:
-                    trending_news.append({
-                        'topic': query.title(),
-                        'article_count': len(articles),
-                        'latest_article': articles[0] if articles else None,
-                        'avg_tone': sum(a.get('tone', 0) for a in articles) / len(articles)
-                    })
-                    
-                await asyncio.sleep(0.3)  # Rate limiting
-                
-            except Exception as e:
-                logger.warning(f"Error fetching trending topic '{query}': {e}")
+        trending_news = []
+        for query, articles in zip(trending_queries, results):
+            if isinstance(articles, Exception):
+                logger.warning(f"Error fetching trending topic '{query}': {articles}")
                 continue
                 
+            if articles:
+                trending_news.append({
+                    'topic': query.title(),
+                    'article_count': len(articles),
+                    'latest_article': articles[0] if articles else None,
+                    'avg_tone': sum(a.get('tone', 0) for a in articles) / len(articles)
+                })
+                
         return trending_news
\ No newline at end of file
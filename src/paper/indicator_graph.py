@@ -0,0 +1,414 @@
+"""
+Incremental indicator graph and ring-buffer bar store for the signal hub.
+
+Indicators are declared as specs ``(kind, source, period)`` where ``source`` is
+an OHLCV column, another spec or the name of a custom node. Each distinct spec
+is computed once per bar and shared by every strategy that asks for it; updates
+are O(1) (amortized for rolling max/min). The live candle can be revised:
+``IndicatorGraph.revise`` rolls every node back one step and applies the new
+values.
+
+Strategy-specific series are added with ``expr(name, fn)`` (stateless function
+of the current values) or ``('custom', name, factory)`` where ``factory`` builds
+a ``Node`` whose ``update`` receives the values dict; both are shared by name.
+
+Outputs follow the pandas expressions used by the strategies (``rolling().mean()``,
+``ewm(span, adjust)``, rolling-mean RSI, ATR as the rolling mean of true range).
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NAN = float('nan')
+
+Spec = Tuple[str, Any, int]
+
+
+class BarRing:
+    """Fixed-capacity ring buffer of float rows"""
+
+    def __init__(self, capacity: int, width: int):
+        self.capacity = capacity
+        self._data = np.empty((capacity, width))
+        self._head = 0  # next write position
+        self.count = 0  # rows currently held
+        self.total = 0  # rows ever appended
+
+    def append(self, row: Sequence[float]):
+        self._data[self._head] = row
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total += 1
+
+    def replace_last(self, row: Sequence[float]):
+        self._data[(self._head - 1) % self.capacity] = row
+
+    def last(self) -> np.ndarray:
+        return self._data[(self._head - 1) % self.capacity]
+
+    def to_array(self, n: Optional[int] = None) -> np.ndarray:
+        """Newest ``n`` rows (all by default), oldest first"""
+        n = self.count if n is None else min(n, self.count)
+        start = (self._head - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._data[start:start + n].copy()
+        return np.concatenate([self._data[start:], self._data[:self._head]])
+
+
+class Node(ABC):
+    """
+    One incremental indicator; ``rollback`` undoes the last ``update``.
+
+    ``update`` takes the source value (the bar for ATR/true range, the values
+    dict for custom nodes).
+    """
+
+    @abstractmethod
+    def update(self, x: Any) -> Any:
+        pass
+
+    @abstractmethod
+    def rollback(self):
+        pass
+
+
+class _Window(Node):
+    """Fixed window with NaN counting; base for rolling mean/std"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window: Deque[float] = deque()
+        self.nans = 0
+        self._evicted: List[Optional[float]] = []
+
+    def _push(self, x: float):
+        evicted = self.window.popleft() if len(self.window) == self.period else None
+        if evicted is not None:
+            self._remove(evicted)
+        self.window.append(x)
+        self._add(x)
+        self._evicted = [evicted]
+
+    def rollback(self):
+        self._remove(self.window.pop())
+        evicted = self._evicted.pop() if self._evicted else None
+        if evicted is not None:
+            self.window.appendleft(evicted)
+            self._add(evicted)
+
+    def _ready(self) -> bool:
+        return len(self.window) == self.period and self.nans == 0
+
+
+class RollingMean(_Window):
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.total = 0.0
+
+    def _add(self, x: float):
+        if math.isnan(x):
+            self.nans += 1
+        else:
+            self.total += x
+
+    def _remove(self, x: float):
+        if math.isnan(x):
+            self.nans -= 1
+        else:
+            self.total -= x
+
+    def update(self, x: float) -> float:
+        self._push(x)
+        return self.value()
+
+    def value(self) -> float:
+        return self.total / self.period if self._ready() else NAN
+
+
+class RollingStd(_Window):
+    """Sample standard deviation (ddof=1) from sums shifted by the first value"""
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self.shift: Optional[float] = None
+        self.s1 = 0.0
+        self.s2 = 0.0
+
+    def _add(self, x: float):
+        if math.isnan(x):
+            self.nans += 1
+            return
+        if self.shift is None:
+            self.shift = x
+        d = x - self.shift
+        self.s1 += d
+        self.s2 += d * d
+
+    def _remove(self, x: float):
+        if math.isnan(x):
+            self.nans -= 1
+            return
+        d = x - self.shift
+        self.s1 -= d
+        self.s2 -= d * d
+
+    def update(self, x: float) -> float:
+        self._push(x)
+        return self.value()
+
+    def value(self) -> float:
+        if not self._ready() or self.period < 2:
+            return NAN
+        var = (self.s2 - self.s1 * self.s1 / self.period) / (self.period - 1)
+        return math.sqrt(max(var, 0.0))
+
+
+class EMA(Node):
+    """pandas ``ewm(span=period, adjust=...)`` mean; NaN inputs hold the last value"""
+
+    def __init__(self, period: int, adjust: bool):
+        self.alpha = 2.0 / (period + 1)
+        self.adjust = adjust
+        self.num = 0.0
+        self.den = 0.0
+        self.value_ = NAN
+        self._prev: List[Tuple[float, float, float]] = []
+
+    def update(self, x: float) -> float:
+        self._prev = [(self.num, self.den, self.value_)]
+        if math.isnan(x):
+            return self.value_
+        decay = 1.0 - self.alpha
+        if self.adjust:
+            self.num = x + decay * self.num
+            self.den = 1.0 + decay * self.den
+            self.value_ = self.num / self.den
+        else:
+            self.value_ = x if math.isnan(self.value_) else self.alpha * x + decay * self.value_
+        return self.value_
+
+    def rollback(self):
+        self.num, self.den, self.value_ = self._prev.pop()
+
+
+class RollingExtreme(Node):
+    """Rolling max (or min) via a monotonic deque; NaN inputs are skipped"""
+
+    def __init__(self, period: int, highest: bool):
+        self.period = period
+        self.sign = 1.0 if highest else -1.0
+        self.deque: Deque[Tuple[int, float]] = deque()
+        self.index = -1
+        self._undo: List[Tuple[Optional[Tuple[int, float]], List[Tuple[int, float]], bool]] = []
+
+    def update(self, x: float) -> float:
+        self.index += 1
+        evicted = None
+        if self.deque and self.deque[0][0] <= self.index - self.period:
+            evicted = self.deque.popleft()
+        popped = []
+        pushed = not math.isnan(x)
+        if pushed:
+            key = self.sign * x
+            while self.deque and self.deque[-1][1] <= key:
+                popped.append(self.deque.pop())
+            self.deque.append((self.index, key))
+        self._undo = [(evicted, popped, pushed)]
+        return self.value()
+
+    def rollback(self):
+        evicted, popped, pushed = self._undo.pop()
+        if pushed:
+            self.deque.pop()
+        self.deque.extend(reversed(popped))
+        if evicted is not None:
+            self.deque.appendleft(evicted)
+        self.index -= 1
+
+    def value(self) -> float:
+        if self.index + 1 < self.period or not self.deque:
+            return NAN
+        return self.sign * self.deque[0][1]
+
+
+class Lag(Node):
+    """Value ``period`` bars ago"""
+
+    def __init__(self, period: int):
+        self.window: Deque[float] = deque(maxlen=period + 1)
+        self._evicted: List[Optional[float]] = []
+
+    def update(self, x: float) -> float:
+        full = len(self.window) == self.window.maxlen
+        self._evicted = [self.window[0] if full else None]
+        self.window.append(x)
+        return self.window[0] if len(self.window) == self.window.maxlen else NAN
+
+    def rollback(self):
+        self.window.pop()
+        evicted = self._evicted.pop()
+        if evicted is not None:
+            self.window.appendleft(evicted)
+
+
+class RSI(Node):
+    """100 - 100 / (1 + mean(gain) / mean(loss)) over ``period`` bars"""
+
+    def __init__(self, period: int):
+        self.prev = Lag(1)
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+
+    def update(self, x: float) -> float:
+        delta = x - self.prev.update(x)
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-delta if delta < 0 else 0.0)
+        return _rsi(gain, loss)
+
+    def rollback(self):
+        self.loss.rollback()
+        self.gain.rollback()
+        self.prev.rollback()
+
+
+class TrueRange(Node):
+    """max(high - low, |high - prev close|, |low - prev close|)"""
+
+    def __init__(self):
+        self.prev_close = Lag(1)
+
+    def update(self, bar: Dict[str, float]) -> float:
+        high, low = bar['high'], bar['low']
+        pc = self.prev_close.update(bar['close'])
+        if math.isnan(pc):
+            return high - low
+        return max(high - low, abs(high - pc), abs(low - pc))
+
+    def rollback(self):
+        self.prev_close.rollback()
+
+
+class ATR(Node):
+    """Rolling mean of true range"""
+
+    def __init__(self, period: int):
+        self.tr = TrueRange()
+        self.mean = RollingMean(period)
+
+    def update(self, bar: Dict[str, float]) -> float:
+        return self.mean.update(self.tr.update(bar))
+
+    def rollback(self):
+        self.mean.rollback()
+        self.tr.rollback()
+
+
+class Expr(Node):
+    """Stateless derived value computed from the current bar's values"""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def update(self, values: Dict[Any, float]) -> Any:
+        return self.fn(values)
+
+    def rollback(self):
+        pass
+
+
+def expr(name: str, fn) -> Spec:
+    """Spec for a named derived series, e.g. ``expr('hl2', lambda v: (v['high'] + v['low']) / 2)``"""
+    return ('custom', name, lambda: Expr(fn))
+
+
+def _rsi(gain: float, loss: float) -> float:
+    if math.isnan(gain) or math.isnan(loss):
+        return NAN
+    if loss == 0:
+        return NAN if gain == 0 else 100.0
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+_FACTORIES = {
+    'sma': lambda p: RollingMean(p),
+    'std': lambda p: RollingStd(p),
+    'ema': lambda p: EMA(p, adjust=False),
+    'ema_adj': lambda p: EMA(p, adjust=True),
+    'max': lambda p: RollingExtreme(p, highest=True),
+    'min': lambda p: RollingExtreme(p, highest=False),
+    'lag': lambda p: Lag(p),
+    'rsi': lambda p: RSI(p),
+}
+
+
+class IndicatorGraph:
+    """
+    Shared incremental indicators for one symbol.
+
+    ``values`` and ``prev`` map each spec to its value on the latest and the
+    previous bar; ``bars`` counts bars seen.
+    """
+
+    def __init__(self, specs: Sequence[Spec] = ()):
+        self._order: List[Spec] = []
+        self._nodes: Dict[Spec, Node] = {}
+        self._custom: Dict[str, Spec] = {}
+        self.values: Dict[Any, float] = {}
+        self.prev: Dict[Any, float] = {}
+        self.bars = 0
+        for spec in specs:
+            self.require(spec)
+
+    def require(self, spec: Spec) -> Spec:
+        """Register an indicator (and its sources); shared if already present"""
+        spec = tuple(spec)
+        kind, source, period = spec
+        if kind == 'custom':
+            if source in self._custom:
+                return self._custom[source]
+            self._custom[source] = spec
+        if spec in self._nodes:
+            return spec
+        if isinstance(source, tuple):
+            self.require(source)
+        if kind == 'custom':
+            node = period()
+        elif kind == 'atr':
+            node = ATR(period)
+        elif kind in _FACTORIES:
+            node = _FACTORIES[kind](period)
+        else:
+            raise ValueError(f"Unknown indicator kind: {kind}")
+        self._nodes[spec] = node
+        self._order.append(spec)
+        return spec
+
+    def update(self, bar: Dict[str, float]):
+        """Apply a new bar"""
+        self.prev = self.values
+        self.values = self._apply(bar)
+        self.bars += 1
+
+    def revise(self, bar: Dict[str, float]):
+        """Replace the latest bar (live candle update)"""
+        for spec in reversed(self._order):
+            self._nodes[spec].rollback()
+        self.values = self._apply(bar)
+
+    def _apply(self, bar: Dict[str, float]) -> Dict[Any, float]:
+        values: Dict[Any, float] = dict(bar)
+        for spec in self._order:
+            kind, source, _ = spec
+            node = self._nodes[spec]
+            if kind == 'custom':
+                values[spec] = values[source] = node.update(values)
+            elif kind == 'atr':
+                values[spec] = node.update(bar)
+            else:
+                values[spec] = node.update(values[source])
+        return values
@@ -0,0 +1,174 @@
+"""
+Shared market-data fan-out for paper trading
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Tick:
+    """Latest price for a symbol, plus any bars that arrived with it"""
+    symbol: str
+    price: Decimal
+    timestamp: datetime
+    received: float  # time.perf_counter() when the update entered the feed
+    bars: List[Any] = field(default_factory=list)
+
+
+TickHandler = Callable[[Tick], Awaitable[None]]
+
+
+class MarketDataFeed:
+    """
+    One subscription per symbol, fanned out to every handler watching it.
+
+    Updates come in through ``publish`` (push sources such as websockets) or
+    from a per-symbol poller around ``fetch_price``. Each symbol has one
+    dispatcher task; if updates arrive faster than handlers finish, they are
+    conflated to the newest price (bars are kept, in order), so handlers never
+    work through a backlog of stale prices.
+    """
+
+    def __init__(
+        self,
+        fetch_price: Optional[Callable[[str], Awaitable[Optional[Decimal]]]] = None,
+        poll_interval: float = 5.0
+    ):
+        """
+        Args:
+            fetch_price: Async price source polled once per symbol (None: push only)
+            poll_interval: Seconds between polls of one symbol
+        """
+        self.fetch_price = fetch_price
+        self.poll_interval = poll_interval
+        self._handlers: Dict[str, List[TickHandler]] = defaultdict(list)
+        self._pending: Dict[str, Tick] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.running = False
+
+        self.stats = {
+            'fetches': 0,
+            'updates': 0,
+            'conflated': 0,
+            'dispatched': 0,
+            'handler_errors': 0
+        }
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._handlers)
+
+    def subscribe(self, symbol: str, handler: TickHandler):
+        """Call ``handler`` with every tick for ``symbol`` (before start())"""
+        self._handlers[symbol].append(handler)
+
+    async def start(self):
+        if self.running:
+            return
+        self.running = True
+        for symbol in self._handlers:
+            self._wakeups[symbol] = asyncio.Event()
+            self._tasks.append(asyncio.create_task(self._dispatch_loop(symbol)))
+            if self.fetch_price is not None:
+                self._tasks.append(asyncio.create_task(self._poll_loop(symbol)))
+        logger.info(f"Market data feed started for {len(self._handlers)} symbols")
+
+    async def stop(self):
+        self.running = False
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._wakeups.clear()
+        self._pending.clear()
+
+    def publish(self, symbol: str, price: Decimal, timestamp: Optional[datetime] = None,
+                bar: Optional[Any] = None):
+        """Queue an update for ``symbol``; returns immediately"""
+        if symbol not in self._wakeups:
+            return
+        self.stats['updates'] += 1
+
+        tick = Tick(symbol=symbol, price=price, timestamp=timestamp or datetime.now(),
+                    received=time.perf_counter())
+        pending = self._pending.get(symbol)
+        if pending is not None:
+            # Not dispatched yet: keep its bars and its arrival time for latency
+            self.stats['conflated'] += 1
+            tick.bars = pending.bars
+            tick.received = pending.received
+        if bar is not None:
+            tick.bars.append(bar)
+        self._pending[symbol] = tick
+        self._wakeups[symbol].set()
+
+    async def dispatch(self, tick: Tick):
+        """Hand one tick to every handler of its symbol"""
+        for handler in self._handlers.get(tick.symbol, []):
+            try:
+                await handler(tick)
+            except Exception as e:
+                self.stats['handler_errors'] += 1
+                logger.error(f"Tick handler failed for {tick.symbol}: {e}")
+        self.stats['dispatched'] += 1
+
+    async def _dispatch_loop(self, symbol: str):
+        wakeup = self._wakeups[symbol]
+        while self.running:
+            await wakeup.wait()
+            wakeup.clear()
+            tick = self._pending.pop(symbol, None)
+            if tick is not None:
+                await self.dispatch(tick)
+
+    async def _poll_loop(self, symbol: str):
+        while self.running:
+            try:
+                price = await self.fetch_price(symbol)
+                self.stats['fetches'] += 1
+                if price is not None:
+                    self.publish(symbol, price)
+            except Exception as e:
+                logger.error(f"Price poll failed for {symbol}: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+class LatencyTracker:
+    """Recent tick-to-decision latencies in milliseconds"""
+
+    def __init__(self, window: int = 1000):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, received: float):
+        self.samples.append((time.perf_counter() - received) * 1000)
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {'count': self.count, 'last_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0,
+                    'p99_ms': 0.0, 'max_ms': 0.0}
+        ordered = sorted(self.samples)
+
+        def pct(q: float) -> float:
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        return {
+            'count': self.count,
+            'last_ms': self.samples[-1],
+            'p50_ms': pct(0.50),
+            'p95_ms': pct(0.95),
+            'p99_ms': pct(0.99),
+            'max_ms': ordered[-1]
+        }
@@ -13,6 +13,7 @@
 from concurrent.futures import ThreadPoolExecutor
 import threading
 
+from src.paper.market_feed import LatencyTracker, MarketDataFeed, Tick
 from src.paper.signal_hub import SignalHub
 from src.risk.engine import RiskEngine
 from src.reports.paper_report import PaperTradingReport
@@ -54,6 +55,14 @@ def __init__(self):
         # Strategy configurations from optimization results
         self.strategy_configs = self._load_strategy_configs()
         
+        # K-factor ramping
+        self.start_date = date.today()
+        self.k_factor_schedule = {
+            0: Decimal('0.25'),  # Day 1
+            1: Decimal('0.50'),  # Day 2  
+            2: Decimal('1.00')   # Day 3+
+        }
+        
         # Per-strategy ledgers
         self.ledgers: Dict[str, StrategyLedger] = {}
         
@@ -64,13 +73,17 @@ def __init__(self):
         self.signal_hub = SignalHub()
         self.risk_engine = RiskEngine()
         
-        # K-factor ramping
-        self.start_date = date.today()
-        self.k_factor_schedule = {
-            0: Decimal('0.25'),  # Day 1
-            1: Decimal('0.50'),  # Day 2  
-            2: Decimal('1.00')   # Day 3+
-        }
+        # One market-data subscription per symbol, fanned out to all its strategies
+        self.strategies_by_symbol: Dict[str, List[str]] = {}
+        for strategy_key, config in self.strategy_configs.items():
+            self.strategies_by_symbol.setdefault(config['symbol'], []).append(strategy_key)
+        self.market_feed = MarketDataFeed(
+            self._get_current_price,
+            poll_interval=float(os.getenv('PAPER_POLL_SECONDS', '5'))
+        )
+        for symbol in self.strategies_by_symbol:
+            self.market_feed.subscribe(symbol, self._on_tick)
+        self.latency = LatencyTracker()
         
         # Auto-gates
         self.gate_violations: Dict[str, List[str]] = {}
@@ -175,10 +188,8 @@ async def start(self):
         # Initialize components
         await self.signal_hub.initialize()
         
-        # Start tasks for each strategy
-        for strategy_key in self.ledgers.keys():
-            task = asyncio.create_task(self._strategy_runner(strategy_key))
-            self.tasks.append(task)
+        # Strategies run on market-data events
+        await self.market_feed.start()
         
         # Start monitoring tasks
         self.tasks.append(asyncio.create_task(self._k_factor_ramp_monitor()))
@@ -190,6 +201,7 @@ async def start(self):
     async def stop(self):
         """Stop all runners"""
         self.running = False
+        await self.market_feed.stop()
         
         # Cancel all tasks
         for task in self.tasks:
@@ -202,44 +214,44 @@ async def stop(self):
         self.tasks.clear()
         logger.info("Parallel paper trading stopped")
     
-    async def _strategy_runner(self, strategy_key: str):
-        """Run individual strategy"""
-        config = self.strategy_configs[strategy_key]
-        ledger = self.ledgers[strategy_key]
+    async def _on_tick(self, tick: Tick):
+        """Evaluate every strategy on the tick's symbol in one batch"""
+        if not self.running or self.kill_switch_active:
+            return
         
-        logger.info(f"Starting runner for {strategy_key}")
+        strategy_keys = [key for key in self.strategies_by_symbol.get(tick.symbol, [])
+                         if self.ledgers[key].running]
+        if not strategy_keys:
+            return
+        
+        # Bars first so the signal reflects them; the fused signal is computed once per symbol
+        for bar in tick.bars:
+            self.signal_hub.append_bar(tick.symbol, bar)
+        signal = self._get_symbol_signal(tick.symbol, tick.price)
+        k_factor = self._get_current_k_factor()
+        now = datetime.now()
         
-        while self.running and ledger.running and not self.kill_switch_active:
+        for strategy_key in strategy_keys:
+            ledger = self.ledgers[strategy_key]
             try:
                 # Update K-factor
-                ledger.k_factor = self._get_current_k_factor()
-                
-                # Get signal for this strategy's symbol
-                symbol = config['symbol']
-                current_price = await self._get_current_price(symbol)
-                
-                if current_price is None:
-                    await asyncio.sleep(10)
-                    continue
+                ledger.k_factor = k_factor
                 
-                # Get signal from strategy
-                signal = await self._get_strategy_signal(config, symbol, current_price)
-                
-                if signal and signal.get('strength', 0) > 0.1:
-                    await self._process_strategy_signal(strategy_key, signal, current_price)
+                strategy_signal = self._strategy_signal(self.strategy_configs[strategy_key], signal)
+                if strategy_signal and strategy_signal.get('strength', 0) > 0.1:
+                    await self._process_strategy_signal(strategy_key, strategy_signal, tick.price)
                 
                 # Update positions and P&L
-                await self._update_strategy_pnl(strategy_key, current_price)
+                await self._update_strategy_pnl(strategy_key, tick.price)
                 
                 # Check exit conditions
-                await self._check_strategy_exits(strategy_key, current_price)
-                
-                ledger.last_update = datetime.now()
-                await asyncio.sleep(15)  # 15 second cycle
+                await self._check_strategy_exits(strategy_key, tick.price)
                 
+                ledger.last_update = now
             except Exception as e:
                 logger.error(f"Error in strategy runner {strategy_key}: {e}")
-                await asyncio.sleep(30)
+        
+        self.latency.record(tick.received)
     
     async def _get_current_price(self, symbol: str) -> Optional[Decimal]:
         """Get current market price"""
@@ -263,23 +275,24 @@ async def _get_current_price(self, symbol: str) -> Optional[Decimal]:
             logger.error(f"Failed to get price for {symbol}: {e}")
             return None
     
-    async def _get_strategy_signal(self, config: Dict[str, Any], symbol: str, current_price: Decimal) -> Optional[Dict[str, Any]]:
-        """Get signal from specific strategy"""
+    def _get_symbol_signal(self, symbol: str, current_price: Decimal) -> Optional[Dict[str, Any]]:
+        """Fused signal for a symbol (shared by all its strategies)"""
         try:
-            # Get signal from signal hub (would be filtered by strategy)
-            signal = self.signal_hub.get_signal(symbol, current_price)
-            
-            if signal:
-                # Filter by strategy name if needed
-                strategy_name = config['strategy_name']
-                if signal.get('strategy') == strategy_name or signal.get('strategies'):
-                    return signal
-            
-            return None
+            return self.signal_hub.get_signal(symbol, current_price)
         except Exception as e:
-            logger.error(f"Failed to get signal for {config['strategy_name']}/{symbol}: {e}")
+            logger.error(f"Failed to get signal for {symbol}: {e}")
             return None
     
+    def _strategy_signal(self, config: Dict[str, Any], signal: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The symbol signal if it applies to this strategy"""
+        if signal:
+            # Filter by strategy name if needed
+            strategy_name = config['strategy_name']
+            if signal.get('strategy') == strategy_name or signal.get('strategies'):
+                return signal
+        
+        return None
+    
     async def _process_strategy_signal(self, strategy_key: str, signal: Dict[str, Any], current_price: Decimal):
         """Process trading signal for strategy"""
         config = self.strategy_configs[strategy_key]
@@ -613,6 +626,11 @@ def get_combined_state(self) -> Dict[str, Any]:
             'kill_switch_active': self.kill_switch_active,
             'running': self.running,
             'gate_violations': len(self.gate_violations),
+            'market_data': {
+                'symbols': len(self.strategies_by_symbol),
+                **self.market_feed.stats
+            },
+            'tick_to_decision': self.latency.summary(),
             'strategy_breakdown': {
                 key: asdict(ledger) for key, ledger in self.ledgers.items()
             }
@@ -3,14 +3,19 @@
 """
 
 import os
+import random
 import logging
-from typing import Dict, Any, List, Optional
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Deque, Dict, Any, List, Optional, Sequence, Union
 from decimal import Decimal
 from datetime import datetime
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
+from src.paper.indicator_graph import NAN, BarRing, IndicatorGraph, Spec
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,12 +31,32 @@ class Signal:
     metadata: Dict[str, Any]
 
 
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
 class SignalHub:
     """Signal aggregation and fusion hub"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        clock: Optional[Callable[[], datetime]] = None,
+        seed: Optional[int] = None,
+        max_bars: int = 500,
+        signal_cache_size: int = 100
+    ):
+        """
+        Args:
+            clock: Time source for signal timestamps and session filters
+                (replay passes the bar clock so runs are reproducible)
+            seed: Seed for the ML signal RNG
+            max_bars: Bars of history kept per symbol (ring buffer capacity)
+            signal_cache_size: Fused signals kept per symbol
+        """
         self.ml_enabled = os.getenv('ML_PREDICTOR_ENABLED', 'false').lower() == 'true'
         self.ml_weight = 0.5  # Weight for ML contribution
+        self.clock = clock or datetime.now
+        self.rng = random.Random(seed)
+        self.max_bars = max_bars
         
         # Import new strategies
         from src.strategies.donchian_breakout import DonchianBreakoutStrategy
@@ -47,12 +72,21 @@ def __init__(self):
             'supertrend': SuperTrendStrategy(),
             'bollinger_revert': BollingerRevertStrategy()
         }
+        for strategy in self.strategies.values():
+            strategy.clock = self.clock
+        
+        # Strategies read the shared indicator graph in on_bar()
+        self._specs: List[Spec] = []
+        for strategy in self.strategies.values():
+            self._specs.extend(strategy.indicator_specs())
         
-        # OHLCV data storage
-        self.ohlcv_data: Dict[str, pd.DataFrame] = {}
+        # Per-symbol OHLCV ring buffer and indicator graph
+        self._rings: Dict[str, BarRing] = {}
+        self.graphs: Dict[str, IndicatorGraph] = {}
         
         # Signal cache
-        self.signal_cache: Dict[str, List[Signal]] = {}
+        self.signal_cache_size = signal_cache_size
+        self.signal_cache: Dict[str, Deque[Signal]] = {}
         
     async def initialize(self):
         """Initialize signal hub"""
@@ -60,26 +94,73 @@ async def initialize(self):
         
         # Initialize strategies
         for name, strategy in self.strategies.items():
-            strategy.initialize()
+            if hasattr(strategy, 'initialize'):
+                strategy.initialize()
             
         logger.info(f"Signal hub initialized with {len(self.strategies)} strategies")
     
     def update_ohlcv(self, symbol: str, ohlcv: List):
-        """Update OHLCV data for symbol"""
-        # Convert to DataFrame
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        
-        self.ohlcv_data[symbol] = df
+        """Replace OHLCV history for symbol"""
+        self._rings.pop(symbol, None)
+        self.graphs.pop(symbol, None)
+        for bar in ohlcv:
+            self._ingest(symbol, bar)
+    
+    def append_bar(self, symbol: str, bar: Union[Sequence, Dict[str, Any]]) -> bool:
+        """
+        Append one [timestamp_ms, open, high, low, close, volume] bar.
+        
+        A bar with the same timestamp as the last one revises it (live candle);
+        older bars are ignored. Returns True if the bar was applied.
+        """
+        return self._ingest(symbol, bar)
+    
+    def _ingest(self, symbol: str, bar: Union[Sequence, Dict[str, Any]]) -> bool:
+        """Update ring buffer and indicator graph with one bar (O(1))"""
+        if isinstance(bar, dict):
+            bar = [bar[column] for column in OHLCV_COLUMNS]
+        values = {'timestamp': _timestamp_ms(bar[0])}
+        values.update(zip(OHLCV_COLUMNS[1:], (NAN if v is None else float(v) for v in bar[1:])))
+        
+        ring = self._rings.get(symbol)
+        if ring is None:
+            ring = self._rings[symbol] = BarRing(self.max_bars, len(OHLCV_COLUMNS))
+            self.graphs[symbol] = IndicatorGraph(self._specs)
+        graph = self.graphs[symbol]
+        
+        last_ts = ring.last()[0] if ring.count else None
+        if last_ts is not None and values['timestamp'] < last_ts:
+            return False
+        revise = values['timestamp'] == last_ts
+        if revise:
+            graph.revise(values)
+        else:
+            graph.update(values)
+        
+        row = [values[c] for c in OHLCV_COLUMNS]
+        if revise:
+            ring.replace_last(row)
+        else:
+            ring.append(row)
         
-        # Update strategies with new data
         for strategy in self.strategies.values():
-            strategy.update_data(symbol, df)
+            strategy.on_bar(symbol, graph)
+        return True
+    
+    def get_ohlcv(self, symbol: str, bars: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """Newest ``bars`` bars (all kept by default) as a timestamp-indexed DataFrame"""
+        ring = self._rings.get(symbol)
+        if ring is None:
+            return None
+        
+        df = pd.DataFrame(ring.to_array(bars), columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype('int64'), unit='ms')
+        df.set_index('timestamp', inplace=True)
+        return df
     
     def get_signal(self, symbol: str, current_price: Decimal) -> Dict[str, Any]:
         """Get fused signal for symbol"""
-        if symbol not in self.ohlcv_data:
+        if symbol not in self._rings:
             return {'symbol': symbol, 'strength': 0, 'confidence': 0}
         
         # Collect signals from all strategies
@@ -87,7 +168,7 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Dict[str, Any]:
         
         for name, strategy in self.strategies.items():
             try:
-                signal = strategy.get_signal(symbol, current_price)
+                signal = self._as_signal(symbol, name, strategy.get_signal(symbol, current_price))
                 if signal:
                     signals.append(signal)
             except Exception as e:
@@ -107,10 +188,10 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Dict[str, Any]:
         
         # Cache signal
         if symbol not in self.signal_cache:
-            self.signal_cache[symbol] = []
+            self.signal_cache[symbol] = deque(maxlen=self.signal_cache_size)
         self.signal_cache[symbol].append(Signal(
             symbol=symbol,
-            timestamp=datetime.now(),
+            timestamp=self.clock(),
             strategy='fusion',
             direction=int(np.sign(fused_signal['strength'])),
             strength=abs(fused_signal['strength']),
@@ -120,6 +201,22 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Dict[str, Any]:
         
         return fused_signal
     
+    def _as_signal(self, symbol: str, name: str, raw: Any) -> Optional[Signal]:
+        """Normalize dict signals from src.strategies into Signal objects"""
+        if not raw or isinstance(raw, Signal):
+            return raw or None
+        if not raw.get('direction'):
+            return None
+        return Signal(
+            symbol=symbol,
+            timestamp=self.clock(),
+            strategy=raw.get('strategy', name),
+            direction=int(raw['direction']),
+            strength=float(raw.get('strength', 0.0)),
+            confidence=float(raw.get('confidence', 0.0)),
+            metadata=raw.get('metadata', {})
+        )
+    
     def _fuse_signals(self, signals: List[Signal]) -> Dict[str, Any]:
         """Fuse multiple signals using majority vote with confidence weighting"""
         if not signals:
@@ -165,14 +262,13 @@ def _get_ml_signal(self, symbol: str, current_price: Decimal) -> Optional[Signal
             # In production, this would call the ML predictor service
             
             # Simulate ML prediction
-            import random
-            direction = random.choice([-1, 0, 1])
-            probability = random.uniform(0.4, 0.8)
+            direction = self.rng.choice([-1, 0, 1])
+            probability = self.rng.uniform(0.4, 0.8)
             
             if probability > 0.6:  # Only use high confidence predictions
                 return Signal(
                     symbol=symbol,
-                    timestamp=datetime.now(),
+                    timestamp=self.clock(),
                     strategy='ml_predictor',
                     direction=direction,
                     strength=probability,
@@ -203,29 +299,67 @@ def _apply_ml_weight(self, fused_signal: Dict[str, Any], ml_signal: Signal) -> D
         return fused_signal
 
 
-class BaseStrategy:
-    """Base strategy class"""
+def _timestamp_ms(value: Any) -> float:
+    """Epoch milliseconds from a number or anything pandas reads as a timestamp"""
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    return float(pd.Timestamp(value).value // 1_000_000)
+
+
+def _ratio(num: float, den: float) -> float:
+    return num / den if den else NAN
+
+
+class BaseStrategy(ABC):
+    """
+    Base strategy class.
+    
+    Strategies run either incrementally (``on_bar`` reads the hub's shared
+    indicator graph) or from a DataFrame (``update_data``). Both paths leave
+    the values ``get_signal`` needs in ``self.state[symbol]``.
+    """
     
     def __init__(self):
         self.data: Dict[str, pd.DataFrame] = {}
         self.indicators: Dict[str, pd.DataFrame] = {}
+        self.state: Dict[str, Dict[str, float]] = {}
+        self.clock: Callable[[], datetime] = datetime.now
         
     def initialize(self):
         """Initialize strategy"""
         pass
     
+    def indicator_specs(self) -> List[Spec]:
+        """Shared indicators this strategy reads in on_bar"""
+        return []
+    
+    @abstractmethod
+    def on_bar(self, symbol: str, graph: IndicatorGraph):
+        """Refresh state from the shared indicator graph"""
+        pass
+    
     def update_data(self, symbol: str, df: pd.DataFrame):
         """Update data for symbol"""
         self.data[symbol] = df
         self._calculate_indicators(symbol)
     
+    @abstractmethod
     def _calculate_indicators(self, symbol: str):
         """Calculate strategy indicators"""
-        raise NotImplementedError
+        pass
     
+    @abstractmethod
     def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Signal]:
         """Get strategy signal"""
-        raise NotImplementedError
+        pass
+
+
+def _cross_direction(fast: float, slow: float) -> int:
+    if fast > slow:
+        return 1
+    if fast < slow:
+        return -1
+    return 0
 
 
 class SMACrossStrategy(BaseStrategy):
@@ -236,6 +370,19 @@ def __init__(self):
         self.fast_period = 20
         self.slow_period = 50
     
+    def indicator_specs(self) -> List[Spec]:
+        return [('sma', 'close', self.fast_period), ('sma', 'close', self.slow_period)]
+    
+    def on_bar(self, symbol: str, graph: IndicatorGraph):
+        fast, slow = self.indicator_specs()
+        self.state[symbol] = {
+            'bars': graph.bars,
+            'sma_fast': graph.values[fast],
+            'sma_slow': graph.values[slow],
+            'signal': _cross_direction(graph.values[fast], graph.values[slow]),
+            'prev_signal': _cross_direction(graph.prev.get(fast, NAN), graph.prev.get(slow, NAN))
+        }
+    
     def _calculate_indicators(self, symbol: str):
         """Calculate SMA indicators"""
         if symbol not in self.data:
@@ -253,32 +400,35 @@ def _calculate_indicators(self, symbol: str):
         df.loc[df['sma_fast'] < df['sma_slow'], 'signal'] = -1
         
         self.indicators[symbol] = df
+        self.state[symbol] = {
+            'bars': len(df),
+            'sma_fast': df['sma_fast'].iloc[-1],
+            'sma_slow': df['sma_slow'].iloc[-1],
+            'signal': df['signal'].iloc[-1],
+            'prev_signal': df['signal'].iloc[-2] if len(df) > 1 else 0
+        }
     
     def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Signal]:
         """Get SMA crossover signal"""
-        if symbol not in self.indicators:
-            return None
-        
-        df = self.indicators[symbol]
-        
-        if len(df) < self.slow_period:
+        state = self.state.get(symbol)
+        if state is None or state['bars'] < self.slow_period:
             return None
         
         # Get latest signal
-        latest_signal = df['signal'].iloc[-1]
-        prev_signal = df['signal'].iloc[-2] if len(df) > 1 else 0
+        latest_signal = state['signal']
+        prev_signal = state['prev_signal']
         
         # Check for crossover
         if latest_signal != prev_signal and latest_signal != 0:
             # Calculate confidence based on separation
-            sma_fast = df['sma_fast'].iloc[-1]
-            sma_slow = df['sma_slow'].iloc[-1]
+            sma_fast = state['sma_fast']
+            sma_slow = state['sma_slow']
             separation = abs(sma_fast - sma_slow) / sma_slow
             confidence = min(1.0, separation * 100)  # Scale separation to confidence
             
             return Signal(
                 symbol=symbol,
-                timestamp=datetime.now(),
+                timestamp=self.clock(),
                 strategy='sma_cross',
                 direction=int(latest_signal),
                 strength=confidence,
@@ -301,6 +451,17 @@ def __init__(self):
         self.ema_period = 21
         self.breakout_threshold = 0.02  # 2% breakout
     
+    def indicator_specs(self) -> List[Spec]:
+        return [('ema', 'close', self.ema_period)]
+    
+    def on_bar(self, symbol: str, graph: IndicatorGraph):
+        ema = graph.values[self.indicator_specs()[0]]
+        self.state[symbol] = {
+            'bars': graph.bars,
+            'ema': ema,
+            'breakout': _ratio(graph.values['close'] - ema, ema)
+        }
+    
     def _calculate_indicators(self, symbol: str):
         """Calculate EMA indicators"""
         if symbol not in self.data:
@@ -315,19 +476,20 @@ def _calculate_indicators(self, symbol: str):
         df['breakout'] = (df['close'] - df['ema']) / df['ema']
         
         self.indicators[symbol] = df
+        self.state[symbol] = {
+            'bars': len(df),
+            'ema': df['ema'].iloc[-1],
+            'breakout': df['breakout'].iloc[-1]
+        }
     
     def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Signal]:
         """Get EMA breakout signal"""
-        if symbol not in self.indicators:
-            return None
-        
-        df = self.indicators[symbol]
-        
-        if len(df) < self.ema_period:
+        state = self.state.get(symbol)
+        if state is None or state['bars'] < self.ema_period:
             return None
         
         # Check for breakout
-        breakout = df['breakout'].iloc[-1]
+        breakout = state['breakout']
         
         if abs(breakout) > self.breakout_threshold:
             direction = 1 if breakout > 0 else -1
@@ -335,13 +497,13 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Signal]:
             
             return Signal(
                 symbol=symbol,
-                timestamp=datetime.now(),
+                timestamp=self.clock(),
                 strategy='ema_breakout',
                 direction=direction,
                 strength=strength,
                 confidence=strength * 0.8,  # Slightly lower confidence
                 metadata={
-                    'ema': float(df['ema'].iloc[-1]),
+                    'ema': float(state['ema']),
                     'breakout_pct': float(breakout * 100)
                 }
             )
@@ -358,6 +520,18 @@ def __init__(self):
         self.oversold = 30
         self.overbought = 70
     
+    def indicator_specs(self) -> List[Spec]:
+        return [('rsi', 'close', self.rsi_period)]
+    
+    def on_bar(self, symbol: str, graph: IndicatorGraph):
+        spec = self.indicator_specs()[0]
+        rsi = graph.values[spec]
+        self.state[symbol] = {
+            'bars': graph.bars,
+            'rsi': rsi,
+            'prev_rsi': graph.prev[spec] if graph.bars > 1 else rsi
+        }
+    
     def _calculate_indicators(self, symbol: str):
         """Calculate RSI indicators"""
         if symbol not in self.data:
@@ -374,19 +548,20 @@ def _calculate_indicators(self, symbol: str):
         df['rsi'] = 100 - (100 / (1 + rs))
         
         self.indicators[symbol] = df
+        self.state[symbol] = {
+            'bars': len(df),
+            'rsi': df['rsi'].iloc[-1],
+            'prev_rsi': df['rsi'].iloc[-2] if len(df) > 1 else df['rsi'].iloc[-1]
+        }
     
     def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Signal]:
         """Get RSI mean reversion signal"""
-        if symbol not in self.indicators:
-            return None
-        
-        df = self.indicators[symbol]
-        
-        if len(df) < self.rsi_period:
+        state = self.state.get(symbol)
+        if state is None or state['bars'] < self.rsi_period:
             return None
         
-        rsi = df['rsi'].iloc[-1]
-        prev_rsi = df['rsi'].iloc[-2] if len(df) > 1 else rsi
+        rsi = state['rsi']
+        prev_rsi = state['prev_rsi']
         
         # Check for oversold/overbought conditions
         if rsi < self.oversold and prev_rsi >= self.oversold:
@@ -395,7 +570,7 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Signal]:
             
             return Signal(
                 symbol=symbol,
-                timestamp=datetime.now(),
+                timestamp=self.clock(),
                 strategy='rsi_mean_reversion',
                 direction=1,
                 strength=strength,
@@ -412,7 +587,7 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Signal]:
             
             return Signal(
                 symbol=symbol,
-                timestamp=datetime.now(),
+                timestamp=self.clock(),
                 strategy='rsi_mean_reversion',
                 direction=-1,
                 strength=strength,
@@ -423,4 +598,4 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Signal]:
                 }
             )
         
-        return None
\ No newline at end of file
+        return None
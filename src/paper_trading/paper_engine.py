@@ -11,14 +11,18 @@
 
 import asyncio
 import json
+import os
 import time
 import logging
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
+from .trade_ledger import TradeLedger
+
 # Setup paper trading logger
 paper_logger = logging.getLogger('paper_trading')
 
@@ -122,14 +126,23 @@ def __init__(self, initial_balance: float = 10000.0):
         self.positions: Dict[str, PaperPosition] = {}
         self.orders: Dict[str, PaperOrder] = {}
         self.order_history: List[PaperOrder] = []
-        self.trade_history: List[Dict] = []
         self.market_prices: Dict[str, float] = {}
         self.fee_rate = 0.001  # 0.1% trading fee
         
-        # Performance tracking
-        self.balance_history: List[float] = [initial_balance]
+        # Performance tracking: columnar fills with running metric accumulators
+        self.ledger = TradeLedger(initial_balance)
         self.equity_curve: List[Dict] = []
         
+    @property
+    def trade_history(self) -> List[Dict]:
+        """All fills as dicts (built from the ledger on demand)."""
+        return self.ledger.records()
+        
+    @property
+    def balance_history(self) -> List[float]:
+        """Equity after each fill, starting from the initial balance."""
+        return [self.account.initial_balance] + self.ledger.column("equity").tolist()
+        
     async def place_order(
         self,
         symbol: str,
@@ -217,13 +230,13 @@ async def _execute_market_order(self, order: PaperOrder) -> None:
         )
         
         # Update position
-        await self._update_position(order)
+        pnl = await self._update_position(order)
         
         # Update account
         await self._update_account(order)
         
         # Record trade
-        self._record_trade(order)
+        self._record_trade(order, pnl)
         
     async def _monitor_limit_order(self, order: PaperOrder) -> None:
         """Monitor limit order for execution."""
@@ -243,15 +256,15 @@ async def _monitor_limit_order(self, order: PaperOrder) -> None:
                 order.status = PaperOrderStatus.FILLED
                 order.filled_at = datetime.utcnow()
                 
-                await self._update_position(order)
+                pnl = await self._update_position(order)
                 await self._update_account(order)
-                self._record_trade(order)
+                self._record_trade(order, pnl)
                 break
                 
             await asyncio.sleep(1)  # Check every second
             
-    async def _update_position(self, order: PaperOrder) -> None:
-        """Update position after order execution."""
+    async def _update_position(self, order: PaperOrder) -> Optional[float]:
+        """Update position after order execution; returns the realized P&L of a sell."""
         if order.side == "buy":
             # Open or add to position
             if order.symbol in self.positions:
@@ -291,6 +304,10 @@ async def _update_position(self, order: PaperOrder) -> None:
                     position.closed_at = datetime.utcnow()
                     del self.positions[order.symbol]
                     
+                return pnl
+                
+        return None
+                    
     async def _update_account(self, order: PaperOrder) -> None:
         """Update account after order execution."""
         order_value = order.filled_quantity * order.average_price
@@ -308,19 +325,24 @@ async def _update_account(self, order: PaperOrder) -> None:
         # Update trade count
         self.account.total_trades += 1
         
-    def _record_trade(self, order: PaperOrder) -> None:
+    def _record_trade(self, order: PaperOrder, pnl: Optional[float] = None) -> None:
         """Record trade for history."""
-        trade = {
-            "id": order.id,
-            "symbol": order.symbol,
-            "side": order.side,
-            "quantity": order.filled_quantity,
-            "price": order.average_price,
-            "value": order.filled_quantity * order.average_price,
-            "fee": order.filled_quantity * order.average_price * self.fee_rate,
-            "timestamp": order.filled_at
-        }
-        self.trade_history.append(trade)
+        equity = self.account.current_balance + sum(
+            pos.quantity * pos.current_price for pos in self.positions.values()
+        )
+        self.ledger.append(
+            order.id,
+            order.symbol,
+            order.side,
+            order.filled_quantity,
+            order.average_price,
+            order.filled_quantity * order.average_price * self.fee_rate,
+            pnl,
+            equity,
+            order.filled_at
+        )
+        self.account.winning_trades = self.ledger.winning_trades
+        self.account.losing_trades = self.ledger.losing_trades
         self.order_history.append(order)
         
     async def cancel_order(self, order_id: str) -> bool:
@@ -367,8 +389,15 @@ def update_market_price(self, symbol: str, price: float) -> None:
             position.unrealized_pnl = (price - position.entry_price) * position.quantity
             
     def calculate_metrics(self) -> TradingMetrics:
-        """Calculate trading performance metrics."""
-        if not self.trade_history:
+        """
+        Calculate trading performance metrics.
+        
+        Read from the ledger's running accumulators, so the cost does not grow
+        with the trade history. A closed trade is a sell with its realized P&L
+        against the average entry price; Sharpe and drawdown use the equity
+        after each fill.
+        """
+        if not len(self.ledger):
             return TradingMetrics(
                 total_return=0.0,
                 sharpe_ratio=0.0,
@@ -386,78 +415,7 @@ def calculate_metrics(self) -> TradingMetrics:
         total_return = ((self.account.current_balance - self.account.initial_balance) / 
                        self.account.initial_balance * 100)
         
-        # Calculate win rate
-        winning_trades = 0
-        losing_trades = 0
-        total_wins = 0.0
-        total_losses = 0.0
-        best_trade = 0.0
-        worst_trade = 0.0
-        
-        for i in range(0, len(self.order_history), 2):  # Pairs of buy/sell
-            if i + 1 < len(self.order_history):
-                buy_order = self.order_history[i]
-                sell_order = self.order_history[i + 1]
-                
-                if buy_order.side == "buy" and sell_order.side == "sell":
-                    pnl = (sell_order.average_price - buy_order.average_price) * buy_order.filled_quantity
-                    
-                    if pnl > 0:
-                        winning_trades += 1
-                        total_wins += pnl
-                    else:
-                        losing_trades += 1
-                        total_losses += abs(pnl)
-                        
-                    best_trade = max(best_trade, pnl)
-                    worst_trade = min(worst_trade, pnl)
-                    
-        win_rate = winning_trades / (winning_trades + losing_trades) * 100 if (winning_trades + losing_trades) > 0 else 0
-        
-        # Calculate profit factor
-        profit_factor = total_wins / total_losses if total_losses > 0 else 0
-        
-        # Calculate average win/loss
-        avg_win = total_wins / winning_trades if winning_trades > 0 else 0
-        avg_loss = total_losses / losing_trades if losing_trades > 0 else 0
-        
-        # Calculate Sharpe ratio (simplified)
-        returns = []
-        for i in range(1, len(self.balance_history)):
-            daily_return = (self.balance_history[i] - self.balance_history[i-1]) / self.balance_history[i-1]
-            returns.append(daily_return)
-            
-        if returns:
-            avg_return = sum(returns) / len(returns)
-            std_return = (sum((r - avg_return) ** 2 for r in returns) / len(returns)) ** 0.5
-            sharpe_ratio = (avg_return / std_return * (252 ** 0.5)) if std_return > 0 else 0
-        else:
-            sharpe_ratio = 0.0
-            
-        # Calculate max drawdown
-        max_drawdown = 0.0
-        peak = self.account.initial_balance
-        for balance in self.balance_history:
-            if balance > peak:
-                peak = balance
-            drawdown = (peak - balance) / peak * 100
-            max_drawdown = max(max_drawdown, drawdown)
-            
-        # Calculate total fees
-        total_fees = sum(trade["fee"] for trade in self.trade_history)
-        
-        return TradingMetrics(
-            total_return=total_return,
-            sharpe_ratio=sharpe_ratio,
-            max_drawdown=max_drawdown,
-            win_rate=win_rate,
-            profit_factor=profit_factor,
-            avg_win=avg_win,
-            avg_loss=avg_loss,
-            best_trade=best_trade,
-            worst_trade=worst_trade,
-            total_fees=total_fees
-        )
+        return TradingMetrics(total_return=total_return, **self.ledger.metrics())
         
     def get_account_summary(self) -> Dict:
         """Get account summary."""
@@ -484,27 +442,67 @@ def get_account_summary(self) -> Dict:
         }
         
     def save_state(self, filepath: str) -> None:
-        """Save engine state to file."""
+        """
+        Save engine state to file.
+        
+        The account, positions, open orders and prices go to ``filepath``;
+        fills are appended to a ``.fills.jsonl`` file next to it, writing only
+        the ones added since the last save.
+        """
+        fills_path = _fills_path(filepath)
+        self.ledger.persist(fills_path)
+        
         state = {
             "account": self.account.dict(),
             "positions": {k: v.dict() for k, v in self.positions.items()},
-            "orders": {k: v.dict() for k, v in self.orders.items()},
-            "trade_history": self.trade_history,
-            "balance_history": self.balance_history,
+            "orders": {k: v.dict() for k, v in self.orders.items()
+                       if v.status in (PaperOrderStatus.PENDING, PaperOrderStatus.PARTIAL)},
+            "fills_file": fills_path.name,
+            "fills": len(self.ledger),
             "market_prices": self.market_prices
         }
         
-        with open(filepath, "w") as f:
+        # Replace atomically so a crash never leaves a half-written snapshot
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, "w") as f:
             json.dump(state, f, indent=2, default=str)
+        os.replace(tmp_path, filepath)
             
     def load_state(self, filepath: str) -> None:
-        """Load engine state from file."""
+        """
+        Load engine state from file.
+        
+        Only the first ``state["fills"]`` fills are replayed: a crash between
+        the fills write and the snapshot leaves fills on disk that the saved
+        account does not include.
+        """
         with open(filepath, "r") as f:
             state = json.load(f)
             
         self.account = PaperAccount(**state["account"])
         self.positions = {k: PaperPosition(**v) for k, v in state["positions"].items()}
         self.orders = {k: PaperOrder(**v) for k, v in state["orders"].items()}
-        self.trade_history = state["trade_history"]
-        self.balance_history = state["balance_history"]
-        self.market_prices = state["market_prices"]
\ No newline at end of file
+        self.market_prices = state["market_prices"]
+        
+        fills_path = Path(filepath).parent / state.get("fills_file", _fills_path(filepath).name)
+        if fills_path.exists():
+            # Fills are written before the snapshot; drop any the snapshot's account never saw
+            self.ledger = TradeLedger.load(fills_path, self.account.initial_balance, limit=state.get("fills"))
+        else:
+            # Snapshot written before fills had their own file
+            self.ledger = TradeLedger(self.account.initial_balance)
+            for trade in state.get("trade_history", []):
+                self.ledger.append(
+                    trade["id"], trade["symbol"], trade["side"], trade["quantity"],
+                    trade["price"], trade["fee"], None, self.ledger.last_equity,
+                    datetime.fromisoformat(trade["timestamp"]) if trade.get("timestamp") else None
+                )
+                
+    def export_trades_parquet(self, filepath: str) -> None:
+        """Export the full fill history to Parquet (requires pyarrow)."""
+        self.ledger.export_parquet(filepath)
+
+
+def _fills_path(filepath: str) -> Path:
+    path = Path(filepath)
+    return path.with_name(path.stem + ".fills.jsonl")
@@ -0,0 +1,266 @@
+"""
+Trade Ledger - Columnar, append-only record of paper fills
+
+Fills are stored in a growable NumPy structured array (one column per field)
+and every performance figure the dashboard asks for is kept as a running
+accumulator, so reading metrics costs the same after ten fills or ten million.
+"""
+
+import json
+import math
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+FILL_DTYPE = np.dtype([
+    ("ts", "f8"),        # fill time, epoch seconds (UTC)
+    ("symbol", "i4"),    # index into TradeLedger.symbols
+    ("side", "i1"),      # +1 buy, -1 sell
+    ("quantity", "f8"),
+    ("price", "f8"),
+    ("fee", "f8"),
+    ("pnl", "f8"),       # realized P&L of a sell, NaN for buys
+    ("equity", "f8"),    # cash plus marked-to-market positions after the fill
+])
+
+SIDES = {"buy": 1, "sell": -1}
+SIDE_NAMES = {1: "buy", -1: "sell"}
+
+
+class TradeLedger:
+    """
+    Append-only fill ledger with O(1) metrics.
+
+    Closed trades are sells with a realized P&L. Returns are taken between
+    consecutive equity samples (one per fill); their mean and variance are
+    tracked with Welford's update, and drawdown against a running high-water
+    mark.
+    """
+
+    def __init__(self, initial_equity: float, capacity: int = 1024):
+        self.initial_equity = initial_equity
+        self._rows = np.empty(capacity, dtype=FILL_DTYPE)
+        self._size = 0
+        self.ids: List[str] = []
+        self.symbols: List[str] = []
+        self._symbol_codes: Dict[str, int] = {}
+
+        # Running accumulators
+        self.total_fees = 0.0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.total_wins = 0.0
+        self.total_losses = 0.0
+        self.best_trade = 0.0
+        self.worst_trade = 0.0
+        self.last_equity = initial_equity
+        self.high_water_mark = initial_equity
+        self.max_drawdown = 0.0
+        self._return_count = 0
+        self._return_mean = 0.0
+        self._return_m2 = 0.0
+
+        # Incremental persistence: rows already written to ``_persist_path``
+        self._persist_path: Optional[Path] = None
+        self._persisted = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        fill_id: str,
+        symbol: str,
+        side: str,
+        quantity: float,
+        price: float,
+        fee: float,
+        pnl: Optional[float],
+        equity: float,
+        timestamp: Optional[datetime] = None
+    ) -> None:
+        """Record one fill and fold it into the accumulators."""
+        if self._size == len(self._rows):
+            self._rows = np.resize(self._rows, 2 * len(self._rows))
+
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            code = self._symbol_codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        pnl = math.nan if pnl is None else float(pnl)
+        self._rows[self._size] = (
+            _to_epoch(timestamp), code, SIDES[side], quantity, price, fee, pnl, equity
+        )
+        self._size += 1
+        self.ids.append(fill_id)
+
+        self.total_fees += fee
+        if not math.isnan(pnl):
+            if pnl > 0:
+                self.winning_trades += 1
+                self.total_wins += pnl
+            else:
+                self.losing_trades += 1
+                self.total_losses += abs(pnl)
+            self.best_trade = max(self.best_trade, pnl)
+            self.worst_trade = min(self.worst_trade, pnl)
+
+        if self.last_equity:
+            ret = (equity - self.last_equity) / self.last_equity
+            self._return_count += 1
+            delta = ret - self._return_mean
+            self._return_mean += delta / self._return_count
+            self._return_m2 += delta * (ret - self._return_mean)
+        self.last_equity = equity
+
+        self.high_water_mark = max(self.high_water_mark, equity)
+        if self.high_water_mark > 0:
+            drawdown = (self.high_water_mark - equity) / self.high_water_mark * 100
+            self.max_drawdown = max(self.max_drawdown, drawdown)
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of one column."""
+        view = self._rows[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def metrics(self) -> Dict[str, float]:
+        """Performance figures from the accumulators."""
+        closed = self.winning_trades + self.losing_trades
+        if self._return_count:
+            std_return = math.sqrt(max(self._return_m2 / self._return_count, 0.0))
+            sharpe_ratio = self._return_mean / std_return * math.sqrt(252) if std_return > 0 else 0.0
+        else:
+            sharpe_ratio = 0.0
+
+        return {
+            "sharpe_ratio": sharpe_ratio,
+            "max_drawdown": self.max_drawdown,
+            "win_rate": self.winning_trades / closed * 100 if closed > 0 else 0.0,
+            "profit_factor": self.total_wins / self.total_losses if self.total_losses > 0 else 0.0,
+            "avg_win": self.total_wins / self.winning_trades if self.winning_trades > 0 else 0.0,
+            "avg_loss": self.total_losses / self.losing_trades if self.losing_trades > 0 else 0.0,
+            "best_trade": self.best_trade,
+            "worst_trade": self.worst_trade,
+            "total_fees": self.total_fees,
+        }
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        """Fills as trade dicts (id, symbol, side, quantity, price, value, fee, pnl, equity, timestamp)."""
+        stop = self._size if stop is None else min(stop, self._size)
+        records = []
+        for i in range(start, stop):
+            row = self._rows[i]
+            pnl = float(row["pnl"])
+            records.append({
+                "id": self.ids[i],
+                "symbol": self.symbols[row["symbol"]],
+                "side": SIDE_NAMES[int(row["side"])],
+                "quantity": float(row["quantity"]),
+                "price": float(row["price"]),
+                "value": float(row["quantity"] * row["price"]),
+                "fee": float(row["fee"]),
+                "pnl": None if math.isnan(pnl) else pnl,
+                "equity": float(row["equity"]),
+                "timestamp": _from_epoch(float(row["ts"])),
+            })
+        return records
+
+    def persist(self, path: str) -> int:
+        """
+        Append fills not yet written to ``path`` (JSON lines).
+
+        Only new rows are written; switching to another path rewrites it from
+        the first fill. Returns the number of rows written.
+        """
+        path = Path(path)
+        if path != self._persist_path:
+            self._persist_path = path
+            self._persisted = 0
+            mode = "w"
+        else:
+            mode = "a"
+
+        rows = self.records(self._persisted)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, mode) as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str) + "\n")
+        self._persisted = self._size
+        return len(rows)
+
+    @classmethod
+    def load(cls, path: str, initial_equity: float, limit: Optional[int] = None) -> "TradeLedger":
+        """
+        Rebuild a ledger (and its accumulators) from a persisted file.
+
+        ``limit`` keeps only the first fills, e.g. those a state snapshot
+        accounts for. When lines are left over (or the last one is torn) the
+        next ``persist`` rewrites the file instead of appending after them.
+        """
+        ledger = cls(initial_equity)
+        path = Path(path)
+        complete = True
+        with open(path) as f:
+            for line in f:
+                if limit is not None and len(ledger) >= limit:
+                    complete = False
+                    break
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    complete = False
+                    break  # torn final write
+                ledger.append(
+                    row["id"], row["symbol"], row["side"], row["quantity"], row["price"],
+                    row["fee"], row.get("pnl"), row.get("equity", ledger.last_equity),
+                    datetime.fromisoformat(row["timestamp"]) if row.get("timestamp") else None
+                )
+        if complete:
+            ledger._persist_path = path
+            ledger._persisted = len(ledger)
+        return ledger
+
+    def to_arrow(self):
+        """All fills as a ``pyarrow.Table``."""
+        import pyarrow as pa
+
+        n = self._size
+        rows = self._rows[:n]
+        return pa.table({
+            "id": pa.array(self.ids, pa.string()),
+            "timestamp": pa.array((rows["ts"] * 1e6).astype("int64"), pa.timestamp("us", tz="UTC")),
+            "symbol": pa.DictionaryArray.from_arrays(
+                pa.array(rows["symbol"], pa.int32()), pa.array(self.symbols, pa.string())
+            ),
+            "side": pa.array(np.where(rows["side"] > 0, "buy", "sell"), pa.string()),
+            "quantity": rows["quantity"],
+            "price": rows["price"],
+            "value": rows["quantity"] * rows["price"],
+            "fee": rows["fee"],
+            "pnl": pa.array(rows["pnl"], pa.float64(), mask=np.isnan(rows["pnl"])),
+            "equity": rows["equity"],
+        })
+
+    def export_parquet(self, path: str) -> None:
+        """Write all fills to a Parquet file for offline analysis."""
+        import pyarrow.parquet as pq
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(self.to_arrow(), path, compression="snappy")
+
+
+def _to_epoch(timestamp: Optional[datetime]) -> float:
+    """Naive datetimes are UTC (the engine stamps fills with ``utcnow``)."""
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc)
+    elif timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _from_epoch(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,178 @@
+"""
+Allocation Engine - HRP, volatility targeting and Kelly on NumPy arrays
+
+Everything here works on plain covariance/return arrays indexed by asset
+position; ``PortfolioConstructor`` maps names to positions once per build.
+The HRP tree (linkage and quasi-diagonal order) is cached between rebalances
+and only rebuilt when the correlation structure moves by more than a
+tolerance, and ``EWMACovariance`` folds in new return rows instead of
+re-estimating over the whole history.
+"""
+
+import logging
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+logger = logging.getLogger(__name__)
+
+MIN_CLUSTER_VARIANCE = 1e-6
+
+
+def covariance_to_correlation(cov: np.ndarray) -> np.ndarray:
+    """Correlation matrix from a covariance matrix (zero-variance assets: 0 off-diagonal)"""
+    std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    corr[~np.isfinite(corr)] = 0.0
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1.0, 1.0)
+
+
+class EWMACovariance:
+    """
+    Exponentially weighted mean and covariance, updated one row at a time.
+
+    Each update costs O(n_assets^2) regardless of how much history has been
+    seen, so a rebalance only pays for the rows that arrived since the last one.
+    """
+
+    def __init__(self, n_assets: int, halflife: float = 60.0):
+        self.n_assets = n_assets
+        self.halflife = halflife
+        self.decay = 0.5 ** (1.0 / halflife)
+        self.mean = np.zeros(n_assets)
+        self.cov = np.zeros((n_assets, n_assets))
+        self.count = 0
+
+    def update(self, row: np.ndarray):
+        """Fold one row of returns into the estimate"""
+        row = np.asarray(row, dtype=float)
+        if self.count == 0:
+            self.mean = row.copy()
+        else:
+            alpha = 1.0 - self.decay
+            diff = row - self.mean
+            self.mean += alpha * diff
+            self.cov = self.decay * (self.cov + alpha * np.outer(diff, diff))
+        self.count += 1
+
+    def update_many(self, rows: np.ndarray):
+        """Fold a (periods x assets) block of returns, oldest first"""
+        for row in np.atleast_2d(rows):
+            self.update(row)
+
+    def correlation(self) -> np.ndarray:
+        return covariance_to_correlation(self.cov)
+
+
+class HRPEngine:
+    """
+    Hierarchical Risk Parity on index arrays with a cached cluster tree.
+
+    The tree is reused while every pairwise correlation stays within
+    ``relink_tolerance`` of the correlations it was built from. Cluster
+    variances come from a 2-D prefix sum over the quasi-diagonalised
+    covariance, so each bisection step is O(1) instead of re-slicing the
+    matrix per cluster.
+    """
+
+    def __init__(self, relink_tolerance: float = 0.05):
+        self.relink_tolerance = relink_tolerance
+        self._key: Optional[Tuple] = None
+        self._corr: Optional[np.ndarray] = None
+        self.linkage_matrix: Optional[np.ndarray] = None
+        self.order: Optional[np.ndarray] = None
+        self.stats = {'linkages': 0, 'reused': 0}
+
+    def invalidate(self):
+        self._key = None
+        self._corr = None
+        self.linkage_matrix = None
+        self.order = None
+
+    def quasi_diagonal_order(self, corr: np.ndarray, key: Optional[Sequence] = None) -> np.ndarray:
+        """Leaf order of the single-linkage tree, rebuilt only if correlations moved"""
+        key = tuple(key) if key is not None else corr.shape
+        if (
+            self.order is not None
+            and key == self._key
+            and np.max(np.abs(corr - self._corr)) <= self.relink_tolerance
+        ):
+            self.stats['reused'] += 1
+            return self.order
+
+        distance = np.sqrt(np.clip((1.0 - corr) / 2.0, 0.0, None))
+        np.fill_diagonal(distance, 0.0)
+        condensed = squareform(distance, checks=False)
+        self.linkage_matrix = linkage(condensed, method='single')
+        self.order = leaves_list(self.linkage_matrix)
+        self._key = key
+        self._corr = corr.copy()
+        self.stats['linkages'] += 1
+        return self.order
+
+    def allocate(self, cov: np.ndarray, corr: Optional[np.ndarray] = None,
+                 key: Optional[Sequence] = None) -> np.ndarray:
+        """HRP weights, in the same asset order as ``cov``"""
+        n = cov.shape[0]
+        if n == 1:
+            return np.ones(1)
+        if corr is None:
+            corr = covariance_to_correlation(cov)
+        order = self.quasi_diagonal_order(corr, key)
+
+        # prefix[i, j] = sum of the ordered covariance over rows < i, cols < j
+        ordered = cov[np.ix_(order, order)]
+        prefix = np.zeros((n + 1, n + 1))
+        prefix[1:, 1:] = ordered.cumsum(axis=0).cumsum(axis=1)
+
+        def cluster_variance(start: int, stop: int) -> float:
+            total = prefix[stop, stop] - prefix[start, stop] - prefix[stop, start] + prefix[start, start]
+            size = stop - start
+            return max(total / (size * size), MIN_CLUSTER_VARIANCE)
+
+        weights = np.ones(n)
+        stack = [(0, n)]
+        while stack:
+            start, stop = stack.pop()
+            if stop - start < 2:
+                continue
+            mid = start + (stop - start) // 2
+            var_left = cluster_variance(start, mid)
+            var_right = cluster_variance(mid, stop)
+            alpha = var_right / (var_left + var_right)
+            weights[start:mid] *= alpha
+            weights[mid:stop] *= 1.0 - alpha
+            stack.append((start, mid))
+            stack.append((mid, stop))
+
+        result = np.empty(n)
+        result[order] = weights
+        return result
+
+
+def inverse_volatility_weights(cov: np.ndarray) -> np.ndarray:
+    """Inverse-volatility weights from a daily covariance (sum to 1)"""
+    vols = np.sqrt(np.clip(np.diag(cov), 0.0, None) * 252)
+    inv_vols = 1.0 / (vols + 1e-6)
+    return inv_vols / inv_vols.sum()
+
+
+def kelly_weights(mu: np.ndarray, cov: np.ndarray, cap: float,
+                  risk_free_rate: float = 0.0) -> np.ndarray:
+    """
+    Long-only capped Kelly weights, normalised to 1.
+
+    ``mu`` and ``cov`` are annualised. Falls back to equal weights when no
+    asset has a positive Kelly fraction.
+    """
+    kelly = np.linalg.pinv(cov) @ (mu - risk_free_rate)
+    kelly = np.clip(kelly, -cap, cap)
+    kelly = np.clip(kelly, 0.0, None)
+    total = kelly.sum()
+    if total > 0:
+        return kelly / total
+    return np.full(len(mu), 1.0 / len(mu))
@@ -9,10 +9,11 @@
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import json
-from scipy.cluster.hierarchy import linkage, leaves_list
-from scipy.spatial.distance import squareform
 from sklearn.covariance import LedoitWolf
-import warnings
+
+from .allocation_engine import (
+    EWMACovariance, HRPEngine, inverse_volatility_weights, kelly_weights
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +34,16 @@ def __init__(self, method: str = "hrp"):
         
         # Minimum periods for estimation
         self.min_periods = 30
+
+        # Covariance estimate: 'sample' over the window, or 'ewma' updated incrementally
+        self.covariance_method = os.getenv('PORTFOLIO_COVARIANCE', 'sample').lower()
+        self.ewma_halflife = float(os.getenv('EWMA_HALFLIFE', '60'))
+        self._ewma: Optional[EWMACovariance] = None
+        self._ewma_columns: Optional[Tuple[str, ...]] = None
+        self._ewma_last = None
+
+        # Cluster tree is reused while correlations move less than this
+        self.hrp_engine = HRPEngine(float(os.getenv('HRP_RELINK_TOLERANCE', '0.05')))
         
     def build_portfolio(self, returns_data: Dict[str, pd.Series], 
                        current_weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
@@ -52,12 +63,14 @@ def build_portfolio(self, returns_data: Dict[str, pd.Series],
         logger.info(f"Building portfolio with {self.method} method, {len(returns_df)} periods")
         
         try:
+            cov = self._covariance(returns_df)
+
             if self.method == 'hrp':
-                weights = self._hierarchical_risk_parity(returns_df)
+                weights = self._hierarchical_risk_parity(returns_df, cov)
             elif self.method == 'voltarget':
-                weights = self._volatility_targeting(returns_df)
+                weights = self._volatility_targeting(returns_df, cov)
             elif self.method == 'kelly':
-                weights = self._kelly_optimal(returns_df)
+                weights = self._kelly_optimal(returns_df, cov)
             elif self.method == 'equal':
                 weights = self._equal_weight(returns_df)
             else:
@@ -71,7 +84,7 @@ def build_portfolio(self, returns_data: Dict[str, pd.Series],
                 weights = self._apply_turnover_penalty(weights, current_weights)
             
             # Calculate portfolio metrics
-            metrics = self._calculate_portfolio_metrics(weights, returns_df)
+            metrics = self._calculate_portfolio_metrics(weights, returns_df, cov)
             
             return {
                 'method': self.method,
@@ -86,159 +99,61 @@ def build_portfolio(self, returns_data: Dict[str, pd.Series],
             logger.error(f"Portfolio construction failed: {e}")
             return {'error': str(e)}
     
-    def _hierarchical_risk_parity(self, returns: pd.DataFrame) -> Dict[str, float]:
-        """Hierarchical Risk Parity (HRP) allocation"""
-        
-        # Calculate correlation matrix
-        corr_matrix = returns.corr()
-        
-        # Handle missing correlations
-        corr_matrix = corr_matrix.fillna(0)
-        np.fill_diagonal(corr_matrix.values, 1.0)
-        
-        # Convert correlation to distance
-        distance_matrix = np.sqrt((1 - corr_matrix) / 2)
-        
-        # Hierarchical clustering
-        condensed_distances = squareform(distance_matrix.values)
-        linkage_matrix = linkage(condensed_distances, method='single')
-        
-        # Get clustered order
-        sorted_indices = leaves_list(linkage_matrix)
-        sorted_assets = [returns.columns[i] for i in sorted_indices]
-        
-        # Calculate HRP weights recursively
-        weights = self._hrp_recursive(sorted_assets, corr_matrix, returns)
-        
-        return {asset: weights.get(asset, 0) for asset in returns.columns}
-    
-    def _hrp_recursive(self, assets: List[str], corr_matrix: pd.DataFrame, 
-                      returns: pd.DataFrame) -> Dict[str, float]:
-        """Recursive HRP weight calculation"""
-        
-        if len(assets) == 1:
-            return {assets[0]: 1.0}
-        
-        # Split assets into two clusters
-        mid_point = len(assets) // 2
-        cluster1 = assets[:mid_point]
-        cluster2 = assets[mid_point:]
-        
-        # Calculate cluster volatilities
-        vol1 = self._cluster_variance(cluster1, corr_matrix, returns)
-        vol2 = self._cluster_variance(cluster2, corr_matrix, returns)
-        
-        # Allocate between clusters (inverse volatility)
-        total_vol = vol1 + vol2
-        if total_vol > 0:
-            alpha1 = vol2 / total_vol
-            alpha2 = vol1 / total_vol
+    def _covariance(self, returns: pd.DataFrame) -> np.ndarray:
+        """Daily covariance of the return columns (sample or incremental EWMA)"""
+        if self.covariance_method != 'ewma':
+            return np.cov(returns.values, rowvar=False, ddof=1).reshape(returns.shape[1], -1)
+
+        columns = tuple(returns.columns)
+        new_rows = returns
+        incremental = (
+            self._ewma is not None
+            and columns == self._ewma_columns
+            and isinstance(returns.index, pd.DatetimeIndex)
+            and self._ewma_last is not None
+        )
+        if incremental:
+            # Only rows after the last one already folded in
+            new_rows = returns[returns.index > self._ewma_last]
         else:
-            alpha1 = alpha2 = 0.5
-        
-        # Recursive allocation within clusters
-        weights1 = self._hrp_recursive(cluster1, corr_matrix, returns)
-        weights2 = self._hrp_recursive(cluster2, corr_matrix, returns)
-        
-        # Scale by cluster allocation
-        final_weights = {}
-        for asset, weight in weights1.items():
-            final_weights[asset] = weight * alpha1
-        for asset, weight in weights2.items():
-            final_weights[asset] = weight * alpha2
-            
-        return final_weights
-    
-    def _cluster_variance(self, assets: List[str], corr_matrix: pd.DataFrame, 
-                         returns: pd.DataFrame) -> float:
-        """Calculate variance of equally weighted cluster"""
-        if not assets:
-            return 0
-        
-        cluster_corr = corr_matrix.loc[assets, assets]
-        cluster_vols = returns[assets].std(ddof=1)
-        
-        # Equal weight assumption
-        n = len(assets)
-        weight = 1.0 / n
-        
-        # Portfolio variance
-        variance = 0
-        for i, asset_i in enumerate(assets):
-            for j, asset_j in enumerate(assets):
-                vol_i = cluster_vols.get(asset_i, 0.01)
-                vol_j = cluster_vols.get(asset_j, 0.01)
-                corr_ij = cluster_corr.loc[asset_i, asset_j] if not pd.isna(cluster_corr.loc[asset_i, asset_j]) else 0
-                variance += weight * weight * vol_i * vol_j * corr_ij
-        
-        return max(variance, 1e-6)
-    
-    def _volatility_targeting(self, returns: pd.DataFrame) -> Dict[str, float]:
+            self._ewma = EWMACovariance(len(columns), halflife=self.ewma_halflife)
+            self._ewma_columns = columns
+
+        self._ewma.update_many(new_rows.values)
+        self._ewma_last = returns.index[-1] if isinstance(returns.index, pd.DatetimeIndex) else None
+        return self._ewma.cov.copy()
+
+    def _hierarchical_risk_parity(self, returns: pd.DataFrame,
+                                  cov: np.ndarray) -> Dict[str, float]:
+        """Hierarchical Risk Parity (HRP) allocation"""
+        weights = self.hrp_engine.allocate(cov, key=returns.columns)
+        return dict(zip(returns.columns, weights.tolist()))
+
+    def _volatility_targeting(self, returns: pd.DataFrame,
+                              cov: np.ndarray) -> Dict[str, float]:
         """Volatility targeting allocation"""
-        
-        # Calculate individual volatilities (annualized)
-        vols = returns.std(ddof=1) * np.sqrt(252)
-        
-        # Inverse volatility weights
-        inv_vols = 1.0 / (vols + 1e-6)  # Add small constant to avoid division by zero
-        weights = inv_vols / inv_vols.sum()
-        
-        # Scale to target volatility
-        current_vol = np.sqrt(np.dot(weights, np.dot(returns.cov() * 252, weights)))
-        if current_vol > 0:
-            scale_factor = self.vol_target / current_vol
-            weights *= scale_factor
-        
-        # Normalize
-        weights /= weights.sum()
-        
-        return weights.to_dict()
-    
-    def _kelly_optimal(self, returns: pd.DataFrame) -> Dict[str, float]:
+        # Scaling the inverse-vol mix to the target and renormalising leaves it
+        # unchanged, so the weights are the normalised inverse volatilities
+        weights = inverse_volatility_weights(cov)
+        return dict(zip(returns.columns, weights.tolist()))
+
+    def _kelly_optimal(self, returns: pd.DataFrame, cov: np.ndarray) -> Dict[str, float]:
         """Kelly optimal allocation (capped)"""
-        
+
         # Calculate expected returns (annualized)
-        mu = returns.mean() * 252
-        
-        # Covariance matrix (annualized) with Ledoit-Wolf shrinkage
-        try:
-            lw = LedoitWolf()
-            cov_shrunk = lw.fit(returns.values).covariance_ * 252
-            sigma = pd.DataFrame(cov_shrunk, index=returns.columns, columns=returns.columns)
-        except:
-            sigma = returns.cov() * 252
-            
-        # Risk-free rate adjustment
-        excess_returns = mu - self.risk_free_rate
-        
+        mu = returns.values.mean(axis=0) * 252
+
+        # Covariance matrix (annualized); sample estimates get Ledoit-Wolf shrinkage
+        sigma = cov * 252
+        if self.covariance_method != 'ewma':
+            try:
+                sigma = LedoitWolf().fit(returns.values).covariance_ * 252
+            except Exception:
+                pass
+
         try:
-            # Kelly weights: w = Σ^-1 * μ
-            inv_sigma = pd.DataFrame(
-                np.linalg.pinv(sigma.values), 
-                index=sigma.index, 
-                columns=sigma.columns
-            )
-            
-            kelly_weights = inv_sigma.dot(excess_returns)
-            
-            # Cap weights
-            kelly_weights = kelly_weights.clip(-self.kelly_cap, self.kelly_cap)
-            
-            # Handle negative weights (convert to 0)
-            kelly_weights = kelly_weights.clip(0, None)
-            
-            # Normalize
-            if kelly_weights.sum() > 0:
-                kelly_weights /= kelly_weights.sum()
-            else:
-                # Fallback to equal weights
-                kelly_weights = pd.Series(
-                    1.0 / len(returns.columns), 
-                    index=returns.columns
-                )
-            
-            return kelly_weights.to_dict()
-            
+            weights = kelly_weights(mu, sigma, self.kelly_cap, self.risk_free_rate)
+            return dict(zip(returns.columns, weights.tolist()))
         except np.linalg.LinAlgError:
             logger.warning("Singular covariance matrix, using equal weights")
             return self._equal_weight(returns)
@@ -259,34 +174,22 @@ def _apply_constraints(self, weights: Dict[str, float], returns: pd.DataFrame) -
         w = w.clip(0, None)
         
         # Maximum weight constraints
-        # Parse symbol and strategy from keys (format: "strategy_symbol")
-        symbol_weights = {}
-        strategy_weights = {}
-        
-        for key in w.index:
-            parts = key.split('_', 1)
-            if len(parts) == 2:
-                strategy, symbol = parts
-                symbol_weights[symbol] = symbol_weights.get(symbol, 0) + w[key]
-                strategy_weights[strategy] = strategy_weights.get(strategy, 0) + w[key]
-        
-        # Apply symbol weight constraints
-        for key in w.index:
-            parts = key.split('_', 1)
-            if len(parts) == 2:
-                strategy, symbol = parts
-                if symbol_weights[symbol] > self.max_symbol_weight:
-                    scale_factor = self.max_symbol_weight / symbol_weights[symbol]
-                    w[key] *= scale_factor
-        
-        # Apply strategy weight constraints  
-        for key in w.index:
-            parts = key.split('_', 1)
-            if len(parts) == 2:
-                strategy, symbol = parts
-                if strategy_weights[strategy] > self.max_strategy_weight:
-                    scale_factor = self.max_strategy_weight / strategy_weights[strategy]
-                    w[key] *= scale_factor
+        # Parse symbol and strategy from keys (format: "strategy_symbol");
+        # both caps are measured on the unconstrained weights
+        parts = [key.split('_', 1) for key in w.index]
+        keyed = np.array([len(p) == 2 for p in parts], dtype=bool)
+        if keyed.any():
+            strategies = [p[0] for p in parts if len(p) == 2]
+            symbols = [p[1] for p in parts if len(p) == 2]
+            keyed_w = w[keyed]
+            symbol_totals = keyed_w.groupby(symbols).transform('sum')
+            strategy_totals = keyed_w.groupby(strategies).transform('sum')
+            
+            over_symbol = symbol_totals > self.max_symbol_weight
+            keyed_w[over_symbol] *= self.max_symbol_weight / symbol_totals[over_symbol]
+            over_strategy = strategy_totals > self.max_strategy_weight
+            keyed_w[over_strategy] *= self.max_strategy_weight / strategy_totals[over_strategy]
+            w[keyed] = keyed_w
         
         # Normalize to sum to 1
         if w.sum() > 0:
@@ -327,8 +230,9 @@ def _apply_turnover_penalty(self, new_weights: Dict[str, float],
         
         return new_weights
     
-    def _calculate_portfolio_metrics(self, weights: Dict[str, float], 
-                                   returns: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_portfolio_metrics(self, weights: Dict[str, float],
+                                   returns: pd.DataFrame,
+                                   cov: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Calculate portfolio performance metrics"""
         
         # Convert weights to series
@@ -338,7 +242,7 @@ def _calculate_portfolio_metrics(self, weights: Dict[str, float],
         w = w.reindex(returns.columns, fill_value=0)
         
         # Portfolio returns
-        port_returns = returns.dot(w)
+        port_returns = returns.values @ w.values
         
         # Performance metrics (annualized)
         mean_return = port_returns.mean() * 252
@@ -346,8 +250,8 @@ def _calculate_portfolio_metrics(self, weights: Dict[str, float],
         sharpe = (mean_return - self.risk_free_rate) / volatility if volatility > 0 else 0
         
         # Maximum drawdown
-        cumulative = (1 + port_returns).cumprod()
-        rolling_max = cumulative.expanding().max()
+        cumulative = np.cumprod(1 + port_returns)
+        rolling_max = np.maximum.accumulate(cumulative)
         drawdown = (cumulative - rolling_max) / rolling_max
         max_drawdown = drawdown.min()
         
@@ -356,7 +260,9 @@ def _calculate_portfolio_metrics(self, weights: Dict[str, float],
         concentration = (w**2).sum()
         
         # Risk decomposition
-        risk_contrib = self._calculate_risk_contributions(w, returns)
+        if cov is None:
+            cov = np.cov(returns.values, rowvar=False, ddof=1).reshape(returns.shape[1], -1)
+        risk_contrib = self._calculate_risk_contributions(w, cov)
         
         return {
             'expected_return': float(mean_return),
@@ -370,26 +276,24 @@ def _calculate_portfolio_metrics(self, weights: Dict[str, float],
             'n_positions': int((w > 0.001).sum())  # Positions > 0.1%
         }
     
-    def _calculate_risk_contributions(self, weights: pd.Series, 
-                                    returns: pd.DataFrame) -> Dict[str, float]:
+    def _calculate_risk_contributions(self, weights: pd.Series,
+                                    cov: np.ndarray) -> Dict[str, float]:
         """Calculate risk contributions of each asset"""
         
-        # Covariance matrix
-        cov_matrix = returns.cov() * 252
+        # Covariance matrix (annualized)
+        cov_matrix = cov * 252
+        w = weights.values
         
         # Portfolio variance
-        port_var = np.dot(weights, np.dot(cov_matrix, weights))
+        port_var = w @ cov_matrix @ w
         
         if port_var <= 0:
             return {asset: 0.0 for asset in weights.index}
         
-        # Marginal risk contributions
-        marginal_contrib = np.dot(cov_matrix, weights)
-        
-        # Risk contributions = weight * marginal contribution / portfolio volatility
-        risk_contrib = weights * marginal_contrib / port_var
+        # Risk contributions = weight * marginal contribution / portfolio variance
+        risk_contrib = w * (cov_matrix @ w) / port_var
         
-        return risk_contrib.to_dict()
+        return dict(zip(weights.index, risk_contrib.tolist()))
     
     def generate_portfolio_report(self, portfolio_result: Dict[str, Any], 
                                  returns_data: Dict[str, pd.Series]) -> str:
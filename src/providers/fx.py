@@ -1,29 +1,72 @@
 """
 FX Rate Provider with caching and fallback
 Provides live USDTRY rates for Turkish arbitrage
+
+Rates live in an in-memory table that a background refresher keeps current
+(one batched ticker request per cycle on a shared exchange session), so a
+lookup is a dictionary read. The refresher starts with the first lookup
+unless the provider is created with ``auto_start=False``. The last good live
+rate keeps being served through short outages, up to a staleness bound,
+then the pair's configured fallback rate; the table is persisted to disk on
+a debounce instead of on every update.
 """
 
+import atexit
 import json
+import os
+import threading
 import time
 import ccxt
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Cache key -> exchange symbol
+DEFAULT_PAIRS = {"USDTTRY": "USDT/TRY"}
+
+# Venues tried in order for each refresh
+DEFAULT_SOURCES = ["btcturk", "binance"]
+
+# Rates served when a pair has no usable live rate (config can override or add)
+DEFAULT_FALLBACK_RATES = {"USDTTRY": 34.5}
+
+# Quote currencies recognised when splitting a cache key, longest first
+QUOTE_CURRENCIES = ("USDT", "USDC", "BUSD", "TRY", "USD", "EUR", "GBP", "BTC", "ETH")
+
 
 class FXProvider:
     """Foreign exchange rate provider"""
-    
-    def __init__(self):
+
+    def __init__(self, cache_file: str = "logs/fx_cache.json",
+                 sources: Optional[List[str]] = None, auto_start: bool = True):
         self.cache = {}
         self.cache_ttl = 30  # 30 seconds cache
-        self.cache_file = Path("logs/fx_cache.json")
-        self.fallback_rate = 34.5  # Default USDTRY rate
+        self.max_staleness = float(os.getenv('FX_MAX_STALE_SECONDS', '300'))
+        self.refresh_interval = float(os.getenv('FX_REFRESH_SECONDS', '10'))
+        self.persist_interval = float(os.getenv('FX_PERSIST_SECONDS', '60'))
+        self.cache_file = Path(cache_file)
+        self.fallback_rate = DEFAULT_FALLBACK_RATES["USDTTRY"]  # Default USDTRY rate
+        self.pairs = dict(DEFAULT_PAIRS)
+        self.sources = list(sources or DEFAULT_SOURCES)
+        self.auto_start = auto_start
+
+        self._exchanges: Dict[str, ccxt.Exchange] = {}
+        self._fallback_rates: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()  # exchange creation and live fetches
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False  # stop() was called; lookups do not restart the refresher
+
+        self.stats = {'lookups': 0, 'live_fetches': 0, 'fetch_failures': 0,
+                      'fallbacks': 0, 'saves': 0}
         self._load_cache()
-        
+
     def _load_cache(self):
         """Load cache from file"""
         if self.cache_file.exists():
@@ -33,92 +76,212 @@ def _load_cache(self):
             except Exception as e:
                 logger.warning(f"Failed to load FX cache: {e}")
                 self.cache = {}
-                
+
     def _save_cache(self):
-        """Save cache to file"""
-        self.cache_file.parent.mkdir(exist_ok=True)
-        try:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache, f)
-        except Exception as e:
-            logger.warning(f"Failed to save FX cache: {e}")
-            
-    def get_usdtry(self, use_cache: bool = True) -> float:
-        """Get USDTRY exchange rate"""
-        pair = "USDTTRY"
-        
-        # Check cache first
-        if use_cache and pair in self.cache:
-            cached = self.cache[pair]
-            if time.time() - cached.get('ts', 0) < self.cache_ttl:
-                logger.debug(f"Using cached USDTRY: {cached['rate']}")
-                return cached['rate']
-                
-        # Try to get live rate
-        rate = self._fetch_live_rate()
-        
-        if rate:
-            # Update cache
-            self.cache[pair] = {
-                'ts': time.time(),
-                'rate': rate,
-                'source': 'live'
-            }
+        """Save cache to file (written aside and swapped in)"""
+        with self._save_lock:
+            self._dirty = False
+            self._last_save = time.time()
+            snapshot = dict(self.cache)
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.cache_file.with_suffix('.tmp')
+                with open(tmp, 'w') as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp, self.cache_file)
+                self.stats['saves'] += 1
+            except Exception as e:
+                logger.warning(f"Failed to save FX cache: {e}")
+
+    def _maybe_save(self):
+        """Persist if there are unsaved updates and the debounce interval has passed"""
+        if self._dirty and time.time() - self._last_save >= self.persist_interval:
             self._save_cache()
-            logger.info(f"Live USDTRY: {rate}")
-            return rate
-        else:
-            # Use fallback
-            rate = self._get_fallback_rate()
-            # Update cache with fallback
-            self.cache[pair] = {
-                'ts': time.time(),
-                'rate': rate,
-                'source': 'fallback'
-            }
+
+    def flush(self):
+        """Persist unsaved updates now"""
+        if self._dirty:
             self._save_cache()
-            logger.warning(f"Using fallback USDTRY: {rate}")
-            return rate
-            
+
+    # Service lifecycle
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the background refresher (idempotent)"""
+        if self.running:
+            return
+        self._stopped = False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="fx-refresher", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+        logger.info(f"FX refresher started ({self.refresh_interval:.0f}s interval)")
+
+    def stop(self):
+        """Stop the refresher and persist the table"""
+        self._stopped = True
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval + 5)
+            self._thread = None
+        self.flush()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                self._maybe_save()
+            except Exception as e:
+                logger.error(f"FX refresh failed: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    # Lookups
+
+    def get_rate(self, pair: str = "USDTTRY", use_cache: bool = True) -> float:
+        """
+        Rate for ``pair`` (cache key, e.g. "USDTTRY").
+
+        The first lookup starts the refresher (see ``auto_start``) and the
+        pair is tracked from then on. While the refresher runs, any entry
+        younger than ``max_staleness`` is served straight from memory;
+        otherwise entries are good for ``cache_ttl``. Only a missing or
+        expired entry fetches inline.
+
+        Raises:
+            LookupError: No live rate was ever seen and no fallback is configured
+        """
+        self.stats['lookups'] += 1
+        if self.auto_start and not self._stopped and not self.running:
+            self.pairs.setdefault(pair, self._symbol_for(pair))
+            self.start()
+        cached = self.cache.get(pair)
+        if use_cache and cached is not None:
+            limit = self.max_staleness if self.running else self.cache_ttl
+            if time.time() - cached.get('ts', 0) < limit:
+                return cached['rate']
+
+        self.refresh([pair])
+        self._maybe_save()
+        if pair not in self.cache:
+            raise LookupError(f"No {pair} rate available and no fallback configured")
+        return self.cache[pair]['rate']
+
+    def get_usdtry(self, use_cache: bool = True) -> float:
+        """Get USDTRY exchange rate"""
+        return self.get_rate("USDTTRY", use_cache=use_cache)
+
+    def refresh(self, pairs: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Fetch live rates for ``pairs`` (default: all tracked) in one request
+        per venue and update the table. Pairs no venue could price keep their
+        last good live rate while it is within ``max_staleness``, else fall
+        back to the pair's configured rate. A pair without one keeps its
+        last rate however old, or stays missing if it never had one.
+        """
+        pairs = list(pairs or self.pairs)
+        for pair in pairs:
+            self.pairs.setdefault(pair, self._symbol_for(pair))
+        rates = self._fetch_live_rates([self.pairs[p] for p in pairs])
+
+        now = time.time()
+        for pair in pairs:
+            rate = rates.get(self.pairs[pair])
+            if rate:
+                self.cache[pair] = {'ts': now, 'rate': rate, 'source': 'live'}
+                self._dirty = True
+                continue
+
+            last = self.cache.get(pair)
+            if last and last.get('source') == 'live' and now - last.get('ts', 0) < self.max_staleness:
+                logger.warning(f"{pair} refresh failed, keeping last good rate {last['rate']}")
+                continue
+
+            rate = self._get_fallback_rate(pair)
+            if rate is None:
+                if last:
+                    logger.warning(f"{pair} refresh failed and no fallback is configured, "
+                                   f"keeping stale rate {last['rate']}")
+                else:
+                    logger.error(f"No {pair} rate available and no fallback is configured")
+                continue
+
+            self.stats['fallbacks'] += 1
+            self.cache[pair] = {'ts': now, 'rate': rate, 'source': 'fallback'}
+            self._dirty = True
+            logger.warning(f"Using fallback {pair}: {rate}")
+        return {pair: self.cache[pair]['rate'] for pair in pairs if pair in self.cache}
+
+    def _symbol_for(self, pair: str) -> str:
+        """"USDTTRY" -> "USDT/TRY", "EURUSDT" -> "EUR/USDT" (unified symbols pass through)"""
+        if '/' in pair:
+            return pair
+        for quote in QUOTE_CURRENCIES:
+            if pair.endswith(quote) and len(pair) > len(quote):
+                return f"{pair[:-len(quote)]}/{quote}"
+        raise ValueError(f"Cannot split FX pair {pair!r}: unknown quote currency")
+
+    def _exchange(self, name: str) -> ccxt.Exchange:
+        """Shared, long-lived exchange session"""
+        exchange = self._exchanges.get(name)
+        if exchange is None:
+            exchange = getattr(ccxt, name)({'enableRateLimit': True, 'timeout': 5000})
+            self._exchanges[name] = exchange
+        return exchange
+
+    def _fetch_live_rates(self, symbols: List[str]) -> Dict[str, float]:
+        """Last prices for ``symbols``, trying each venue for what is still missing"""
+        rates: Dict[str, float] = {}
+        with self._lock:
+            for name in self.sources:
+                missing = [s for s in symbols if s not in rates]
+                if not missing:
+                    break
+                try:
+                    exchange = self._exchange(name)
+                    self.stats['live_fetches'] += 1
+                    if len(missing) == 1:
+                        tickers = {missing[0]: exchange.fetch_ticker(missing[0])}
+                    else:
+                        tickers = exchange.fetch_tickers(missing)
+                    for symbol, ticker in tickers.items():
+                        if symbol in missing and ticker and ticker.get('last'):
+                            rates[symbol] = float(ticker['last'])
+                except Exception as e:
+                    self.stats['fetch_failures'] += 1
+                    logger.debug(f"{name} FX fetch failed for {missing}: {e}")
+        return rates
+
     def _fetch_live_rate(self) -> Optional[float]:
         """Fetch live rate from exchange"""
-        try:
-            # Try BTCTurk first (native TRY pairs)
-            exchange = ccxt.btcturk()
-            ticker = exchange.fetch_ticker("USDT/TRY")
-            return ticker['last']
-        except Exception as e1:
-            logger.debug(f"BTCTurk USDTRY failed: {e1}")
-            
-            # Try Binance as backup
+        return self._fetch_live_rates([self.pairs["USDTTRY"]]).get(self.pairs["USDTTRY"])
+
+    def _get_fallback_rate(self, pair: str = "USDTTRY") -> Optional[float]:
+        """
+        Fallback rate for ``pair`` from config or the defaults (config read
+        once); None when the pair has none
+        """
+        if self._fallback_rates is None:
+            rates = dict(DEFAULT_FALLBACK_RATES, USDTTRY=self.fallback_rate)
             try:
-                exchange = ccxt.binance()
-                ticker = exchange.fetch_ticker("USDT/TRY")
-                return ticker['last']
-            except Exception as e2:
-                logger.debug(f"Binance USDTRY failed: {e2}")
-                
-        return None
-        
-    def _get_fallback_rate(self) -> float:
-        """Get fallback rate from config or default"""
-        try:
-            # Try to load from config
-            config_file = Path("config/strategies/turkish_arbitrage.yaml")
-            if config_file.exists():
-                import yaml
-                with open(config_file, 'r') as f:
-                    config = yaml.safe_load(f)
-                    return config.get('usdtry_rate', self.fallback_rate)
-        except:
-            pass
-            
-        return self.fallback_rate
-        
-    def get_rate_info(self) -> Dict:
+                # Try to load from config
+                config_file = Path("config/strategies/turkish_arbitrage.yaml")
+                if config_file.exists():
+                    import yaml
+                    with open(config_file, 'r') as f:
+                        config = yaml.safe_load(f) or {}
+                    if 'usdtry_rate' in config:
+                        rates['USDTTRY'] = float(config['usdtry_rate'])
+                    rates.update({k: float(v) for k, v in (config.get('fx_fallback_rates') or {}).items()})
+            except Exception:
+                pass
+            self._fallback_rates = rates
+        return self._fallback_rates.get(pair)
+
+    def get_rate_info(self, pair: str = "USDTTRY") -> Dict:
         """Get detailed rate information"""
-        pair = "USDTTRY"
-        
         if pair in self.cache:
             cached = self.cache[pair]
             age = time.time() - cached.get('ts', 0)
@@ -126,16 +289,18 @@ def get_rate_info(self) -> Dict:
                 'rate': cached['rate'],
                 'source': cached['source'],
                 'age_seconds': age,
-                'is_stale': age > self.cache_ttl
+                'is_stale': age > self.cache_ttl,
+                'refresher_running': self.running
             }
         else:
             return {
-                'rate': self.fallback_rate,
+                'rate': self._get_fallback_rate(pair),
                 'source': 'default',
                 'age_seconds': 0,
-                'is_stale': True
+                'is_stale': True,
+                'refresher_running': self.running
             }
 
 
 # Global instance
-fx_provider = FXProvider()
\ No newline at end of file
+fx_provider = FXProvider()
@@ -22,6 +22,9 @@ def __init__(self, rules: List[ScanRule] = None, outputs_dir: str = "./outputs")
         self.outputs_dir = Path(outputs_dir)
         self.outputs_dir.mkdir(parents=True, exist_ok=True)
         
+        # Latest result per symbol, per timeframe; incremental scans refresh entries
+        self.latest_results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        
     def scan_symbol(self, symbol: str, timeframe: str = '1h') -> Dict[str, Any]:
         """Scan a single symbol and return signal information"""
         try:
@@ -86,23 +89,53 @@ def scan_symbol(self, symbol: str, timeframe: str = '1h') -> Dict[str, Any]:
                 'error': str(e)
             }
             
-    def scan_all_symbols(self, timeframe: str = '1h', max_workers: int = 4) -> List[Dict[str, Any]]:
-        """Scan all available symbols"""
+    def scan_all_symbols(self, timeframe: str = '1h', max_workers: int = 4,
+                         symbols: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Scan all available symbols.
+
+        With ``symbols``, only those are rescanned and merged into the latest
+        results of the others (a full scan runs if there are none yet).
+        """
         available_symbols = data_pipeline.get_available_symbols()
         
         if not available_symbols:
             logger.warning("No symbols available for scanning")
             return []
             
-        logger.info(f"Scanning {len(available_symbols)} symbols with {len(self.rules)} rules")
+        latest = self.latest_results.get(timeframe)
+        if symbols is not None and latest:
+            available = set(available_symbols)
+            latest = {s: r for s, r in latest.items() if s in available}
+            to_scan = [s for s in symbols if s in available]
+        else:
+            latest = {}
+            to_scan = available_symbols
+            
+        logger.info(f"Scanning {len(to_scan)} of {len(available_symbols)} symbols with {len(self.rules)} rules")
+        
+        latest.update(self._scan_symbols(to_scan, timeframe, max_workers))
+        self.latest_results[timeframe] = latest
+        
+        results = list(latest.values())
+        # Sort by score (highest first)
+        results.sort(key=lambda x: x.get('score', 0), reverse=True)
+        
+        logger.info(f"Scan completed: {len(to_scan)} symbols processed")
+        return results
         
-        results = []
+    def _scan_symbols(self, symbols: List[str], timeframe: str,
+                      max_workers: int) -> Dict[str, Dict[str, Any]]:
+        """Scan ``symbols`` in parallel; results keyed by symbol"""
+        results = {}
+        if not symbols:
+            return results
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit all symbol scan tasks
             future_to_symbol = {
                 executor.submit(self.scan_symbol, symbol, timeframe): symbol
-                for symbol in available_symbols
+                for symbol in symbols
             }
             
             # Collect results
@@ -110,22 +143,17 @@ def scan_all_symbols(self, timeframe: str = '1h', max_workers: int = 4) -> List[
                 symbol = future_to_symbol[future]
                 
                 try:
-                    result = future.result(timeout=30)
-                    results.append(result)
+                    results[symbol] = future.result(timeout=30)
                     
                 except Exception as e:
                     logger.error(f"Failed to scan {symbol}: {e}")
-                    results.append({
+                    results[symbol] = {
                         'symbol': symbol,
                         'score': 0,
                         'signals': [],
                         'error': str(e)
-                    })
+                    }
                     
-        # Sort by score (highest first)
-        results.sort(key=lambda x: x.get('score', 0), reverse=True)
-        
-        logger.info(f"Scan completed: {len(results)} symbols processed")
         return results
         
     def get_top_signals(self, results: List[Dict[str, Any]], limit: int = 50) -> List[Dict[str, Any]]:
@@ -208,12 +236,13 @@ def save_signals_json(self, results: List[Dict[str, Any]]):
             
         logger.info(f"Signals saved to {signals_path} and {csv_path}")
         
-    def run_scan(self, timeframe: str = '1h', save_results: bool = True) -> List[Dict[str, Any]]:
-        """Run complete scan and optionally save results"""
+    def run_scan(self, timeframe: str = '1h', save_results: bool = True,
+                 symbols: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Run a scan (of ``symbols`` only, if given) and optionally save results"""
         logger.info(f"Starting crypto scanner with {len(self.rules)} rules")
         
         # Run scan
-        results = self.scan_all_symbols(timeframe)
+        results = self.scan_all_symbols(timeframe, symbols=symbols)
         
         # Log summary
         total_symbols = len(results)
@@ -0,0 +1,183 @@
+"""
+Dependency-aware job graph for the scheduler
+
+Cron triggers only *submit* jobs; the graph decides when they run. Each job
+has a concurrency limit; a submission that arrives while the job is at its
+limit is coalesced into a single pending run (its arguments merged), so
+missed or overlapping triggers collapse into one catch-up run. Downstream
+jobs are triggered by an upstream job succeeding, with arguments derived
+from its result (e.g. only the symbols a fetch changed).
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from loguru import logger
+
+JobRunner = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+# Upstream result -> downstream kwargs, or None to skip the downstream run
+TriggerRule = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+MergeRule = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+
+
+def replace_kwargs(pending: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Default merge: the latest submission wins"""
+    return dict(new)
+
+
+def union_symbols(pending: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge two ``symbols=`` submissions; ``None`` (everything) absorbs any list"""
+    merged = {**pending, **new}
+    if pending.get('symbols') is None or new.get('symbols') is None:
+        merged['symbols'] = None
+    else:
+        merged['symbols'] = sorted(set(pending['symbols']) | set(new['symbols']))
+    return merged
+
+
+@dataclass
+class JobNode:
+    name: str
+    max_concurrency: int = 1
+    coalesce: bool = True
+    merge: MergeRule = replace_kwargs
+    downstream: List[tuple] = field(default_factory=list)  # (job name, TriggerRule)
+
+    running: int = 0
+    pending: Optional[Dict[str, Any]] = None
+    durations: Deque[float] = field(default_factory=lambda: deque(maxlen=100))
+    stats: Dict[str, Any] = field(default_factory=lambda: {
+        'submitted': 0, 'runs': 0, 'failures': 0, 'coalesced': 0, 'skipped': 0,
+        'triggered': 0, 'last_started': None, 'last_duration_s': None
+    })
+
+
+class JobGraph:
+    """Runs named jobs on a thread pool, respecting limits and dependencies"""
+
+    def __init__(self, runner: JobRunner, max_workers: int = 4):
+        self.runner = runner
+        self.nodes: Dict[str, JobNode] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def add_job(self, name: str, max_concurrency: int = 1, coalesce: bool = True,
+                merge: MergeRule = replace_kwargs) -> JobNode:
+        node = JobNode(name, max_concurrency=max_concurrency, coalesce=coalesce, merge=merge)
+        self.nodes[name] = node
+        return node
+
+    def add_dependency(self, upstream: str, downstream: str,
+                       when: Optional[TriggerRule] = None):
+        """Submit ``downstream`` after each successful ``upstream`` run"""
+        for name in (upstream, downstream):
+            if name not in self.nodes:
+                raise ValueError(f"Unknown job {name!r}; register it with add_job() first")
+        self.nodes[upstream].downstream.append((downstream, when or (lambda result: {})))
+
+    def submit(self, name: str, **kwargs) -> bool:
+        """
+        Request a run of ``name``.
+
+        Returns False when the job is at its concurrency limit and does not
+        coalesce (the request is dropped); otherwise the run starts now or
+        is folded into the single pending run.
+        """
+        with self._lock:
+            return self._submit_locked(self.nodes[name], kwargs)
+
+    def _submit_locked(self, node: JobNode, kwargs: Dict[str, Any]) -> bool:
+        node.stats['submitted'] += 1
+        if node.running < node.max_concurrency:
+            self._start(node, kwargs)
+            return True
+        if not node.coalesce:
+            node.stats['skipped'] += 1
+            logger.info(f"Job {node.name} already running, skipped")
+            return False
+        if node.pending is None:
+            node.pending = dict(kwargs)
+        else:
+            node.pending = node.merge(node.pending, kwargs)
+            node.stats['coalesced'] += 1
+        return True
+
+    def _start(self, node: JobNode, kwargs: Dict[str, Any]):
+        node.running += 1
+        node.stats['last_started'] = datetime.now().isoformat()
+        self._executor.submit(self._execute, node, kwargs)
+
+    def _execute(self, node: JobNode, kwargs: Dict[str, Any]):
+        started = time.perf_counter()
+        try:
+            result = self.runner(node.name, kwargs) or {}
+        except Exception as e:
+            logger.error(f"Job {node.name} crashed: {e}")
+            result = {'status': 'error', 'error': str(e)}
+        duration = time.perf_counter() - started
+
+        follow_ups = []
+        if result.get('status') == 'success':
+            for name, when in node.downstream:
+                try:
+                    follow = when(result)
+                except Exception as e:
+                    logger.error(f"Trigger {node.name} -> {name} failed: {e}")
+                    continue
+                if follow is not None:
+                    follow_ups.append((name, follow))
+
+        with self._lock:
+            node.running -= 1
+            node.durations.append(duration)
+            node.stats['runs'] += 1
+            node.stats['last_duration_s'] = duration
+            if result.get('status') != 'success':
+                node.stats['failures'] += 1
+            if node.pending is not None and node.running < node.max_concurrency:
+                pending, node.pending = node.pending, None
+                self._start(node, pending)
+            # Submitted before releasing the lock so the graph never looks idle in between
+            for name, follow in follow_ups:
+                self.nodes[name].stats['triggered'] += 1
+                self._submit_locked(self.nodes[name], follow)
+            self._idle.notify_all()
+
+    def busy(self) -> bool:
+        return any(n.running or n.pending is not None for n in self.nodes.values())
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no job is running or pending"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self.busy():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-job counters and duration summary (seconds)"""
+        with self._lock:
+            report = {}
+            for name, node in self.nodes.items():
+                ordered = sorted(node.durations)
+                summary = {}
+                if ordered:
+                    summary = {
+                        'avg_duration_s': sum(ordered) / len(ordered),
+                        'p95_duration_s': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                        'max_duration_s': ordered[-1],
+                    }
+                report[name] = {**node.stats, **summary, 'running': node.running,
+                                'pending': node.pending is not None}
+            return report
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
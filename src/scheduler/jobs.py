@@ -3,7 +3,7 @@
 """
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from loguru import logger
 
 from ..data.pipeline import data_pipeline
@@ -41,13 +41,16 @@ def job_fetch_data() -> Dict[str, Any]:
             }
     
     @staticmethod  
-    def job_scan_signals() -> Dict[str, Any]:
-        """Scan for trading signals (5-minute interval)"""
+    def job_scan_signals(symbols: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Scan for trading signals (after each fetch, over the symbols it changed)"""
         try:
             logger.info("Starting scheduled signal scan job")
             
             # Run scan and save results
-            results = scanner.run_scan(timeframe='1h', save_results=True)
+            if symbols is None:
+                results = scanner.run_scan(timeframe='1h', save_results=True)
+            else:
+                results = scanner.run_scan(timeframe='1h', save_results=True, symbols=symbols)
             
             signal_count = len([r for r in results if r.get('score', 0) > 0])
             top_score = max([r.get('score', 0) for r in results]) if results else 0
@@ -60,6 +63,7 @@ def job_scan_signals() -> Dict[str, Any]:
                 "timestamp": datetime.now().isoformat(),
                 "results": {
                     "total_symbols": len(results),
+                    "symbols_scanned": len(symbols) if symbols is not None else len(results),
                     "symbols_with_signals": signal_count,
                     "top_score": top_score
                 }
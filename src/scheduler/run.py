@@ -5,14 +5,25 @@
 import json
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.executors.pool import ThreadPoolExecutor
 from loguru import logger
 
+from .graph import JobGraph, replace_kwargs, union_symbols
 from .jobs import SCHEDULED_JOBS
 
 
+def changed_symbols(timeframe: str = '1h'):
+    """Trigger rule: scan the symbols a data job wrote new ``timeframe`` bars for"""
+    def rule(result: dict):
+        changed = (result.get('results') or {}).get('changed_symbols') or {}
+        symbols = changed.get(timeframe) if isinstance(changed, dict) else None
+        return {'symbols': sorted(symbols)} if symbols else None
+    return rule
+
+
 class CryptoScheduler:
     """Scheduler for cryptocurrency scanning jobs"""
     
@@ -24,24 +35,39 @@ def __init__(self, outputs_dir: str = "./outputs"):
         self.logs_dir = self.outputs_dir / "scheduler_logs"
         self.logs_dir.mkdir(parents=True, exist_ok=True)
         
-        # Configure scheduler
+        # Job graph: runs the jobs, enforces per-job limits, chains fetch -> scan
+        self.graph = JobGraph(
+            runner=self._run_job_with_logging,
+            max_workers=int(os.getenv('SCHEDULER_WORKERS', '4'))
+        )
+        for job_name in SCHEDULED_JOBS:
+            self.graph.add_job(job_name, max_concurrency=1,
+                               merge=union_symbols if job_name == 'scan_signals' else replace_kwargs)
+        # Chains are wired only between jobs that are configured
+        for upstream in ('fetch_data', 'full_data_sync'):
+            if upstream in self.graph.nodes and 'scan_signals' in self.graph.nodes:
+                self.graph.add_dependency(upstream, 'scan_signals', when=changed_symbols('1h'))
+        
+        # Cron triggers only submit to the graph, so one small pool is enough
         executors = {
-            'default': ThreadPoolExecutor(max_workers=3),
+            'default': ThreadPoolExecutor(max_workers=1),
         }
         
         self.scheduler = BackgroundScheduler(
             executors=executors,
+            job_defaults={'coalesce': True, 'misfire_grace_time': 300},
             timezone='UTC'
         )
         
         self.is_running = False
         
     def add_jobs(self):
-        """Add all scheduled jobs with their cron triggers"""
+        """Add cron triggers for the jobs that start a chain"""
         
-        # Data fetching - every 15 minutes
+        # Data fetching - every 15 minutes; signal scans follow each fetch
+        # for the symbols that received new bars
         self.scheduler.add_job(
-            func=self._run_job_with_logging,
+            func=self.graph.submit,
             args=['fetch_data'],
             trigger=CronTrigger(minute='*/15'),
             id='fetch_data',
@@ -50,20 +76,9 @@ def add_jobs(self):
             max_instances=1
         )
         
-        # Signal scanning - every 5 minutes
-        self.scheduler.add_job(
-            func=self._run_job_with_logging,
-            args=['scan_signals'],
-            trigger=CronTrigger(minute='*/5'),
-            id='scan_signals',
-            name='Scan Trading Signals',
-            replace_existing=True,
-            max_instances=1
-        )
-        
         # News updates - every 15 minutes
         self.scheduler.add_job(
-            func=self._run_job_with_logging,
+            func=self.graph.submit,
             args=['update_news'],
             trigger=CronTrigger(minute='*/15'),
             id='update_news',
@@ -74,7 +89,7 @@ def add_jobs(self):
         
         # Health checks - every 10 minutes
         self.scheduler.add_job(
-            func=self._run_job_with_logging,
+            func=self.graph.submit,
             args=['health_check'],
             trigger=CronTrigger(minute='*/10'),
             id='health_check',
@@ -85,7 +100,7 @@ def add_jobs(self):
         
         # Full data sync - daily at 2:00 AM UTC
         self.scheduler.add_job(
-            func=self._run_job_with_logging,
+            func=self.graph.submit,
             args=['full_data_sync'],
             trigger=CronTrigger(hour=2, minute=0),
             id='full_data_sync',
@@ -96,7 +111,7 @@ def add_jobs(self):
         
         # Cleanup - weekly on Sunday at 3:00 AM UTC
         self.scheduler.add_job(
-            func=self._run_job_with_logging,
+            func=self.graph.submit,
             args=['cleanup_old_data'],
             trigger=CronTrigger(day_of_week='sun', hour=3, minute=0),
             id='cleanup_old_data',
@@ -107,7 +122,7 @@ def add_jobs(self):
         
         logger.info(f"Added {len(self.scheduler.get_jobs())} scheduled jobs")
         
-    def _run_job_with_logging(self, job_name: str):
+    def _run_job_with_logging(self, job_name: str, kwargs: Optional[dict] = None) -> dict:
         """Run a job with comprehensive logging"""
         start_time = datetime.now()
         
@@ -119,7 +134,7 @@ def _run_job_with_logging(self, job_name: str):
             if not job_func:
                 raise ValueError(f"Unknown job: {job_name}")
                 
-            result = job_func()
+            result = job_func(**(kwargs or {}))
             
             # Log the result
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -131,6 +146,7 @@ def _run_job_with_logging(self, job_name: str):
                 logger.info(f"Job {job_name} completed successfully in {execution_time:.1f}s")
             else:
                 logger.error(f"Job {job_name} failed: {result.get('error', 'Unknown error')}")
+            return result
                 
         except Exception as e:
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -144,6 +160,7 @@ def _run_job_with_logging(self, job_name: str):
             
             self._save_job_log(job_name, error_result)
             logger.error(f"Job {job_name} crashed after {execution_time:.1f}s: {e}")
+            return error_result
             
     def _save_job_log(self, job_name: str, result: dict):
         """Save job execution log"""
@@ -199,6 +216,7 @@ def stop(self):
             
         try:
             self.scheduler.shutdown(wait=True)
+            self.graph.shutdown(wait=True)
             self.is_running = False
             logger.info("Crypto scheduler stopped")
             
@@ -237,6 +255,7 @@ def get_job_status(self) -> dict:
             "total_jobs": len(self.scheduler.get_jobs()) if self.is_running else 0,
             "jobs": {}
         }
+        metrics = self.graph.metrics()
         
         for job_name in SCHEDULED_JOBS.keys():
             recent_logs = self.get_job_logs(job_name, limit=1)
@@ -254,6 +273,7 @@ def get_job_status(self) -> dict:
                     "last_status": "never_run",
                     "last_execution_time": None
                 }
+            status["jobs"][job_name]["metrics"] = metrics.get(job_name, {})
                 
         return status
         
@@ -263,7 +283,10 @@ def run_job_now(self, job_name: str) -> dict:
             return {"error": f"Unknown job: {job_name}"}
             
         logger.info(f"Manually running job: {job_name}")
-        self._run_job_with_logging(job_name)
+        # Through the graph, so a running instance is not duplicated and
+        # downstream jobs (e.g. scans after a fetch) follow
+        self.graph.submit(job_name)
+        self.graph.wait_idle()
         
         # Return recent log
         logs = self.get_job_logs(job_name, limit=1)
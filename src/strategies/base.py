@@ -4,17 +4,38 @@
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from decimal import Decimal
 from datetime import datetime
 import pandas as pd
 import numpy as np
 
+from src.paper.indicator_graph import IndicatorGraph, Spec
+
 logger = logging.getLogger(__name__)
 
+# Common indicators of _calculate_common_indicators as shared graph specs (see on_bar)
+ATR_14 = ('atr', None, 14)
+EMA_21 = ('ema_adj', 'close', 21)
+EMA_21_LAG_5 = ('lag', EMA_21, 5)
+VOLUME_MA_20 = ('sma', 'volume', 20)
+COMMON_SPECS = [ATR_14, EMA_21, EMA_21_LAG_5, VOLUME_MA_20]
+
+
+def ratio(num: float, den: float) -> float:
+    """num / den, NaN when den is zero"""
+    return num / den if den else float('nan')
+
 
 class BaseStrategy(ABC):
-    """Base strategy with common risk management and filters"""
+    """
+    Base strategy with common risk management and filters.
+    
+    Indicators come either from a DataFrame (``update_data``, used by backtests
+    and the optimizer) or incrementally from a shared ``IndicatorGraph``
+    (``on_bar``, used by the signal hub). Signals read the latest rows through
+    ``_latest_rows`` so both paths behave the same.
+    """
     
     def __init__(self, params: Dict[str, Any] = None):
         self.params = params or {}
@@ -34,12 +55,72 @@ def __init__(self, params: Dict[str, Any] = None):
         self.indicators: Dict[str, pd.DataFrame] = {}
         self.positions: Dict[str, Dict] = {}
         
+        # Latest/previous indicator rows per symbol when fed through on_bar
+        self.state: Dict[str, Dict[str, Any]] = {}
+        
+        # Time source for session filters (replay swaps in the bar clock)
+        self.clock: Callable[[], datetime] = datetime.now
+        
     def update_data(self, symbol: str, ohlcv: pd.DataFrame):
         """Update data and calculate indicators"""
+        self.state.pop(symbol, None)
         self.data[symbol] = ohlcv.copy()
         self._calculate_common_indicators(symbol)
         self._calculate_strategy_indicators(symbol)
     
+    def indicator_specs(self) -> List[Spec]:
+        """Graph indicators needed by on_bar"""
+        return COMMON_SPECS + self._strategy_specs()
+    
+    def _strategy_specs(self) -> List[Spec]:
+        return []
+    
+    def on_bar(self, symbol: str, graph: IndicatorGraph):
+        """Refresh the latest indicator row from the shared graph (O(1))"""
+        v = graph.values
+        ema, ema_lag = v[EMA_21], v[EMA_21_LAG_5]
+        ema_slope = ratio(ema - ema_lag, ema_lag)
+        row = {
+            'open': v['open'],
+            'high': v['high'],
+            'low': v['low'],
+            'close': v['close'],
+            'volume': v['volume'],
+            'atr': v[ATR_14],
+            'atr_pct': ratio(v[ATR_14], v['close']),
+            'ema_21': ema,
+            'ema_slope': ema_slope,
+            'trend_regime': 1 if ema_slope > self.trend_slope_threshold else
+                            (-1 if ema_slope < -self.trend_slope_threshold else 0),
+            'volume_ma': v[VOLUME_MA_20],
+            'volume_ratio': ratio(v['volume'], v[VOLUME_MA_20]),
+        }
+        row.update(self._strategy_row(graph))
+        
+        state = self.state.get(symbol)
+        if state is not None and state['bars'] == graph.bars:
+            state['latest'] = row  # revised live bar
+        else:
+            self.state[symbol] = {
+                'latest': row,
+                'prev': state['latest'] if state else row,
+                'bars': graph.bars
+            }
+    
+    def _strategy_row(self, graph: IndicatorGraph) -> Dict[str, Any]:
+        """Strategy-specific columns of the latest row"""
+        return {}
+    
+    def _latest_rows(self, symbol: str) -> Optional[Tuple[Any, Any, int]]:
+        """(latest, previous, bar count) from whichever feed is active"""
+        state = self.state.get(symbol)
+        if state is not None:
+            return state['latest'], state['prev'], state['bars']
+        df = self.indicators.get(symbol)
+        if df is None or len(df) == 0:
+            return None
+        return df.iloc[-1], df.iloc[-2] if len(df) > 1 else df.iloc[-1], len(df)
+    
     def _calculate_common_indicators(self, symbol: str):
         """Calculate common indicators used by all strategies"""
         if symbol not in self.data:
@@ -82,14 +163,11 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Dict[str,
     
     def _apply_filters(self, symbol: str, raw_signal: Dict[str, Any]) -> Dict[str, Any]:
         """Apply common filters to raw signal"""
-        if symbol not in self.indicators:
-            return {'direction': 0, 'strength': 0, 'confidence': 0, 'filtered': True}
-        
-        df = self.indicators[symbol]
-        if len(df) < 21:
+        rows = self._latest_rows(symbol)
+        if rows is None or rows[2] < 21:
             return {'direction': 0, 'strength': 0, 'confidence': 0, 'filtered': True}
         
-        latest = df.iloc[-1]
+        latest = rows[0]
         
         # Volatility filter - don't trade if too low volatility
         if latest['atr_pct'] < self.min_atr_pct:
@@ -112,7 +190,7 @@ def _apply_filters(self, symbol: str, raw_signal: Dict[str, Any]) -> Dict[str, A
             raw_signal['strength'] *= 0.8
         
         # Session filter (basic - can be enhanced)
-        current_hour = datetime.now().hour
+        current_hour = self.clock().hour
         # Reduce activity during low liquidity hours (2-6 AM UTC for crypto)
         if 2 <= current_hour <= 6:
             raw_signal['strength'] *= 0.7
@@ -122,14 +200,11 @@ def _apply_filters(self, symbol: str, raw_signal: Dict[str, Any]) -> Dict[str, A
     def calculate_position_size(self, symbol: str, signal_strength: float, 
                               balance: Decimal, k_factor: Decimal) -> Decimal:
         """Calculate position size with ATR-based sizing"""
-        if symbol not in self.indicators:
-            return Decimal('0')
-        
-        df = self.indicators[symbol]
-        if len(df) == 0:
+        rows = self._latest_rows(symbol)
+        if rows is None:
             return Decimal('0')
         
-        latest = df.iloc[-1]
+        latest = rows[0]
         current_price = Decimal(str(latest['close']))
         atr = Decimal(str(latest['atr']))
         
@@ -148,14 +223,11 @@ def calculate_position_size(self, symbol: str, signal_strength: float,
     
     def get_exit_signals(self, symbol: str, position: Dict[str, Any]) -> Dict[str, Any]:
         """Get exit signals for position"""
-        if symbol not in self.indicators:
-            return {'should_exit': False}
-        
-        df = self.indicators[symbol]
-        if len(df) == 0:
+        rows = self._latest_rows(symbol)
+        if rows is None:
             return {'should_exit': False}
         
-        latest = df.iloc[-1]
+        latest, _, bars = rows
         current_price = Decimal(str(latest['close']))
         entry_price = Decimal(str(position['entry_price']))
         entry_time = position['entry_time']
@@ -182,7 +254,7 @@ def get_exit_signals(self, symbol: str, position: Dict[str, Any]) -> Dict[str, A
                 return {'should_exit': True, 'reason': 'take_profit', 'urgency': 'medium'}
         
         # Max holding period
-        bars_held = len(df) - position.get('entry_bar', len(df))
+        bars_held = bars - position.get('entry_bar', bars)
         if bars_held >= self.max_hold_bars:
             return {'should_exit': True, 'reason': 'max_hold', 'urgency': 'medium'}
         
@@ -190,14 +262,14 @@ def get_exit_signals(self, symbol: str, position: Dict[str, Any]) -> Dict[str, A
     
     def get_trailing_stop(self, symbol: str, position: Dict[str, Any]) -> Optional[Decimal]:
         """Calculate trailing stop price"""
-        if symbol not in self.indicators or not self.params.get('use_trailing_stop', False):
+        if not self.params.get('use_trailing_stop', False):
             return None
         
-        df = self.indicators[symbol]
-        if len(df) == 0:
+        rows = self._latest_rows(symbol)
+        if rows is None:
             return None
         
-        latest = df.iloc[-1]
+        latest = rows[0]
         current_price = Decimal(str(latest['close']))
         atr = Decimal(str(latest['atr']))
         side = position['side']
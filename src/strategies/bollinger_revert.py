@@ -2,12 +2,13 @@
 Bollinger Bands Mean Reversion Strategy
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from decimal import Decimal
 import pandas as pd
 import numpy as np
 
-from .base import BaseStrategy
+from src.paper.indicator_graph import IndicatorGraph, Spec, expr
+from .base import BaseStrategy, ratio
 
 
 class BollingerRevertStrategy(BaseStrategy):
@@ -39,6 +40,38 @@ def __init__(self, params: Dict[str, Any] = None):
         self.bb_period = self.params['bb_period']
         self.bb_std = self.params['bb_std']
         self.revert_threshold = self.params['revert_threshold']
+        
+        self._ma = ('sma', 'close', self.bb_period)
+        self._std = ('std', 'close', self.bb_period)
+        self._width = expr(f'bb_width_{self.bb_period}_{self.bb_std}', self._band_width)
+        self._width_ma = ('sma', self._width[1], 10)
+        self._rsi = ('rsi', 'close', 14)
+        self._close_lag = ('lag', 'close', 5)
+    
+    def _band_width(self, v: Dict[Any, float]) -> float:
+        ma, std = v[self._ma], v[self._std]
+        return ratio((ma + std * self.bb_std) - (ma - std * self.bb_std), ma)
+    
+    def _strategy_specs(self) -> List[Spec]:
+        return [self._ma, self._std, self._width, self._width_ma, self._rsi, self._close_lag]
+    
+    def _strategy_row(self, graph: IndicatorGraph) -> Dict[str, Any]:
+        v = graph.values
+        ma, std, close = v[self._ma], v[self._std], v['close']
+        width, width_ma = v[self._width], v[self._width_ma]
+        return {
+            'bb_ma': ma,
+            'bb_std': std,
+            'bb_upper': ma + std * self.bb_std,
+            'bb_lower': ma - std * self.bb_std,
+            'bb_position': ratio(close - ma, std * self.bb_std),
+            'bb_width': width,
+            'bb_width_ma': width_ma,
+            'bb_width_ratio': ratio(width, width_ma),
+            'rsi': v[self._rsi],
+            'roc_5': ratio(close - v[self._close_lag], v[self._close_lag]),
+            'bb_squeeze': width < width_ma * 0.8
+        }
     
     def _calculate_strategy_indicators(self, symbol: str):
         """Calculate Bollinger Bands indicators"""
@@ -80,15 +113,11 @@ def _calculate_strategy_indicators(self, symbol: str):
     
     def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Dict[str, Any]]:
         """Generate Bollinger mean reversion signal"""
-        if symbol not in self.indicators:
+        rows = self._latest_rows(symbol)
+        if rows is None or rows[2] < self.bb_period + 20:
             return None
         
-        df = self.indicators[symbol]
-        if len(df) < self.bb_period + 20:
-            return None
-        
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
+        latest, prev, _ = rows
         
         signal = {
             'strategy': 'bollinger_revert',
@@ -190,7 +219,7 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Dict[str,
         if signal['direction'] != 0:
             # Mean reversion works better in ranging markets
             # Reduce strength in strong trends
-            if hasattr(latest, 'trend_regime'):
+            if 'trend_regime' in latest:
                 if abs(latest['trend_regime']) > 0:  # Strong trend
                     signal['strength'] *= 0.7
             
@@ -205,14 +234,11 @@ def get_exit_signals(self, symbol: str, position: Dict[str, Any]) -> Dict[str, A
         if base_exit['should_exit']:
             return base_exit
         
-        if symbol not in self.indicators:
-            return {'should_exit': False}
-        
-        df = self.indicators[symbol]
-        if len(df) == 0:
+        rows = self._latest_rows(symbol)
+        if rows is None:
             return {'should_exit': False}
         
-        latest = df.iloc[-1]
+        latest = rows[0]
         position_side = position['side']
         bb_pos = latest['bb_position']
         
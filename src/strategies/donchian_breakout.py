@@ -2,12 +2,13 @@
 Donchian Channel Breakout Strategy
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from decimal import Decimal
 import pandas as pd
 import numpy as np
 
-from .base import BaseStrategy
+from src.paper.indicator_graph import IndicatorGraph, Spec, expr
+from .base import BaseStrategy, ratio
 
 
 class DonchianBreakoutStrategy(BaseStrategy):
@@ -37,6 +38,33 @@ def __init__(self, params: Dict[str, Any] = None):
         self.donchian_period = self.params['donchian_period']
         self.breakout_strength = self.params['breakout_strength']
         self.trend_filter = self.params['trend_filter']
+        
+        period = self.donchian_period
+        self._high = ('max', 'high', period)
+        self._low = ('min', 'low', period)
+        self._width = expr(f'donchian_width_{period}',
+                           lambda v: ratio(v[self._high] - v[self._low], v['close']))
+        self._width_ma = ('sma', self._width[1], 20)
+    
+    def _strategy_specs(self) -> List[Spec]:
+        return [self._high, self._low, self._width, self._width_ma]
+    
+    def _strategy_row(self, graph: IndicatorGraph) -> Dict[str, Any]:
+        v, p = graph.values, graph.prev
+        high, low, close = v[self._high], v[self._low], v['close']
+        prev_high, prev_low = p.get(self._high, np.nan), p.get(self._low, np.nan)
+        prev_close = p.get('close', np.nan)
+        return {
+            'donchian_high': high,
+            'donchian_low': low,
+            'donchian_mid': (high + low) / 2,
+            'channel_width': v[self._width],
+            'channel_width_ma': v[self._width_ma],
+            'channel_width_ratio': ratio(v[self._width], v[self._width_ma]),
+            'upper_breakout': close > prev_high and prev_close <= prev_high,
+            'lower_breakout': close < prev_low and prev_close >= prev_low,
+            'channel_position': ratio(close - low, high - low)
+        }
     
     def _calculate_strategy_indicators(self, symbol: str):
         """Calculate Donchian Channel indicators"""
@@ -70,15 +98,11 @@ def _calculate_strategy_indicators(self, symbol: str):
     
     def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Dict[str, Any]]:
         """Generate Donchian breakout signal"""
-        if symbol not in self.indicators:
-            return None
-        
-        df = self.indicators[symbol]
-        if len(df) < self.donchian_period + 20:
+        rows = self._latest_rows(symbol)
+        if rows is None or rows[2] < self.donchian_period + 20:
             return None
         
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
+        latest, prev, _ = rows
         
         signal = {
             'strategy': 'donchian_breakout',
@@ -2,9 +2,17 @@
 """
 High-Frequency Grid Trading Monster
 Dynamic grid trading with volatility-based adjustments
+
+Grids are driven by price ticks: ``on_price`` looks the tick up in a
+per-symbol index of resting order prices and only wakes a grid when the
+move since the previous tick crossed one of its levels. The universe scan
+analyzes symbols concurrently over one batched market snapshot, and order
+placement is paced by a venue rate budget.
 """
 
 import asyncio
+import bisect
+import itertools
 import logging
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
@@ -18,6 +26,8 @@
 import ccxt
 from pathlib import Path
 
+from src.exchanges.base import RateLimiter, RequestPriority
+
 logger = logging.getLogger(__name__)
 
 class GridState(Enum):
@@ -96,6 +106,49 @@ class ActiveGrid:
     bb_lower: Decimal
     bb_middle: Decimal
 
+class GridPriceIndex:
+    """Sorted resting-order prices per symbol; a tick returns only the levels it crossed"""
+
+    def __init__(self):
+        self.prices: Dict[str, List[float]] = {}
+        self.entries: Dict[str, List[Tuple[int, str]]] = {}  # parallel to prices: (level_id, side)
+        self.last_price: Dict[str, float] = {}
+
+    def rebuild(self, grid: ActiveGrid):
+        """Index the grid's live (placed, unfilled) orders"""
+        live = sorted(
+            (float(level.price), level.level_id, level.side)
+            for level in grid.levels
+            if level.order_id and not level.filled
+        )
+        self.prices[grid.symbol] = [price for price, _, _ in live]
+        self.entries[grid.symbol] = [(level_id, side) for _, level_id, side in live]
+
+    def remove(self, symbol: str):
+        self.prices.pop(symbol, None)
+        self.entries.pop(symbol, None)
+        self.last_price.pop(symbol, None)
+
+    def crossed(self, symbol: str, price: float) -> List[int]:
+        """
+        Level ids whose orders the move from the previous tick to ``price``
+        reached, nearest first: buys on the way down, sells on the way up.
+        """
+        previous = self.last_price.get(symbol)
+        self.last_price[symbol] = price
+        prices = self.prices.get(symbol)
+        if previous is None or price == previous or not prices:
+            return []
+        entries = self.entries[symbol]
+        if price < previous:
+            lo = bisect.bisect_left(prices, price)
+            hi = bisect.bisect_left(prices, previous)
+            return [entries[i][0] for i in range(hi - 1, lo - 1, -1) if entries[i][1] == "buy"]
+        lo = bisect.bisect_right(prices, previous)
+        hi = bisect.bisect_right(prices, price)
+        return [entries[i][0] for i in range(lo, hi) if entries[i][1] == "sell"]
+
+
 class GridMonster:
     """High-frequency grid trading system"""
     
@@ -145,6 +198,20 @@ def __init__(self, config: Dict[str, Any] = None):
         self.order_timeout = config.get("order_timeout", 30)
         self.rebalance_interval = config.get("rebalance_interval", 300)  # 5 minutes
         self.adjustment_cooldown = config.get("adjustment_cooldown", 60)
+        self.scan_interval = config.get("scan_interval", 30)
+        self.scan_concurrency = config.get("scan_concurrency", 8)
+        # REST polling for active grids; set to 0 when a stream calls publish_price
+        self.price_poll_interval = config.get("price_poll_interval", 1.0)
+        self.spread_check_ttl = config.get("spread_check_ttl", 1.0)
+        # Scan volume/spread from one live tickers request instead of the mock lookups
+        self.live_market_data = config.get("live_market_data", False)
+        
+        # Venue order budget (place/cancel), shared by all grids
+        order_rate = config.get("order_rate_per_second", 10)
+        self.order_budget = RateLimiter(
+            requests_per_second=order_rate,
+            burst=config.get("order_burst", max(1, int(order_rate)))
+        )
         
         # API credentials
         self.api_key = config.get("api_key")
@@ -157,6 +224,12 @@ def __init__(self, config: Dict[str, Any] = None):
         self.order_map: Dict[str, Tuple[str, int]] = {}  # order_id -> (grid_id, level_id)
         self.price_history: Dict[str, deque] = {}
         self.volume_history: Dict[str, deque] = {}
+        self.price_index = GridPriceIndex()
+        self._ticks: asyncio.Queue = asyncio.Queue()
+        self._order_seq = itertools.count(1)
+        self._market_exchange = None
+        self._spread_checks: Dict[str, Tuple[float, bool]] = {}
+        self.monitor_stats = {"ticks": 0, "grid_wakeups": 0, "crossings": 0}
         
         # Statistics
         self.total_profit = Decimal("0")
@@ -184,9 +257,10 @@ async def initialize(self):
         self.tasks = [
             asyncio.create_task(self._coin_scanner()),
             asyncio.create_task(self._grid_monitor()),
-            asyncio.create_task(self._adjustment_monitor()),
-            asyncio.create_task(self._order_fill_handler())
+            asyncio.create_task(self._adjustment_monitor())
         ]
+        if self.price_poll_interval > 0:
+            self.tasks.append(asyncio.create_task(self._price_poller()))
         
         logger.info("Grid Monster initialized")
     
@@ -202,9 +276,10 @@ async def _coin_scanner(self):
             try:
                 # Get all symbols
                 symbols = await self._get_active_symbols()
+                results = await self.scan_universe(symbols)
                 
                 for symbol in symbols:
-                    metrics = await self._analyze_coin(symbol)
+                    metrics = results.get(symbol)
                     
                     if metrics and metrics.suitable_for_grid:
                         self.coin_metrics[symbol] = metrics
@@ -213,20 +288,74 @@ async def _coin_scanner(self):
                         if symbol not in self.active_grids and len(self.active_grids) < self.max_grids:
                             await self.start_grid(symbol)
                 
-                await asyncio.sleep(30)  # Scan every 30 seconds
+                await asyncio.sleep(self.scan_interval)
                 
             except Exception as e:
                 logger.error(f"Error in coin scanner: {e}")
                 await asyncio.sleep(10)
     
+    async def scan_universe(self, symbols: List[str]) -> Dict[str, CoinMetrics]:
+        """Analyze ``symbols`` concurrently (at most ``scan_concurrency`` at once)"""
+        market = await self._get_market_snapshot(symbols)
+        semaphore = asyncio.Semaphore(self.scan_concurrency)
+        
+        async def analyze(symbol: str) -> Optional[CoinMetrics]:
+            async with semaphore:
+                return await self._analyze_coin(symbol, market.get(symbol))
+        
+        results = await asyncio.gather(*(analyze(symbol) for symbol in symbols))
+        return {metrics.symbol: metrics for metrics in results if metrics}
+    
+    async def _get_market_snapshot(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        24h quote volume and relative spread for all symbols.
+        
+        With ``live_market_data`` this is one fetch_tickers request on the
+        shared exchange client; symbols it does not cover (or every symbol,
+        without live data or when the request fails) are looked up
+        concurrently through the per-symbol helpers.
+        """
+        snapshot: Dict[str, Dict[str, float]] = {}
+        if self.live_market_data:
+            try:
+                tickers = await asyncio.to_thread(self._market_client().fetch_tickers)
+                by_id = {symbol.replace('/', ''): ticker for symbol, ticker in tickers.items()}
+                for symbol in symbols:
+                    ticker = tickers.get(symbol) or by_id.get(symbol.replace('/', ''))
+                    if not ticker or not ticker.get('bid') or not ticker.get('ask'):
+                        continue
+                    mid = (ticker['bid'] + ticker['ask']) / 2
+                    snapshot[symbol] = {
+                        "volume_24h": float(ticker.get('quoteVolume') or 0.0),
+                        "spread": (ticker['ask'] - ticker['bid']) / mid
+                    }
+            except Exception as e:
+                logger.error(f"Error fetching market snapshot: {e}")
+        
+        missing = [symbol for symbol in symbols if symbol not in snapshot]
+        if missing:
+            rows = await asyncio.gather(*(
+                asyncio.gather(self._get_24h_volume(symbol), self._get_spread(symbol))
+                for symbol in missing
+            ))
+            for symbol, (volume_24h, spread) in zip(missing, rows):
+                snapshot[symbol] = {"volume_24h": volume_24h, "spread": spread}
+        return snapshot
+    
+    def _market_client(self):
+        """Shared ccxt client for tickers and spread checks"""
+        if self._market_exchange is None:
+            self._market_exchange = ccxt.binance({'enableRateLimit': True})
+        return self._market_exchange
+    
     async def _get_active_symbols(self) -> List[str]:
         """Get list of active trading symbols (mock)"""
         # Mock implementation
         return ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT", 
                 "DOGEUSDT", "XRPUSDT", "DOTUSDT", "UNIUSDT", "LINKUSDT"]
     
-    async def _analyze_coin(self, symbol: str) -> Optional[CoinMetrics]:
-        """Analyze coin for grid suitability"""
+    async def _analyze_coin(self, symbol: str, market: Optional[Dict[str, float]] = None) -> Optional[CoinMetrics]:
+        """Analyze coin for grid suitability (``market``: snapshot row, fetched if missing)"""
         try:
             # Get price history
             prices = await self._get_price_history(symbol, 100)
@@ -238,7 +367,7 @@ async def _analyze_coin(self, symbol: str) -> Optional[CoinMetrics]:
             atr_percentage = (atr / prices[-1]) * 100
             
             # Get volume
-            volume_24h = await self._get_24h_volume(symbol)
+            volume_24h = market["volume_24h"] if market else await self._get_24h_volume(symbol)
             
             # Calculate trend
             trend_direction, trend_strength = self._calculate_trend(prices)
@@ -247,7 +376,7 @@ async def _analyze_coin(self, symbol: str) -> Optional[CoinMetrics]:
             volatility = np.std([p for p in prices[-20:]]) / np.mean(prices[-20:])
             
             # Get spread
-            spread = await self._get_spread(symbol)
+            spread = market["spread"] if market else await self._get_spread(symbol)
             
             # Calculate liquidity score
             liquidity_score = min(volume_24h / 1000000, 100)  # Normalize to 0-100
@@ -482,51 +611,65 @@ def _create_grid_levels(self, setup: GridSetup) -> List[GridLevel]:
         return levels
     
     async def _place_grid_orders(self, grid: ActiveGrid):
-        """Place all grid orders"""
+        """Place all grid orders (concurrently, paced by the order budget)"""
         logger.info(f"Placing {len(grid.levels)} orders for {grid.symbol}")
         
-        for level in grid.levels:
-            if not level.filled and not level.order_id:
-                order_id = await self._place_limit_order(
-                    grid.symbol,
-                    level.side,
-                    level.price,
-                    level.size
-                )
-                
-                if order_id:
-                    level.order_id = order_id
-                    self.order_map[order_id] = (grid.grid_id, level.level_id)
+        pending = [level for level in grid.levels if not level.filled and not level.order_id]
+        if self.paper_mode:
+            await self._spread_allows(grid.symbol)  # one ticker fetch for the whole batch
+        order_ids = await asyncio.gather(*(
+            self._place_limit_order(grid.symbol, level.side, level.price, level.size)
+            for level in pending
+        ))
+        
+        for level, order_id in zip(pending, order_ids):
+            if order_id:
+                level.order_id = order_id
+                self.order_map[order_id] = (grid.grid_id, level.level_id)
+        
+        self.price_index.rebuild(grid)
+    
+    async def _spread_allows(self, symbol: str) -> bool:
+        """Spread gate, cached per symbol for ``spread_check_ttl`` seconds"""
+        now = time.monotonic()
+        cached = self._spread_checks.get(symbol)
+        if cached and now - cached[0] < self.spread_check_ttl:
+            return cached[1]
+        
+        allowed = True
+        try:
+            # Get current spread from exchange (shared client, off the event loop)
+            ticker = await asyncio.to_thread(self._market_client().fetch_ticker, symbol.replace('/', ''))
+            bid = ticker['bid']
+            ask = ticker['ask']
+            mid = (bid + ask) / 2
+            spread_pct = (ask - bid) / mid * 100
+            
+            # Check spread gate
+            min_spread = self.spread_gate_multiplier * self.fee_pct
+            if spread_pct < min_spread:
+                logger.warning(f"Spread too tight: {spread_pct:.3f}% < {min_spread:.3f}%")
+                allowed = False
                 
-                await asyncio.sleep(0.1)  # Rate limiting
+        except Exception as e:
+            logger.error(f"Error checking spread: {e}")
+        
+        self._spread_checks[symbol] = (time.monotonic(), allowed)
+        return allowed
     
     async def _place_limit_order(self, symbol: str, side: str, price: Decimal, size: Decimal) -> str:
         """Place limit order with maker-only and spread checks"""
         
         # Trade gate: Check spread
-        if self.paper_mode:
-            # Get current spread from exchange
-            try:
-                exchange = ccxt.binance({'enableRateLimit': True})
-                ticker = exchange.fetch_ticker(symbol.replace('/', ''))
-                bid = ticker['bid']
-                ask = ticker['ask']
-                mid = (bid + ask) / 2
-                spread_pct = (ask - bid) / mid * 100
-                
-                # Check spread gate
-                min_spread = self.spread_gate_multiplier * self.fee_pct
-                if spread_pct < min_spread:
-                    logger.warning(f"Spread too tight: {spread_pct:.3f}% < {min_spread:.3f}%")
-                    return None
-                    
-            except Exception as e:
-                logger.error(f"Error checking spread: {e}")
+        if self.paper_mode and not await self._spread_allows(symbol):
+            return None
+        
+        await self.order_budget.acquire(priority=RequestPriority.ORDER)
         
         # Use LIMIT_MAKER for real orders (paper mode simulates this)
         order_type = "LIMIT_MAKER" if self.maker_only else "LIMIT"
         
-        order_id = f"order_{symbol}_{side}_{int(time.time() * 1000)}"
+        order_id = f"order_{symbol}_{side}_{int(time.time() * 1000)}_{next(self._order_seq)}"
         logger.info(f"Placed {order_type} {side} order {order_id}: {size:.4f} @ {price:.2f}")
         
         # Schedule cancellation if unfilled
@@ -559,41 +702,81 @@ async def _cancel_unfilled_after(self, order_id: str, seconds: int):
                             level.order_id = new_order_id
                             self.order_map[new_order_id] = (grid_id, level_id)
     
+    def publish_price(self, symbol: str, price: Decimal):
+        """Queue a price tick (called by a market data stream or the poller)"""
+        self._ticks.put_nowait((symbol, price))
+    
     async def _grid_monitor(self):
-        """Monitor active grids"""
+        """Apply price ticks to the grids they affect"""
         while self.running:
+            symbol, price = await self._ticks.get()
             try:
-                # Check daily DD kill-switch
-                current_dd_pct = float(self.daily_pnl / self.daily_start_balance * 100)
-                if current_dd_pct < -self.daily_max_drawdown_pct and not self.kill_switch_active:
-                    logger.error(f"Daily DD limit hit: {current_dd_pct:.2f}%")
-                    self.kill_switch_active = True
-                    # Close all positions
-                    for grid in list(self.active_grids.values()):
-                        await self._close_grid(grid)
-                    logger.info("Kill switch activated - all grids closed")
-                    
-                if not self.kill_switch_active:
-                    for symbol, grid in list(self.active_grids.items()):
-                        if grid.state == GridState.ACTIVE:
-                            # Check if price left range
-                            current_price = await self._get_current_price(symbol)
-                            
-                            if current_price > grid.setup.upper_price * Decimal("1.02") or \
-                               current_price < grid.setup.lower_price * Decimal("0.98"):
-                                logger.info(f"Price left range for {symbol}, resetting grid")
-                                await self._reset_grid(grid)
-                            
-                            # Check profitability
-                            if grid.profit_realized > grid.setup.total_capital * Decimal("0.1"):
-                                logger.info(f"Grid {grid.grid_id} reached profit target")
-                                await self._close_grid(grid)
-                
-                await asyncio.sleep(5)
-                
+                await self.on_price(symbol, price)
             except Exception as e:
                 logger.error(f"Error in grid monitor: {e}")
-                await asyncio.sleep(5)
+    
+    async def _price_poller(self):
+        """Poll current prices of active grids when no stream publishes ticks"""
+        while self.running:
+            try:
+                symbols = list(self.active_grids)
+                prices = await asyncio.gather(*(self._get_current_price(symbol) for symbol in symbols))
+                for symbol, price in zip(symbols, prices):
+                    self.publish_price(symbol, price)
+            except Exception as e:
+                logger.error(f"Error polling prices: {e}")
+            await asyncio.sleep(self.price_poll_interval)
+    
+    async def on_price(self, symbol: str, price: Decimal):
+        """
+        Handle one tick for ``symbol``.
+
+        Leaving the range (2% outside the band) resets the grid. Otherwise
+        the grid is only touched if the move crossed a resting order level;
+        those orders are filled (paper fill on touch) nearest first.
+        """
+        self.monitor_stats["ticks"] += 1
+        crossed = self.price_index.crossed(symbol, float(price))
+        grid = self.active_grids.get(symbol)
+        if grid is None or grid.state != GridState.ACTIVE or self.kill_switch_active:
+            return
+        
+        # Check if price left range
+        if price > grid.setup.upper_price * Decimal("1.02") or \
+           price < grid.setup.lower_price * Decimal("0.98"):
+            logger.info(f"Price left range for {symbol}, resetting grid")
+            await self._reset_grid(grid)
+            return
+        
+        if not crossed:
+            return
+        
+        self.monitor_stats["grid_wakeups"] += 1
+        levels = {level.level_id: level for level in grid.levels}
+        for level_id in crossed:
+            level = levels.get(level_id)
+            if level is not None and level.order_id and not level.filled:
+                self.monitor_stats["crossings"] += 1
+                await self._handle_filled_order(grid, level)
+        self.price_index.rebuild(grid)
+        
+        # Check profitability
+        if grid.profit_realized > grid.setup.total_capital * Decimal("0.1"):
+            logger.info(f"Grid {grid.grid_id} reached profit target")
+            await self._close_grid(grid)
+        
+        await self._check_kill_switch()
+    
+    async def _check_kill_switch(self):
+        """Daily DD kill-switch: close everything once the loss limit is hit"""
+        current_dd_pct = float(self.daily_pnl / self.daily_start_balance * 100)
+        if current_dd_pct < -self.daily_max_drawdown_pct and not self.kill_switch_active:
+            logger.error(f"Daily DD limit hit: {current_dd_pct:.2f}%")
+            self.kill_switch_active = True
+            # Close all positions
+            for grid in list(self.active_grids.values()):
+                await self._close_grid(grid)
+            logger.info("Kill switch activated - all grids closed")
     
     async def _adjustment_monitor(self):
         """Monitor and adjust grids based on market conditions"""
@@ -701,24 +884,7 @@ async def _reduce_grid_levels(self, grid: ActiveGrid):
                     orders_to_cancel -= 1
             
             grid.setup.num_levels -= 5
-    
-    async def _order_fill_handler(self):
-        """Handle filled orders"""
-        while self.running:
-            try:
-                # Check for filled orders (mock)
-                for grid in self.active_grids.values():
-                    for level in grid.levels:
-                        if level.order_id and not level.filled:
-                            # Mock fill simulation
-                            if np.random.random() < 0.1:  # 10% chance of fill
-                                await self._handle_filled_order(grid, level)
-                
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error in order fill handler: {e}")
-                await asyncio.sleep(1)
+            self.price_index.rebuild(grid)
     
     async def _handle_filled_order(self, grid: ActiveGrid, level: GridLevel):
         """Handle a filled order"""
@@ -825,6 +991,7 @@ async def _close_grid(self, grid: ActiveGrid):
             
             # Remove from active grids
             del self.active_grids[grid.symbol]
+            self.price_index.remove(grid.symbol)
             
             logger.info(f"Grid {grid.grid_id} closed. Profit: {grid.profit_realized:.2f}")
             
@@ -833,20 +1000,23 @@ async def _close_grid(self, grid: ActiveGrid):
     
     async def _cancel_unfilled_orders(self, grid: ActiveGrid):
         """Cancel unfilled orders"""
-        for level in grid.levels:
-            if level.order_id and not level.filled:
-                await self._cancel_order(level.order_id)
-                level.order_id = None
+        levels = [level for level in grid.levels if level.order_id and not level.filled]
+        await asyncio.gather(*(self._cancel_order(level.order_id) for level in levels))
+        for level in levels:
+            level.order_id = None
+        self.price_index.rebuild(grid)
     
     async def _cancel_all_orders(self, grid: ActiveGrid):
         """Cancel all orders for a grid"""
-        for level in grid.levels:
-            if level.order_id:
-                await self._cancel_order(level.order_id)
-                level.order_id = None
+        levels = [level for level in grid.levels if level.order_id]
+        await asyncio.gather(*(self._cancel_order(level.order_id) for level in levels))
+        for level in levels:
+            level.order_id = None
+        self.price_index.rebuild(grid)
     
     async def _cancel_order(self, order_id: str):
         """Cancel an order (mock)"""
+        await self.order_budget.acquire(priority=RequestPriority.ORDER)
         logger.debug(f"Cancelled order {order_id}")
         if order_id in self.order_map:
             del self.order_map[order_id]
@@ -877,7 +1047,8 @@ def get_statistics(self) -> Dict[str, Any]:
             "failed_grids": self.failed_grids,
             "success_rate": (self.successful_grids / max(self.successful_grids + self.failed_grids, 1)) * 100,
             "active_capital": float(active_capital),
-            "suitable_coins": len([m for m in self.coin_metrics.values() if m.suitable_for_grid])
+            "suitable_coins": len([m for m in self.coin_metrics.values() if m.suitable_for_grid]),
+            **self.monitor_stats
         }
     
     def get_grid_details(self, symbol: str) -> Optional[Dict[str, Any]]:
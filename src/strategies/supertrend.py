@@ -2,12 +2,13 @@
 SuperTrend Strategy
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from decimal import Decimal
 import pandas as pd
 import numpy as np
 
-from .base import BaseStrategy
+from src.paper.indicator_graph import IndicatorGraph, Node, Spec, expr
+from .base import BaseStrategy, ratio
 
 
 class SuperTrendStrategy(BaseStrategy):
@@ -36,6 +37,30 @@ def __init__(self, params: Dict[str, Any] = None):
         super().__init__(default_params)
         self.atr_length = self.params['atr_length']
         self.factor = self.params['factor']
+        
+        self._atr = ('atr', None, self.atr_length)
+        name = f'supertrend_{self.atr_length}_{self.factor}'
+        self._bands = ('custom', name, lambda: _SuperTrendNode(self._atr, self.factor))
+        self._strength = expr(f'{name}_strength',
+                              lambda v: ratio(abs(v['close'] - v[self._bands][3]), v[self._atr]))
+        self._strength_ma = ('sma', self._strength[1], 10)
+    
+    def _strategy_specs(self) -> List[Spec]:
+        return [self._atr, self._bands, self._strength, self._strength_ma]
+    
+    def _strategy_row(self, graph: IndicatorGraph) -> Dict[str, Any]:
+        v = graph.values
+        final_upper, final_lower, direction, supertrend, change = v[self._bands]
+        return {
+            'st_atr': v[self._atr],
+            'final_upper_band': final_upper,
+            'final_lower_band': final_lower,
+            'supertrend': supertrend,
+            'st_direction': direction,
+            'st_direction_change': change,
+            'trend_strength': v[self._strength],
+            'trend_strength_ma': v[self._strength_ma]
+        }
     
     def _calculate_strategy_indicators(self, symbol: str):
         """Calculate SuperTrend indicators"""
@@ -60,41 +85,16 @@ def _calculate_strategy_indicators(self, symbol: str):
         df['upper_band'] = df['hl2'] + (self.factor * df['st_atr'])
         df['lower_band'] = df['hl2'] - (self.factor * df['st_atr'])
         
-        # Initialize SuperTrend arrays
-        df['final_upper_band'] = df['upper_band'].copy()
-        df['final_lower_band'] = df['lower_band'].copy()
-        df['supertrend'] = 0.0
-        df['st_direction'] = 1  # 1 for up, -1 for down
-        
-        # Calculate final bands and SuperTrend
-        for i in range(1, len(df)):
-            # Final upper band
-            if df['upper_band'].iloc[i] < df['final_upper_band'].iloc[i-1] or \
-               df['close'].iloc[i-1] > df['final_upper_band'].iloc[i-1]:
-                df.iloc[i, df.columns.get_loc('final_upper_band')] = df['upper_band'].iloc[i]
-            else:
-                df.iloc[i, df.columns.get_loc('final_upper_band')] = df['final_upper_band'].iloc[i-1]
-            
-            # Final lower band
-            if df['lower_band'].iloc[i] > df['final_lower_band'].iloc[i-1] or \
-               df['close'].iloc[i-1] < df['final_lower_band'].iloc[i-1]:
-                df.iloc[i, df.columns.get_loc('final_lower_band')] = df['lower_band'].iloc[i]
-            else:
-                df.iloc[i, df.columns.get_loc('final_lower_band')] = df['final_lower_band'].iloc[i-1]
-            
-            # SuperTrend direction
-            if df['close'].iloc[i] <= df['final_lower_band'].iloc[i]:
-                df.iloc[i, df.columns.get_loc('st_direction')] = -1
-            elif df['close'].iloc[i] >= df['final_upper_band'].iloc[i]:
-                df.iloc[i, df.columns.get_loc('st_direction')] = 1
-            else:
-                df.iloc[i, df.columns.get_loc('st_direction')] = df['st_direction'].iloc[i-1]
-            
-            # SuperTrend value
-            if df['st_direction'].iloc[i] == 1:
-                df.iloc[i, df.columns.get_loc('supertrend')] = df['final_lower_band'].iloc[i]
-            else:
-                df.iloc[i, df.columns.get_loc('supertrend')] = df['final_upper_band'].iloc[i]
+        # Final bands and direction are path dependent; run the recursion on arrays
+        final_upper, final_lower, direction, supertrend = _supertrend_bands(
+            df['upper_band'].to_numpy(dtype=float),
+            df['lower_band'].to_numpy(dtype=float),
+            df['close'].to_numpy(dtype=float)
+        )
+        df['final_upper_band'] = final_upper
+        df['final_lower_band'] = final_lower
+        df['supertrend'] = supertrend
+        df['st_direction'] = direction
         
         # Detect direction changes
         df['st_direction_change'] = df['st_direction'].diff().fillna(0)
@@ -107,15 +107,11 @@ def _calculate_strategy_indicators(self, symbol: str):
     
     def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Dict[str, Any]]:
         """Generate SuperTrend signal"""
-        if symbol not in self.indicators:
+        rows = self._latest_rows(symbol)
+        if rows is None or rows[2] < self.atr_length + 20:
             return None
         
-        df = self.indicators[symbol]
-        if len(df) < self.atr_length + 20:
-            return None
-        
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
+        latest, prev, _ = rows
         
         signal = {
             'strategy': 'supertrend',
@@ -150,7 +146,7 @@ def get_signal(self, symbol: str, current_price: Decimal) -> Optional[Dict[str,
             confidence = 0.6
             
             # Trend alignment with longer EMA
-            if hasattr(latest, 'trend_regime'):
+            if 'trend_regime' in latest:
                 if (signal['direction'] == 1 and latest['trend_regime'] >= 0) or \
                    (signal['direction'] == -1 and latest['trend_regime'] <= 0):
                     confidence += 0.15
@@ -187,14 +183,11 @@ def get_exit_signals(self, symbol: str, position: Dict[str, Any]) -> Dict[str, A
             return base_exit
         
         # SuperTrend exit logic
-        if symbol not in self.indicators:
-            return {'should_exit': False}
-        
-        df = self.indicators[symbol]
-        if len(df) == 0:
+        rows = self._latest_rows(symbol)
+        if rows is None:
             return {'should_exit': False}
         
-        latest = df.iloc[-1]
+        latest = rows[0]
         position_side = position['side']
         
         # Exit on SuperTrend direction change
@@ -212,4 +205,69 @@ def get_exit_signals(self, symbol: str, position: Dict[str, Any]) -> Dict[str, A
         elif position_side == 'short' and current_price > supertrend_price:
             return {'should_exit': True, 'reason': 'supertrend_cross', 'urgency': 'high'}
         
-        return {'should_exit': False}
\ No newline at end of file
+        return {'should_exit': False}
+
+
+def _supertrend_bands(upper: np.ndarray, lower: np.ndarray, close: np.ndarray):
+    """Final upper/lower bands, direction and SuperTrend line"""
+    n = len(close)
+    final_upper = upper.copy()
+    final_lower = lower.copy()
+    direction = np.ones(n, dtype=int)
+    supertrend = np.zeros(n)
+    
+    for i in range(1, n):
+        if not (upper[i] < final_upper[i-1] or close[i-1] > final_upper[i-1]):
+            final_upper[i] = final_upper[i-1]
+        if not (lower[i] > final_lower[i-1] or close[i-1] < final_lower[i-1]):
+            final_lower[i] = final_lower[i-1]
+        
+        if close[i] <= final_lower[i]:
+            direction[i] = -1
+        elif close[i] >= final_upper[i]:
+            direction[i] = 1
+        else:
+            direction[i] = direction[i-1]
+        
+        supertrend[i] = final_lower[i] if direction[i] == 1 else final_upper[i]
+    
+    return final_upper, final_lower, direction, supertrend
+
+
+
+class _SuperTrendNode(Node):
+    """Incremental form of ``_supertrend_bands`` plus the direction change"""
+    
+    def __init__(self, atr: Spec, factor: float):
+        self.atr = atr
+        self.factor = factor
+        self.last: Optional[Tuple[float, float, int, float]] = None  # bands, direction, close
+        self._prev: List[Optional[Tuple[float, float, int, float]]] = []
+    
+    def update(self, values: Dict[Any, Any]) -> Tuple[float, float, int, float, int]:
+        hl2 = (values['high'] + values['low']) / 2
+        upper = hl2 + self.factor * values[self.atr]
+        lower = hl2 - self.factor * values[self.atr]
+        close = values['close']
+        
+        if self.last is None:
+            final_upper, final_lower, direction, supertrend, change = upper, lower, 1, 0.0, 0
+        else:
+            prev_upper, prev_lower, prev_direction, prev_close = self.last
+            final_upper = upper if (upper < prev_upper or prev_close > prev_upper) else prev_upper
+            final_lower = lower if (lower > prev_lower or prev_close < prev_lower) else prev_lower
+            if close <= final_lower:
+                direction = -1
+            elif close >= final_upper:
+                direction = 1
+            else:
+                direction = prev_direction
+            supertrend = final_lower if direction == 1 else final_upper
+            change = direction - prev_direction
+        
+        self._prev = [self.last]
+        self.last = (final_upper, final_lower, direction, close)
+        return final_upper, final_lower, direction, supertrend, change
+    
+    def rollback(self):
+        self.last = self._prev.pop()
@@ -9,8 +9,10 @@
 - Market Cap weighted allocation
 """
 
+import hashlib
 import logging
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from enum import Enum
 import numpy as np
 import pandas as pd
@@ -27,14 +29,28 @@ class AssetAllocator:
     Implements various asset allocation strategies for multi-asset portfolios
     """
     
-    def __init__(self, lookback_period: int = 60):
+    CACHE_SIZE = 32
+    
+    def __init__(
+        self,
+        lookback_period: int = 60,
+        covariance_estimator: str = "sample",
+        ewma_halflife: float = 30.0
+    ):
         """
         Initialize Asset Allocator
         
         Args:
             lookback_period: Number of periods to look back for calculations
+            covariance_estimator: "sample", "ledoit_wolf" (shrinkage) or "ewma"
+            ewma_halflife: Half-life in periods for the EWMA estimator
         """
         self.lookback_period = lookback_period
+        self.covariance_estimator = covariance_estimator
+        self.ewma_halflife = ewma_halflife
+        
+        # Results keyed by (kind, input-data hash, params), shared across methods
+        self._cache: "OrderedDict[Tuple, Any]" = OrderedDict()
         
     def calculate_allocation(
         self,
@@ -205,6 +221,12 @@ def _market_cap_allocation(
     
     def _calculate_volatilities(self, price_data: Dict[str, List[float]]) -> Dict[str, float]:
         """Calculate annualized volatility for each asset"""
+        return dict(self._cached(
+            ("volatilities", self._data_hash(price_data)),
+            lambda: self._compute_volatilities(price_data)
+        ))
+    
+    def _compute_volatilities(self, price_data: Dict[str, List[float]]) -> Dict[str, float]:
         volatilities = {}
         
         for symbol, prices in price_data.items():
@@ -255,63 +277,93 @@ def optimize_allocation(
         if n_assets == 1:
             return {symbols[0]: 1.0}
         
-        # Calculate returns and covariance matrix
-        returns_data = self._prepare_returns_data(price_data)
+        # Calculate returns and covariance matrix (cached per input data)
+        moments = self._get_moments(price_data)
         
-        if returns_data is None or returns_data.empty:
+        if moments is None:
             return self._equal_weight_allocation(symbols)
         
-        expected_returns = returns_data.mean() * 252  # Annualized
-        cov_matrix = returns_data.cov() * 252  # Annualized
+        valid_symbols, expected_returns, cov_matrix = moments
+        weights = self._solve_min_variance(
+            expected_returns,
+            cov_matrix,
+            target_return=target_return,
+            max_volatility=max_volatility,
+            bounds=(min_weight, max_weight)
+        )
+        
+        if weights is None:
+            logger.warning("Optimization failed, using equal weights")
+            return self._equal_weight_allocation(symbols)
         
-        # Optimization objective: minimize portfolio variance
-        def objective(weights):
-            portfolio_var = np.dot(weights, np.dot(cov_matrix.values, weights))
-            return portfolio_var
+        return self._to_allocation(symbols, valid_symbols, weights)
+    
+    def _solve_min_variance(
+        self,
+        expected_returns: np.ndarray,
+        cov_matrix: np.ndarray,
+        target_return: Optional[float] = None,
+        max_volatility: Optional[float] = None,
+        bounds: Tuple[float, float] = (0.0, 1.0),
+        x0: Optional[np.ndarray] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Minimum-variance weights subject to budget, optional target return,
+        optional volatility cap and per-asset bounds.
         
-        # Constraints
-        constraints = [{'type': 'eq', 'fun': lambda x: np.sum(x) - 1}]  # Weights sum to 1
+        Tries the closed-form (equality-constrained) solution first and only
+        falls back to SLSQP, with analytic gradients, when a bound binds.
+        """
+        n_assets = len(expected_returns)
+        min_weight, max_weight = bounds
+        
+        if max_volatility is None:
+            weights = _closed_form_min_variance(expected_returns, cov_matrix, target_return)
+            if (
+                weights is not None
+                and weights.min() >= min_weight - 1e-10
+                and weights.max() <= max_weight + 1e-10
+            ):
+                return np.clip(weights, min_weight, max_weight)
+        
+        ones = np.ones(n_assets)
+        constraints = [
+            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: ones}
+        ]  # Weights sum to 1
         
-        # Target return constraint
         if target_return is not None:
             constraints.append({
                 'type': 'eq',
-                'fun': lambda x: np.dot(x, expected_returns.values) - target_return
+                'fun': lambda x: np.dot(x, expected_returns) - target_return,
+                'jac': lambda x: expected_returns
             })
         
-        # Maximum volatility constraint
         if max_volatility is not None:
             constraints.append({
                 'type': 'ineq',
-                'fun': lambda x: max_volatility**2 - np.dot(x, np.dot(cov_matrix.values, x))
+                'fun': lambda x: max_volatility**2 - np.dot(x, np.dot(cov_matrix, x)),
+                'jac': lambda x: -2 * np.dot(cov_matrix, x)
             })
         
-        # Bounds for weights
-        bounds = [(min_weight, max_weight) for _ in range(n_assets)]
-        
-        # Initial guess (equal weights)
-        initial_weights = np.array([1.0 / n_assets] * n_assets)
+        if x0 is None:
+            x0 = np.full(n_assets, 1.0 / n_assets)
         
         try:
-            # Optimize
             result = minimize(
-                objective,
-                initial_weights,
+                lambda x: np.dot(x, np.dot(cov_matrix, x)),
+                x0,
+                jac=lambda x: 2 * np.dot(cov_matrix, x),
                 method='SLSQP',
-                bounds=bounds,
-                constraints=constraints
+                bounds=[(min_weight, max_weight)] * n_assets,
+                constraints=constraints,
+                # Variances are ~1e-3; SLSQP's default absolute ftol (1e-6) stops early
+                options={'ftol': 1e-12}
             )
-            
-            if result.success:
-                optimal_weights = result.x
-                return {symbol: weight for symbol, weight in zip(symbols, optimal_weights)}
-            else:
-                logger.warning("Optimization failed, using equal weights")
-                return self._equal_weight_allocation(symbols)
-                
         except Exception as e:
             logger.error(f"Optimization error: {e}")
-            return self._equal_weight_allocation(symbols)
+            return None
+        
+        return result.x if result.success else None
     
     def _prepare_returns_data(self, price_data: Dict[str, List[float]]) -> Optional[pd.DataFrame]:
         """Prepare returns data for optimization"""
@@ -337,40 +389,69 @@ def _prepare_returns_data(self, price_data: Dict[str, List[float]]) -> Optional[
     def calculate_efficient_frontier(
         self,
         price_data: Dict[str, List[float]],
-        num_points: int = 50
+        num_points: int = 50,
+        min_weight: float = 0.0,
+        max_weight: float = 1.0
     ) -> List[Dict[str, float]]:
         """
         Calculate efficient frontier portfolios
         
+        Returns and covariance are estimated once; each point is warm-started
+        from the previous solution. Frontiers are cached per input data.
+        
         Args:
             price_data: Historical price data
             num_points: Number of points on frontier
+            min_weight: Minimum weight per asset (negative allows shorts)
+            max_weight: Maximum weight per asset
             
         Returns:
             List of portfolio allocations along efficient frontier
         """
-        returns_data = self._prepare_returns_data(price_data)
+        key = (
+            "frontier", self._data_hash(price_data), self.covariance_estimator,
+            self.ewma_halflife, num_points, min_weight, max_weight
+        )
+        frontier = self._cached(
+            key, lambda: self._compute_frontier(price_data, num_points, (min_weight, max_weight))
+        )
+        return [dict(allocation) for allocation in frontier]
+    
+    def _compute_frontier(
+        self,
+        price_data: Dict[str, List[float]],
+        num_points: int,
+        bounds: Tuple[float, float]
+    ) -> List[Dict[str, float]]:
+        symbols = list(price_data.keys())
+        moments = self._get_moments(price_data)
         
-        if returns_data is None or returns_data.empty:
-            return [self._equal_weight_allocation(list(price_data.keys()))]
+        if moments is None:
+            return [self._equal_weight_allocation(symbols)]
         
-        expected_returns = returns_data.mean() * 252
-        min_return = expected_returns.min()
-        max_return = expected_returns.max()
+        valid_symbols, expected_returns, cov_matrix = moments
+        if len(valid_symbols) == 1:
+            return [self._to_allocation(symbols, valid_symbols, np.ones(1))] * num_points
         
         # Generate target returns
-        target_returns = np.linspace(min_return, max_return, num_points)
+        target_returns = np.linspace(expected_returns.min(), expected_returns.max(), num_points)
         
         efficient_portfolios = []
+        previous = None
         
         for target_return in target_returns:
-            allocation = self.optimize_allocation(
-                price_data,
+            weights = self._solve_min_variance(
+                expected_returns,
+                cov_matrix,
                 target_return=target_return,
-                max_weight=1.0,  # Allow full allocation for frontier
-                min_weight=0.0
+                bounds=bounds,
+                x0=previous
             )
-            efficient_portfolios.append(allocation)
+            if weights is None:
+                efficient_portfolios.append(self._equal_weight_allocation(symbols))
+                continue
+            previous = weights
+            efficient_portfolios.append(self._to_allocation(symbols, valid_symbols, weights))
         
         return efficient_portfolios
     
@@ -385,50 +466,195 @@ def calculate_sharpe_optimal(self, price_data: Dict[str, List[float]], risk_free
         Returns:
             Optimal allocation weights
         """
-        returns_data = self._prepare_returns_data(price_data)
+        symbols = list(price_data.keys())
+        key = (
+            "sharpe", self._data_hash(price_data), self.covariance_estimator,
+            self.ewma_halflife, risk_free_rate
+        )
+        return dict(self._cached(
+            key, lambda: self._compute_sharpe_optimal(price_data, symbols, risk_free_rate)
+        ))
+    
+    def _compute_sharpe_optimal(
+        self,
+        price_data: Dict[str, List[float]],
+        symbols: List[str],
+        risk_free_rate: float
+    ) -> Dict[str, float]:
+        moments = self._get_moments(price_data)
         
-        if returns_data is None or returns_data.empty:
-            return self._equal_weight_allocation(list(price_data.keys()))
+        if moments is None:
+            return self._equal_weight_allocation(symbols)
         
-        expected_returns = returns_data.mean() * 252
-        cov_matrix = returns_data.cov() * 252
+        valid_symbols, expected_returns, cov_matrix = moments
+        n_assets = len(valid_symbols)
         
         # Objective: maximize Sharpe ratio = minimize -Sharpe ratio
         def objective(weights):
-            portfolio_return = np.dot(weights, expected_returns.values)
-            portfolio_var = np.dot(weights, np.dot(cov_matrix.values, weights))
-            portfolio_vol = np.sqrt(portfolio_var)
-            
+            excess = np.dot(weights, expected_returns) - risk_free_rate
+            portfolio_vol = np.sqrt(np.dot(weights, np.dot(cov_matrix, weights)))
             if portfolio_vol == 0:
                 return -np.inf
-            
-            sharpe_ratio = (portfolio_return - risk_free_rate) / portfolio_vol
-            return -sharpe_ratio  # Negative because we're minimizing
+            return -excess / portfolio_vol
         
-        symbols = list(price_data.keys())
-        n_assets = len(symbols)
+        def gradient(weights):
+            excess = np.dot(weights, expected_returns) - risk_free_rate
+            cov_w = np.dot(cov_matrix, weights)
+            portfolio_vol = np.sqrt(np.dot(weights, cov_w))
+            if portfolio_vol == 0:
+                return np.zeros(n_assets)
+            return -(expected_returns / portfolio_vol - excess * cov_w / portfolio_vol**3)
+        
+        # Start from the tangency portfolio when it is long-only
+        initial_weights = _closed_form_tangency(expected_returns, cov_matrix, risk_free_rate)
+        if initial_weights is not None and initial_weights.min() >= -1e-10:
+            return self._to_allocation(symbols, valid_symbols, np.clip(initial_weights, 0, 1))
+        initial_weights = np.full(n_assets, 1.0 / n_assets)
         
-        # Constraints and bounds
-        constraints = [{'type': 'eq', 'fun': lambda x: np.sum(x) - 1}]
+        ones = np.ones(n_assets)
+        constraints = [{'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: ones}]
         bounds = [(0, 1) for _ in range(n_assets)]
-        initial_weights = np.array([1.0 / n_assets] * n_assets)
         
         try:
             result = minimize(
                 objective,
                 initial_weights,
+                jac=gradient,
                 method='SLSQP',
                 bounds=bounds,
                 constraints=constraints
             )
             
             if result.success:
-                optimal_weights = result.x
-                return {symbol: weight for symbol, weight in zip(symbols, optimal_weights)}
+                return self._to_allocation(symbols, valid_symbols, result.x)
             else:
                 logger.warning("Sharpe optimization failed, using equal weights")
                 return self._equal_weight_allocation(symbols)
                 
         except Exception as e:
             logger.error(f"Sharpe optimization error: {e}")
-            return self._equal_weight_allocation(symbols)
\ No newline at end of file
+            return self._equal_weight_allocation(symbols)
+    
+    def _get_moments(
+        self,
+        price_data: Dict[str, List[float]]
+    ) -> Optional[Tuple[List[str], np.ndarray, np.ndarray]]:
+        """Annualized expected returns and covariance, cached per input data"""
+        key = ("moments", self._data_hash(price_data), self.covariance_estimator, self.ewma_halflife)
+        return self._cached(key, lambda: self._estimate_moments(price_data))
+    
+    def _estimate_moments(
+        self,
+        price_data: Dict[str, List[float]]
+    ) -> Optional[Tuple[List[str], np.ndarray, np.ndarray]]:
+        returns_data = self._prepare_returns_data(price_data)
+        
+        if returns_data is None or returns_data.empty:
+            return None
+        
+        returns = returns_data.values
+        
+        if self.covariance_estimator == "ewma":
+            alpha = 1.0 - 0.5 ** (1.0 / self.ewma_halflife)
+            decay = (1.0 - alpha) ** np.arange(len(returns) - 1, -1, -1)
+            decay /= decay.sum()
+            mean = decay @ returns
+            centered = returns - mean
+            cov = (centered * decay[:, None]).T @ centered
+        elif self.covariance_estimator == "ledoit_wolf":
+            mean = returns.mean(axis=0)
+            cov = _ledoit_wolf(returns)
+        else:
+            mean = returns.mean(axis=0)
+            cov = np.cov(returns, rowvar=False, ddof=1)
+        
+        return list(returns_data.columns), mean * 252, np.atleast_2d(cov) * 252
+    
+    def _cached(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """LRU lookup shared by frontier, Sharpe, risk parity and volatility calls"""
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        value = compute()
+        self._cache[key] = value
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return value
+    
+    @staticmethod
+    def _data_hash(price_data: Dict[str, List[float]]) -> str:
+        """Stable hash of the input price histories"""
+        digest = hashlib.sha1()
+        for symbol, prices in price_data.items():
+            digest.update(symbol.encode())
+            digest.update(np.asarray(prices, dtype=float).tobytes())
+            digest.update(b"|")
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _to_allocation(
+        symbols: List[str],
+        valid_symbols: List[str],
+        weights: np.ndarray
+    ) -> Dict[str, float]:
+        """Map solved weights back to every requested symbol (0 for those without data)"""
+        solved = dict(zip(valid_symbols, weights))
+        return {symbol: float(solved.get(symbol, 0.0)) for symbol in symbols}
+
+
+def _closed_form_min_variance(
+    expected_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    target_return: Optional[float] = None
+) -> Optional[np.ndarray]:
+    """Markowitz solution with only budget (and target return) equalities"""
+    ones = np.ones(len(expected_returns))
+    try:
+        inv_ones = np.linalg.solve(cov_matrix, ones)
+        inv_mu = np.linalg.solve(cov_matrix, expected_returns)
+    except np.linalg.LinAlgError:
+        return None
+    
+    a = ones @ inv_ones
+    if target_return is None:
+        return inv_ones / a if a > 0 else None
+    
+    b = ones @ inv_mu
+    c = expected_returns @ inv_mu
+    d = a * c - b * b
+    if abs(d) < 1e-12:
+        return None
+    return ((c - target_return * b) * inv_ones + (target_return * a - b) * inv_mu) / d
+
+
+def _closed_form_tangency(
+    expected_returns: np.ndarray,
+    cov_matrix: np.ndarray,
+    risk_free_rate: float
+) -> Optional[np.ndarray]:
+    """Unconstrained maximum-Sharpe (tangency) portfolio"""
+    try:
+        raw = np.linalg.solve(cov_matrix, expected_returns - risk_free_rate)
+    except np.linalg.LinAlgError:
+        return None
+    total = raw.sum()
+    if total <= 1e-12:
+        return None
+    return raw / total
+
+
+def _ledoit_wolf(returns: np.ndarray) -> np.ndarray:
+    """Ledoit-Wolf shrinkage of the sample covariance towards a scaled identity"""
+    n_obs, n_assets = returns.shape
+    centered = returns - returns.mean(axis=0)
+    sample = centered.T @ centered / n_obs
+    mu = np.trace(sample) / n_assets
+    target = mu * np.eye(n_assets)
+    
+    d2 = np.sum((sample - target) ** 2) / n_assets
+    if d2 == 0:
+        return sample
+    row_norms = np.sum(centered ** 2, axis=1)
+    b_bar2 = (np.sum(row_norms ** 2) - n_obs * np.sum(sample ** 2)) / (n_obs ** 2 * n_assets)
+    shrinkage = min(b_bar2, d2) / d2
+    return shrinkage * target + (1 - shrinkage) * sample
@@ -9,11 +9,13 @@
 """
 
 import asyncio
+import math
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
 from pydantic import BaseModel
 
+from .currency_graph import Cycle, CurrencyGraph
 from .market_adapter import MarketData, MarketType, Order, OrderSide, OrderType
 
 
@@ -44,6 +46,8 @@ class TriangularArbitrage(BaseModel):
     path: List[str]  # Trading path
     volumes: List[float]
     timestamp: datetime
+    market: Optional[str] = None  # Venue all legs trade on
+    currencies: List[str] = []  # Currencies held before each leg
 
 
 class ArbitrageConfig(BaseModel):
@@ -54,6 +58,7 @@ class ArbitrageConfig(BaseModel):
     scan_interval: int = 1  # Seconds between scans
     execution_delay: int = 100  # Milliseconds max execution delay
     include_fees: bool = True
+    max_cycle_legs: int = 3  # Longest multi-leg cycle to search for
     markets_to_scan: List[str] = ["binance", "coinbase", "kraken"]
 
 
@@ -80,6 +85,9 @@ def __init__(self, config: ArbitrageConfig):
             "coinbase": 0.005,  # 0.5%
             "kraken": 0.002,  # 0.2%
         }
+        # Per-venue currency graphs and the profitable cycles currently in them
+        self.currency_graphs: Dict[str, CurrencyGraph] = {}
+        self.active_cycles: Dict[str, Dict[Tuple[str, ...], Cycle]] = {}
         
     async def scan_cross_exchange(self, symbol: str) -> List[ArbitrageOpportunity]:
         """Scan for cross-exchange arbitrage opportunities."""
@@ -124,51 +132,59 @@ async def scan_cross_exchange(self, symbol: str) -> List[ArbitrageOpportunity]:
                         
         return opportunities
         
-    async def scan_triangular(self, base_currency: str = "USDT") -> List[TriangularArbitrage]:
-        """Scan for triangular arbitrage opportunities."""
+    async def scan_triangular(self, base_currency: Optional[str] = "USDT") -> List[TriangularArbitrage]:
+        """
+        Scan for triangular (multi-leg) arbitrage opportunities.
+
+        Cycles are maintained incrementally by ``update_market_data``; this
+        only filters them. Only cycles through ``base_currency`` are returned,
+        entered at it (pass None for all cycles).
+        """
         opportunities = []
         
-        # Example triangular path: USDT -> BTC -> ETH -> USDT
-        paths = [
-            ["BTC/USDT", "ETH/BTC", "ETH/USDT"],
-            ["BTC/USDT", "BNB/BTC", "BNB/USDT"],
-            ["ETH/USDT", "BNB/ETH", "BNB/USDT"],
-        ]
-        
-        for path in paths:
-            profit = await self._calculate_triangular_profit(path)
-            if profit > self.config.min_spread_pct:
+        for market, cycles in self.active_cycles.items():
+            for cycle in cycles.values():
+                if cycle.profit_pct <= self.config.min_spread_pct:
+                    continue
+                if base_currency is not None:
+                    if base_currency not in cycle.currencies:
+                        continue
+                    cycle = cycle.rotated(base_currency)
+                path = list(cycle.symbols)
                 opportunity = TriangularArbitrage(
                     pair1=path[0],
                     pair2=path[1],
-                    pair3=path[2],
-                    profit_pct=profit,
+                    pair3=path[-1],
+                    profit_pct=cycle.profit_pct,
                     path=path,
-                    volumes=[1000.0, 0.0, 0.0],  # Simplified
-                    timestamp=datetime.utcnow()
+                    volumes=[1000.0] + [0.0] * (len(path) - 1),  # Simplified
+                    timestamp=datetime.utcnow(),
+                    market=market,
+                    currencies=list(cycle.currencies)
                 )
                 opportunities.append(opportunity)
                 
+        opportunities.sort(key=lambda o: o.profit_pct, reverse=True)
         return opportunities
         
-    async def _calculate_triangular_profit(self, path: List[str]) -> float:
-        """Calculate profit for a triangular arbitrage path."""
-        # Simplified calculation - would need actual market data
-        # Start with 1 unit of base currency
-        amount = 1.0
-        
-        for pair in path:
-            # Mock price conversion
-            if "BTC" in pair:
-                amount *= 0.000022  # Example BTC price
-            elif "ETH" in pair:
-                amount *= 0.00055  # Example ETH price
-            else:
-                amount *= 1.0
-                
-        # Calculate profit percentage
-        profit_pct = (amount - 1.0) * 100
-        return profit_pct
+    async def _calculate_triangular_profit(self, path: List[str], base_currency: str = "USDT",
+                                           market: Optional[str] = None) -> float:
+        """
+        Calculate profit for a triangular arbitrage path.
+
+        Starts with ``base_currency`` on ``market`` (default: the first
+        scanned market with data) and trades each pair at the top of book,
+        net of fees. Returns -100.0 if a leg cannot be traded.
+        """
+        if market is None:
+            market = next((m for m in self.config.markets_to_scan if m in self.currency_graphs), None)
+        graph = self.currency_graphs.get(market)
+        if graph is None:
+            return -100.0
+        weight = graph.path_weight(base_currency, path)
+        if weight is None:
+            return -100.0
+        return math.expm1(-weight) * 100
         
     async def scan_statistical(self, pairs: List[Tuple[str, str]]) -> List[ArbitrageOpportunity]:
         """Scan for statistical arbitrage (pairs trading) opportunities."""
@@ -276,6 +292,26 @@ async def update_market_data(self, market: str, symbol: str, data: MarketData) -
         if market not in self.market_data:
             self.market_data[market] = {}
         self.market_data[market][symbol] = data
+        if "/" in symbol:
+            self._update_cycles(market, symbol, data)
+        
+    def _currency_graph(self, market: str) -> CurrencyGraph:
+        graph = self.currency_graphs.get(market)
+        if graph is None:
+            fee = self.fee_structure.get(market, 0.002) if self.config.include_fees else 0.0
+            graph = CurrencyGraph(max_legs=self.config.max_cycle_legs, fee=fee)
+            self.currency_graphs[market] = graph
+            self.active_cycles[market] = {}
+        return graph
+        
+    def _update_cycles(self, market: str, symbol: str, data: MarketData) -> None:
+        """Re-evaluate only the cycles that trade the updated book."""
+        found = self._currency_graph(market).update_book(symbol, data.bid, data.ask)
+        cycles = self.active_cycles[market]
+        for key in [k for k, c in cycles.items() if symbol in c.symbols]:
+            del cycles[key]
+        for cycle in found:
+            cycles[cycle.key] = cycle
         
     async def start_scanning(self) -> None:
         """Start continuous scanning for opportunities."""
@@ -302,8 +338,8 @@ async def start_scanning(self) -> None:
                         ArbitrageOpportunity(
                             type="triangular",
                             symbol=tri.pair1,
-                            buy_market="exchange1",
-                            sell_market="exchange1",
+                            buy_market=tri.market or "exchange1",
+                            sell_market=tri.market or "exchange1",
                             buy_price=0.0,
                             sell_price=0.0,
                             spread=tri.profit_pct,
@@ -13,6 +13,8 @@
 from typing import Dict, List, Optional, Tuple
 
 from pydantic import BaseModel
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
 
 
 class CorrelationMatrix(BaseModel):
@@ -70,6 +72,7 @@ def __init__(self):
         self.price_data: Dict[str, List[float]] = {}
         self.correlation_cache: Dict[str, CorrelationMatrix] = {}
         self.current_regime: Optional[MarketRegime] = None
+        self.streaming: Optional["StreamingCorrelation"] = None
         
     def add_price_data(self, symbol: str, prices: List[float]) -> None:
         """Add price data for a symbol."""
@@ -82,16 +85,26 @@ def calculate_correlation_matrix(
     ) -> CorrelationMatrix:
         """Calculate correlation matrix for given symbols."""
         n = len(symbols)
-        matrix = [[0.0] * n for _ in range(n)]
-        
-        for i, symbol1 in enumerate(symbols):
-            for j, symbol2 in enumerate(symbols):
-                if i == j:
-                    matrix[i][j] = 1.0
-                else:
-                    corr = self._calculate_correlation(symbol1, symbol2, period)
-                    matrix[i][j] = corr
-                    matrix[j][i] = corr  # Symmetric
+        corr = np.eye(n)
+        
+        # Pairs only correlate over equal-length windows, so group by window length
+        # and compute each group with one matrix product.
+        groups: Dict[int, List[int]] = {}
+        for i, symbol in enumerate(symbols):
+            if symbol in self.price_data:
+                length = len(self.price_data[symbol][-period:])
+                if length >= 2:
+                    groups.setdefault(length, []).append(i)
+                    
+        for length, idx in groups.items():
+            prices = np.array(
+                [self.price_data[symbols[i]][-period:] for i in idx], dtype=float
+            ).T
+            block = _corr_from_returns(np.diff(prices, axis=0) / prices[:-1])
+            corr[np.ix_(idx, idx)] = block
+            
+        np.fill_diagonal(corr, 1.0)
+        matrix = corr.tolist()
                     
         result = CorrelationMatrix(
             symbols=symbols,
@@ -215,30 +228,73 @@ def find_lead_lag_relationships(
     ) -> List[LeadLagRelationship]:
         """Find lead-lag relationships between symbols."""
         relationships = []
+        if max_lag < 1:
+            return relationships
+            
+        lagged = self.lagged_correlation_tensor(symbols, max_lag)
+        
+        # Strongest lag per pair (first lag wins ties, as in a sequential scan)
+        best_idx = np.argmax(np.abs(lagged), axis=0)
+        best_corr = np.take_along_axis(lagged, best_idx[None, :, :], axis=0)[0]
         
         for i, symbol1 in enumerate(symbols):
-            for symbol2 in symbols[i+1:]:
-                best_lag = 0
-                best_corr = 0.0
-                
-                for lag in range(1, max_lag + 1):
-                    corr = self._calculate_lagged_correlation(symbol1, symbol2, lag)
-                    if abs(corr) > abs(best_corr):
-                        best_corr = corr
-                        best_lag = lag
-                        
-                if abs(best_corr) > 0.5:  # Significant correlation
+            for j in range(i + 1, len(symbols)):
+                corr = float(best_corr[i, j])
+                if abs(corr) > 0.5:  # Significant correlation
+                    symbol2 = symbols[j]
                     rel = LeadLagRelationship(
-                        leader=symbol1 if best_corr > 0 else symbol2,
-                        follower=symbol2 if best_corr > 0 else symbol1,
-                        lag_periods=best_lag,
-                        correlation=abs(best_corr),
-                        confidence=min(abs(best_corr), 0.9)
+                        leader=symbol1 if corr > 0 else symbol2,
+                        follower=symbol2 if corr > 0 else symbol1,
+                        lag_periods=int(best_idx[i, j]) + 1,
+                        correlation=abs(corr),
+                        confidence=min(abs(corr), 0.9)
                     )
                     relationships.append(rel)
                     
         return relationships
         
+    def lagged_correlation_tensor(
+        self,
+        symbols: List[str],
+        max_lag: int = 5,
+        window: int = 20
+    ) -> np.ndarray:
+        """
+        Correlations of every symbol lagged by 1..max_lag against every other.
+        
+        Returns an array of shape (max_lag, N, N) where [lag-1, i, j] is the
+        correlation of symbol i's returns `lag` bars earlier with symbol j's
+        latest returns, both over a `window`-price span.
+        """
+        n = len(symbols)
+        out = np.zeros((max_lag, n, n))
+        lengths = np.array([len(self.price_data.get(s, [])) for s in symbols])
+        usable = [i for i in range(n) if lengths[i] >= window + 1]
+        if not usable or max_lag < 1:
+            return out
+            
+        # Tail-aligned prices; shorter histories are masked per lag below
+        span = min(window + max_lag, int(lengths[usable].max()))
+        prices = np.full((span, len(usable)), np.nan)
+        for col, i in enumerate(usable):
+            tail = self.price_data[symbols[i]][-span:]
+            prices[span - len(tail):, col] = tail
+        returns = np.diff(prices, axis=0) / prices[:-1]
+        
+        steps = window - 1
+        latest = _standardize(returns[-steps:])
+        for lag in range(1, max_lag + 1):
+            if steps + lag > len(returns):
+                break
+            shifted = _standardize(returns[-steps - lag:-lag])
+            block = shifted.T @ latest / steps
+            ok = lengths[usable] >= lag + window
+            block[~ok, :] = 0.0
+            block[:, ~ok] = 0.0
+            out[lag - 1][np.ix_(usable, usable)] = np.nan_to_num(block)
+            
+        return out
+        
     def _calculate_lagged_correlation(
         self, 
         symbol1: str, 
@@ -369,25 +425,145 @@ def get_correlation_clusters(
         symbols: List[str], 
         threshold: float = 0.7
     ) -> List[List[str]]:
-        """Find clusters of highly correlated assets."""
+        """Find clusters of highly correlated assets.
+
+        Average-linkage hierarchical clustering on 1 - |corr|, cut at
+        1 - threshold; singletons are dropped.
+        """
+        if len(symbols) < 2:
+            return []
+            
         corr_matrix = self.calculate_correlation_matrix(symbols)
-        clusters = []
-        used = set()
+        distance = 1.0 - np.abs(np.asarray(corr_matrix.matrix))
+        distance = np.clip((distance + distance.T) / 2, 0.0, None)
+        np.fill_diagonal(distance, 0.0)
         
-        for i, symbol1 in enumerate(symbols):
-            if symbol1 in used:
-                continue
-                
-            cluster = [symbol1]
-            used.add(symbol1)
+        tree = linkage(squareform(distance, checks=False), method="average")
+        labels = fcluster(tree, t=1.0 - threshold, criterion="distance")
+        
+        clusters: Dict[int, List[str]] = {}
+        for symbol, label in zip(symbols, labels):
+            clusters.setdefault(int(label), []).append(symbol)
             
-            for j, symbol2 in enumerate(symbols):
-                if i != j and symbol2 not in used:
-                    if abs(corr_matrix.matrix[i][j]) >= threshold:
-                        cluster.append(symbol2)
-                        used.add(symbol2)
-                        
-            if len(cluster) > 1:
-                clusters.append(cluster)
-                
-        return clusters
\ No newline at end of file
+        return [cluster for cluster in clusters.values() if len(cluster) > 1]
+        
+    def update_bar(self, bar: Dict[str, float]) -> None:
+        """Append the latest close for each symbol and update streaming correlations."""
+        for symbol, price in bar.items():
+            self.price_data.setdefault(symbol, []).append(price)
+        if self.streaming is not None:
+            self.streaming.update(bar)
+            
+    def enable_streaming(
+        self,
+        symbols: List[str],
+        window: int = 30,
+        halflife: float = 20.0
+    ) -> "StreamingCorrelation":
+        """Track rolling and EWMA correlations for `symbols`, updated per bar."""
+        self.streaming = StreamingCorrelation(symbols, window=window, halflife=halflife)
+        for symbol in symbols:
+            prices = self.price_data.get(symbol)
+            if prices:
+                self.streaming.last_prices[self.streaming.index[symbol]] = prices[-1]
+        return self.streaming
+
+
+class StreamingCorrelation:
+    """
+    Incremental rolling-window and EWMA correlation over a fixed symbol set.
+    
+    Each bar costs O(N^2) regardless of history length: the rolling window keeps
+    running sums of returns and cross-products, the EWMA keeps a mean vector and
+    covariance matrix.
+    """
+    
+    def __init__(self, symbols: List[str], window: int = 30, halflife: float = 20.0):
+        """Initialize streaming correlation state."""
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.window = window
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        
+        n = len(self.symbols)
+        self.last_prices = np.full(n, np.nan)
+        self.buffer = np.zeros((window, n))
+        self.count = 0
+        self.sum = np.zeros(n)
+        self.sum_xy = np.zeros((n, n))
+        self.ewm_mean = np.zeros(n)
+        self.ewm_cov = np.zeros((n, n))
+        self.ewm_count = 0
+        
+    def update(self, bar: Dict[str, float]) -> None:
+        """Consume one bar of prices; symbols missing from the bar get a 0 return."""
+        prices = self.last_prices.copy()
+        for symbol, price in bar.items():
+            i = self.index.get(symbol)
+            if i is not None:
+                prices[i] = price
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.nan_to_num((prices - self.last_prices) / self.last_prices)
+        had_prices = not np.all(np.isnan(self.last_prices))
+        self.last_prices = prices
+        if not had_prices:
+            return
+            
+        # Rolling window: add new, drop the return falling out of the ring
+        slot = self.count % self.window
+        if self.count >= self.window:
+            old = self.buffer[slot]
+            self.sum -= old
+            self.sum_xy -= np.outer(old, old)
+        self.buffer[slot] = r
+        self.sum += r
+        self.sum_xy += np.outer(r, r)
+        self.count += 1
+        
+        # EWMA mean/covariance
+        if self.ewm_count == 0:
+            self.ewm_mean = r.copy()
+        else:
+            delta = r - self.ewm_mean
+            self.ewm_mean += self.alpha * delta
+            self.ewm_cov = (1 - self.alpha) * (self.ewm_cov + self.alpha * np.outer(delta, delta))
+        self.ewm_count += 1
+        
+    def rolling_correlation(self) -> np.ndarray:
+        """Correlation over the last `window` returns."""
+        n = min(self.count, self.window)
+        if n < 2:
+            return np.eye(len(self.symbols))
+        mean = self.sum / n
+        cov = self.sum_xy / n - np.outer(mean, mean)
+        return _corr_from_cov(cov)
+        
+    def ewma_correlation(self) -> np.ndarray:
+        """Exponentially weighted correlation."""
+        if self.ewm_count < 2:
+            return np.eye(len(self.symbols))
+        return _corr_from_cov(self.ewm_cov)
+
+
+def _corr_from_cov(cov: np.ndarray) -> np.ndarray:
+    """Normalize a covariance matrix; zero-variance assets get 0 off-diagonal."""
+    std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    denom = np.outer(std, std)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.where(denom > 1e-24, cov / denom, 0.0)
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _corr_from_returns(returns: np.ndarray) -> np.ndarray:
+    """Pearson correlation of the columns of a (T x N) returns matrix."""
+    centered = returns - returns.mean(axis=0)
+    return _corr_from_cov(centered.T @ centered / len(returns))
+
+
+def _standardize(returns: np.ndarray) -> np.ndarray:
+    """Z-score columns (population std); constant columns become 0."""
+    centered = returns - returns.mean(axis=0)
+    std = centered.std(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0, centered / std, 0.0)
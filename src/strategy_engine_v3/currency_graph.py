@@ -0,0 +1,192 @@
+"""
+Currency Graph - Multi-leg arbitrage cycles as negative-weight cycles.
+
+Every listed market BASE/QUOTE contributes two directed edges between
+currencies, priced at the top of book and net of the taker fee:
+
+- sell BASE at the bid:  BASE -> QUOTE, rate = bid * (1 - fee)
+- buy BASE at the ask:   QUOTE -> BASE, rate = (1 - fee) / ask
+
+Edge weights are -log(rate), so a round trip whose rates multiply to more
+than 1 is a cycle with negative total weight. When one book changes, only
+cycles through its two edges can have changed sign, so detection is a
+bounded search from the updated edge back to its source instead of a scan
+of the whole graph.
+"""
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+PROFIT_EPSILON = 1e-12
+
+
+class Edge(NamedTuple):
+    """One tradeable conversion between two currencies."""
+
+    src: str
+    dst: str
+    symbol: str
+    side: str  # "buy" or "sell" of the market's base currency
+    price: float
+    rate: float  # units of dst received per unit of src, net of fees
+    weight: float  # -log(rate)
+
+
+@dataclass(frozen=True)
+class Cycle:
+    """A closed sequence of conversions starting and ending in ``currencies[0]``."""
+
+    currencies: Tuple[str, ...]
+    legs: Tuple[Edge, ...]
+    weight: float
+
+    @property
+    def profit_pct(self) -> float:
+        return math.expm1(-self.weight) * 100
+
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        return tuple(leg.symbol for leg in self.legs)
+
+    @property
+    def key(self) -> Tuple[str, ...]:
+        """Rotation-independent identity (direction still matters)."""
+        start = self.currencies.index(min(self.currencies))
+        return self.currencies[start:] + self.currencies[:start]
+
+    def rotated(self, start: str) -> "Cycle":
+        """Same cycle, entered and exited at ``start``."""
+        i = self.currencies.index(start)
+        return Cycle(self.currencies[i:] + self.currencies[:i], self.legs[i:] + self.legs[:i], self.weight)
+
+
+class CurrencyGraph:
+    """
+    Directed currency graph of one venue's order books.
+
+    Cycles need at least three legs (a two-leg round trip is a single
+    market's spread) and at most ``max_legs``.
+    """
+
+    def __init__(self, max_legs: int = 3, fee: float = 0.0):
+        """Initialize an empty graph."""
+        if max_legs < 3:
+            raise ValueError("max_legs must be at least 3")
+        self.max_legs = max_legs
+        self.fee = fee
+        self.out: Dict[str, Dict[str, Edge]] = defaultdict(dict)
+        self.markets: Dict[str, Tuple[str, str]] = {}
+        self.stats = {"updates": 0, "paths_checked": 0}
+
+    def update_book(self, symbol: str, bid: float, ask: float,
+                    fee: Optional[float] = None) -> List[Cycle]:
+        """
+        Reprice ``symbol`` and return the profitable cycles that trade it.
+
+        A non-positive bid or ask removes that side's edge.
+        """
+        base, quote = self._split(symbol)
+        fee = self.fee if fee is None else fee
+        self.stats["updates"] += 1
+
+        self._set_edge(base, quote, symbol, "sell", bid, bid * (1 - fee) if bid > 0 else 0.0)
+        self._set_edge(quote, base, symbol, "buy", ask, (1 - fee) / ask if ask > 0 else 0.0)
+
+        found: Dict[Tuple[str, ...], Cycle] = {}
+        for src, dst in ((base, quote), (quote, base)):
+            for cycle in self.cycles_through(src, dst):
+                found[cycle.key] = cycle
+        return list(found.values())
+
+    def remove_market(self, symbol: str):
+        """Drop both edges of ``symbol``."""
+        base, quote = self._split(symbol)
+        del self.markets[symbol]
+        for src, dst in ((base, quote), (quote, base)):
+            edge = self.out[src].get(dst)
+            if edge is not None and edge.symbol == symbol:
+                del self.out[src][dst]
+
+    def cycles_through(self, src: str, dst: str) -> List[Cycle]:
+        """Profitable cycles that use the edge ``src -> dst``."""
+        first = self.out[src].get(dst)
+        if first is None:
+            return []
+
+        found = []
+        out = self.out
+        max_inner = self.max_legs - 1
+
+        # Depth-first over simple paths dst -> ... -> src with at most max_inner edges
+        stack = [(dst, (first,), first.weight, frozenset((src, dst)))]
+        while stack:
+            node, legs, weight, seen = stack.pop()
+            remaining = max_inner - (len(legs) - 1)
+            if len(legs) >= 2:
+                self._close(src, node, legs, weight, found)
+            if remaining == 2:
+                # Last inner edge: close each neighbour directly instead of pushing it
+                for nxt, edge in out[node].items():
+                    if nxt not in seen and src in out[nxt]:
+                        self._close(src, nxt, legs + (edge,), weight + edge.weight, found)
+            elif remaining > 2:
+                for nxt, edge in out[node].items():
+                    if nxt not in seen:
+                        stack.append((nxt, legs + (edge,), weight + edge.weight, seen | {nxt}))
+        return found
+
+    def _close(self, src: str, node: str, legs: Tuple[Edge, ...], weight: float,
+               found: List[Cycle]):
+        closing = self.out[node].get(src)
+        if closing is None:
+            return
+        self.stats["paths_checked"] += 1
+        total = weight + closing.weight
+        if total < -PROFIT_EPSILON:
+            path = legs + (closing,)
+            found.append(Cycle(tuple(e.src for e in path), path, total))
+
+    def find_all_cycles(self) -> List[Cycle]:
+        """Every profitable cycle in the graph (full rescan)."""
+        found: Dict[Tuple[str, ...], Cycle] = {}
+        for src in list(self.out):
+            for dst in list(self.out[src]):
+                for cycle in self.cycles_through(src, dst):
+                    found.setdefault(cycle.key, cycle)
+        return sorted(found.values(), key=lambda c: c.weight)
+
+    def path_weight(self, start: str, symbols: Iterable[str]) -> Optional[float]:
+        """
+        Total weight of converting ``start`` through ``symbols`` in order.
+
+        Each market is traded in whichever direction converts the currency
+        currently held. Returns None if a leg is not tradeable.
+        """
+        held = start
+        weight = 0.0
+        for symbol in symbols:
+            base, quote = self._split(symbol)
+            if held not in (base, quote):
+                return None
+            nxt = quote if held == base else base
+            edge = self.out[held].get(nxt)
+            if edge is None or edge.symbol != symbol:
+                return None
+            weight += edge.weight
+            held = nxt
+        return weight
+
+    def _set_edge(self, src: str, dst: str, symbol: str, side: str, price: float, rate: float):
+        if rate > 0:
+            self.out[src][dst] = Edge(src, dst, symbol, side, price, rate, -math.log(rate))
+        else:
+            self.out[src].pop(dst, None)
+
+    def _split(self, symbol: str) -> Tuple[str, str]:
+        pair = self.markets.get(symbol)
+        if pair is None:
+            base, quote = symbol.split("/")
+            pair = self.markets[symbol] = (base, quote)
+        return pair
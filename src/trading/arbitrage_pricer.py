@@ -4,14 +4,86 @@
 """
 
 import yaml
+import numpy as np
 from pathlib import Path
 from decimal import Decimal, ROUND_DOWN
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class DepthCurve:
+    """
+    One side of an order book as a piecewise-linear cost curve.
+
+    ``qty_edges``/``notional_edges`` are the cumulative size and cost at each
+    level boundary (starting at 0), so the cost of any quantity, the quantity
+    bought with any notional and the VWAP are O(log levels) lookups.
+    """
+    
+    def __init__(self, levels: List[List[float]]):
+        book = np.asarray(levels, dtype=float).reshape(-1, 2)
+        self.prices = book[:, 0]
+        self.sizes = book[:, 1]
+        self.qty_edges = np.concatenate(([0.0], np.cumsum(self.sizes)))
+        self.notional_edges = np.concatenate(([0.0], np.cumsum(self.prices * self.sizes)))
+        
+    def __len__(self) -> int:
+        return len(self.prices)
+        
+    @property
+    def total_qty(self) -> float:
+        return float(self.qty_edges[-1])
+        
+    @property
+    def best_price(self) -> float:
+        return float(self.prices[0]) if len(self) else 0.0
+        
+    def _level(self, edges: np.ndarray, x):
+        """Index of the level whose range [edges[i], edges[i+1]) holds ``x``"""
+        # minimum/maximum rather than clip: much cheaper on scalars
+        return np.minimum(np.maximum(np.searchsorted(edges, x, side='right') - 1, 0), len(self) - 1)
+        
+    def notional(self, qty):
+        """Cost of taking ``qty`` from the top (capped at the book's depth)"""
+        qty = np.minimum(np.maximum(qty, 0.0), self.qty_edges[-1])
+        level = self._level(self.qty_edges, qty)
+        return self.notional_edges[level] + self.prices[level] * (qty - self.qty_edges[level])
+        
+    def quantity(self, notional):
+        """Quantity taken from the top for a given cost (capped at the book's depth)"""
+        notional = np.minimum(np.maximum(notional, 0.0), self.notional_edges[-1])
+        level = self._level(self.notional_edges, notional)
+        return self.qty_edges[level] + (notional - self.notional_edges[level]) / self.prices[level]
+        
+    def marginal_price(self, qty):
+        """Price of the level the next unit after ``qty`` is taken from"""
+        return self.prices[self._level(self.qty_edges, qty)]
+        
+    def vwap(self, qty: float) -> Tuple[float, float]:
+        """(vwap, filled quantity) for taking ``qty``"""
+        filled = min(float(qty), self.total_qty)
+        if not len(self) or filled <= 0:
+            return 0.0, 0.0
+        return float(self.notional(filled)) / filled, filled
+
+
+class OrderBookDepth:
+    """Depth curves of both sides of a book, built once per book update"""
+    
+    def __init__(self, orderbook: Dict):
+        self.bids = DepthCurve(orderbook.get('bids') or [])
+        self.asks = DepthCurve(orderbook.get('asks') or [])
+        
+    def side(self, side: str) -> DepthCurve:
+        """Levels consumed by a 'buy' (asks) or 'sell' (bids)"""
+        return self.asks if side == 'buy' else self.bids
+
+
+BookLike = Union[Dict, OrderBookDepth]
+
+
 class ArbitragePricer:
     """Depth-aware arbitrage pricing with fee model"""
     
@@ -19,6 +91,20 @@ def __init__(self, config_path: str = "config/fees.yaml"):
         self.fees = self._load_fees(config_path)
         self.min_profitable_spread = 30  # basis points
         
+    def prepare(self, orderbook: BookLike) -> OrderBookDepth:
+        """
+        Cumulative depth arrays for a book.
+        
+        Pass the result instead of the raw book to the pricing methods to
+        reuse it across calls on the same update.
+        """
+        if isinstance(orderbook, OrderBookDepth):
+            return orderbook
+        return OrderBookDepth(orderbook)
+        
+    def _min_spread(self) -> float:
+        return self.fees.get('min_profitable_spread', {}).get('default', 30)
+        
     def _load_fees(self, config_path: str) -> Dict:
         """Load fee configuration"""
         config_file = Path(config_path)
@@ -50,29 +136,9 @@ def calculate_vwap(self, orderbook: List[List[float]],
         Returns:
             (vwap_price, actual_amount)
         """
-        if not orderbook:
-            return 0.0, 0.0
-            
-        total_cost = 0.0
-        total_amount = 0.0
-        
-        for price, size in orderbook:
-            if total_amount >= target_amount:
-                break
-                
-            remaining = target_amount - total_amount
-            fill_amount = min(size, remaining)
-            
-            total_cost += price * fill_amount
-            total_amount += fill_amount
-            
-        if total_amount == 0:
-            return 0.0, 0.0
-            
-        vwap = total_cost / total_amount
-        return vwap, total_amount
+        return DepthCurve(orderbook).vwap(target_amount)
         
-    def get_effective_price(self, exchange: str, orderbook: Dict,
+    def get_effective_price(self, exchange: str, orderbook: BookLike,
                           amount: float, side: str,
                           use_maker: bool = False) -> Dict:
         """
@@ -80,7 +146,7 @@ def get_effective_price(self, exchange: str, orderbook: Dict,
         
         Args:
             exchange: 'binance' or 'btcturk'
-            orderbook: {'bids': [[price, size]], 'asks': [[price, size]]}
+            orderbook: {'bids': [[price, size]], 'asks': [[price, size]]} or prepare() result
             amount: Amount to trade
             side: 'buy' or 'sell'
             use_maker: Whether to use maker fee (limit order)
@@ -96,12 +162,9 @@ def get_effective_price(self, exchange: str, orderbook: Dict,
             }
         """
         # Determine which side of orderbook to use
-        if side == 'buy':
-            levels = orderbook.get('asks', [])
-        else:
-            levels = orderbook.get('bids', [])
+        levels = self.prepare(orderbook).side(side)
             
-        if not levels:
+        if not len(levels):
             return {
                 'raw_price': 0,
                 'vwap_price': 0,
@@ -112,10 +175,10 @@ def get_effective_price(self, exchange: str, orderbook: Dict,
             }
             
         # Best price
-        raw_price = levels[0][0]
+        raw_price = levels.best_price
         
         # Calculate VWAP
-        vwap_price, filled_amount = self.calculate_vwap(levels, amount, side)
+        vwap_price, filled_amount = levels.vwap(amount)
         
         # Get fee
         fee_type = 'maker' if use_maker else 'taker'
@@ -143,7 +206,7 @@ def get_effective_price(self, exchange: str, orderbook: Dict,
             'available_depth': filled_amount
         }
         
-    def calculate_arbitrage_profit(self, binance_book: Dict, btcturk_book: Dict,
+    def calculate_arbitrage_profit(self, binance_book: BookLike, btcturk_book: BookLike,
                                   amount_usdt: float, fx_rate: float) -> Dict:
         """
         Calculate arbitrage profit for Binance -> BTCTurk route
@@ -151,25 +214,34 @@ def calculate_arbitrage_profit(self, binance_book: Dict, btcturk_book: Dict,
         Args:
             binance_book: Binance orderbook
             btcturk_book: BTCTurk orderbook
-            amount_usdt: Amount in USDT
+            amount_usdt: Amount in USDT (spent on the Binance asks, fees included)
             fx_rate: USDTRY exchange rate
             
         Returns:
             Detailed profit calculation
         """
-        # Calculate BTC amount from USDT
+        binance = self.prepare(binance_book)
+        btcturk = self.prepare(btcturk_book)
+        
+        if not len(binance.asks):
+            return {'profitable': False, 'reason': 'No Binance depth'}
+            
+        # BTC bought by walking the asks until amount_usdt (incl. fee) is spent
+        buy_fee_pct = self.fees['binance']['spot']['taker']
+        btc_amount = float(binance.asks.quantity(amount_usdt / (1 + buy_fee_pct / 100)))
         binance_buy = self.get_effective_price(
-            'binance', binance_book, amount_usdt, 'buy', use_maker=False
+            'binance', binance, btc_amount, 'buy', use_maker=False
         )
         
         if binance_buy['vwap_price'] == 0:
             return {'profitable': False, 'reason': 'No Binance depth'}
             
-        btc_amount = amount_usdt / binance_buy['effective_price']
+        # Less than amount_usdt when the asks run out
+        usdt_spent = btc_amount * binance_buy['effective_price']
         
         # Calculate BTCTurk sell
         btcturk_sell = self.get_effective_price(
-            'btcturk', btcturk_book, btc_amount, 'sell', use_maker=False
+            'btcturk', btcturk, btc_amount, 'sell', use_maker=False
         )
         
         if btcturk_sell['vwap_price'] == 0:
@@ -186,16 +258,17 @@ def calculate_arbitrage_profit(self, binance_book: Dict, btcturk_book: Dict,
         usdt_final = tl_after_gateway / fx_rate
         
         # Calculate profit
-        profit_usdt = usdt_final - amount_usdt
-        profit_pct = (profit_usdt / amount_usdt) * 100
+        profit_usdt = usdt_final - usdt_spent
+        profit_pct = (profit_usdt / usdt_spent) * 100
         
         # Check if profitable
         spread_bps = profit_pct * 100
-        min_spread = self.fees.get('min_profitable_spread', {}).get('default', 30)
+        min_spread = self._min_spread()
         
         return {
             'profitable': spread_bps > min_spread,
             'btc_amount': btc_amount,
+            'usdt_spent': usdt_spent,
             'binance_buy_price': binance_buy['effective_price'],
             'binance_fee_pct': binance_buy['fee_pct'],
             'binance_slippage_bps': binance_buy['slippage_bps'],
@@ -212,11 +285,19 @@ def calculate_arbitrage_profit(self, binance_book: Dict, btcturk_book: Dict,
             'min_spread_bps': min_spread
         }
         
-    def find_optimal_size(self, binance_book: Dict, btcturk_book: Dict,
+    def find_optimal_size(self, binance_book: BookLike, btcturk_book: BookLike,
                          fx_rate: float, max_size: float = 10000) -> Dict:
         """
         Find optimal trade size for maximum profit
         
+        Profit is piecewise linear in the BTC amount, with breakpoints at the
+        level boundaries of both books. Between breakpoints the marginal buy
+        price (Binance ask plus fee) and marginal sell price (BTCTurk bid net
+        of fee and gateway, in USDT) are constant; profit grows until they
+        cross, so the optimum is the first breakpoint where they do. If the
+        average spread there is below the minimum, the size is cut back to
+        where it meets the minimum exactly.
+        
         Args:
             binance_book: Binance orderbook
             btcturk_book: BTCTurk orderbook
@@ -226,111 +307,76 @@ def find_optimal_size(self, binance_book: Dict, btcturk_book: Dict,
         Returns:
             Optimal size and expected profit
         """
-        test_sizes = [100, 500, 1000, 2000, 5000, 10000]
-        test_sizes = [s for s in test_sizes if s <= max_size]
+        binance = self.prepare(binance_book)
+        btcturk = self.prepare(btcturk_book)
+        asks, bids = binance.asks, btcturk.bids
         
-        best_profit = 0
-        best_size = 0
-        best_result = None
-        
-        for size in test_sizes:
-            result = self.calculate_arbitrage_profit(
-                binance_book, btcturk_book, size, fx_rate
-            )
+        no_trade = {
+            'optimal_size': 0,
+            'expected_profit': 0,
+            'profit_pct': 0,
+            'details': {'profitable': False, 'reason': 'No profitable size found'}
+        }
+        if not len(asks) or not len(bids):
+            return no_trade
             
-            if result.get('profitable', False):
-                profit_usdt = result['profit_usdt']
-                if profit_usdt > best_profit:
-                    best_profit = profit_usdt
-                    best_size = size
-                    best_result = result
-                    
-        if best_result:
-            return {
-                'optimal_size': best_size,
-                'expected_profit': best_profit,
-                'profit_pct': best_result['profit_pct'],
-                'details': best_result
-            }
+        buy_cost = 1 + self.fees['binance']['spot']['taker'] / 100
+        sell_proceeds = ((1 - self.fees['btcturk']['spot']['taker'] / 100)
+                         * (1 - self.fees['tl_gateway']['withdrawal_fee'] / 100) / fx_rate)
+        max_qty = min(asks.total_qty, bids.total_qty, float(asks.quantity(max_size / buy_cost)))
+        
+        qty = np.union1d(asks.qty_edges, bids.qty_edges)
+        qty = np.append(qty[qty < max_qty], max_qty)
+        
+        # First segment where selling the next unit no longer pays for buying it
+        marginal_buy = asks.marginal_price(qty[:-1]) * buy_cost
+        marginal_sell = bids.marginal_price(qty[:-1]) * sell_proceeds
+        crossed = np.flatnonzero(marginal_sell <= marginal_buy)
+        qty = qty[:crossed[0] + 1] if len(crossed) else qty
+        
+        # Profit above the minimum spread; concave and 0 at qty 0, so it is
+        # non-negative on [0, root] and the root is found on its segment
+        cost = asks.notional(qty) * buy_cost
+        excess = bids.notional(qty) * sell_proceeds - cost * (1 + self._min_spread() / 10000)
+        if excess[-1] >= 0:
+            best_qty = qty[-1]
         else:
-            return {
-                'optimal_size': 0,
-                'expected_profit': 0,
-                'profit_pct': 0,
-                'details': {'profitable': False, 'reason': 'No profitable size found'}
-            }
+            j = np.flatnonzero(excess >= 0)[-1]
+            t = excess[j] / (excess[j] - excess[j + 1])
+            # A hair inside the root so the spread compares strictly above the minimum
+            best_qty = (qty[j] + t * (qty[j + 1] - qty[j])) * (1 - 1e-9)
+            
+        if best_qty <= 0:
+            return no_trade
             
-    def get_depth_analysis(self, orderbook: Dict, max_amount: float = 10000) -> Dict:
+        best_size = float(asks.notional(best_qty)) * buy_cost
+        best_result = self.calculate_arbitrage_profit(binance, btcturk, best_size, fx_rate)
+        if not best_result.get('profitable', False):
+            return no_trade
+            
+        return {
+            'optimal_size': best_size,
+            'expected_profit': best_result['profit_usdt'],
+            'profit_pct': best_result['profit_pct'],
+            'details': best_result
+        }
+            
+    def get_depth_analysis(self, orderbook: BookLike, max_amount: float = 10000) -> Dict:
         """
         Analyze orderbook depth and price impact
         
         Args:
-            orderbook: {'bids': [], 'asks': []}
+            orderbook: {'bids': [], 'asks': []} or prepare() result
             max_amount: Maximum amount to analyze
             
         Returns:
             Depth analysis with price impacts
         """
+        depth = self.prepare(orderbook)
         analysis = {
-            'bid': {'levels': [], 'total_volume': 0, 'avg_price': 0},
-            'ask': {'levels': [], 'total_volume': 0, 'avg_price': 0}
+            'bid': self._side_depth(depth.bids),
+            'ask': self._side_depth(depth.asks)
         }
-        
-        # Analyze bid side
-        if 'bids' in orderbook and orderbook['bids']:
-            total_volume = 0
-            total_value = 0
-            
-            for i, (price, size) in enumerate(orderbook['bids'][:10]):
-                total_volume += size
-                total_value += price * size
-                
-                level_info = {
-                    'level': i + 1,
-                    'price': price,
-                    'size': size,
-                    'cumulative_volume': total_volume,
-                    'vwap': total_value / total_volume if total_volume > 0 else 0,
-                    'spread_bps': 0
-                }
-                
-                if i == 0:
-                    best_bid = price
-                else:
-                    level_info['spread_bps'] = ((best_bid - price) / best_bid) * 10000
-                    
-                analysis['bid']['levels'].append(level_info)
-                
-            analysis['bid']['total_volume'] = total_volume
-            analysis['bid']['avg_price'] = total_value / total_volume if total_volume > 0 else 0
-            
-        # Analyze ask side
-        if 'asks' in orderbook and orderbook['asks']:
-            total_volume = 0
-            total_value = 0
-            
-            for i, (price, size) in enumerate(orderbook['asks'][:10]):
-                total_volume += size
-                total_value += price * size
-                
-                level_info = {
-                    'level': i + 1,
-                    'price': price,
-                    'size': size,
-                    'cumulative_volume': total_volume,
-                    'vwap': total_value / total_volume if total_volume > 0 else 0,
-                    'spread_bps': 0
-                }
-                
-                if i == 0:
-                    best_ask = price
-                else:
-                    level_info['spread_bps'] = ((price - best_ask) / best_ask) * 10000
-                    
-                analysis['ask']['levels'].append(level_info)
-                
-            analysis['ask']['total_volume'] = total_volume
-            analysis['ask']['avg_price'] = total_value / total_volume if total_volume > 0 else 0
             
         # Calculate mid-market spread
         if analysis['bid']['levels'] and analysis['ask']['levels']:
@@ -340,4 +386,33 @@ def get_depth_analysis(self, orderbook: Dict, max_amount: float = 10000) -> Dict
         else:
             analysis['spread_bps'] = 0
             
-        return analysis
\ No newline at end of file
+        return analysis
+        
+    def _side_depth(self, curve: DepthCurve, max_levels: int = 10) -> Dict:
+        """Per-level cumulative volume, VWAP and distance from the best price"""
+        if not len(curve):
+            return {'levels': [], 'total_volume': 0, 'avg_price': 0}
+            
+        n = min(len(curve), max_levels)
+        prices = curve.prices[:n]
+        volume = curve.qty_edges[1:n + 1]
+        value = curve.notional_edges[1:n + 1]
+        vwap = np.divide(value, volume, out=np.zeros(n), where=volume > 0)
+        spread_bps = np.abs(prices - prices[0]) / prices[0] * 10000
+        
+        levels = [
+            {
+                'level': i + 1,
+                'price': float(prices[i]),
+                'size': float(curve.sizes[i]),
+                'cumulative_volume': float(volume[i]),
+                'vwap': float(vwap[i]),
+                'spread_bps': float(spread_bps[i])
+            }
+            for i in range(n)
+        ]
+        return {
+            'levels': levels,
+            'total_volume': float(volume[-1]),
+            'avg_price': float(vwap[-1])
+        }
@@ -0,0 +1,218 @@
+"""
+WebSocket fan-out hub
+Serialize once, queue per client, send concurrently
+
+A message published to a topic is encoded to text once and appended to the
+bounded queue of every client subscribed to that topic. Each client has its
+own sender task, so a slow socket only backs up its own queue: snapshot
+topics are conflated (a queued, unsent snapshot is replaced by the newer
+one, per topic or per ``key`` within it) and event topics drop the oldest
+entry once the queue is full.
+Snapshot producers registered with ``add_topic`` run once per interval for
+all subscribers, and only while the topic has any.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+ALL_TOPICS = "*"
+
+SnapshotProducer = Callable[[], Awaitable[Any]]
+
+
+def encode(payload: Any) -> str:
+    """Text frame for ``payload`` (strings are sent as-is)"""
+    if isinstance(payload, str):
+        return payload
+    if hasattr(payload, "model_dump_json"):
+        return payload.model_dump_json()
+    return json.dumps(payload, default=str)
+
+
+class FanoutClient:
+    """One connected socket: its topics, outgoing queue and sender task"""
+
+    def __init__(self, websocket: WebSocket, topics: Optional[Iterable[str]], queue_size: int):
+        self.websocket = websocket
+        self.topics: Set[str] = set(topics) if topics is not None else {ALL_TOPICS}
+        self.queue: Deque[Tuple[Optional[Tuple[str, str]], str]] = deque()  # (conflation key, text)
+        self.queue_size = queue_size
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+
+    def wants(self, topic: Optional[str]) -> bool:
+        return topic is None or ALL_TOPICS in self.topics or topic in self.topics
+
+    def enqueue(self, key: Optional[Tuple[str, str]], text: str) -> str:
+        """
+        Queue ``text``, replacing an unsent message with the same conflation
+        ``key`` (None: never conflate). Returns "queued", "conflated" or
+        "dropped" (the oldest message was evicted to make room).
+        """
+        outcome = "queued"
+        if key is not None:
+            for i, (queued_key, _) in enumerate(self.queue):
+                if queued_key == key:
+                    self.queue[i] = (key, text)
+                    return "conflated"
+        if len(self.queue) >= self.queue_size:
+            self.queue.popleft()
+            self.dropped += 1
+            outcome = "dropped"
+        self.queue.append((key, text))
+        self.ready.set()
+        return outcome
+
+
+class FanoutHub:
+    """Topic-based WebSocket broadcaster shared by the dashboards"""
+
+    def __init__(self, queue_size: int = 32, send_timeout: float = 10.0):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.clients: Dict[WebSocket, FanoutClient] = {}
+        self.latest: Dict[str, Dict[str, str]] = {}  # topic -> conflation key -> text
+        self._producers: Dict[str, Tuple[SnapshotProducer, float]] = {}
+        self._producer_tasks: Dict[str, asyncio.Task] = {}
+        self.stats = {"published": 0, "serialized": 0, "queued": 0, "conflated": 0,
+                      "dropped": 0, "sent": 0, "send_errors": 0}
+
+    @property
+    def active_connections(self) -> list:
+        return list(self.clients)
+
+    async def connect(self, websocket: WebSocket, topics: Optional[Iterable[str]] = None,
+                      accept: bool = True) -> FanoutClient:
+        """Register ``websocket`` (all topics unless ``topics`` given) and start its sender"""
+        if accept:
+            await websocket.accept()
+        client = FanoutClient(websocket, topics, self.queue_size)
+        self.clients[websocket] = client
+        client.task = asyncio.create_task(self._sender(client))
+        self._on_subscribed(client, client.topics)
+        logger.info(f"Client connected. Total connections: {len(self.clients)}")
+        return client
+
+    def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        if client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+        logger.info(f"Client disconnected. Total connections: {len(self.clients)}")
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]):
+        """Add ``topics``; a client on all topics is narrowed to the ones it asks for"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        new = set(topics) - client.topics
+        client.topics.discard(ALL_TOPICS)
+        client.topics.update(new)
+        self._on_subscribed(client, new)
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]):
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.topics.difference_update(topics)
+
+    def publish(self, topic: Optional[str], payload: Any, conflate: bool = True,
+                key: Optional[str] = None) -> int:
+        """
+        Queue ``payload`` for every subscriber of ``topic`` (None: every client).
+
+        ``payload`` is serialized once however many clients receive it. With
+        ``conflate`` a newer message replaces an unsent one of the same topic
+        and ``key`` (e.g. the symbol of a price update) and is replayed to
+        new subscribers. Returns the number of clients it was queued for.
+        """
+        text = encode(payload)
+        self.stats["published"] += 1
+        self.stats["serialized"] += 1
+        conflation_key = (topic, key or "") if conflate and topic is not None else None
+        if conflation_key is not None:
+            self.latest.setdefault(topic, {})[conflation_key[1]] = text
+        receivers = 0
+        for client in self.clients.values():
+            if client.wants(topic):
+                self.stats[client.enqueue(conflation_key, text)] += 1
+                receivers += 1
+        return receivers
+
+    async def send_personal_message(self, message: Any, websocket: WebSocket):
+        """Queue a direct reply; it is sent in order with the client's other messages"""
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.enqueue(None, encode(message))
+
+    def add_topic(self, topic: str, producer: SnapshotProducer, interval: float):
+        """Publish ``await producer()`` to ``topic`` every ``interval`` seconds while subscribed"""
+        self._producers[topic] = (producer, interval)
+        if self.subscriber_count(topic):
+            self._start_producer(topic)
+
+    def subscriber_count(self, topic: str) -> int:
+        return sum(1 for c in self.clients.values() if topic in c.topics or ALL_TOPICS in c.topics)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "clients": len(self.clients),
+            "queued_now": sum(len(c.queue) for c in self.clients.values()),
+            "producers": sorted(t for t, task in self._producer_tasks.items() if not task.done()),
+        }
+
+    async def close(self):
+        for task in self._producer_tasks.values():
+            task.cancel()
+        for websocket in list(self.clients):
+            self.disconnect(websocket)
+
+    def _on_subscribed(self, client: FanoutClient, topics: Set[str]):
+        for topic in (set(self.latest) | set(self._producers) if ALL_TOPICS in topics else topics):
+            for key, text in self.latest.get(topic, {}).items():
+                client.enqueue((topic, key), text)
+            if topic in self._producers:
+                self._start_producer(topic)
+
+    def _start_producer(self, topic: str):
+        task = self._producer_tasks.get(topic)
+        if task is None or task.done():
+            self._producer_tasks[topic] = asyncio.create_task(self._produce(topic))
+
+    async def _produce(self, topic: str):
+        producer, interval = self._producers[topic]
+        while self.subscriber_count(topic):
+            try:
+                self.publish(topic, await producer())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Snapshot for {topic} failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def _sender(self, client: FanoutClient):
+        websocket = client.websocket
+        try:
+            while True:
+                await client.ready.wait()
+                while client.queue:
+                    _, text = client.queue.popleft()
+                    await asyncio.wait_for(websocket.send_text(text), self.send_timeout)
+                    client.sent += 1
+                    self.stats["sent"] += 1
+                client.ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["send_errors"] += 1
+            logger.info(f"Dropping client after send failure: {e}")
+            self.disconnect(websocket)
@@ -12,6 +12,8 @@
 from pydantic import BaseModel
 import logging
 
+from .fanout import FanoutHub
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -23,48 +25,8 @@ class DashboardUpdate(BaseModel):
     timestamp: datetime
 
 
-class ConnectionManager:
-    """Manages WebSocket connections"""
-    
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.subscriptions: Dict[WebSocket, Set[str]] = {}
-        
-    async def connect(self, websocket: WebSocket):
-        """Accept new connection"""
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        self.subscriptions[websocket] = set()
-        logger.info(f"Client connected. Total connections: {len(self.active_connections)}")
-        
-    def disconnect(self, websocket: WebSocket):
-        """Remove connection"""
-        self.active_connections.remove(websocket)
-        if websocket in self.subscriptions:
-            del self.subscriptions[websocket]
-        logger.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
-        
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        """Send message to specific client"""
-        await websocket.send_text(message)
-        
-    async def broadcast(self, message: str, channel: Optional[str] = None):
-        """Broadcast message to all or subscribed clients"""
-        for connection in self.active_connections:
-            if channel is None or channel in self.subscriptions.get(connection, set()):
-                try:
-                    await connection.send_text(message)
-                except:
-                    # Connection might be closed
-                    pass
-                    
-    def subscribe(self, websocket: WebSocket, channels: List[str]):
-        """Subscribe client to channels"""
-        if websocket in self.subscriptions:
-            self.subscriptions[websocket].update(channels)
-            
-
-manager = ConnectionManager()
+# Clients start with no channels and pick them with a "subscribe" message
+manager = FanoutHub()
 
 
 class RealTimeDashboard:
@@ -108,10 +70,7 @@ async def start_price_updates(self):
                         timestamp=datetime.now(timezone.utc)
                     )
                     
-                    await manager.broadcast(
-                        update.model_dump_json(),
-                        channel="prices"
-                    )
+                    manager.publish("prices", update, key=symbol)
                 
                 await asyncio.sleep(self.update_interval)
                 
@@ -145,10 +104,7 @@ async def start_portfolio_updates(self):
                     timestamp=datetime.now(timezone.utc)
                 )
                 
-                await manager.broadcast(
-                    update.model_dump_json(),
-                    channel="portfolio"
-                )
+                manager.publish("portfolio", update)
                 
                 await asyncio.sleep(5)  # Update every 5 seconds
                 
@@ -172,10 +128,7 @@ async def check_alerts(self):
                             "timestamp": datetime.now(timezone.utc).isoformat()
                         }
                         
-                        await manager.broadcast(
-                            json.dumps({"type": "alert", "data": alert}),
-                            channel="alerts"
-                        )
+                        manager.publish("alerts", {"type": "alert", "data": alert}, conflate=False)
                         
                 await asyncio.sleep(10)  # Check every 10 seconds
                 
@@ -378,7 +331,7 @@ async def get_dashboard():
 @app.websocket("/ws/dashboard")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates"""
-    await manager.connect(websocket)
+    await manager.connect(websocket, topics=())
     
     try:
         while True:
@@ -13,10 +13,10 @@
 from typing import List, Dict
 import logging
 from decimal import Decimal
-import uuid
 
 from ..data.real_time_fetcher import fetcher
 from ..auth.dependencies import get_current_active_user
+from ..web.fanout import FanoutHub
 
 logger = logging.getLogger(__name__)
 
@@ -24,58 +24,8 @@
 templates = Jinja2Templates(directory="src/web_ui/templates")
 app.mount("/static", StaticFiles(directory="src/web_ui/static"), name="static")
 
-class ConnectionManager:
-    """Manages WebSocket connections"""
-    
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.user_connections: Dict[str, List[str]] = {}
-        
-    async def connect(self, websocket: WebSocket, client_id: str, user_id: str = None):
-        await websocket.accept()
-        self.active_connections[client_id] = websocket
-        
-        if user_id:
-            if user_id not in self.user_connections:
-                self.user_connections[user_id] = []
-            self.user_connections[user_id].append(client_id)
-        
-        logger.info(f"Client {client_id} connected")
-        
-    def disconnect(self, client_id: str, user_id: str = None):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
-            
-        if user_id and user_id in self.user_connections:
-            if client_id in self.user_connections[user_id]:
-                self.user_connections[user_id].remove(client_id)
-                if not self.user_connections[user_id]:
-                    del self.user_connections[user_id]
-        
-        logger.info(f"Client {client_id} disconnected")
-        
-    async def send_personal_message(self, message: dict, client_id: str):
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
-            try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {e}")
-                self.disconnect(client_id)
-                
-    async def broadcast(self, message: dict):
-        disconnected = []
-        for client_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
-                disconnected.append(client_id)
-                
-        for client_id in disconnected:
-            self.disconnect(client_id)
-
-manager = ConnectionManager()
+# Every client receives every topic; each snapshot is serialized once per tick
+manager = FanoutHub()
 
 # Watched symbols for dashboard
 WATCHED_SYMBOLS = ["bitcoin", "ethereum", "solana", "binancecoin", "cardano", "polkadot", "chainlink", "litecoin"]
@@ -112,7 +62,7 @@ async def start_streaming(self):
                         self.last_prices[symbol] = data["price"]
                     
                     # Broadcast to all connected clients
-                    await manager.broadcast({
+                    manager.publish("market_update", {
                         "type": "market_update",
                         "data": market_data,
                         "timestamp": datetime.now(timezone.utc).isoformat()
@@ -121,7 +71,7 @@ async def start_streaming(self):
                 # Get top gainers/losers
                 gainers_losers = await fetcher.get_top_gainers_losers(5)
                 if gainers_losers:
-                    await manager.broadcast({
+                    manager.publish("gainers_losers", {
                         "type": "gainers_losers",
                         "data": gainers_losers,
                         "timestamp": datetime.now(timezone.utc).isoformat()
@@ -636,8 +586,7 @@ async def dashboard_home():
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time data"""
-    client_id = str(uuid.uuid4())
-    await manager.connect(websocket, client_id)
+    await manager.connect(websocket)
     
     try:
         while True:
@@ -648,12 +597,12 @@ async def websocket_endpoint(websocket: WebSocket):
             try:
                 message = json.loads(data)
                 if message.get("type") == "ping":
-                    await manager.send_personal_message({"type": "pong"}, client_id)
+                    await manager.send_personal_message({"type": "pong"}, websocket)
             except:
                 pass
                 
     except WebSocketDisconnect:
-        manager.disconnect(client_id)
+        manager.disconnect(websocket)
 
 @app.get("/api/market/{symbol}")
 async def get_symbol_data(symbol: str):
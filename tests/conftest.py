@@ -0,0 +1,28 @@
+"""
+Shared test fixtures
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _make_bars(n=60, seed=0, tz=None, start="2024-01-01"):
+    """5-minute random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    index = pd.date_range(start, periods=n, freq="5min", tz=tz)
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * 1.002,
+        'low': np.minimum(open_, close) * 0.998,
+        'close': close,
+        'volume': rng.uniform(100, 1000, n),
+    }, index=index)
+
+
+@pytest.fixture
+def make_bars():
+    """Factory for 5-minute random-walk OHLCV frames (``make_bars(n, seed, tz, start)``)"""
+    return _make_bars
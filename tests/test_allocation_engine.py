@@ -0,0 +1,95 @@
+"""
+Test the array-based allocation engine behind PortfolioConstructor
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.portfolio.allocation_engine import EWMACovariance, HRPEngine, covariance_to_correlation
+from src.portfolio.constructor import PortfolioConstructor
+
+
+def factor_returns(n_assets, periods=250, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, (periods, 3))
+    loadings = rng.normal(0, 1, (3, n_assets))
+    return factors @ loadings + rng.normal(0, 0.01, (periods, n_assets))
+
+
+def reference_hrp(cov, order):
+    """Plain recursive bisection over label lists, as originally written"""
+    def variance(assets):
+        return max(cov[np.ix_(assets, assets)].sum() / len(assets) ** 2, 1e-6)
+
+    def recurse(assets):
+        if len(assets) == 1:
+            return {assets[0]: 1.0}
+        left, right = assets[:len(assets) // 2], assets[len(assets) // 2:]
+        v1, v2 = variance(left), variance(right)
+        weights = {a: w * v2 / (v1 + v2) for a, w in recurse(left).items()}
+        weights.update({a: w * v1 / (v1 + v2) for a, w in recurse(right).items()})
+        return weights
+
+    weights = recurse(list(order))
+    return np.array([weights[i] for i in range(len(cov))])
+
+
+def test_hrp_matches_recursive_bisection():
+    returns = factor_returns(37)
+    cov = np.cov(returns, rowvar=False)
+    engine = HRPEngine()
+
+    weights = engine.allocate(cov)
+
+    np.testing.assert_allclose(weights, reference_hrp(cov, engine.order), rtol=1e-10)
+    assert weights.sum() == pytest.approx(1.0)
+    assert (weights > 0).all()
+
+
+def test_cluster_tree_is_reused_until_correlations_move():
+    returns = factor_returns(20)
+    engine = HRPEngine(relink_tolerance=0.05)
+    cov = np.cov(returns, rowvar=False)
+
+    engine.allocate(cov)
+    order = engine.order
+    # One extra day barely moves the correlations
+    engine.allocate(np.cov(np.vstack([returns, returns[-1:] * 0.5]), rowvar=False))
+    assert engine.stats == {'linkages': 1, 'reused': 1}
+    assert engine.order is order
+
+    engine.allocate(np.cov(factor_returns(20, seed=1), rowvar=False))
+    assert engine.stats['linkages'] == 2
+
+
+def test_ewma_covariance_is_incremental(monkeypatch):
+    returns = factor_returns(8, periods=120)
+    batch = EWMACovariance(8, halflife=30)
+    batch.update_many(returns)
+
+    # Exponential weights written out in full
+    decay = 0.5 ** (1 / 30)
+    alpha = 1 - decay
+    mean, cov = returns[0], np.zeros((8, 8))
+    for row in returns[1:]:
+        diff = row - mean
+        mean = mean + alpha * diff
+        cov = decay * (cov + alpha * np.outer(diff, diff))
+    np.testing.assert_allclose(batch.cov, cov)
+    assert np.diag(batch.correlation()) == pytest.approx(1.0)
+
+    monkeypatch.setenv('PORTFOLIO_COVARIANCE', 'ewma')
+    monkeypatch.setenv('EWMA_HALFLIFE', '30')
+    constructor = PortfolioConstructor(method='hrp')
+    dates = pd.date_range('2024-01-01', periods=120, freq='D')
+    frame = pd.DataFrame(returns, index=dates, columns=[f'strategy{i}_SYM{i}' for i in range(8)])
+
+    constructor.build_portfolio({c: frame[c].iloc[:90] for c in frame})
+    # Rolling window: rows already folded in are skipped
+    result = constructor.build_portfolio({c: frame[c].iloc[30:] for c in frame})
+
+    assert 'error' not in result
+    assert constructor._ewma.count == 120
+    np.testing.assert_allclose(constructor._ewma.cov, batch.cov)
+    np.testing.assert_allclose(covariance_to_correlation(batch.cov), batch.correlation())
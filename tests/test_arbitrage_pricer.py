@@ -2,6 +2,7 @@
 Test Arbitrage Pricer
 """
 
+import numpy as np
 import pytest
 from unittest.mock import patch, MagicMock
 from src.trading.arbitrage_pricer import ArbitragePricer
@@ -184,4 +185,40 @@ def test_maker_vs_taker_fees(self, pricer, sample_orderbook):
         assert maker_result['fee_pct'] <= taker_result['fee_pct']
         
         # Effective price should be better for maker
-        assert maker_result['effective_price'] <= taker_result['effective_price']
\ No newline at end of file
+        assert maker_result['effective_price'] <= taker_result['effective_price']
+
+    def test_optimal_size_stops_where_marginal_prices_cross(self, pricer):
+        """The second Binance level costs more than BTCTurk pays, so only the first is taken"""
+        binance_book = {'asks': [[40000, 0.1], [41000, 1.0]]}
+        btcturk_book = {'bids': [[1400000, 2.0]]}
+        
+        result = pricer.find_optimal_size(binance_book, btcturk_book, 34.0, max_size=50000)
+        
+        assert result['details']['btc_amount'] == pytest.approx(0.1)
+        assert result['optimal_size'] == pytest.approx(0.1 * 40000 * 1.001)
+    
+    def test_optimal_size_beats_size_grid(self, pricer):
+        """No size on a fine grid earns more than the analytical optimum"""
+        rng = np.random.default_rng(3)
+        for _ in range(20):
+            asks = np.c_[40000 + np.cumsum(rng.uniform(0, 20, 15)), rng.uniform(0.01, 0.3, 15)].tolist()
+            bids = np.c_[1380000 - np.cumsum(rng.uniform(0, 700, 15)), rng.uniform(0.01, 0.3, 15)].tolist()
+            binance = pricer.prepare({'asks': asks})
+            btcturk = pricer.prepare({'bids': bids})
+            bid_depth = sum(size for _, size in bids)
+            
+            result = pricer.find_optimal_size(binance, btcturk, 34.0, max_size=20000)
+            
+            assert result['optimal_size'] <= 20000 + 1e-6
+            for size in np.linspace(10, 20000, 400):
+                trade = pricer.calculate_arbitrage_profit(binance, btcturk, size, 34.0)
+                if trade['profitable'] and trade['btc_amount'] <= bid_depth:
+                    assert trade['profit_usdt'] <= result['expected_profit'] + 1e-6
+    
+    def test_prepared_book_matches_raw_book(self, pricer, sample_orderbook):
+        depth = pricer.prepare(sample_orderbook)
+        
+        assert pricer.get_depth_analysis(depth) == pricer.get_depth_analysis(sample_orderbook)
+        assert pricer.get_effective_price('binance', depth, 1.2, 'buy') == \
+            pricer.get_effective_price('binance', sample_orderbook, 1.2, 'buy')
+        assert depth.asks.vwap(1.2) == pricer.calculate_vwap(sample_orderbook['asks'], 1.2, 'buy')
@@ -0,0 +1,226 @@
+"""
+Test the strategy engine v2 asset allocator against NumPy/SciPy references
+"""
+
+import importlib.util
+import sys
+import types
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+
+ALLOCATOR_PATH = Path(__file__).resolve().parents[1] / "src" / "strategy_engine_v2" / "asset_allocator.py"
+
+
+def load_allocator():
+    """
+    Load asset_allocator.py on its own
+
+    The package __init__ and portfolio_manager import backtester modules that
+    are not part of this tree, and the allocator only needs AllocationMethod
+    from there, so it is loaded under a private package next to a copy of
+    that enum.
+    """
+    package = types.ModuleType("_allocator_pkg")
+    package.__path__ = [str(ALLOCATOR_PATH.parent)]
+    portfolio_manager = types.ModuleType("_allocator_pkg.portfolio_manager")
+
+    class AllocationMethod(str, Enum):
+        EQUAL_WEIGHT = "equal_weight"
+        MARKET_CAP_WEIGHT = "market_cap_weight"
+        RISK_PARITY = "risk_parity"
+        MOMENTUM_WEIGHT = "momentum_weight"
+        VOLATILITY_WEIGHT = "volatility_weight"
+        CUSTOM = "custom"
+
+    portfolio_manager.AllocationMethod = AllocationMethod
+    sys.modules["_allocator_pkg"] = package
+    sys.modules["_allocator_pkg.portfolio_manager"] = portfolio_manager
+    spec = importlib.util.spec_from_file_location("_allocator_pkg.asset_allocator", ALLOCATOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+allocator_module = load_allocator()
+AssetAllocator = allocator_module.AssetAllocator
+AllocationMethod = allocator_module.AllocationMethod
+
+
+def make_prices(n_assets=4, n_obs=250, seed=7):
+    rng = np.random.default_rng(seed)
+    mix = rng.normal(size=(n_assets, n_assets)) * 0.01
+    drift = np.linspace(0.0002, 0.001, n_assets)
+    returns = rng.normal(size=(n_obs, n_assets)) @ mix + drift
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    return {f"A{i}": list(prices[:, i]) for i in range(n_assets)}
+
+
+def returns_of(price_data):
+    return pd.DataFrame(price_data).pct_change().dropna().values
+
+
+def reference_min_variance(cov, mu=None, target=None, bounds=None, max_volatility=None):
+    """Plain SLSQP with numeric gradients"""
+    n = len(cov)
+    constraints = [{'type': 'eq', 'fun': lambda x: x.sum() - 1}]
+    if target is not None:
+        constraints.append({'type': 'eq', 'fun': lambda x: x @ mu - target})
+    if max_volatility is not None:
+        constraints.append({'type': 'ineq', 'fun': lambda x: max_volatility**2 - x @ cov @ x})
+    result = minimize(lambda x: x @ cov @ x, np.full(n, 1.0 / n), method='SLSQP',
+                      bounds=bounds and [bounds] * n, constraints=constraints,
+                      options={'ftol': 1e-14, 'maxiter': 500})
+    assert result.success
+    return result.x
+
+
+def test_sample_moments_match_numpy():
+    price_data = make_prices()
+    symbols, mu, cov = AssetAllocator()._get_moments(price_data)
+    returns = returns_of(price_data)
+
+    assert symbols == list(price_data)
+    np.testing.assert_allclose(mu, returns.mean(axis=0) * 252, rtol=1e-12)
+    np.testing.assert_allclose(cov, np.cov(returns, rowvar=False) * 252, rtol=1e-12)
+
+
+def test_ewma_moments_match_pandas():
+    price_data = make_prices()
+    _, mu, cov = AssetAllocator(covariance_estimator="ewma", ewma_halflife=20)._get_moments(price_data)
+    ewm = pd.DataFrame(returns_of(price_data)).ewm(halflife=20)
+
+    np.testing.assert_allclose(mu, ewm.mean().iloc[-1].values * 252, rtol=1e-10)
+    np.testing.assert_allclose(cov, ewm.cov(bias=True).iloc[-len(price_data):].values * 252, rtol=1e-10)
+
+
+def test_ledoit_wolf_matches_sklearn():
+    covariance = pytest.importorskip("sklearn.covariance")
+    returns = returns_of(make_prices(n_assets=6, n_obs=40))
+
+    np.testing.assert_allclose(allocator_module._ledoit_wolf(returns),
+                               covariance.ledoit_wolf(returns)[0], rtol=1e-10)
+
+
+def test_moments_are_cached_by_data_hash():
+    allocator = AssetAllocator()
+    calls = []
+    estimate = allocator._estimate_moments
+    allocator._estimate_moments = lambda price_data: calls.append(1) or estimate(price_data)
+    price_data = make_prices()
+
+    first = allocator._get_moments(price_data)
+    again = allocator._get_moments({symbol: list(prices) for symbol, prices in price_data.items()})
+    assert again is first and len(calls) == 1  # equal data in new lists hits
+
+    price_data["A0"][-1] *= 1.01
+    allocator._get_moments(price_data)
+    assert len(calls) == 2  # changed data misses
+
+    allocator.covariance_estimator = "ledoit_wolf"
+    allocator._get_moments(price_data)
+    assert len(calls) == 3  # the estimator is part of the key
+
+
+def test_cache_evicts_least_recently_used():
+    allocator = AssetAllocator()
+    allocator.CACHE_SIZE = 2
+    computed = []
+
+    def lookup(key):
+        return allocator._cached((key,), lambda: computed.append(key) or key)
+
+    lookup("a"), lookup("b"), lookup("a"), lookup("c")
+    assert list(allocator._cache) == [("a",), ("c",)]
+    lookup("a"), lookup("b")
+    assert computed == ["a", "b", "c", "b"]
+
+
+def test_closed_form_min_variance_matches_slsqp():
+    _, mu, cov = AssetAllocator()._get_moments(make_prices())
+
+    global_min = allocator_module._closed_form_min_variance(mu, cov)
+    np.testing.assert_allclose(global_min, reference_min_variance(cov), atol=1e-6)
+
+    target = mu.mean()
+    on_target = allocator_module._closed_form_min_variance(mu, cov, target)
+    assert on_target.sum() == pytest.approx(1.0)
+    assert on_target @ mu == pytest.approx(target)
+    np.testing.assert_allclose(on_target, reference_min_variance(cov, mu, target), atol=1e-6)
+
+
+def test_closed_form_tangency_maximizes_sharpe():
+    _, mu, cov = AssetAllocator()._get_moments(make_prices())
+    risk_free = 0.02
+
+    def negative_sharpe(x):
+        return -(x @ mu - risk_free) / np.sqrt(x @ cov @ x)
+
+    tangency = allocator_module._closed_form_tangency(mu, cov, risk_free)
+    result = minimize(negative_sharpe, np.full(len(mu), 0.25), method='SLSQP',
+                      constraints=[{'type': 'eq', 'fun': lambda x: x.sum() - 1}],
+                      options={'ftol': 1e-14, 'maxiter': 500})
+
+    assert tangency.sum() == pytest.approx(1.0)
+    assert negative_sharpe(tangency) == pytest.approx(result.fun, rel=1e-8)
+    assert negative_sharpe(tangency) <= result.fun + 1e-12
+
+
+def test_solve_min_variance_skips_slsqp_for_interior_solutions(monkeypatch):
+    allocator = AssetAllocator()
+    _, mu, cov = allocator._get_moments(make_prices())
+    monkeypatch.setattr(allocator_module, "minimize", pytest.fail)
+
+    weights = allocator._solve_min_variance(mu, cov, bounds=(-1.0, 1.0))
+    np.testing.assert_allclose(weights, allocator_module._closed_form_min_variance(mu, cov))
+
+
+@pytest.mark.parametrize("target, bounds, max_volatility", [
+    (None, (0.05, 0.4), None),
+    ("mid", (0.0, 0.5), None),
+    (None, (0.0, 1.0), "cap"),
+])
+def test_solve_min_variance_with_binding_constraints_matches_slsqp(target, bounds, max_volatility):
+    allocator = AssetAllocator()
+    _, mu, cov = allocator._get_moments(make_prices())
+    target = (mu.min() + mu.max()) / 2 if target else None
+    global_min = allocator_module._closed_form_min_variance(mu, cov)
+    max_volatility = 1.05 * np.sqrt(global_min @ cov @ global_min) if max_volatility else None
+
+    weights = allocator._solve_min_variance(mu, cov, target_return=target,
+                                            max_volatility=max_volatility, bounds=bounds)
+    expected = reference_min_variance(cov, mu, target, bounds, max_volatility)
+
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights.min() >= bounds[0] - 1e-8 and weights.max() <= bounds[1] + 1e-8
+    assert weights @ cov @ weights == pytest.approx(expected @ cov @ expected, rel=1e-5)
+    np.testing.assert_allclose(weights, expected, atol=1e-4)
+
+
+def test_optimize_allocation_maps_weights_to_symbols():
+    price_data = make_prices()
+    price_data["NEW"] = [1.0]  # no returns yet
+
+    allocation = AssetAllocator().optimize_allocation(price_data, max_weight=0.5, min_weight=0.0)
+
+    assert allocation["NEW"] == 0.0
+    assert sum(allocation.values()) == pytest.approx(1.0)
+    assert max(allocation.values()) <= 0.5 + 1e-8
+
+
+def test_risk_parity_reuses_cached_volatilities():
+    allocator = AssetAllocator()
+    price_data = make_prices()
+    returns = returns_of(price_data)
+
+    first = allocator.calculate_allocation(price_data, AllocationMethod.RISK_PARITY)
+    inverse_vol = 1 / returns.std(axis=0)
+    np.testing.assert_allclose(list(first.values()), inverse_vol / inverse_vol.sum(), rtol=1e-10)
+
+    allocator._compute_volatilities = pytest.fail
+    assert allocator.calculate_allocation(price_data, AllocationMethod.VOLATILITY_WEIGHT) == pytest.approx(first)
@@ -0,0 +1,119 @@
+"""
+Test the paginated async universe backfill against in-memory venues
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from src.data.backfill import UniverseBackfill
+from src.data.exchanges import AsyncExchangeClient
+from src.data.ohlcv_store import OHLCVStore
+from src.exchanges.base import RateLimiter
+
+HOUR_MS = 3_600_000
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeVenue:
+    """ccxt-like async client serving hourly bars, with an optional hole"""
+
+    rateLimit = 10
+
+    def __init__(self, symbols, volume=1.0, hole=None, page=1000):
+        self.symbols = symbols
+        self.volume = volume
+        self.hole = hole or (0, 0)
+        self.page = page
+        self.calls = []
+        self.end_ms = int(END.timestamp() * 1000)
+
+    async def load_markets(self):
+        return {s: {} for s in self.symbols}
+
+    async def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=None):
+        self.calls.append((symbol, since))
+        first = -(-since // HOUR_MS) * HOUR_MS
+        rows = []
+        ts = first
+        while len(rows) < min(limit, self.page) and ts <= self.end_ms:
+            if not self.hole[0] <= ts < self.hole[1]:
+                rows.append([ts, 1.0, 1.0, 1.0, 1.0, self.volume])
+            ts += HOUR_MS
+        return rows
+
+    async def close(self):
+        pass
+
+
+def client(name, venue, rps=1000.0):
+    return AsyncExchangeClient(name, client=venue, page_limit=1000,
+                               rate_limiter=RateLimiter(requests_per_second=rps, burst=1))
+
+
+def run(backfill, symbols, since=START, until=END):
+    return asyncio.run(backfill.run(symbols, ['1h'], since, until))
+
+
+def test_pages_full_year_and_reports_gaps(tmp_path):
+    hole_start = int(datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp() * 1000)
+    venue = FakeVenue(['BTC/USDT'], hole=(hole_start, hole_start + 5 * HOUR_MS))
+    store = OHLCVStore(tmp_path)
+    backfill = UniverseBackfill(store, ['fake'], clients={'fake': client('fake', venue)})
+
+    report = run(backfill, ['BTC/USDT', 'NOPE/USDT'])
+
+    expected = 366 * 24 + 1 - 5
+    assert report['symbols_processed'] == 1
+    assert report['symbols_failed'] == 1
+    assert report['total_records'] == expected
+    assert len(store.read('BTC/USDT', '1h')) == expected
+    # One request per 1000-bar page, cursors strictly advancing
+    assert len(venue.calls) == -(-expected // 1000)
+    assert [since for _, since in venue.calls] == sorted(set(since for _, since in venue.calls))
+    assert report['gaps'] == {'BTC/USDT 1h': [{
+        'start': '2024-06-01T00:00:00', 'end': '2024-06-01T04:00:00', 'missing_bars': 5
+    }]}
+
+
+def test_resumes_after_last_stored_bar_and_prefers_volume(tmp_path):
+    thin = FakeVenue(['ETH/USDT'], volume=1.0)
+    deep = FakeVenue(['ETH/USDT'], volume=5.0)
+    store = OHLCVStore(tmp_path)
+    clients = {'thin': client('thin', thin), 'deep': client('deep', deep)}
+
+    first = run(UniverseBackfill(store, list(clients), clients=clients), ['ETH/USDT'],
+                until=datetime(2024, 3, 1, tzinfo=timezone.utc))
+    stored = store.read('ETH/USDT', '1h')
+    assert set(stored['exchange']) == {'deep'}
+    assert len(thin.calls) == 1  # first page only, to compare volume
+
+    deep.calls.clear()
+    second = run(UniverseBackfill(store, list(clients), clients=clients), ['ETH/USDT'],
+                 until=datetime(2024, 3, 2, tzinfo=timezone.utc))
+
+    # The last stored bar is refetched in case it was still forming
+    assert deep.calls[0][1] == int(stored.index[-1].tz_localize('UTC').timestamp() * 1000)
+    assert second['total_records'] == 25
+    assert second['changed_symbols'] == {'1h': ['ETH/USDT']}
+    assert second['gaps'] == {}
+    assert len(store.read('ETH/USDT', '1h')) == first['total_records'] + 24
+
+
+def test_wall_clock_follows_venue_rate_limit(tmp_path):
+    venue = FakeVenue([f'S{i}/USDT' for i in range(6)], page=500)
+    rps = 40.0
+    backfill = UniverseBackfill(OHLCVStore(tmp_path), ['fake'],
+                                clients={'fake': client('fake', venue, rps=rps)})
+
+    started = time.monotonic()
+    report = run(backfill, venue.symbols, since=datetime(2024, 11, 1, tzinfo=timezone.utc))
+    elapsed = time.monotonic() - started
+
+    requests = report['requests']['fake']
+    assert requests == len(venue.calls) + 1 == 6 * 3 + 1  # load_markets + 3 pages per symbol
+    assert elapsed == pytest.approx((requests - 1) / rps, rel=0.35)
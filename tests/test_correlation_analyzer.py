@@ -0,0 +1,105 @@
+"""
+Test vectorized CorrelationAnalyzer
+"""
+
+import numpy as np
+import pytest
+
+from src.strategy_engine_v3.correlation_analyzer import CorrelationAnalyzer, StreamingCorrelation
+
+
+@pytest.fixture
+def prices():
+    """Random-walk prices with one correlated group and one lagged follower"""
+    rng = np.random.default_rng(42)
+    common = rng.normal(0, 0.01, 200)
+    data = {}
+    for i in range(6):
+        own = rng.normal(0, 0.01, 200)
+        shocks = own + 2 * common if i < 3 else own
+        data[f"S{i}"] = list(100 * np.exp(np.cumsum(shocks)))
+    # S6 follows S0 with a 2-bar delay
+    leader_returns = np.diff(np.log(data["S0"]))
+    follower = np.concatenate([[0.0, 0.0], leader_returns[:-2]]) + rng.normal(0, 0.001, 199)
+    data["S6"] = list(100 * np.exp(np.concatenate([[0.0], np.cumsum(follower)])))
+    return data
+
+
+@pytest.fixture
+def analyzer(prices):
+    """Analyzer loaded with sample prices"""
+    analyzer = CorrelationAnalyzer()
+    for symbol, series in prices.items():
+        analyzer.add_price_data(symbol, series)
+    return analyzer
+
+
+def test_matrix_matches_pairwise(analyzer, prices):
+    """Vectorized matrix equals the pairwise calculation"""
+    symbols = list(prices)
+    matrix = np.array(analyzer.calculate_correlation_matrix(symbols, period=30).matrix)
+
+    for i, s1 in enumerate(symbols):
+        for j, s2 in enumerate(symbols):
+            expected = 1.0 if i == j else analyzer._calculate_correlation(s1, s2, 30)
+            assert matrix[i, j] == pytest.approx(expected, abs=1e-12)
+
+
+def test_matrix_handles_missing_and_flat_series(analyzer):
+    """Unknown symbols and constant prices correlate at 0"""
+    analyzer.add_price_data("FLAT", [100.0] * 50)
+    matrix = analyzer.calculate_correlation_matrix(["S0", "FLAT", "MISSING"]).matrix
+    assert matrix[0][1] == 0.0
+    assert matrix[0][2] == 0.0
+    assert matrix[2][2] == 1.0
+
+
+def test_lagged_tensor_matches_pairwise(analyzer, prices):
+    """Every lag/pair entry equals the scalar lagged correlation"""
+    symbols = list(prices)
+    tensor = analyzer.lagged_correlation_tensor(symbols, max_lag=4)
+
+    for lag in range(1, 5):
+        for i, s1 in enumerate(symbols):
+            for j, s2 in enumerate(symbols):
+                expected = analyzer._calculate_lagged_correlation(s1, s2, lag)
+                assert tensor[lag - 1, i, j] == pytest.approx(expected, abs=1e-9)
+
+
+def test_lead_lag_detects_follower(analyzer):
+    """S0 leads S6 by two bars"""
+    relationships = analyzer.find_lead_lag_relationships(["S0", "S6"], max_lag=4)
+    assert len(relationships) == 1
+    assert relationships[0].leader == "S0"
+    assert relationships[0].lag_periods == 2
+
+
+def test_hierarchical_clusters(analyzer):
+    """Assets sharing the common factor cluster together"""
+    clusters = analyzer.get_correlation_clusters(["S0", "S1", "S2", "S3", "S4", "S5"], threshold=0.3)
+    assert ["S0", "S1", "S2"] in clusters
+    assert all("S3" not in cluster for cluster in clusters)
+
+
+def test_streaming_rolling_matches_batch(prices):
+    """Incremental rolling correlation equals a batch recomputation"""
+    symbols = ["S0", "S1", "S3"]
+    stream = StreamingCorrelation(symbols, window=30)
+    for t in range(120):
+        stream.update({s: prices[s][t] for s in symbols})
+
+    window = np.array([prices[s][89:120] for s in symbols]).T
+    returns = np.diff(window, axis=0) / window[:-1]
+    expected = np.corrcoef(returns, rowvar=False)
+    np.testing.assert_allclose(stream.rolling_correlation(), expected, atol=1e-9)
+
+
+def test_streaming_ewma_tracks_common_factor(analyzer, prices):
+    """EWMA correlation is high within the correlated group"""
+    stream = analyzer.enable_streaming(["S0", "S1", "S4"], halflife=30)
+    for t in range(200):
+        analyzer.update_bar({s: prices[s][t] for s in ["S0", "S1", "S4"]})
+
+    corr = stream.ewma_correlation()
+    assert corr[0, 1] > 0.3
+    assert abs(corr[0, 2]) < corr[0, 1]
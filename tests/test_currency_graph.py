@@ -0,0 +1,80 @@
+"""
+Test multi-leg cycle detection on the currency graph
+"""
+
+import asyncio
+import math
+import random
+from datetime import datetime
+
+import pytest
+
+from src.strategy_engine_v3.arbitrage_scanner import ArbitrageConfig, ArbitrageScanner
+from src.strategy_engine_v3.currency_graph import CurrencyGraph
+from src.strategy_engine_v3.market_adapter import MarketData, MarketType
+
+
+def book(symbol, bid, ask):
+    return MarketData(symbol=symbol, market_type=MarketType.CRYPTO, timestamp=datetime.utcnow(),
+                      bid=bid, ask=ask, last=bid, volume=100.0, open=bid, high=ask, low=bid, close=bid)
+
+
+def test_triangle_profit_net_of_fees():
+    graph = CurrencyGraph(max_legs=3, fee=0.001)
+    assert graph.update_book("BTC/USDT", 50000, 50010) == []
+    assert graph.update_book("ETH/USDT", 3000, 3001) == []
+    cycles = graph.update_book("ETH/BTC", 0.0615, 0.0616)
+
+    # ETH is rich in BTC: USDT -> ETH (buy) -> BTC (sell) -> USDT (sell); the reverse loses
+    assert len(cycles) == 1
+    cycle = cycles[0].rotated("USDT")
+    assert cycle.currencies == ("USDT", "ETH", "BTC")
+    assert cycle.symbols == ("ETH/USDT", "ETH/BTC", "BTC/USDT")
+    expected = (0.999 / 3001) * (0.0615 * 0.999) * (50000 * 0.999) - 1
+    assert cycle.profit_pct == pytest.approx(expected * 100)
+    assert graph.path_weight("USDT", cycle.symbols) == pytest.approx(cycle.weight)
+
+
+@pytest.mark.parametrize("max_legs", [3, 4])
+def test_incremental_matches_full_rescan(max_legs):
+    rng = random.Random(7)
+    graph = CurrencyGraph(max_legs=max_legs, fee=0.001)
+    mids = {"USDT": 1.0, "BTC": 50000.0, "ETH": 3000.0}
+    mids.update({f"A{i}": rng.uniform(1, 100) for i in range(12)})
+    symbols = [f"A{i}/{q}" for i in range(12) for q in ("USDT", "BTC", "ETH")]
+    symbols += ["BTC/USDT", "ETH/USDT", "ETH/BTC"]
+
+    active = {}
+    for _ in range(400):
+        symbol = rng.choice(symbols)
+        base, quote = symbol.split("/")
+        mid = mids[base] / mids[quote] * rng.uniform(0.99, 1.01)
+        found = graph.update_book(symbol, mid * 0.9999, mid * 1.0001)
+        active = {k: c for k, c in active.items() if symbol not in c.symbols}
+        active.update({c.key: c for c in found})
+
+        full = {c.key: c.weight for c in graph.find_all_cycles()}
+        assert set(active) == set(full)
+        assert [active[k].weight for k in full] == pytest.approx(list(full.values()))
+    assert all(3 <= len(c.legs) <= max_legs for c in active.values())
+
+
+def test_scanner_tracks_cycles_from_book_updates():
+    scanner = ArbitrageScanner(ArbitrageConfig(min_spread_pct=0.5))
+
+    async def run():
+        await scanner.update_market_data("binance", "BTC/USDT", book("BTC/USDT", 50000, 50010))
+        await scanner.update_market_data("binance", "ETH/USDT", book("ETH/USDT", 3000, 3001))
+        await scanner.update_market_data("binance", "ETH/BTC", book("ETH/BTC", 0.0615, 0.0616))
+        found = await scanner.scan_triangular("USDT")
+        profit = await scanner._calculate_triangular_profit(["ETH/USDT", "ETH/BTC", "BTC/USDT"])
+
+        await scanner.update_market_data("binance", "ETH/BTC", book("ETH/BTC", 0.05999, 0.06001))
+        return found, profit, await scanner.scan_triangular("USDT")
+
+    found, profit, after = asyncio.run(run())
+    assert [o.path for o in found] == [["ETH/USDT", "ETH/BTC", "BTC/USDT"]]
+    assert found[0].market == "binance"
+    assert found[0].profit_pct == pytest.approx(profit)
+    assert after == []
+    assert math.isclose(scanner.currency_graphs["binance"].fee, 0.001)
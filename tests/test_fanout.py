@@ -0,0 +1,121 @@
+"""
+Test the serialize-once WebSocket fan-out hub
+"""
+
+import asyncio
+import json
+
+from src.web import fanout
+from src.web.fanout import FanoutHub
+
+
+class FakeSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.release = asyncio.Event()
+        if not delay:
+            self.release.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.release.wait()
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+
+def test_serialized_once_and_slow_client_does_not_stall_others(monkeypatch):
+    dumps = []
+    real_dumps = json.dumps
+    monkeypatch.setattr(fanout.json, "dumps", lambda *a, **k: dumps.append(1) or real_dumps(*a, **k))
+
+    async def run():
+        hub = FanoutHub(queue_size=4)
+        fast = [FakeSocket() for _ in range(50)]
+        slow = FakeSocket()
+        slow.release.clear()  # never drains until released
+        for ws in fast + [slow]:
+            await hub.connect(ws)
+
+        for i in range(10):
+            hub.publish("portfolio", {"seq": i})
+            hub.publish("alerts", {"alert": i}, conflate=False)
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)
+        queued = len(hub.clients[slow].queue)
+        slow.release.set()
+        await asyncio.sleep(0.01)
+        await hub.close()
+        return hub, fast, slow, queued
+
+    hub, fast, slow, queued = asyncio.run(run())
+    assert len(dumps) == 20
+    for ws in fast:
+        # Every alert arrives; snapshots may conflate but end on the latest
+        assert [m["alert"] for m in ws.sent if "alert" in m] == list(range(10))
+        assert [m for m in ws.sent if "seq" in m][-1] == {"seq": 9}
+    # The stalled client kept at most queue_size messages: the newest alerts
+    # and the conflated latest snapshot; its first message was already in flight
+    assert queued == 4
+    assert slow.sent[0] == {"seq": 0}
+    assert {"seq": 9} in slow.sent and {"alert": 9} in slow.sent
+    assert hub.stats["dropped"] > 0 and hub.stats["conflated"] > 0
+
+
+def test_topics_and_keyed_conflation():
+    async def run():
+        hub = FanoutHub()
+        prices, alerts = FakeSocket(), FakeSocket()
+        await hub.connect(prices, topics=())
+        await hub.connect(alerts, topics=["alerts"])
+        hub.subscribe(prices, ["prices"])
+
+        for price in (1, 2, 3):
+            hub.publish("prices", {"symbol": "BTC", "price": price}, key="BTC")
+            hub.publish("prices", {"symbol": "ETH", "price": price}, key="ETH")
+        hub.publish("alerts", {"alert": "x"}, conflate=False)
+        await asyncio.sleep(0.01)
+
+        late = FakeSocket()
+        await hub.connect(late, topics=["prices"])
+        await asyncio.sleep(0.01)
+        await hub.close()
+        return prices, alerts, late
+
+    prices, alerts, late = asyncio.run(run())
+    # Published without yielding: each key collapses to its latest price, in first-queued order
+    assert prices.sent == [{"symbol": "BTC", "price": 3}, {"symbol": "ETH", "price": 3}]
+    assert alerts.sent == [{"alert": "x"}]
+    # A new subscriber gets the latest snapshot of every key
+    assert late.sent == [{"symbol": "BTC", "price": 3}, {"symbol": "ETH", "price": 3}]
+
+
+def test_snapshot_producer_runs_once_per_tick_while_subscribed():
+    calls = []
+
+    async def snapshot():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    async def run():
+        hub = FanoutHub()
+        hub.add_topic("portfolio", snapshot, interval=0.02)
+        await asyncio.sleep(0.03)
+        assert calls == []  # nobody subscribed yet
+
+        sockets = [FakeSocket() for _ in range(20)]
+        for ws in sockets:
+            await hub.connect(ws, topics=["portfolio"])
+        await asyncio.sleep(0.05)
+        for ws in sockets:
+            hub.disconnect(ws)
+        await asyncio.sleep(0.05)
+        stopped = hub.get_stats()["producers"]
+        return sockets, stopped
+
+    sockets, stopped = asyncio.run(run())
+    assert 2 <= len(calls) <= 4
+    assert all(ws.sent == sockets[0].sent for ws in sockets)
+    assert stopped == []
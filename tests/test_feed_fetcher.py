@@ -0,0 +1,234 @@
+"""
+Test the shared news fetch layer against a local HTTP stub
+"""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+from src.news.cryptopanic import CryptoPanicClient
+from src.news.feed_fetcher import DedupIndex, FeedFetcher
+
+
+def rss(posts):
+    items = ''.join(f"<item><title>{p['title']}</title><link>{p['url']}</link>"
+                    f"<description>&lt;p&gt;Body {p['id']}&lt;/p&gt;</description>"
+                    f"<pubDate>Mon, 01 Jan 2024 12:00:00 GMT</pubDate></item>" for p in posts)
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>{items}</channel></rss>'
+
+
+class StubFeed(BaseHTTPRequestHandler):
+    """JSON (or ``/rss``) feed with an ETag; ``/slow`` records how many requests overlap"""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get('If-None-Match')))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if urlparse(self.path).path == '/slow':
+                time.sleep(0.05)
+            if urlparse(self.path).path == '/rss':
+                body = rss(server.posts).encode()
+            else:
+                body = json.dumps({'results': server.posts}).encode()
+            etag = f'"{server.posts[0]["id"] if server.posts else 0}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubFeed)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.posts = []
+    server.in_flight = server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server, path='/feed'):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def post(i):
+    return {'id': i, 'title': f'Post {i}', 'url': f'https://news.example/{i}',
+            'created_at': '2099-01-01T00:00:00Z'}
+
+
+def fetch_posts(fetcher, server, parsed):
+    def parse(entry):
+        parsed.append(entry['id'])
+        return dict(entry)
+
+    return fetcher.fetch_items(url(server), entries=lambda r: r.json()['results'],
+                               key=lambda entry: entry['id'], parse=parse, max_items=5)
+
+
+def test_conditional_get_and_incremental_parse(stub):
+    async def run():
+        fetcher = FeedFetcher()
+        parsed = []
+        stub.posts = [post(3), post(2), post(1)]
+        first = await fetch_posts(fetcher, stub, parsed)
+
+        # Unchanged feed: the server answers 304, nothing is parsed
+        second = await fetch_posts(fetcher, stub, parsed)
+
+        # Two new posts on top: parsing stops at the first known one
+        stub.posts = [post(5), post(4)] + stub.posts
+        third = await fetch_posts(fetcher, stub, parsed)
+        await fetcher.close()
+        return fetcher, parsed, first, second, third
+
+    fetcher, parsed, first, second, third = asyncio.run(run())
+
+    assert [p['id'] for p in first] == [p['id'] for p in second] == [3, 2, 1]
+    assert [p['id'] for p in third] == [5, 4, 3, 2, 1]
+    assert parsed == [3, 2, 1, 5, 4]
+    assert [etag for _, etag in stub.requests] == [None, '"3"', '"3"']
+    assert fetcher.get_stats()['not_modified'] == 1
+
+
+def test_sliding_window_keeps_only_the_current_entries(stub):
+    async def run():
+        fetcher = FeedFetcher()
+        parsed, sizes = [], []
+        for newest in range(5, 15):
+            stub.posts = [post(i) for i in range(newest, newest - 5, -1)]
+            items = await fetcher.fetch_items(url(stub), entries=lambda r: iter(r.json()['results']),
+                                              key=lambda entry: entry['id'],
+                                              parse=lambda entry: parsed.append(entry['id']) or entry)
+            sizes.append([p['id'] for p in items])
+        await fetcher.close()
+        return parsed, sizes
+
+    parsed, sizes = asyncio.run(run())
+    assert parsed == list(range(5, 0, -1)) + list(range(6, 15))
+    assert sizes[-1] == [14, 13, 12, 11, 10]
+    assert all(len(ids) == 5 for ids in sizes)
+
+
+def test_rss_entries_are_parsed_once(stub, monkeypatch):
+    from src.ai.news_sentiment import NewsSentimentAnalyzer
+
+    monkeypatch.setenv('USE_FINBERT', 'false')
+    analyzer = NewsSentimentAnalyzer()
+    parse = analyzer._parse_rss_entry
+    parsed = []
+    analyzer._parse_rss_entry = lambda entry, source: parsed.append(entry['title']) or parse(entry, source)
+    feed = {'name': 'Stub', 'url': url(stub, '/rss')}
+
+    async def run():
+        stub.posts = [post(2), post(1)]
+        first = await analyzer._fetch_feed(feed)
+        stub.posts = [post(3)] + stub.posts
+        second = await analyzer._fetch_feed(feed)
+        await analyzer.feed_fetcher.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert parsed == ['Post 2', 'Post 1', 'Post 3']
+    assert [item.url for item in second] == [f'https://news.example/{i}' for i in (3, 2, 1)]
+    assert second[1] is first[0]
+    assert first[0].summary == 'Body 2' and first[0].source == 'Stub'
+    assert first[0].timestamp.year == 2024
+
+
+def test_rss_entity_expansion_is_refused():
+    from src.ai.news_sentiment import NewsSentimentAnalyzer
+
+    bomb = ('<?xml version="1.0"?><!DOCTYPE rss [<!ENTITY a "aaaaaaaaaa">'
+            '<!ENTITY b "&a;&a;&a;&a;&a;&a;&a;&a;&a;&a;">]>'
+            '<rss version="2.0"><channel><item><title>&b;</title></item></channel></rss>')
+    assert list(NewsSentimentAnalyzer._rss_entries(bomb.encode())) == []
+    assert list(NewsSentimentAnalyzer._rss_entries(rss([post(1)]).encode()))[0]['title'] == 'Post 1'
+
+
+def test_concurrency_is_bounded_across_feeds(stub):
+    async def run():
+        fetcher = FeedFetcher(max_concurrency=3)
+        await asyncio.gather(*[fetcher.fetch(url(stub, f'/slow?q={i}')) for i in range(12)])
+        await fetcher.close()
+
+    asyncio.run(run())
+    assert len(stub.requests) == 12
+    assert 1 < stub.max_in_flight <= 3
+
+
+def test_client_shares_fetcher_and_filters_by_age(stub):
+    stub.posts = [post(2), dict(post(1), created_at='2000-01-01T00:00:00Z')]
+
+    async def run():
+        fetcher = FeedFetcher()
+        client = CryptoPanicClient(api_token='token', fetcher=fetcher)
+        client.base_url = url(stub, '')
+        posts = await client.fetch_symbol_news('BTC/USDT')
+        session = await client.get_session()
+        same = session is await fetcher.get_session()
+        await client.close()
+        return posts, same
+
+    posts, same = asyncio.run(run())
+    assert same
+    assert [p['url'] for p in posts] == ['https://news.example/2']
+
+
+def test_dedup_index_matches_url_or_title_and_expires():
+    now = [0.0]
+    index = DedupIndex(ttl=timedelta(hours=1), clock=lambda: now[0])
+
+    first, new = index.resolve('https://a.example/x', 'Bitcoin ETF sees record inflows', 'A')
+    assert (first, new) == ('A', True)
+    assert index.resolve('https://b.example/y', 'Bitcoin ETF Sees Record Inflows!', 'B') == ('A', False)
+    assert index.resolve('https://a.example/x', 'Edited headline', 'C') == ('A', False)
+
+    now[0] = 1800
+    index.resolve('https://c.example/z', 'Other story', 'D')
+    now[0] = 3700
+    assert index.evict() == 1
+    assert len(index) == 1
+    assert index.resolve('https://a.example/x', 'Bitcoin ETF sees record inflows', 'E') == ('E', True)
+
+
+def test_sentiment_analyzer_dedups_across_cycles(monkeypatch):
+    from datetime import datetime
+    from src.ai.news_sentiment import NewsItem, NewsSentimentAnalyzer
+
+    monkeypatch.setenv('USE_FINBERT', 'false')
+    analyzer = NewsSentimentAnalyzer()
+
+    def item(title, url):
+        return NewsItem(title=title, summary='', url=url, source='Reuters', timestamp=datetime.now())
+
+    first = analyzer._deduplicate_news([item('Apple beats', 'u1'), item('Apple  beats.', 'u2')])
+    again = analyzer._deduplicate_news([item('Apple beats', 'u1'), item('Azure grows', 'u3')])
+    assert len(first) == 1
+    assert again[0] is first[0]
+    assert [i.url for i in again] == ['u1', 'u3']
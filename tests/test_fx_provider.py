@@ -0,0 +1,121 @@
+"""
+Test the FX provider's in-memory rate table and refresher
+"""
+
+import time
+
+import pytest
+
+from src.providers.fx import FXProvider
+
+
+class FakeVenue:
+    def __init__(self, rate=34.0):
+        self.rate = rate
+        self.calls = 0
+
+    def fetch_ticker(self, symbol):
+        self.calls += 1
+        if self.rate is None:
+            raise ConnectionError("venue down")
+        return {'last': self.rate * (1.1 if symbol == "EUR/TRY" else 1.0)}
+
+    def fetch_tickers(self, symbols):
+        return {s: self.fetch_ticker(s) for s in symbols}
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    monkeypatch.setenv('FX_REFRESH_SECONDS', '0.01')
+    monkeypatch.setenv('FX_PERSIST_SECONDS', '3600')
+    fx = FXProvider(cache_file=str(tmp_path / "fx_cache.json"), sources=["btcturk"], auto_start=False)
+    fx.venue = fx._exchanges["btcturk"] = FakeVenue()
+    yield fx
+    fx.stop()
+
+
+def test_lookups_are_served_from_memory(provider):
+    assert provider.get_usdtry() == 34.0
+    for _ in range(100):
+        provider.get_usdtry()
+    assert provider.venue.calls == 1
+    # First write waits for the debounce; nothing else touched disk
+    assert provider.stats['saves'] == 1
+    provider.venue.rate = 35.0
+    provider.get_usdtry()
+    assert provider.stats['saves'] == 1
+
+    provider.stop()
+    assert FXProvider(cache_file=str(provider.cache_file)).cache['USDTTRY']['rate'] == 34.0
+
+
+def test_last_good_rate_survives_outage(provider):
+    provider.get_usdtry()
+    provider.venue.rate = None
+    assert provider.get_usdtry(use_cache=False) == 34.0
+    assert provider.get_rate_info()['source'] == 'live'
+
+    provider.cache['USDTTRY']['ts'] -= provider.max_staleness + 1
+    assert provider.get_usdtry() == provider._get_fallback_rate()
+    assert provider.get_rate_info()['source'] == 'fallback'
+
+
+def test_refresher_keeps_table_current(provider):
+    provider.start()
+    deadline = time.time() + 2
+    while 'USDTTRY' not in provider.cache and time.time() < deadline:
+        time.sleep(0.01)
+    provider.venue.rate = 36.0
+    while provider.cache['USDTTRY']['rate'] != 36.0 and time.time() < deadline:
+        time.sleep(0.01)
+    calls = provider.venue.calls
+    assert provider.get_usdtry() == 36.0
+    assert provider.venue.calls == calls
+    assert provider.get_rate_info()['refresher_running']
+    provider.stop()
+    assert not provider.running
+
+
+def test_first_lookup_starts_the_refresher(provider):
+    provider.auto_start = True
+    provider.refresh_interval = 3600
+    assert provider.get_rate("EURTRY") == pytest.approx(37.4)
+    assert provider.running
+    assert provider.pairs["EURTRY"] == "EUR/TRY"
+    deadline = time.time() + 2
+    while 'USDTTRY' not in provider.cache and time.time() < deadline:
+        time.sleep(0.01)  # the refresher's first cycle (all tracked pairs)
+
+    # An entry past cache_ttl is still a memory read while the refresher runs
+    provider.cache["EURTRY"]["ts"] -= provider.cache_ttl + 1
+    calls = provider.venue.calls
+    provider.get_rate("EURTRY")
+    assert provider.venue.calls == calls
+
+    provider.stop()
+    provider.get_rate("EURTRY")
+    assert not provider.running
+
+
+def test_fallback_is_per_pair(provider):
+    provider.get_rate("EURTRY")
+    provider.venue.rate = None
+    provider.cache["EURTRY"]["ts"] -= provider.max_staleness + 1
+
+    # No EURTRY fallback: the last EUR rate is kept rather than the USDTRY default
+    assert provider.get_rate("EURTRY", use_cache=False) == pytest.approx(37.4)
+    with pytest.raises(LookupError):
+        provider.get_rate("GBPTRY")
+
+    provider._fallback_rates["GBPTRY"] = 44.0
+    assert provider.get_rate("GBPTRY") == 44.0
+    assert provider.get_usdtry() == 34.5
+
+
+def test_pair_symbols_split_on_known_quotes(provider):
+    assert provider._symbol_for("USDTTRY") == "USDT/TRY"
+    assert provider._symbol_for("BTCUSDT") == "BTC/USDT"
+    assert provider._symbol_for("EURUSD") == "EUR/USD"
+    assert provider._symbol_for("ETH/BTC") == "ETH/BTC"
+    with pytest.raises(ValueError):
+        provider._symbol_for("ABCXYZ")
@@ -0,0 +1,120 @@
+"""
+Test GridMonster's concurrent scan and level-crossing grid monitor
+"""
+
+import asyncio
+import time
+from decimal import Decimal
+
+from src.strategies.grid_monster import GridMonster, GridState
+
+
+def monster(**config):
+    return GridMonster({"paper_mode": False, **config})
+
+
+def choppy(limit):
+    return [100.0 + (3.0 if i % 2 else -3.0) for i in range(limit)]
+
+
+async def started_grid(gm, symbol="BTC/USDT"):
+    async def history(symbol, limit):
+        return choppy(limit)
+
+    gm._get_price_history = history
+    gm.coin_metrics.update(await gm.scan_universe([symbol]))
+    grid_id = await gm.start_grid(symbol)
+    assert grid_id
+    return gm.active_grids[symbol]
+
+
+def test_scan_runs_concurrently_over_one_snapshot():
+    gm = monster(scan_concurrency=4)
+    symbols = [f"C{i}/USDT" for i in range(8)]
+    snapshots, in_flight, peak = [], [0], [0]
+
+    async def snapshot(syms):
+        snapshots.append(list(syms))
+        return {s: {"volume_24h": 1e8, "spread": 0.0002} for s in syms}
+
+    async def history(symbol, limit):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.02)
+        in_flight[0] -= 1
+        return choppy(limit)
+
+    gm._get_market_snapshot = snapshot
+    gm._get_price_history = history
+
+    start = time.perf_counter()
+    results = asyncio.run(gm.scan_universe(symbols))
+    elapsed = time.perf_counter() - start
+
+    assert sorted(results) == sorted(symbols)
+    assert all(m.suitable_for_grid for m in results.values())
+    assert snapshots == [symbols]
+    assert peak[0] == 4
+    assert elapsed < 8 * 0.02
+
+
+def test_tick_wakes_grid_only_when_a_level_is_crossed():
+    async def run():
+        gm = monster()
+        grid = await started_grid(gm)
+        buys = sorted((l for l in grid.levels if l.side == "buy"), key=lambda l: l.price, reverse=True)
+        middle = (buys[0].price + min(l.price for l in grid.levels if l.side == "sell")) / 2
+
+        await gm.on_price("BTC/USDT", middle)
+        await gm.on_price("BTC/USDT", middle * Decimal("1.00001"))
+        quiet = dict(gm.monitor_stats)
+
+        # Falling through the two highest buys fills exactly those, nearest first
+        await gm.on_price("BTC/USDT", (buys[1].price + buys[2].price) / 2)
+        return gm, grid, buys, quiet
+
+    gm, grid, buys, quiet = asyncio.run(run())
+    assert quiet == {"ticks": 2, "grid_wakeups": 0, "crossings": 0}
+    assert gm.monitor_stats["grid_wakeups"] == 1
+    assert [l.level_id for l in grid.levels if l.filled] == sorted([buys[0].level_id, buys[1].level_id])
+    assert grid.total_trades == 2
+    assert buys[1].price not in gm.price_index.prices["BTC/USDT"]
+
+
+def test_range_exit_resets_and_orders_use_the_budget():
+    async def run():
+        gm = monster(order_rate_per_second=1000, order_burst=5)
+        grid = await started_grid(gm)
+        placed = gm.order_budget.stats["acquired"]
+        old_ids = {l.order_id for l in grid.levels}
+
+        await gm.on_price("BTC/USDT", grid.setup.upper_price)
+        await gm.on_price("BTC/USDT", grid.setup.upper_price * Decimal("1.05"))
+        return gm, grid, placed, old_ids
+
+    gm, grid, placed, old_ids = asyncio.run(run())
+    assert placed == len(grid.levels)
+    assert len({l.order_id for l in grid.levels}) == len(grid.levels)
+    assert not old_ids & {l.order_id for l in grid.levels}
+    assert grid.state == GridState.ACTIVE
+    assert gm.order_budget.stats["waited"] > 0
+
+
+def test_live_snapshot_is_one_tickers_request():
+    class Venue:
+        calls = 0
+
+        def fetch_tickers(self):
+            Venue.calls += 1
+            return {"BTC/USDT": {"bid": 99.0, "ask": 101.0, "quoteVolume": 2e9},
+                    "ETH/USDT": {"bid": None, "ask": None, "quoteVolume": 1e9}}
+
+    gm = monster(live_market_data=True)
+    gm._market_exchange = Venue()
+    snapshot = asyncio.run(gm._get_market_snapshot(["BTCUSDT", "ETHUSDT", "XRPUSDT"]))
+
+    assert Venue.calls == 1
+    assert snapshot["BTCUSDT"] == {"volume_24h": 2e9, "spread": 0.02}
+    # No usable quote: per-symbol lookups fill in
+    assert snapshot["ETHUSDT"]["volume_24h"] == 800000000
+    assert snapshot["XRPUSDT"]["volume_24h"] == 60000000
@@ -0,0 +1,146 @@
+"""
+Test the incremental indicator graph and the signal hub's O(1) bar path
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.paper.indicator_graph import BarRing, IndicatorGraph
+from src.paper.signal_hub import SignalHub
+from src.strategies.bollinger_revert import BollingerRevertStrategy
+from src.strategies.donchian_breakout import DonchianBreakoutStrategy
+from src.strategies.supertrend import SuperTrendStrategy
+
+SMA = ('sma', 'close', 20)
+EMA_ADJ = ('ema_adj', 'close', 21)
+SPECS = [
+    SMA,
+    ('std', 'close', 20),
+    ('ema', 'close', 21),
+    EMA_ADJ,
+    ('max', 'high', 50),
+    ('min', 'low', 50),
+    ('rsi', 'close', 14),
+    ('atr', None, 14),
+    ('lag', EMA_ADJ, 5),
+]
+
+
+def expected(df):
+    """The pandas expressions the strategies use"""
+    close = df['close']
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    true_range = pd.concat([
+        df['high'] - df['low'],
+        (df['high'] - close.shift()).abs(),
+        (df['low'] - close.shift()).abs(),
+    ], axis=1).max(axis=1)
+    return [
+        close.rolling(20).mean(),
+        close.rolling(20).std(),
+        close.ewm(span=21, adjust=False).mean(),
+        close.ewm(span=21).mean(),
+        df['high'].rolling(50).max(),
+        df['low'].rolling(50).min(),
+        100 - 100 / (1 + gain / loss),
+        true_range.rolling(14).mean(),
+        close.ewm(span=21).mean().shift(5),
+    ]
+
+
+@pytest.mark.parametrize("revise", [False, True])
+def test_graph_matches_pandas(revise, make_bars):
+    """Every node reproduces its pandas counterpart, also after live-candle revisions"""
+    df = make_bars(300, seed=9)
+    graph = IndicatorGraph(SPECS)
+    out = {spec: [] for spec in SPECS}
+    for bar in df.to_dict('records'):
+        if revise:
+            graph.update({**bar, 'close': bar['close'] * 1.01, 'high': bar['high'] * 1.02})
+            graph.revise(bar)
+        else:
+            graph.update(bar)
+        for spec in SPECS:
+            out[spec].append(graph.values[spec])
+
+    for spec, series in zip(SPECS, expected(df)):
+        np.testing.assert_allclose(out[spec], series.values, rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=str(spec))
+
+
+def test_specs_are_shared():
+    graph = IndicatorGraph([SMA, ('lag', SMA, 1)])
+    assert graph.require(('sma', 'close', 20)) == SMA
+    assert len(graph._nodes) == 2
+
+
+def test_ring_wraps_in_order():
+    ring = BarRing(3, 1)
+    for i in range(5):
+        ring.append([i])
+    ring.replace_last([9])
+    assert ring.to_array().ravel().tolist() == [2, 3, 9]
+    assert ring.to_array(2).ravel().tolist() == [3, 9]
+
+
+@pytest.mark.parametrize("cls", [DonchianBreakoutStrategy, SuperTrendStrategy, BollingerRevertStrategy])
+def test_incremental_strategy_matches_dataframe(cls, make_bars):
+    """on_bar gives the same rows and signals as recomputing the DataFrame each bar"""
+    df = make_bars(260, seed=11)
+    incremental, batch = cls(), cls()
+    incremental.clock = batch.clock = lambda: datetime(2024, 1, 1, 12)
+    graph = IndicatorGraph(incremental.indicator_specs())
+
+    for i, bar in enumerate(df.to_dict('records')):
+        graph.update(bar)
+        incremental.on_bar('X', graph)
+        if i < 60 or i % 10:
+            continue
+        batch.update_data('X', df.iloc[:i + 1])
+
+        price = Decimal(str(bar['close']))
+        signals = [s.get_signal('X', price) for s in (incremental, batch)]
+        assert [s is None for s in signals] == [signals[1] is None] * 2
+        if signals[0]:
+            fields = [[s[k] for k in ('direction', 'strength', 'confidence')] for s in signals]
+            assert fields[0] == pytest.approx(fields[1])
+        for column, value in incremental.state['X']['latest'].items():
+            assert value == pytest.approx(batch.indicators['X'][column].iloc[-1], nan_ok=True), column
+
+
+def test_signal_cache_is_capped(make_bars):
+    hub = SignalHub(signal_cache_size=5)
+    df = make_bars(300, seed=2)
+    cached = 0
+    for ts, row in zip(df.index, df.values.tolist()):
+        hub.append_bar('X', [int(ts.timestamp() * 1000), *row])
+        cached += hub.get_signal('X', Decimal(str(row[3])))['strength'] != 0
+    assert cached > 5
+    assert len(hub.signal_cache['X']) == 5
+
+
+def test_incomplete_nodes_and_strategies_fail_on_construction():
+    from src.paper.indicator_graph import Node
+    from src.paper.signal_hub import BaseStrategy
+
+    class NoRollback(Node):
+        def update(self, x):
+            return x
+
+    class NoSignal(BaseStrategy):
+        def on_bar(self, symbol, graph):
+            pass
+
+        def _calculate_indicators(self, symbol):
+            pass
+
+    with pytest.raises(TypeError):
+        NoRollback()
+    with pytest.raises(TypeError):
+        NoSignal()
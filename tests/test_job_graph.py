@@ -0,0 +1,152 @@
+"""
+Test the scheduler job graph: fetch -> scan chaining, coalescing and metrics
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.scheduler.graph import JobGraph, union_symbols
+
+
+class Recorder:
+    """Job runner that records calls; jobs can be held open with an event"""
+
+    def __init__(self, results=None):
+        self.calls = []
+        self.results = results or {}
+        self.gates = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, name, kwargs):
+        with self.lock:
+            self.calls.append((name, kwargs))
+        gate = self.gates.get(name)
+        if gate is not None:
+            gate.wait(5)
+        return self.results.get(name, {'status': 'success'})
+
+
+def changed(result):
+    symbols = result.get('results', {}).get('changed_symbols', {}).get('1h')
+    return {'symbols': symbols} if symbols else None
+
+
+def make_graph(runner):
+    graph = JobGraph(runner, max_workers=4)
+    graph.add_job('fetch_data')
+    graph.add_job('scan_signals', merge=union_symbols)
+    graph.add_dependency('fetch_data', 'scan_signals', when=changed)
+    return graph
+
+
+def test_scan_follows_fetch_for_changed_symbols_only():
+    runner = Recorder({'fetch_data': {'status': 'success',
+                                      'results': {'changed_symbols': {'1h': ['BTC/USDT']}}}})
+    graph = make_graph(runner)
+
+    graph.submit('fetch_data')
+    assert graph.wait_idle(5)
+    assert runner.calls == [('fetch_data', {}), ('scan_signals', {'symbols': ['BTC/USDT']})]
+
+    # Nothing new: no scan
+    runner.results['fetch_data'] = {'status': 'success', 'results': {'changed_symbols': {'1h': []}}}
+    graph.submit('fetch_data')
+    assert graph.wait_idle(5)
+    # Failed fetch: no scan either
+    runner.results['fetch_data'] = {'status': 'error', 'error': 'down'}
+    graph.submit('fetch_data')
+    assert graph.wait_idle(5)
+
+    assert [name for name, _ in runner.calls].count('scan_signals') == 1
+    metrics = graph.metrics()
+    assert metrics['fetch_data']['runs'] == 3
+    assert metrics['fetch_data']['failures'] == 1
+    assert metrics['scan_signals']['triggered'] == 1
+    graph.shutdown()
+
+
+def test_submissions_while_running_coalesce_into_one_run():
+    runner = Recorder()
+    runner.gates['scan_signals'] = gate = threading.Event()
+    graph = make_graph(runner)
+
+    graph.submit('scan_signals', symbols=['A'])
+    time.sleep(0.05)
+    graph.submit('scan_signals', symbols=['B'])
+    graph.submit('scan_signals', symbols=['C', 'A'])
+    assert graph.metrics()['scan_signals']['running'] == 1
+    gate.set()
+    assert graph.wait_idle(5)
+
+    assert runner.calls == [('scan_signals', {'symbols': ['A']}),
+                            ('scan_signals', {'symbols': ['A', 'B', 'C']})]
+    metrics = graph.metrics()['scan_signals']
+    assert metrics['runs'] == 2
+    assert metrics['coalesced'] == 1
+    assert metrics['max_duration_s'] >= metrics['avg_duration_s'] > 0
+    graph.shutdown()
+
+
+def test_scheduler_chains_fetch_into_incremental_scan(tmp_path):
+    from src.scan.scanner import SignalScanner
+    from src.scheduler.run import CryptoScheduler
+
+    scanned = []
+
+    def scan_symbol(symbol, timeframe='1h'):
+        scanned.append(symbol)
+        return {'symbol': symbol, 'score': len(scanned), 'signals': []}
+
+    scanner = SignalScanner(outputs_dir=str(tmp_path / 'out'))
+    universe = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']
+    fetch = {'status': 'success', 'job': 'fetch_data',
+             'results': {'changed_symbols': {'1h': ['ETH/USDT']}}}
+
+    with patch('src.scan.scanner.data_pipeline') as pipeline, \
+            patch('src.scheduler.jobs.data_pipeline') as job_pipeline, \
+            patch('src.scheduler.jobs.scanner', scanner), \
+            patch.object(scanner, 'scan_symbol', side_effect=scan_symbol):
+        pipeline.get_available_symbols.return_value = universe
+        job_pipeline.update_recent_data.return_value = fetch['results']
+
+        scheduler = CryptoScheduler(outputs_dir=str(tmp_path))
+        scheduler.run_job_now('scan_signals')  # first scan covers everything
+        assert sorted(scanned) == sorted(universe)
+
+        scanned.clear()
+        scheduler.run_job_now('fetch_data')
+
+    assert scanned == ['ETH/USDT']
+    latest = scheduler.get_job_logs('scan_signals', limit=1)[0]
+    assert latest['results']['symbols_scanned'] == 1
+    assert latest['results']['total_symbols'] == 3
+    status = scheduler.get_job_status()
+    assert status['jobs']['scan_signals']['metrics']['runs'] == 2
+    assert status['jobs']['scan_signals']['metrics']['triggered'] == 1
+    scheduler.graph.shutdown()
+
+
+def test_dependency_on_unknown_job_names_it():
+    graph = JobGraph(Recorder())
+    graph.add_job('fetch_data')
+
+    with pytest.raises(ValueError, match="'scan_signals'"):
+        graph.add_dependency('fetch_data', 'scan_signals')
+    with pytest.raises(ValueError, match="'full_data_sync'"):
+        graph.add_dependency('full_data_sync', 'fetch_data')
+    graph.shutdown()
+
+
+def test_scheduler_skips_chains_for_unconfigured_jobs(tmp_path):
+    from src.scheduler import run
+
+    with patch.dict(run.SCHEDULED_JOBS, clear=True):
+        run.SCHEDULED_JOBS['fetch_data'] = lambda: {'status': 'success'}
+        scheduler = run.CryptoScheduler(outputs_dir=str(tmp_path))
+
+    assert list(scheduler.graph.nodes) == ['fetch_data']
+    assert scheduler.graph.nodes['fetch_data'].downstream == []
+    scheduler.graph.shutdown()
@@ -0,0 +1,83 @@
+"""
+Test compiled keyword matching and per-item news tagging
+"""
+
+import random
+import re
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from src.ai.keyword_matcher import KeywordMatcher, TagCache
+from src.ai.news_features import NewsFeatureEngine
+from src.ai.news_sentiment import NewsItem, NewsSentimentAnalyzer
+
+KEYWORDS = ['sec', 'sec filing', 'filing', 'crypto', 'cryptocurrency', 'currency',
+            'eth', 'ethereum', 'tim cook', 'now', 'c++', 'c']
+WORDS = ['sec', 'filing', 'crypto', 'cryptocurrency', 'ethereum', 'eth', 'tim', 'cook',
+         'know', 'now', 'c++', 'c', 'SEC', 'x', '+']
+
+
+@pytest.mark.parametrize("whole_words", [True, False])
+def test_counts_match_per_keyword_search(whole_words):
+    """One pass gives the same counts as searching each keyword on its own"""
+    matcher = KeywordMatcher({'all': KEYWORDS}, whole_words=whole_words)
+    rng = random.Random(0)
+    for _ in range(500):
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 12)))
+        if rng.random() < 0.3:
+            text = text.replace(' ', '')
+        lowered = text.lower()
+        expected = Counter({
+            k: len(re.findall(rf'\b{re.escape(k)}\b' if whole_words else f'(?={re.escape(k)})', lowered))
+            for k in KEYWORDS
+        })
+        assert matcher.count(text) == +expected, text
+
+
+def test_groups_share_keywords():
+    matcher = KeywordMatcher({'BTC': ['bitcoin', 'crypto'], 'ETH': ['ethereum', 'crypto']},
+                             whole_words=False)
+    assert matcher.match_groups("Crypto markets rally") == ['BTC', 'ETH']
+    assert matcher.match_groups("Ethereum upgrade") == ['ETH']
+    assert matcher.groups(matcher.count("crypto crypto bitcoin")) == {'BTC': 3, 'ETH': 2}
+
+
+def test_tag_cache_is_bounded():
+    cache = TagCache(max_items=2)
+    for key in ['a', 'b', 'a', 'c']:
+        cache.get((key,), lambda: key.upper())
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert cache.get(('a',), lambda: 'fresh') == 'A'
+
+
+def make_item(title, summary="", url=None):
+    return NewsItem(title=title, summary=summary, url=url or title, source='Reuters',
+                    timestamp=datetime.now(), sentiment_score=0.0)
+
+
+def test_feature_engine_tags_each_item_once():
+    engine = NewsFeatureEngine()
+    items = [make_item("SEC probe hits crypto exchange", "Breaking: earnings miss"),
+             make_item("Market volume surges", "Growth now strong")]
+
+    first = engine._analyze_keyword_impact(items)
+    engine.extract_features('BTC/USDT', items)
+    assert engine.tag_cache.misses == 2
+
+    # 'sec', 'earnings' (2.0) and 'miss' (1.3), no decay for fresh items
+    assert engine._analyze_keyword_impact(items[:1])['total_impact_score'] == pytest.approx(5.3, rel=1e-3)
+    assert {'keyword': 'sec', 'count': 1} in first['top_keywords']
+    assert engine._classify_event_types(items[:1])['event_type_counts'] == {'regulatory': 1, 'earnings': 1}
+
+
+def test_sentiment_analyzer_buckets_news_by_symbol(monkeypatch):
+    monkeypatch.setenv('USE_FINBERT', 'false')
+    analyzer = NewsSentimentAnalyzer()
+    items = [make_item("Bitcoin and Ethereum slide"), make_item("Apple unveils new Mac"),
+             make_item("Quiet session")]
+
+    assert [analyzer._symbols_for(item) for item in items] == [['BTC/USDT', 'ETH/USDT'], ['AAPL'], []]
+    assert analyzer.symbol_tags.misses == 3
@@ -0,0 +1,142 @@
+"""
+Test versioned model registry and lazy ML imports
+"""
+
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.model_registry import ModelRegistry, feature_set_hash
+from src.ml.price_predictor import PricePredictor
+
+
+def make_ohlcv(n=300, seed=0):
+    """Daily random-walk OHLCV frame in yfinance column layout"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    index = pd.date_range("2023-01-01", periods=n, freq="D")
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * 1.01,
+        'Low': np.minimum(open_, close) * 0.99,
+        'Close': close,
+        'Volume': rng.uniform(1e5, 1e6, n),
+    }, index=index)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(tmp_path / "registry", max_memory_mb=1)
+
+
+def test_versions_and_lookup(registry):
+    """Each save bumps the version; lookups filter by feature hash"""
+    registry.save({"w": np.arange(10)}, "BTC", 1, feature_columns=["a", "b"])
+    second = registry.save({"w": np.arange(20)}, "BTC", 1, feature_columns=["a", "b"])
+    registry.save({"w": np.arange(5)}, "BTC", 1, feature_columns=["a", "c"])
+
+    assert second.version == 2
+    assert registry.find("BTC", 1, feature_columns=["a", "b"]).version == 2
+    assert registry.find("BTC", 1, feature_columns=["x"]) is None
+    assert second.feature_hash == feature_set_hash(["a", "b"])
+
+
+def test_lazy_load_from_index(registry, tmp_path):
+    """A fresh registry reads the index but loads models on first use"""
+    registry.save({"w": np.arange(1000, dtype=float)}, "ETH", "24", data_start=pd.Timestamp("2024-01-01"))
+
+    reopened = ModelRegistry(tmp_path / "registry")
+    assert reopened.get_status()["loaded"] == []
+
+    model = reopened.latest("ETH", 24)
+    assert isinstance(model["w"], np.memmap)
+    assert model["w"][-1] == 999
+    reopened.latest("ETH", 24)
+    assert reopened.stats == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_lru_memory_cap(tmp_path):
+    """Least recently used models are dropped once the budget is exceeded"""
+    registry = ModelRegistry(tmp_path, max_memory_mb=0.2)
+    for symbol in ["A", "B", "C"]:
+        registry.save({"w": np.zeros(10_000)}, symbol, 1)  # ~80 KB each
+
+    status = registry.get_status()
+    assert status["loaded"] == ["B/1/1", "C/1/1"]
+    assert status["evictions"] == 1
+
+
+def test_old_versions_pruned(tmp_path):
+    registry = ModelRegistry(tmp_path, keep_versions=2)
+    for i in range(4):
+        registry.save({"i": i}, "BTC", 1)
+    assert sorted(r.version for r in registry.records("BTC")) == [3, 4]
+    assert not (tmp_path / "BTC" / "1" / "v1").exists()
+
+
+@pytest.mark.parametrize("algorithm", ["xgboost", "random_forest"])
+def test_price_predictor_round_trip(registry, tmp_path, algorithm):
+    """Predictors reload from their own artifact format with identical output"""
+    data = make_ohlcv()
+    predictor = PricePredictor(algorithm=algorithm)
+    predictor.train(data, validate=False)
+    registry.save(predictor, "SPY", "classification-h1", feature_columns=predictor.feature_columns)
+
+    reopened = ModelRegistry(tmp_path / "registry")
+    loaded = reopened.latest("SPY", "classification-h1", feature_columns=predictor.feature_columns)
+
+    assert isinstance(loaded, PricePredictor)
+    expected = predictor.predict(data.tail(80), return_confidence=True)
+    pd.testing.assert_frame_equal(loaded.predict(data.tail(80), return_confidence=True), expected)
+
+
+def test_import_does_not_load_ml_libraries():
+    """Importing the predictors must not pull in sklearn or xgboost"""
+    code = (
+        "import sys; import src.ml.price_predictor, src.ml.model_registry; "
+        "print(any(m in sys.modules for m in ('sklearn', 'xgboost')))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+@pytest.fixture
+def api(monkeypatch):
+    from fastapi.testclient import TestClient
+    import src.api.main as main
+
+    data = make_ohlcv(200)
+    monkeypatch.setattr(main.yf, "Ticker", lambda symbol: type("Ticker", (), {"history": lambda self, period: data})())
+    return main, TestClient(main.app)
+
+
+def test_ml_endpoints_work_without_registry(api, monkeypatch):
+    """A missing registry means models are trained but not persisted"""
+    main, client = api
+    monkeypatch.setattr(main, "get_model_registry", lambda: None)
+    params = {"symbol": "SPY", "algorithm": "random_forest"}
+
+    trained = client.post("/api/ml/train", params=params)
+    assert trained.status_code == 200
+    assert trained.json()["model_version"] is None
+
+    # Only the registry handling is under test here, not the 20-bar prediction window
+    frame = pd.DataFrame({"prediction": [1], "confidence": [0.6]})
+    monkeypatch.setattr(main.PricePredictor, "predict", lambda self, data, return_confidence=False: frame)
+    predicted = client.post("/api/ml/predict", params=params)
+    assert predicted.status_code == 200
+    assert predicted.json()["latest_prediction"] == {"prediction": 1, "confidence": 0.6}
+
+
+def test_ml_endpoints_unavailable_without_predictor(api, monkeypatch):
+    main, client = api
+    monkeypatch.setattr(main, "PricePredictor", None)
+
+    for endpoint in ("/api/ml/train", "/api/ml/predict"):
+        response = client.post(endpoint, params={"symbol": "SPY"})
+        assert response.status_code == 503
+        assert response.json()["detail"] == "ML prediction is not available"
@@ -0,0 +1,75 @@
+"""
+Test the month-partitioned OHLCV store behind DataPipeline
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.ohlcv_store import OHLCVStore
+
+
+def bars(start, periods, freq='1h', seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=periods, freq=freq, name='timestamp')
+    close = 100 + rng.normal(0, 1, periods).cumsum()
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                         'close': close, 'volume': rng.uniform(1, 10, periods)}, index=index)
+
+
+def test_append_rewrites_only_the_affected_month(tmp_path):
+    store = OHLCVStore(tmp_path)
+    history = bars('2024-01-01', 24 * 90)
+    assert store.write('BTC/USDT', '1h', history) == 3
+
+    months = {p.name: p.stat().st_mtime_ns for p in store.partitions('BTC/USDT', '1h')}
+    assert list(months) == ['2024-01.parquet', '2024-02.parquet', '2024-03.parquet']
+
+    # Revised last bar plus one new bar, both in March
+    update = bars(history.index[-1], 2, seed=1)
+    assert store.write('BTC/USDT', '1h', update) == 1
+
+    after = {p.name: p.stat().st_mtime_ns for p in store.partitions('BTC/USDT', '1h')}
+    assert after['2024-01.parquet'] == months['2024-01.parquet']
+    assert after['2024-02.parquet'] == months['2024-02.parquet']
+
+    stored = store.read('BTC/USDT', '1h')
+    assert len(stored) == len(history) + 1
+    assert stored.index.is_monotonic_increasing
+    assert stored['close'].iloc[-2] == update['close'].iloc[0]
+    assert store.last_timestamp('BTC/USDT', '1h') == update.index[-1]
+
+
+def test_range_read_prunes_partitions(tmp_path, monkeypatch):
+    store = OHLCVStore(tmp_path)
+    history = bars('2024-01-01', 24 * 120)
+    store.write('ETH/USDT', '1h', history)
+
+    opened = []
+    real = __import__('pyarrow.parquet', fromlist=['ParquetDataset']).ParquetDataset
+    monkeypatch.setattr('src.data.ohlcv_store.pq.ParquetDataset',
+                        lambda files, **kw: opened.extend(files) or real(files, **kw))
+
+    window = store.read('ETH/USDT', '1h', start='2024-02-10', end='2024-02-12 05:00')
+
+    assert [f.rsplit('/', 1)[-1] for f in opened] == ['2024-02.parquet']
+    pd.testing.assert_frame_equal(window, history.loc['2024-02-10':'2024-02-12 05:00'],
+                                  check_freq=False)
+
+
+def test_pipeline_migrates_legacy_file(tmp_path):
+    from src.data.pipeline import DataPipeline
+
+    pipeline = DataPipeline(data_dir=str(tmp_path))
+    legacy = pipeline.ohlcv_dir / 'SOL-USDT_1h.parquet'
+    history = bars('2023-12-20', 24 * 20)
+    history.to_parquet(legacy)
+
+    assert pipeline.get_available_symbols() == ['SOL/USDT']
+    pipeline.save_ohlcv_data('SOL/USDT', '1h', bars(history.index[-1] + pd.Timedelta('1h'), 3))
+
+    assert not legacy.exists()
+    stored = pipeline.get_symbol_data('SOL/USDT', '1h')
+    assert len(stored) == len(history) + 3
+    assert pipeline.get_symbol_data('SOL/USDT', '1h', start=pd.Timestamp('2024-01-08')).index[0] == \
+        pd.Timestamp('2024-01-08')
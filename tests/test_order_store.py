@@ -0,0 +1,104 @@
+"""
+Test the indexed order store behind src.core OrderManager
+"""
+
+import time
+
+from src.core.order_manager import OrderManager, OrderSide, OrderStatus, OrderType
+
+
+def place(manager, symbol="BTC/USDT", **kwargs):
+    return manager.create_order(symbol, OrderSide.BUY, OrderType.LIMIT, 1.0, price=100.0, **kwargs)
+
+
+def test_indexes_follow_status_changes():
+    manager = OrderManager()
+    events = []
+    manager.subscribe(lambda event, order: events.append((event, order.id, order.status)))
+
+    a = place(manager, client_order_id="c-1", strategy="grid")
+    b = place(manager, symbol="ETH/USDT", strategy="grid")
+    c = place(manager)
+
+    assert manager.get_order_by_client_id("c-1") is a
+    assert manager.get_active_orders("BTC/USDT") == [a, c]
+    assert manager.get_active_orders(strategy="grid") == [a, b]
+    assert manager.get_orders_by_status(OrderStatus.PENDING) == [a, b, c]
+
+    manager.update_order_status(a.id, OrderStatus.PARTIALLY_FILLED, filled_quantity=0.5)
+    assert manager.get_active_orders("BTC/USDT") == [a, c]
+    assert manager.update_order_status(a.id, OrderStatus.FILLED, filled_quantity=1.0, average_fill_price=99.5)
+    assert manager.cancel_order(c.id)
+    assert not manager.cancel_order(c.id)
+
+    assert manager.get_active_orders("BTC/USDT") == []
+    assert manager.active_orders == [b]
+    assert manager.get_active_orders(strategy="grid") == [b]
+    assert manager.get_order_history("BTC/USDT") == [a, c]
+    assert manager.get_orders_by_status(OrderStatus.FILLED) == [a]
+    assert events[-2:] == [("updated", a.id, OrderStatus.FILLED), ("updated", c.id, OrderStatus.CANCELLED)]
+    assert [e[0] for e in events[:3]] == ["created"] * 3
+
+
+def test_history_is_bounded_and_spills_compact_rows(tmp_path):
+    spill = tmp_path / "orders.jsonl"
+    manager = OrderManager(history_limit=5, spill_path=str(spill))
+    orders = [place(manager, symbol="BTC/USDT" if i % 2 else "ETH/USDT", client_order_id=f"c-{i}")
+              for i in range(12)]
+    for order in orders:
+        manager.cancel_order(order.id)
+
+    assert len(manager.store) == 5
+    assert manager.get_order_history(limit=100) == orders[7:]
+    assert manager.get_order(orders[0].id) is None
+    assert manager.get_order_by_client_id("c-0") is None
+
+    spilled = manager.store.spilled_history(symbol="BTC/USDT", limit=2)
+    assert [o.id for o in spilled] == [orders[3].id, orders[5].id]
+    assert spilled[0].status == OrderStatus.CANCELLED and spilled[0].client_order_id == "c-3"
+    assert len(manager.store.spilled_history(limit=100)) == 7
+
+    restored = OrderManager()
+    restored.store.restore(manager.store.snapshot())
+    assert [o.id for o in restored.get_order_history()] == [o.id for o in orders[7:]]
+
+
+def test_update_cost_does_not_grow_with_open_orders():
+    def time_updates(n_open):
+        manager = OrderManager()
+        for _ in range(n_open):
+            place(manager)
+        probes = [place(manager, symbol="SOL/USDT") for _ in range(500)]
+        start = time.perf_counter()
+        for order in probes:
+            manager.update_order_status(order.id, OrderStatus.OPEN)
+            manager.cancel_order(order.id)
+        return time.perf_counter() - start
+
+    small, large = time_updates(100), time_updates(20000)
+    assert large < small * 5
+
+
+def test_order_cancel_goes_through_the_store():
+    manager = OrderManager()
+    order = place(manager)
+
+    order.cancel()
+
+    assert order.status == OrderStatus.CANCELLED
+    assert manager.active_orders == []
+    assert manager.get_active_orders("BTC/USDT") == []
+    assert manager.get_order_history("BTC/USDT") == [order]
+
+
+def test_rearmed_order_moves_back_to_active():
+    manager = OrderManager()
+    order = place(manager, strategy="grid")
+    manager.cancel_order(order.id)
+
+    assert manager.update_order_status(order.id, OrderStatus.OPEN)
+
+    assert manager.get_active_orders("BTC/USDT", strategy="grid") == [order]
+    assert manager.get_order_history() == []
+    assert manager.cancel_order(order.id)
+    assert manager.get_order_history("BTC/USDT") == [order]
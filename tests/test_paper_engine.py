@@ -0,0 +1,123 @@
+"""
+Test the paper engine's columnar ledger, O(1) metrics and incremental persistence
+"""
+
+import asyncio
+import json
+import random
+
+import numpy as np
+import pytest
+
+from src.paper_trading.paper_engine import PaperTradingEngine
+
+
+def run_session(engine, steps, seed=0):
+    """Random buys/sells on two symbols with moving prices"""
+    rng = random.Random(seed)
+    prices = {"BTC/USDT": 100.0, "ETH/USDT": 50.0}
+
+    async def trade():
+        for _ in range(steps):
+            symbol = rng.choice(list(prices))
+            prices[symbol] *= 1 + rng.uniform(-0.05, 0.05)
+            engine.update_market_price(symbol, prices[symbol])
+            position = engine.positions.get(symbol)
+            if position and rng.random() < 0.5:
+                await engine.place_order(symbol, "sell", "market", position.quantity * rng.choice([0.5, 1.0]))
+            else:
+                await engine.place_order(symbol, "buy", "market", rng.uniform(1, 5))
+
+    asyncio.run(trade())
+
+
+def test_metrics_match_full_recomputation():
+    engine = PaperTradingEngine(initial_balance=10000)
+    run_session(engine, 300)
+    metrics = engine.calculate_metrics()
+
+    trades = engine.trade_history
+    pnls = [t["pnl"] for t in trades if t["pnl"] is not None]
+    wins = [p for p in pnls if p > 0]
+    losses = [-p for p in pnls if p <= 0]
+    equity = np.array(engine.balance_history)
+    returns = np.diff(equity) / equity[:-1]
+    drawdown = (np.maximum.accumulate(equity) - equity) / np.maximum.accumulate(equity) * 100
+
+    assert len(trades) == engine.account.total_trades
+    assert metrics.win_rate == pytest.approx(len(wins) / len(pnls) * 100)
+    assert metrics.profit_factor == pytest.approx(sum(wins) / sum(losses))
+    assert metrics.best_trade == pytest.approx(max(pnls))
+    assert metrics.worst_trade == pytest.approx(min(pnls))
+    assert metrics.total_fees == pytest.approx(sum(t["fee"] for t in trades))
+    assert metrics.sharpe_ratio == pytest.approx(returns.mean() / returns.std() * np.sqrt(252))
+    assert metrics.max_drawdown == pytest.approx(drawdown.max())
+
+
+def test_save_state_appends_only_new_fills(tmp_path):
+    state_file = tmp_path / "paper_state.json"
+    fills_file = tmp_path / "paper_state.fills.jsonl"
+    engine = PaperTradingEngine(initial_balance=10000)
+
+    run_session(engine, 20)
+    engine.save_state(str(state_file))
+    first_lines = fills_file.read_text().splitlines()
+
+    run_session(engine, 15, seed=1)
+    engine.save_state(str(state_file))
+    lines = fills_file.read_text().splitlines()
+
+    assert len(lines) == len(engine.ledger) == json.loads(state_file.read_text())["fills"]
+    assert lines[:len(first_lines)] == first_lines
+
+    restored = PaperTradingEngine()
+    restored.load_state(str(state_file))
+    assert restored.calculate_metrics() == engine.calculate_metrics()
+    assert restored.balance_history == pytest.approx(engine.balance_history)
+
+    # Restored ledger keeps appending to the same file
+    run_session(restored, 5, seed=2)
+    restored.save_state(str(state_file))
+    assert len(fills_file.read_text().splitlines()) == len(restored.ledger)
+
+
+def test_load_ignores_fills_written_after_the_snapshot(tmp_path):
+    """A crash between the fills append and the snapshot replace"""
+    state_file = tmp_path / "paper_state.json"
+    fills_file = tmp_path / "paper_state.fills.jsonl"
+    engine = PaperTradingEngine(initial_balance=10000)
+    run_session(engine, 20)
+    engine.save_state(str(state_file))
+    snapshot = state_file.read_text()
+    saved_metrics = engine.calculate_metrics()
+
+    run_session(engine, 10, seed=1)
+    engine.save_state(str(state_file))
+    state_file.write_text(snapshot)  # the newer snapshot never landed
+
+    restored = PaperTradingEngine()
+    restored.load_state(str(state_file))
+    assert len(restored.ledger) == json.loads(snapshot)["fills"]
+    assert restored.calculate_metrics() == saved_metrics
+
+    # The orphaned lines are dropped from the file on the next save
+    run_session(restored, 5, seed=2)
+    restored.save_state(str(state_file))
+    lines = fills_file.read_text().splitlines()
+    assert len(lines) == len(restored.ledger)
+    assert [json.loads(line)["id"] for line in lines] == restored.ledger.ids
+
+
+def test_parquet_export(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    engine = PaperTradingEngine(initial_balance=10000)
+    run_session(engine, 50)
+
+    path = tmp_path / "fills.parquet"
+    engine.export_trades_parquet(str(path))
+    table = pq.read_table(path)
+
+    assert table.num_rows == len(engine.ledger)
+    assert table.column("id").to_pylist() == engine.ledger.ids
+    assert table.column("pnl").null_count == sum(t["pnl"] is None for t in engine.trade_history)
+    np.testing.assert_allclose(table.column("equity").to_numpy(), engine.ledger.column("equity"))
@@ -0,0 +1,90 @@
+"""
+Test the shared market-data fan-out of the parallel paper runner
+"""
+
+import asyncio
+from collections import Counter
+from decimal import Decimal
+
+import pytest
+
+from src.paper.market_feed import MarketDataFeed
+from src.paper.parallel_runner import ParallelPaperRunner
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # no optimizer results: default configs
+    monkeypatch.setenv('PAPER_POLL_SECONDS', '0.01')
+    return ParallelPaperRunner()
+
+
+def test_one_fetch_per_symbol_poll(runner, monkeypatch):
+    fetches = Counter()
+
+    async def fetch(symbol):
+        fetches[symbol] += 1
+        return Decimal('100')
+
+    runner.market_feed.fetch_price = fetch
+
+    async def run():
+        await runner.market_feed.start()
+        runner.running = True
+        await asyncio.sleep(0.1)
+        runner.running = False
+        await runner.market_feed.stop()
+
+    asyncio.run(run())
+
+    symbols = set(runner.strategies_by_symbol)
+    assert len(runner.ledgers) == 4 * len(symbols)
+    assert set(fetches) == symbols
+    # Every poll fans out to all four strategies of the symbol
+    assert runner.latency.count == runner.market_feed.stats['dispatched'] > 0
+    assert max(fetches.values()) < 20
+
+
+def test_tick_updates_all_ledgers_of_symbol(runner):
+    runner.running = True
+    before = {key: ledger.last_update for key, ledger in runner.ledgers.items()}
+
+    async def run():
+        runner.market_feed.fetch_price = None
+        await runner.market_feed.start()
+        runner.market_feed.publish('ETH/USDT', Decimal('3400'))
+        await asyncio.sleep(0.01)
+        await runner.market_feed.stop()
+
+    asyncio.run(run())
+
+    updated = {key for key, ledger in runner.ledgers.items() if ledger.last_update != before[key]}
+    assert updated == set(runner.strategies_by_symbol['ETH/USDT'])
+    state = runner.get_combined_state()
+    assert state['tick_to_decision']['count'] == 1
+    assert state['tick_to_decision']['p50_ms'] >= 0
+    assert state['market_data']['symbols'] == 4
+
+
+def test_feed_conflates_to_latest_price_and_keeps_bars():
+    seen = []
+
+    async def handler(tick):
+        seen.append((tick.price, list(tick.bars)))
+
+    async def run():
+        feed = MarketDataFeed()
+        feed.subscribe('BTC/USDT', handler)
+        await feed.start()
+        for i in range(3):
+            feed.publish('BTC/USDT', Decimal(100 + i), bar=[i, 1, 1, 1, 1, 1])
+        await asyncio.sleep(0.01)
+        feed.publish('BTC/USDT', Decimal(200))
+        await asyncio.sleep(0.01)
+        await feed.stop()
+        return feed
+
+    feed = asyncio.run(run())
+    assert seen == [(Decimal(102), [[0, 1, 1, 1, 1, 1], [1, 1, 1, 1, 1, 1], [2, 1, 1, 1, 1, 1]]),
+                    (Decimal(200), [])]
+    assert feed.stats['conflated'] == 2
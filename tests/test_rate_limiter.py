@@ -0,0 +1,124 @@
+"""
+Test exchange RateLimiter (multi-bucket, priority lanes, header sync)
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.exchanges.base import RateBucket, RateLimiter, RequestPriority
+
+
+class TestRateLimiter:
+
+    @pytest.fixture
+    def limiter(self):
+        """Weight + order buckets with per-endpoint costs"""
+        return RateLimiter(
+            buckets=[
+                RateBucket("weight", capacity=10, refill_per_second=100, header="X-MBX-USED-WEIGHT-1M"),
+                RateBucket("orders", capacity=2, refill_per_second=20),
+            ],
+            endpoint_weights={
+                "ticker": {"weight": 2},
+                "create_order": {"weight": 1, "orders": 1},
+                "noop": {"weight": 0},
+            },
+        )
+
+    @pytest.mark.asyncio
+    async def test_default_single_bucket(self):
+        """Legacy constructor keeps a single requests bucket"""
+        limiter = RateLimiter(requests_per_second=10, burst=5)
+        for _ in range(5):
+            await limiter.acquire()
+        assert limiter.tokens < 1
+
+    @pytest.mark.asyncio
+    async def test_endpoint_costs_hit_every_bucket(self, limiter):
+        """An order consumes both request weight and order count"""
+        await limiter.acquire(endpoint="create_order", priority=RequestPriority.ORDER)
+        status = limiter.get_status()
+        assert status["buckets"]["weight"]["tokens"] == pytest.approx(9, abs=0.1)
+        assert status["buckets"]["orders"]["tokens"] == pytest.approx(1, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_zero_weight_never_waits(self, limiter):
+        """Zero-cost calls bypass a congested queue"""
+        tasks = [asyncio.create_task(limiter.acquire(endpoint="ticker")) for _ in range(20)]
+        await asyncio.sleep(0)
+        start = time.monotonic()
+        await limiter.acquire(endpoint="noop")
+        assert time.monotonic() - start < 0.01
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_waiters_run_concurrently(self, limiter):
+        """Waiters sleep in parallel instead of serializing behind a lock"""
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire(endpoint="ticker") for _ in range(25)))
+        elapsed = time.monotonic() - start
+        # 50 weight: 10 burst + 40 refilled at 100/s -> ~0.4s
+        assert 0.3 < elapsed < 0.8
+
+    @pytest.mark.asyncio
+    async def test_orders_preempt_market_data(self, limiter):
+        """Order lane is served before queued market-data polls"""
+        order = []
+
+        async def call(name, endpoint, priority):
+            await limiter.acquire(endpoint=endpoint, priority=priority)
+            order.append(name)
+
+        market = [
+            asyncio.create_task(call(f"md{i}", "ticker", RequestPriority.MARKET_DATA))
+            for i in range(10)
+        ]
+        await asyncio.sleep(0)
+        placed = asyncio.create_task(call("order", "create_order", RequestPriority.ORDER))
+        await asyncio.gather(*market, placed)
+
+        # Burst covers 5 tickers; the order must go before the remaining queue
+        assert order.index("order") <= 5
+
+    @pytest.mark.asyncio
+    async def test_blocked_bucket_does_not_stall_other_buckets(self, limiter):
+        """An order waiting on the order bucket does not hold up ticker calls"""
+        await limiter.acquire(endpoint="create_order", priority=RequestPriority.ORDER)
+        await limiter.acquire(endpoint="create_order", priority=RequestPriority.ORDER)
+        pending = asyncio.create_task(
+            limiter.acquire(endpoint="create_order", priority=RequestPriority.ORDER)
+        )
+        await asyncio.sleep(0)
+        start = time.monotonic()
+        await limiter.acquire(endpoint="ticker")
+        assert time.monotonic() - start < 0.02
+        await pending
+
+    @pytest.mark.asyncio
+    async def test_sync_from_headers(self, limiter):
+        """Server-reported usage overrides local estimate"""
+        limiter.sync_from_headers({"x-mbx-used-weight-1m": "9"})
+        status = limiter.get_status()
+        assert status["buckets"]["weight"]["tokens"] == pytest.approx(1, abs=0.2)
+        assert status["header_syncs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_limiter(self, limiter):
+        """Retry-After blocks all buckets"""
+        limiter.sync_from_headers({"Retry-After": "0.1"})
+        start = time.monotonic()
+        await limiter.acquire(endpoint="ticker")
+        assert time.monotonic() - start >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self, limiter):
+        """Cancelled waiters don't consume tokens or block the lane"""
+        for _ in range(5):
+            await limiter.acquire(endpoint="ticker")
+        waiter = asyncio.create_task(limiter.acquire(endpoint="ticker"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(limiter.acquire(endpoint="ticker"), timeout=0.2)
@@ -0,0 +1,176 @@
+"""
+Test online feature store and batched inference in the real-time predictor
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.real_time_predictor import (
+    FeatureEngineer,
+    MultiModelPredictor,
+    OnlineFeatureStore,
+    RealTimePredictionEngine,
+)
+
+
+def make_ohlcv(n=120, seed=0):
+    """Hourly random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    index = pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC")
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * 1.002,
+        'low': np.minimum(open_, close) * 0.998,
+        'close': close,
+        'volume': rng.uniform(100, 1000, n),
+    }, index=index)
+
+
+class TestOnlineFeatureStore:
+
+    def test_latest_row_matches_batch_features(self):
+        """Incremental row equals the last row of the full pandas pipeline"""
+        df = make_ohlcv()
+        store = OnlineFeatureStore()
+        store.seed("btc", df)
+
+        expected = FeatureEngineer().create_features(df).iloc[-1]
+        row = store.latest_row("btc")
+
+        for column, value in row.items():
+            assert value == pytest.approx(expected[column], rel=1e-9, abs=1e-9), column
+
+    def test_live_bar_revision(self):
+        """Re-sending the current bar replaces it instead of appending"""
+        df = make_ohlcv()
+        store = OnlineFeatureStore()
+        store.seed("btc", df.iloc[:-1])
+
+        last = df.iloc[-1]
+        bar = {'time': df.index[-1], 'open': last.open, 'high': last.high,
+               'low': last.low, 'close': last.close * 1.05, 'volume': last.volume}
+        store.update("btc", bar)
+        store.update("btc", {**bar, 'close': last.close})
+
+        expected = FeatureEngineer().create_features(df).iloc[-1]
+        assert store.latest_row("btc")['ema_10'] == pytest.approx(expected['ema_10'])
+        assert store.latest_price("btc") == pytest.approx(last.close)
+
+    def test_stale_bar_ignored(self):
+        """Bars older than the latest are rejected"""
+        df = make_ohlcv(40)
+        store = OnlineFeatureStore()
+        store.seed("btc", df)
+        first = df.iloc[0]
+        assert not store.update("btc", {'time': df.index[0], **first.to_dict()})
+
+    def test_not_ready_until_enough_history(self):
+        """Rows need 25 bars of history"""
+        store = OnlineFeatureStore()
+        store.seed("btc", make_ohlcv(24))
+        assert store.latest_row("btc") is None
+
+
+class TestBatchedInference:
+
+    @pytest.fixture
+    def predictor(self):
+        """Predictor trained on short horizons only"""
+        predictor = MultiModelPredictor()
+        assert predictor.train_models(make_ohlcv(200), target_horizons=[1, 24])
+        return predictor
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_predictions(self, predictor):
+        """One matrix call gives the same prices as per-symbol calls"""
+        frames = {f"s{i}": make_ohlcv(60, seed=i) for i in range(3)}
+        store = OnlineFeatureStore()
+        for symbol, df in frames.items():
+            store.seed(symbol, df)
+
+        symbols, X = store.latest_matrix(list(frames), predictor.feature_columns)
+        prices = np.array([store.latest_price(s) for s in symbols])
+        batch = predictor.predict_batch(symbols, X, prices)
+
+        for result in batch:
+            single = await predictor.predict(result.symbol, frames[result.symbol])
+            assert result.predicted_price_1h == pytest.approx(single.predicted_price_1h, rel=1e-6)
+            assert result.predicted_price_24h == pytest.approx(single.predicted_price_24h, rel=1e-6)
+
+    def test_fast_paths_match_sklearn_predict(self, predictor):
+        """Stacked linear models and direct tree passes equal each model's predict()"""
+        store = OnlineFeatureStore()
+        for i in range(4):
+            store.seed(f"s{i}", make_ohlcv(60, seed=20 + i))
+        _, X = store.latest_matrix([f"s{i}" for i in range(4)], predictor.feature_columns)
+
+        raw = predictor._predict_raw(X)
+        assert set(raw) == {(h, name) for h in (1, 24) for name in ('rf', 'gb', 'lr')}
+        for (horizon, name), values in raw.items():
+            expected = predictor.trained_models[horizon][name].predict(X)
+            np.testing.assert_allclose(values, expected, rtol=1e-9, atol=1e-12)
+
+    def test_horizons_keep_separate_models(self, predictor):
+        """Each horizon is fitted on its own estimator"""
+        assert predictor.trained_models[1]['lr'] is not predictor.trained_models[24]['lr']
+
+    def test_engine_predict_all_groups_shared_predictor(self, predictor):
+        """Symbols sharing a predictor are scored together into the cache"""
+        engine = RealTimePredictionEngine()
+        engine.symbols = ["a", "b"]
+        for i, symbol in enumerate(engine.symbols):
+            engine.predictors[symbol] = predictor
+            engine.feature_store.seed(symbol, make_ohlcv(60, seed=10 + i))
+
+        assert engine.predict_all() == 2
+        assert set(engine.get_all_predictions()) == {"a", "b"}
+
+
+class TestRegistryReuse:
+
+    @pytest.mark.asyncio
+    async def test_second_engine_loads_saved_ensemble(self, tmp_path, monkeypatch):
+        """Engines default to the shared registry, so a restart skips training"""
+        from src.ml import model_registry, real_time_predictor
+
+        monkeypatch.setenv("SOFIA_MODEL_DIR", str(tmp_path / "registry"))
+        monkeypatch.setattr(model_registry, "_default_registry", None)
+
+        async def noop():
+            pass
+
+        async def history(self, symbol, hours):
+            return make_ohlcv(200)
+
+        monkeypatch.setattr(real_time_predictor.fetcher, "start", noop)
+        monkeypatch.setattr(real_time_predictor.fetcher, "stop", noop)
+        monkeypatch.setattr(RealTimePredictionEngine, "_fetch_history", history)
+        trained = []
+        train_models = MultiModelPredictor.train_models
+        monkeypatch.setattr(MultiModelPredictor, "train_models", lambda self, df, **kwargs:
+                            trained.append(1) or train_models(self, df, target_horizons=[1, 24]))
+
+        first = RealTimePredictionEngine()
+        first.symbols = ["bitcoin"]
+        await first.start()
+        await first.stop()
+        assert len(trained) == 1
+
+        # A new process: fresh registry object reading the index from disk
+        monkeypatch.setattr(model_registry, "_default_registry", None)
+        second = RealTimePredictionEngine()
+        second.symbols = ["bitcoin"]
+        await second.start()
+        await second.stop()
+
+        assert len(trained) == 1
+        assert second.registry is not first.registry
+        assert second.predictors["bitcoin"].feature_columns == first.predictors["bitcoin"].feature_columns
+        second.feature_store.seed("bitcoin", make_ohlcv(200))
+        first.feature_store.seed("bitcoin", make_ohlcv(200))
+        assert second.predict_all() == 1 and first.predict_all() == 1
+        assert second.get_prediction("bitcoin").predicted_price_1h == pytest.approx(
+            first.get_prediction("bitcoin").predicted_price_1h)
@@ -0,0 +1,68 @@
+"""
+Test the chunked Monte Carlo engine in tools/risk_backtest.py
+"""
+
+import numpy as np
+import pytest
+
+from tools.risk_backtest import RiskBacktest, path_metrics, simulate_returns
+
+
+@pytest.fixture
+def history():
+    return np.random.default_rng(0).normal(0.002, 0.03, 250)
+
+
+def make_backtest(**overrides):
+    config = {"n_simulations": 2000, "n_days": 30, "seed": 7}
+    config.update(overrides)
+    return RiskBacktest(config)
+
+
+def test_path_metrics_match_scalar_versions():
+    """Row-wise VaR/ETL/drawdown equal the per-path calculations"""
+    backtest = make_backtest()
+    returns = np.random.default_rng(1).normal(0, 0.03, (50, 30))
+
+    growth, var, etl, max_dd = path_metrics(returns)
+
+    for i, row in enumerate(returns):
+        assert growth[i] == pytest.approx(np.prod(1 + row))
+        assert var[i] == pytest.approx(backtest.calculate_var(row, 0.95))
+        assert etl[i] == pytest.approx(backtest.calculate_etl(row, 0.95))
+        assert max_dd[i] == pytest.approx(backtest.calculate_max_drawdown(row)[0])
+
+
+def test_results_independent_of_workers_and_reproducible(history):
+    serial = make_backtest(chunk_memory_mb=0.05).monte_carlo_simulation(history)
+    parallel = make_backtest(chunk_memory_mb=0.05, n_workers=2).monte_carlo_simulation(history)
+    assert serial == parallel
+
+
+def test_parametric_split_follows_global_index():
+    """The first half of the paths is normal even when chunks straddle the split"""
+    params = {"method": "parametric", "n_days": 5, "mean": 5.0, "std": 0.0,
+              "t_params": (5.0, -5.0, 1e-9), "n_normal": 10}
+    returns = simulate_returns(params, 8, 14, np.random.default_rng(0))
+    assert returns.shape == (6, 5)
+    np.testing.assert_allclose(returns[:2], 5.0)
+    np.testing.assert_allclose(returns[2:], -5.0, atol=1e-6)
+
+
+def test_block_bootstrap_resamples_contiguous_history():
+    history = np.arange(20, dtype=float)
+    params = {"method": "bootstrap", "n_days": 12, "history": history, "block_size": 4}
+    returns = simulate_returns(params, 0, 100, np.random.default_rng(0))
+
+    assert returns.shape == (100, 12)
+    blocks = returns.reshape(100, 3, 4)
+    assert np.all(np.diff(blocks, axis=2) % 20 == 1)
+
+
+def test_distribution_matches_history(history):
+    """Bootstrap paths reproduce the historical mean daily return"""
+    results = make_backtest(method="bootstrap", n_simulations=20000).monte_carlo_simulation(history)
+    expected = np.mean(np.log1p(history)) * 30
+    assert np.log(results["final_values"]["median"] / 100000) == pytest.approx(expected, abs=0.02)
+    assert 0 < results["etl_distribution"]["mean"]
+    assert results["var_distribution"]["mean"] <= results["etl_distribution"]["mean"]
@@ -0,0 +1,117 @@
+"""
+Test the incremental risk state behind EnterpriseRiskManager
+"""
+
+import asyncio
+import math
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.enterprise_risk_manager import EnterpriseRiskManager, Position
+from src.core.risk_state import ReturnCovariance
+
+
+def position(pid, symbol, entry, size, side="long", stop=None):
+    return Position(id=pid, symbol=symbol, side=side, entry_price=Decimal(str(entry)),
+                    current_price=Decimal(str(entry)), size=Decimal(str(size)),
+                    timestamp=datetime.now(), stop_loss=Decimal(str(stop)) if stop else None)
+
+
+def test_rolling_correlation_matches_pairwise_pandas():
+    rng = np.random.default_rng(11)
+    cov = ReturnCovariance(lookback=30)
+    prices = {"A": 100.0, "B": 50.0, "C": 10.0}
+    rows = []
+    for t in range(600):  # several window lengths and resyncs
+        shock = rng.normal(0, 0.01)
+        prices["A"] *= math.exp(shock + rng.normal(0, 0.005))
+        prices["B"] *= math.exp(-shock + rng.normal(0, 0.01))
+        prices["C"] *= math.exp(rng.normal(0, 0.02))
+        snapshot = {s: p for s, p in prices.items() if not (s == "C" and t % 3 == 0)}
+        if t == 590:
+            snapshot["D"] = 5.0  # joins late
+        elif t > 590:
+            snapshot["D"] = 5.0 * math.exp(rng.normal(0, 0.01))
+        cov.observe(snapshot)
+        rows.append(snapshot)
+
+    # Reference: last 30 snapshots of returns, pairwise-complete observations
+    frame = pd.DataFrame(rows)
+    returns = np.log(frame).diff().iloc[-30:]
+    symbols = ["A", "B", "C", "D"]
+    expected = returns[symbols].corr(min_periods=2).to_numpy()
+    np.testing.assert_allclose(cov.correlation_matrix(symbols), expected, rtol=1e-9, atol=1e-9)
+    assert cov.correlation("A", "B") < -0.5
+    np.testing.assert_allclose(cov.covariance_matrix(["A", "B"]), returns[["A", "B"]].cov().to_numpy(),
+                               rtol=1e-9)
+
+
+def test_aggregates_follow_position_changes():
+    manager = EnterpriseRiskManager({"max_positions": 100, "max_position_size": 1.0,
+                                     "max_portfolio_heat": 1.0})
+
+    async def run():
+        for i in range(20):
+            side = "long" if i % 2 else "short"
+            stop = 95 + i if side == "long" else None
+            assert await manager.add_position(position(f"P{i}", f"S{i}/USDT", 100 + i, 1 + i / 10, side, stop))
+        await manager.close_position("P3")
+        await manager.close_position("P8")
+        manager.positions["P5"].current_price = Decimal("140")
+        await manager.update_stop_loss("P5", "trailing")
+
+    asyncio.run(run())
+    exposure = sum(p.entry_price * p.size for p in manager.positions.values())
+    risk = sum(p.risk_amount for p in manager.positions.values())
+    assert manager.book.exposure == exposure
+    assert manager.calculate_portfolio_heat() == risk / exposure * 100
+    assert len(manager.book) == 18
+
+
+def test_prices_drive_stops_correlation_checks_and_var():
+    manager = EnterpriseRiskManager({"max_positions": 100, "max_position_size": 1.0,
+                                     "max_portfolio_heat": 1.0, "max_correlation": 0.7})
+    rng = np.random.default_rng(5)
+    btc, eth, sol = 50000.0, 3000.0, 100.0
+    for _ in range(40):
+        shock = rng.normal(0, 0.01)
+        btc *= math.exp(shock)
+        eth *= math.exp(shock + rng.normal(0, 0.001))
+        sol *= math.exp(rng.normal(0, 0.02))
+        manager.update_prices({"BTC/USDT": btc, "ETH/USDT": eth, "SOL/USDT": sol})
+
+    async def run():
+        assert await manager.add_position(position("btc", "BTC/USDT", btc, 0.1, stop=btc * 0.99))
+        ok, reason = await manager.check_position_limits("ETH/USDT", Decimal("100"), Decimal("100000"))
+        assert not ok and "BTC/USDT" in reason
+        assert await manager.add_position(position("sol", "SOL/USDT", sol, 10, side="short", stop=sol * 1.05))
+
+        manager.update_prices({"BTC/USDT": btc * 0.98, "ETH/USDT": eth, "SOL/USDT": sol * 1.01})
+        assert manager.book.triggered_stops() == ["btc"]
+        await manager.check_stop_losses()
+
+    asyncio.run(run())
+    assert list(manager.positions) == ["sol"]
+    assert manager.positions["sol"].current_price == Decimal(str(sol * 1.01))
+    assert manager.alerts[-1].message == "Stop loss triggered for BTC/USDT"
+
+    # One short SOL position: VaR is z * sigma * notional
+    sigma = math.sqrt(manager.returns.covariance_matrix(["SOL/USDT"])[0, 0])
+    assert float(manager.calculate_portfolio_var()) == pytest.approx(1.6448536 * sigma * sol * 10, rel=1e-6)
+
+
+def test_correlation_matrix_from_assigned_history():
+    manager = EnterpriseRiskManager({})
+    manager.price_history["BTC/USDT"] = [45000 + i * 100 + (i % 3) * 50 for i in range(30)]
+    manager.price_history["ETH/USDT"] = [3000 + i * 10 + (i % 3) * 5 for i in range(40)]
+    manager.price_history["BNB/USDT"] = [400 - i * 2 - (i % 4) for i in range(30)]
+
+    matrix = manager.calculate_correlation_matrix(["BTC/USDT", "ETH/USDT", "BNB/USDT"])
+    btc = np.diff(np.log(manager.price_history["BTC/USDT"]))
+    eth = np.diff(np.log(manager.price_history["ETH/USDT"][-30:]))
+    assert matrix["BTC/USDT"]["ETH/USDT"] == pytest.approx(np.corrcoef(btc, eth)[0, 1])
+    assert matrix["BNB/USDT"]["BNB/USDT"] == 1.0
@@ -0,0 +1,144 @@
+"""
+Test batched, cached sentiment scoring
+"""
+
+import threading
+
+import pytest
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from src.ai.sentiment_service import SentimentService
+
+
+class FakeFinBERT:
+    """Records batch sizes and the thread each batch ran on"""
+
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+
+    def __call__(self, texts, batch_size=None, truncation=False):
+        self.batches.append(len(texts))
+        self.threads.add(threading.current_thread().name)
+        return [{'label': 'negative' if 'loss' in t else 'positive', 'score': 0.9} for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_batches_off_loop_and_scores_each_text_once(tmp_path):
+    model = FakeFinBERT()
+    service = SentimentService(finbert=model, cache_path=tmp_path / "scores.jsonl", batch_size=4)
+    texts = [f"headline {i}" for i in range(10)] + ["record loss", "headline 0"]
+
+    scores = await service.score_many(texts)
+    again = await service.score_many(texts)
+
+    assert model.batches == [4, 4, 3]
+    assert all(name.startswith("sentiment") for name in model.threads)
+    assert scores == again
+    assert scores[10] == {'score': -0.9, 'confidence': 0.9}
+    stats = service.get_stats()
+    assert stats['scored'] == 11
+    assert stats['cache_hit_ratio'] == pytest.approx(12 / 24)
+    assert stats['articles_per_second'] > 0
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_survives_restart(tmp_path):
+    path = tmp_path / "scores.jsonl"
+    first = SentimentService(finbert=FakeFinBERT(), cache_path=path)
+    await first.score_many(["Profits jump", "Shares slide on loss"])
+
+    model = FakeFinBERT()
+    second = SentimentService(finbert=model, cache_path=path)
+    assert (await second.score("Shares slide on loss"))['score'] == -0.9
+    assert model.batches == []
+
+
+@pytest.mark.asyncio
+async def test_vader_uses_same_path_and_model_keys_differ(tmp_path):
+    path = tmp_path / "scores.jsonl"
+    vader = SentimentIntensityAnalyzer()
+    service = SentimentService(vader=vader, cache_path=path)
+
+    score = await service.score("Great quarter, strong growth")
+    expected = vader.polarity_scores("Great quarter, strong growth")
+    assert score['score'] == expected['compound']
+    assert (await service.score("   ")) == {'score': 0.0, 'confidence': 0.0}
+
+    # A FinBERT service does not reuse VADER scores
+    finbert = SentimentService(vader=vader, finbert=FakeFinBERT(), cache_path=path)
+    assert (await finbert.score("Great quarter, strong growth"))['confidence'] == 0.9
+
+
+@pytest.mark.asyncio
+async def test_finbert_failure_falls_back_to_vader():
+    def broken(texts, **kwargs):
+        raise RuntimeError("CUDA out of memory")
+
+    service = SentimentService(vader=SentimentIntensityAnalyzer(), finbert=broken, cache_path=None)
+    score = await service.score("Terrible crash")
+    assert score['score'] < 0
+    assert service.stats['fallbacks'] == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_scores_are_not_cached(tmp_path):
+    path = tmp_path / "scores.jsonl"
+    model = FakeFinBERT()
+    calls = [0]
+
+    def flaky(texts, **kwargs):
+        calls[0] += 1
+        if calls[0] == 1:
+            raise RuntimeError("CUDA out of memory")
+        return model(texts, **kwargs)
+
+    service = SentimentService(vader=SentimentIntensityAnalyzer(), finbert=flaky, cache_path=path)
+    fallback = await service.score("Terrible crash")
+    recovered = await service.score("Terrible crash")
+
+    assert fallback['confidence'] != 0.9
+    assert recovered == {'score': 0.9, 'confidence': 0.9}
+    assert len(path.read_text().splitlines()) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded_and_file_compacted(tmp_path):
+    path = tmp_path / "scores.jsonl"
+    service = SentimentService(finbert=FakeFinBERT(), cache_path=path, max_entries=4)
+    for i in range(12):
+        await service.score(f"headline {i}")
+        await service.score("headline 0")  # kept hot
+
+    assert len(service._cache) == 4
+    assert len(path.read_text().splitlines()) <= 8
+
+    model = FakeFinBERT()
+    restarted = SentimentService(finbert=model, cache_path=path, max_entries=4)
+    await restarted.score_many(["headline 10", "headline 11"])
+    assert model.batches == []
+    assert len(path.read_text().splitlines()) == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_file_io_stays_off_the_event_loop(tmp_path, monkeypatch):
+    import builtins
+
+    path = tmp_path / "scores.jsonl"
+    path.write_text('{"key": "stale", "score": 0.1, "confidence": 0.2}\n' * 3)
+    threads = []
+    real_open = builtins.open
+
+    def tracking_open(file, *args, **kwargs):
+        if str(file).startswith(str(path)):
+            threads.append(threading.current_thread().name)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", tracking_open)
+    service = SentimentService(finbert=FakeFinBERT(), cache_path=path, max_entries=2)
+    for i in range(6):
+        await service.score(f"headline {i}")
+
+    # load, compaction of the stale lines, appends and a later compaction
+    assert len(threads) >= 4
+    assert all(name.startswith("sentiment") for name in threads)
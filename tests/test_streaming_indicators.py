@@ -0,0 +1,129 @@
+"""
+Test the streaming indicators and bar aggregation in backend/app/trading
+"""
+
+import math
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from backend.app.trading.streaming_indicators import (
+    ADX, ATR, CCI, EMA, MACD, MFI, RSI, Bar, BarAggregator, BollingerBands, IndicatorSet,
+    LinearTrend,
+)
+
+# talib outputs for the series below (TA-Lib 0.8.2)
+TALIB_LAST = {
+    'ema': 126.11588828891983,
+    'rsi': 50.09623057649893,
+    'macd': (3.0572220728872423, 3.980561867951228, -0.9233397950639857),
+    'bbands': (136.4234528184559, 125.2765935673644, 114.1297343162729),
+    'atr': 3.1180612405242507,
+    'adx': 38.4981064198222,
+    'cci': -165.53001021021075,
+    'mfi': 43.3958514410937,
+}
+
+
+def make_bars(n=80):
+    bars = []
+    for i in range(n):
+        close = 100 + 10 * math.sin(i / 5) + 0.3 * i
+        bars.append(Bar(i * 60.0, close, close + 1 + (i % 3) * 0.5, close - 1 - (i % 4) * 0.25,
+                        close, 100.0 + (i * 37) % 50))
+    return bars
+
+
+def make_indicators():
+    return {
+        'ema': EMA(12), 'rsi': RSI(14), 'macd': MACD(12, 26, 9), 'bbands': BollingerBands(20, 2.0),
+        'atr': ATR(14), 'adx': ADX(14), 'cci': CCI(14), 'mfi': MFI(14),
+    }
+
+
+def test_matches_talib_with_live_previews_in_between():
+    indicators = make_indicators()
+    first_ready = {}
+    for i, bar in enumerate(make_bars()):
+        for name, indicator in indicators.items():
+            # A forming bar far from the final one must not leak into state
+            indicator.update(Bar(bar.timestamp, bar.open, bar.high * 1.2, bar.low * 0.8,
+                                 bar.close * 1.1, bar.volume * 5), closed=False)
+            indicator.update(bar)
+            if indicator.ready:
+                first_ready.setdefault(name, i)
+
+    for name, expected in TALIB_LAST.items():
+        assert indicators[name].value == pytest.approx(expected, rel=1e-9)
+        assert first_ready[name] == indicators[name].lookback
+
+
+def test_linear_trend_matches_linregress():
+    trend = LinearTrend(20)
+    closes = [bar.close for bar in make_bars()]
+    for close in closes:
+        trend.update(Bar(0.0, close, close, close, close))
+    fit = stats.linregress(np.arange(20), closes[-20:])
+    assert trend.value == pytest.approx((fit.slope, fit.rvalue), rel=1e-9)
+
+
+def test_aggregator_closes_bars_and_keeps_the_live_one():
+    aggregator = BarAggregator('5m')
+    ticks = [(0, 10.0, 1), (60, 12.0, 2), (299, 9.0, 1), (300, 11.0, 4), (200, 50.0, 1), (610, 13.0, 1)]
+    closed = [bar for bar in (aggregator.add_tick(ts, p, v) for ts, p, v in ticks) if bar]
+
+    assert closed == [Bar(0.0, 10.0, 12.0, 9.0, 9.0, 4.0), Bar(300.0, 11.0, 11.0, 11.0, 11.0, 4.0)]
+    assert aggregator.live == Bar(600.0, 13.0, 13.0, 13.0, 13.0, 1.0)
+
+
+def test_indicator_set_tracks_live_bar():
+    live = IndicatorSet('1m', {'ema': EMA(3)})
+    closed_only = IndicatorSet('1m', {'ema': EMA(3)}, live=False)
+    prices = [10.0, 11.0, 12.0, 13.0, 20.0]
+    for minute, price in enumerate(prices):
+        for indicator_set in (live, closed_only):
+            indicator_set.update_tick(minute * 60 + 1, price)
+
+    # Four closed bars (10..13) plus the live bar at 20
+    k = 0.5
+    closed_ema = 11.0 + k * (13.0 - 11.0)
+    assert closed_only.values() == {'ema': closed_ema}
+    assert live.values() == {'ema': pytest.approx(closed_ema + k * (20.0 - closed_ema))}
+    assert live['ema'].count == 4
+
+
+def test_strategies_keep_streaming_indicators_per_symbol():
+    pytest.importorskip("structlog")
+    pytest.importorskip("talib")
+    from datetime import datetime, timezone
+    from backend.app.trading.engine import Portfolio
+    from backend.app.trading.strategies import MomentumBreakoutStrategy
+
+    strategy = MomentumBreakoutStrategy(Portfolio(10000.0))
+    assert strategy.indicator('BTC/USDT', 'rsi', 50.0) == 50.0
+
+    expected = {symbol: (RSI(14), MACD(12, 26, 9)) for symbol in ('BTC/USDT', 'ETH/USDT')}
+    for i, bar in enumerate(make_bars()):
+        timestamp = datetime.fromtimestamp(bar.timestamp, timezone.utc)
+        for scale, symbol in enumerate(expected, start=1):
+            price = bar.close * scale + (i % 7 if scale == 2 else 0)
+            strategy.update_market_data(symbol, price, bar.volume, timestamp)
+            for indicator in expected[symbol]:
+                indicator.update(Bar(bar.timestamp, price, price, price, price, bar.volume))
+
+    for symbol, (rsi, macd) in expected.items():
+        assert strategy.indicator(symbol, 'rsi') == rsi.value
+        assert strategy.indicator(symbol, 'macd') == macd.value
+    assert strategy.indicator('BTC/USDT', 'rsi') != strategy.indicator('ETH/USDT', 'rsi')
+
+
+def test_incomplete_indicator_fails_on_construction():
+    from backend.app.trading.streaming_indicators import StreamingIndicator
+
+    class NoCommit(StreamingIndicator):
+        def _step(self, bar):
+            return None, bar.close
+
+    with pytest.raises(TypeError):
+        NoCommit()
@@ -0,0 +1,101 @@
+"""
+Portfolio Benchmark - HRP rebalance cost across universe sizes
+Compares a full rebuild (sample covariance + new cluster tree) against the
+incremental path (EWMA covariance update + cached tree) used between rebalances
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.portfolio.allocation_engine import (
+    EWMACovariance, HRPEngine, covariance_to_correlation, inverse_volatility_weights, kelly_weights
+)
+
+
+def _returns(n_assets: int, periods: int, rng: np.random.Generator) -> np.ndarray:
+    """Factor-driven daily returns so the cluster tree has structure"""
+    factors = rng.normal(0, 0.01, (periods, 5))
+    loadings = rng.normal(0, 1, (5, n_assets))
+    return factors @ loadings + rng.normal(0, 0.01, (periods, n_assets))
+
+
+def _timed(fn, repeats: int) -> float:
+    """Best-of wall time in milliseconds"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_benchmark(sizes: List[int], window: int = 250, new_rows: int = 1,
+                  repeats: int = 5, seed: int = 7) -> List[Dict]:
+    """Time one rebalance per universe size"""
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in sizes:
+        history = _returns(n, window + new_rows, rng)
+        previous, latest = history[:window], history[-new_rows:]
+
+        def full_rebuild():
+            cov = np.cov(history[new_rows:], rowvar=False)
+            HRPEngine().allocate(cov)
+
+        ewma = EWMACovariance(n)
+        ewma.update_many(previous)
+        engine = HRPEngine()
+        engine.allocate(ewma.cov, ewma.correlation())
+
+        def incremental():
+            state = EWMACovariance(n)
+            state.mean, state.cov, state.count = ewma.mean.copy(), ewma.cov.copy(), ewma.count
+            state.update_many(latest)
+            engine.allocate(state.cov, covariance_to_correlation(state.cov))
+
+        cov = np.cov(history, rowvar=False)
+        results.append({
+            "assets": n,
+            "full_rebuild_ms": round(_timed(full_rebuild, repeats), 2),
+            "incremental_ms": round(_timed(incremental, repeats), 2),
+            "tree_reused": engine.stats["reused"] > 0,
+            "voltarget_ms": round(_timed(lambda: inverse_volatility_weights(cov), repeats), 3),
+            "kelly_ms": round(_timed(lambda: kelly_weights(history.mean(axis=0) * 252, cov * 252, 0.5), repeats), 2),
+        })
+    return results
+
+
+def main():
+    """Run portfolio construction benchmark"""
+    parser = argparse.ArgumentParser(description="HRP/vol-target/Kelly rebalance benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--window", type=int, default=250)
+    parser.add_argument("--new-rows", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, window=args.window, new_rows=args.new_rows,
+                            repeats=args.repeats)
+
+    print("=" * 72)
+    print("PORTFOLIO CONSTRUCTION BENCHMARK")
+    print("=" * 72)
+    print(f"Window: {args.window} periods, {args.new_rows} new row(s) per rebalance")
+    print(f"{'assets':>7} {'full HRP':>11} {'incremental':>12} {'reused':>7} {'voltarget':>10} {'kelly':>9}")
+    for r in results:
+        print(
+            f"{r['assets']:>7} {r['full_rebuild_ms']:>9.2f}ms {r['incremental_ms']:>10.2f}ms "
+            f"{str(r['tree_reused']):>7} {r['voltarget_ms']:>8.3f}ms {r['kelly_ms']:>7.2f}ms"
+        )
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
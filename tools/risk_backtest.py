@@ -5,6 +5,7 @@
 
 import numpy as np
 from scipy import stats
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
@@ -27,6 +28,13 @@ def __init__(self, config: Dict = None):
         self.n_days = config.get("n_days", 30)
         self.confidence_levels = config.get("confidence_levels", [0.95, 0.99])
         
+        # Monte Carlo engine: "parametric" (normal + Student-t) or "bootstrap"
+        self.method = config.get("method", "parametric")
+        self.block_size = config.get("block_size", 5)
+        self.seed = config.get("seed")
+        self.chunk_memory_mb = config.get("chunk_memory_mb", 64)
+        self.n_workers = config.get("n_workers", 1)
+        
         # Risk-free rate (annual)
         self.risk_free_rate = config.get("risk_free_rate", 0.02)
         
@@ -48,6 +56,11 @@ def load_config(self) -> Dict:
             "n_simulations": 10000,
             "n_days": 30,
             "confidence_levels": [0.95, 0.99],
+            "method": "parametric",
+            "block_size": 5,
+            "seed": None,
+            "chunk_memory_mb": 64,
+            "n_workers": 1,
             "risk_free_rate": 0.02,
             "max_position": 100000,
             "initial_capital": 100000
@@ -80,7 +93,7 @@ def load_historical_returns(self) -> np.ndarray:
             # Generate realistic crypto returns (higher vol)
             mean_return = 0.002  # 0.2% daily
             volatility = 0.03    # 3% daily vol
-            returns = np.random.normal(mean_return, volatility, 100)
+            returns = np.random.default_rng(self.seed).normal(mean_return, volatility, 100)
         
         return np.array(returns)
     
@@ -200,60 +213,55 @@ def monte_carlo_simulation(
         self,
         historical_returns: np.ndarray
     ) -> Dict:
-        """Run Monte Carlo simulation"""
-        
-        # Fit distribution to historical returns
-        mean = np.mean(historical_returns)
-        std = np.std(historical_returns)
-        
-        # Also fit a t-distribution for fat tails
-        params = stats.t.fit(historical_returns)
-        df, loc, scale = params
-        
-        # Storage for simulation results
-        final_values = []
-        paths = []
-        vars = []
-        max_dds = []
-        
-        logger.info(f"Running {self.n_simulations} Monte Carlo simulations...")
-        
-        for sim in range(self.n_simulations):
-            # Generate returns path
-            if sim < self.n_simulations // 2:
-                # Half with normal distribution
-                sim_returns = np.random.normal(mean, std, self.n_days)
-            else:
-                # Half with t-distribution (fat tails)
-                sim_returns = stats.t.rvs(df, loc=loc, scale=scale, size=self.n_days)
-            
-            # Calculate cumulative value
-            cum_value = self.initial_capital * np.cumprod(1 + sim_returns)
-            final_value = cum_value[-1]
-            
-            # Store results
-            final_values.append(final_value)
-            
-            # Store sample paths
-            if sim < 100:  # Store first 100 paths for visualization
-                paths.append(cum_value)
-            
-            # Calculate VaR for this path
-            path_var = self.calculate_var(sim_returns, 0.95)
-            vars.append(path_var)
-            
-            # Calculate max drawdown
-            max_dd, _ = self.calculate_max_drawdown(sim_returns)
-            max_dds.append(max_dd)
+        """
+        Run Monte Carlo simulation.
+        
+        Paths are drawn as (simulations x days) matrices in chunks sized to
+        ``chunk_memory_mb`` and reduced along the day axis, so memory stays
+        flat as ``n_simulations`` grows. Each chunk gets its own seed spawned
+        from ``seed``, which makes results independent of ``n_workers``.
+        """
+        historical_returns = np.asarray(historical_returns, dtype=float)
+        
+        params = {"method": self.method, "n_days": self.n_days}
+        if self.method == "bootstrap":
+            params.update(history=historical_returns, block_size=self.block_size)
+        else:
+            # Half of the paths are normal, half Student-t for fat tails
+            df, loc, scale = stats.t.fit(historical_returns)
+            params.update(
+                mean=np.mean(historical_returns),
+                std=np.std(historical_returns),
+                t_params=(df, loc, scale),
+                n_normal=self.n_simulations // 2
+            )
+        
+        chunk_size = max(1, int(self.chunk_memory_mb * 1024 ** 2 // (self.n_days * 8 * 4)))
+        bounds = [
+            (start, min(start + chunk_size, self.n_simulations))
+            for start in range(0, self.n_simulations, chunk_size)
+        ]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(bounds))
+        tasks = [(params, start, stop, seed) for (start, stop), seed in zip(bounds, seeds)]
+        
+        logger.info(
+            f"Running {self.n_simulations} Monte Carlo simulations "
+            f"({self.method}, {len(tasks)} chunks, {self.n_workers} workers)..."
+        )
+        
+        if self.n_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                chunks = list(executor.map(_simulate_chunk, tasks))
+        else:
+            chunks = [_simulate_chunk(task) for task in tasks]
         
-        # Calculate statistics
-        final_values = np.array(final_values)
-        vars = np.array(vars)
-        max_dds = np.array(max_dds)
+        growth, vars, etls, max_dds = (np.concatenate(parts) for parts in zip(*chunks))
+        final_values = self.initial_capital * growth
         
         results = {
             "n_simulations": self.n_simulations,
             "n_days": self.n_days,
+            "method": self.method,
             "initial_capital": self.initial_capital,
             "final_values": {
                 "mean": np.mean(final_values),
@@ -275,6 +283,11 @@ def monte_carlo_simulation(
                 "p95": np.percentile(vars, 95),
                 "p99": np.percentile(vars, 99)
             },
+            "etl_distribution": {
+                "mean": np.mean(etls),
+                "p95": np.percentile(etls, 95),
+                "p99": np.percentile(etls, 99)
+            },
             "max_dd_distribution": {
                 "mean": np.mean(max_dds),
                 "p95": np.percentile(max_dds, 95),
@@ -438,6 +451,57 @@ def print_report(self, metrics: Dict):
         print("="*60)
 
 
+def simulate_returns(
+    params: Dict,
+    start: int,
+    stop: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """Return paths ``start..stop`` of the simulation as a (paths x days) matrix"""
+    n_paths, n_days = stop - start, params["n_days"]
+    
+    if params["method"] == "bootstrap":
+        # Circular block bootstrap keeps short-range autocorrelation and vol clustering
+        history, block = params["history"], max(1, min(params["block_size"], len(params["history"])))
+        n_blocks = -(-n_days // block)
+        starts = rng.integers(0, len(history), size=(n_paths, n_blocks, 1))
+        index = (starts + np.arange(block)) % len(history)
+        return history[index.reshape(n_paths, -1)[:, :n_days]]
+    
+    # Global path index decides the distribution, as in the sequential loop
+    n_normal = min(max(params["n_normal"] - start, 0), n_paths)
+    df, loc, scale = params["t_params"]
+    return np.vstack([
+        rng.normal(params["mean"], params["std"], size=(n_normal, n_days)),
+        loc + scale * rng.standard_t(df, size=(n_paths - n_normal, n_days))
+    ])
+
+
+def path_metrics(
+    returns: np.ndarray,
+    confidence_level: float = 0.95
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Growth factor, VaR, ETL and max drawdown of each row of a returns matrix"""
+    # Same order statistic as calculate_var, selected without a full sort
+    k = int((1 - confidence_level) * returns.shape[1])
+    var = -np.partition(returns, k, axis=1)[:, k]
+    
+    tail = returns <= -var[:, None]
+    etl = -(returns * tail).sum(axis=1) / tail.sum(axis=1)
+    
+    cum_returns = np.cumprod(1 + returns, axis=1)
+    running_max = np.maximum.accumulate(cum_returns, axis=1)
+    max_dd = np.abs(np.min((cum_returns - running_max) / running_max, axis=1))
+    
+    return cum_returns[:, -1], var, etl, max_dd
+
+
+def _simulate_chunk(task: Tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Worker entry point: simulate one chunk and reduce it to per-path metrics"""
+    params, start, stop, seed = task
+    return path_metrics(simulate_returns(params, start, stop, np.random.default_rng(seed)))
+
+
 def main():
     """Run risk backtest"""
     